@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Gemeinsame Fixtures für die Tests mit den Beispieldaten.
+"""
+
+import io
+
+import pytest
+from pymarc import MARCReader
+
+SAMPLE_MARC = "samples/output.mrc"
+
+
+@pytest.fixture(scope="session")
+def sample_bytes() -> bytes:
+    """Die Beispieldatei als ISO-2709-Bytes (einmal pro Testlauf gelesen)."""
+    with open(SAMPLE_MARC, 'rb') as marc_file:
+        return marc_file.read()
+
+
+@pytest.fixture
+def sample_records(sample_bytes):
+    """Die Beispielrecords als pymarc.Record-Objekte, pro Test neu geparst (Tests dürfen sie verändern)."""
+    return list(MARCReader(io.BytesIO(sample_bytes)))
+
+
+@pytest.fixture
+def sample_values(sample_records):
+    """Die Feldwerte der Beispielrecords aus map_record()."""
+    from marc2finc import map_record
+    return [map_record(record) for record in sample_records]
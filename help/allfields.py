@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Erzeugung des Freitextfelds allfields (SolrMarc: getAllSearchableFieldsAsSet).
+
+In der SolrMarc-Konfiguration steht ``allfields = custom, getAllSearchableFieldsAsSet(100, 900)``:
+Alle Datenfelder mit einer Feldnummer von 100 bis 899 werden mit ihren Subfeldern
+(durch Leerzeichen getrennt) als je ein Wert übernommen, doppelte Werte entfallen,
+die Reihenfolge bleibt erhalten.
+
+Die Implementierung durchläuft die Felder eines Records genau einmal; bei einem
+LazyRecord werden dabei nur die Felder im Bereich dekodiert. Die Subfelder
+eines Feldes werden in einem wiederverwendeten Puffer gesammelt, Duplikate über eine
+Hash-Menge der Feldtexte erkannt. Optional wird die Gesamtgröße begrenzt; write_joined()
+schreibt den verbundenen Text direkt in einen Stream, ohne eine Liste der Feldtexte
+aufzubauen.
+"""
+
+import io
+from typing import List, Optional, TextIO
+
+from help.slublogging import getSlubLogger
+
+
+class AllFieldsBuilder:
+    """
+    Baut allfields für einen Record in einem Durchlauf über die Datenfelder.
+
+    Example:
+        >>> builder = AllFieldsBuilder(100, 900)
+        >>> values = builder.build(record)
+        >>> text = builder.joined(record)
+    """
+
+    def __init__(self, lower_bound: int = 100, upper_bound: int = 900, max_chars: Optional[int] = None,
+                 separator: str = " ", skip_codes: str = ""):
+        """
+        Args:
+            lower_bound: Kleinste Feldnummer (inklusive)
+            upper_bound: Größte Feldnummer (exklusive), wie bei SolrMarc
+            max_chars: Optional. Obergrenze für die Gesamtlänge aller Werte; weitere Felder werden verworfen
+            separator: Trennzeichen zwischen den Subfeldern eines Feldes
+            skip_codes: Optional. Subfeldcodes, die nicht übernommen werden (z.B. "0123456789" für Steuersubfelder)
+        """
+        self.log = getSlubLogger('help.allfields')
+        # Gültige Feldnummern vorab als Menge von Strings, damit pro Feld kein int() nötig ist
+        self.tags = frozenset(f"{tag:03d}" for tag in range(max(lower_bound, 10), upper_bound))
+        self.max_chars = max_chars
+        self.separator = separator
+        self.skip_codes = frozenset(skip_codes)
+        self.truncated_records = 0
+        # Wiederverwendeter Puffer für die Subfelder des aktuellen Feldes
+        self._buffer: List[str] = []
+
+    def _field_texts(self, record):
+        """Liefert die Feldtexte aller passenden Datenfelder, ohne Duplikate und unter Beachtung von max_chars."""
+        tags = self.tags
+        skip_codes = self.skip_codes
+        separator = self.separator
+        buffer = self._buffer
+        remaining = self.max_chars
+        seen = set()
+
+        # LazyRecord dekodiert so nur die Felder im Bereich, nicht 0xx und 9xx
+        get_fields_in = getattr(record, "get_fields_in", None)
+        fields = get_fields_in(tags) if get_fields_in is not None else record.fields
+        for field in fields:
+            if field.tag not in tags or field.is_control_field():
+                continue
+            buffer.clear()
+            for code, value in field.subfields:
+                if value and code not in skip_codes:
+                    buffer.append(value)
+            if not buffer:
+                continue
+            text = separator.join(buffer)
+            if text in seen:
+                continue
+            if remaining is not None:
+                if len(text) > remaining:
+                    self.truncated_records += 1
+                    return
+                remaining -= len(text) + len(separator)
+            seen.add(text)
+            yield text
+
+    def build(self, record) -> List[str]:
+        """
+        Liefert die durchsuchbaren Feldtexte eines Records (entspricht getAllSearchableFieldsAsSet).
+
+        Args:
+            record: Ein pymarc.Record-Objekt
+
+        Returns:
+            Liste der Feldtexte ohne Duplikate in der Reihenfolge der Felder
+        """
+        return list(self._field_texts(record))
+
+    def write_joined(self, record, out: TextIO, separator: str = " ") -> int:
+        """
+        Schreibt die Feldtexte verbunden in einen Stream, ohne eine Liste aufzubauen.
+
+        Args:
+            record: Ein pymarc.Record-Objekt
+            out: Textstream, z.B. eine geöffnete Datei oder io.StringIO
+            separator: Trennzeichen zwischen den Feldtexten
+
+        Returns:
+            Anzahl der geschriebenen Zeichen
+        """
+        written = 0
+        for text in self._field_texts(record):
+            if written:
+                written += out.write(separator)
+            written += out.write(text)
+        return written
+
+    def joined(self, record, separator: str = " ") -> str:
+        """
+        Liefert die Feldtexte als einen String (für Solr-Felder, die nicht mehrwertig sind).
+
+        Args:
+            record: Ein pymarc.Record-Objekt
+            separator: Trennzeichen zwischen den Feldtexten
+
+        Returns:
+            Der verbundene Text
+        """
+        out = io.StringIO()
+        self.write_joined(record, out, separator)
+        return out.getvalue()
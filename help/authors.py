@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Extraktion von Autoren, Körperschaften und ihren Rollen aus MARC21-Records.
+
+Die Felder 100/110/111/700/710/711 werden in einem einzigen Durchlauf gelesen.
+Pro Feld wird der Name aus den Namens-Subfeldern gebildet und die Rolle über
+eine vorab berechnete Tabelle aus $4 (Relator-Code) bzw. $e/$j (Relator-Term)
+aufgelöst. Namen und Rollen landen in parallelen Listen gleicher Länge; fehlt
+die Rolle, steht an ihrer Stelle ein leerer String.
+
+Zuordnung zu den Finc-Feldern:
+- 100 -> author / author_role
+- 700 -> author2 / author2_role
+- 110, 111, 710, 711 -> author_corporate / author_corporate_role
+
+author_sort ist der erste Name in der Reihenfolge 100abcd:110ab:111abc:700abcd
+und wird aus demselben Durchlauf abgeleitet.
+
+Die Zuordnung ist in TAG_RULES hinterlegt; author_rules() leitet sie aus den
+source_marc-Annotationen des Schemas ab (siehe generate_converter()).
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from help.slublogging import getSlubLogger
+
+# Platzhalter für Namen ohne (auflösbare) Rolle, damit Anzahl Namen = Anzahl Rollen
+ROLE_PLACEHOLDER = ""
+
+# Trennzeichen, wenn ein Name mehrere Rollen hat (z.B. "aut|edt")
+RELATOR_SEPARATOR = "|"
+
+AUTHOR_TAGS = ("100", "110", "111", "700", "710", "711")
+
+# Reihenfolge für author_sort: 100abcd:110ab:111abc:700abcd
+AUTHOR_SORT_TAGS = ("100", "110", "111", "700")
+
+# Relator-Codes (MARC Code List for Relators) mit deutschen und englischen Termen
+# aus RDA bzw. der GND-Praxis. Die Terme werden beim Import in die Nachschlagetabelle
+# RELATOR_TERMS übernommen.
+RELATORS: Dict[str, tuple] = {
+    "act": ("SchauspielerIn", "Schauspieler", "actor"),
+    "adi": ("Art Director", "art director"),
+    "arr": ("ArrangeurIn", "Arrangeur", "arranger"),
+    "aui": ("VerfasserIn eines Vorworts", "VerfasserIn einer Einleitung", "author of introduction, etc."),
+    "aup": ("ProduzentIn einer Tonaufnahme", "audio producer"),
+    "aus": ("DrehbuchautorIn", "Drehbuchautor", "screenwriter"),
+    "aut": ("VerfasserIn", "Verfasser", "Verf.", "Verf .e. Beitr.", "author"),
+    "cad": ("Casting Director", "casting director"),
+    "chr": ("ChoreografIn", "choreographer"),
+    "cmp": ("KomponistIn", "Komponist", "composer"),
+    "cnd": ("DirigentIn", "Dirigent", "conductor"),
+    "cng": ("Kameramann/Kamerafrau", "Kameramann", "cinematographer"),
+    "com": ("ZusammenstellendeR", "compiler"),
+    "ctb": ("MitwirkendeR", "Mitwirkender", "Beiträger", "contributor"),
+    "ctg": ("KartografIn", "Kartograf", "cartographer"),
+    "dte": ("WidmungsempfängerIn", "dedicatee"),
+    "edm": ("CutterIn", "Cutter", "film editor"),
+    "edt": ("HerausgeberIn", "Herausgeber", "Hrsg.", "Hrsg. Org.", "editor"),
+    "egr": ("StecherIn", "Stecher", "engraver"),
+    "fmd": ("FilmregisseurIn", "Filmregisseur", "film director"),
+    "fmp": ("FilmproduzentIn", "Filmproduzent", "film producer"),
+    "fon": ("BegründerIn eines Werks", "founder of work"),
+    "his": ("GastgebendeInstitution", "host institution"),
+    "ill": ("IllustratorIn", "Illustrator", "Ill.", "illustrator"),
+    "isb": ("Herausgebendes Organ", "issuing body"),
+    "itr": ("InstrumentalmusikerIn", "Instrumentalmusiker", "instrumentalist"),
+    "ive": ("InterviewteR", "interviewee"),
+    "ivr": ("InterviewerIn", "interviewer"),
+    "lbt": ("LibrettistIn", "Librettist", "librettist"),
+    "lyr": ("TextdichterIn", "Textdichter", "lyricist"),
+    "mod": ("ModeratorIn", "moderator"),
+    "msd": ("MusikalischeR LeiterIn", "musical director"),
+    "mus": ("MusikerIn", "Musiker", "musician"),
+    "nrt": ("ErzählerIn", "Erzähler", "narrator"),
+    "orm": ("VeranstalterIn", "Veranstalter", "organizer"),
+    "oth": ("Sonstige", "other"),
+    "pbl": ("VerlegerIn", "Verleger", "Verlag", "publisher"),
+    "pht": ("FotografIn", "Fotograf", "photographer"),
+    "pra": ("PraesesIn", "Praeses", "praeses"),
+    "prf": ("AusführendeR", "Ausführender", "performer"),
+    "prt": ("DruckerIn", "Drucker", "printer"),
+    "rcd": ("TonmeisterIn", "Tonmeister", "recordist"),
+    "red": ("RedakteurIn", "Redakteur", "redaktor"),
+    "rsp": ("RespondentIn", "Respondent", "respondent"),
+    "sng": ("SängerIn", "Sänger", "singer"),
+    "spk": ("SprecherIn", "Sprecher", "speaker"),
+    "trl": ("ÜbersetzerIn", "Übersetzer", "Übers.", "translator"),
+    "wac": ("VerfasserIn von Zusatztexten", "writer of added commentary"),
+    "wst": ("VerfasserIn von ergänzendem Text", "writer of supplementary textual content"),
+}
+
+
+def _normalize_term(term: str) -> str:
+    """Normalisiert einen Relator-Term für die Nachschlagetabelle (Kleinschreibung, ohne Satzzeichen am Ende)."""
+    return term.strip().rstrip(" ,;:/").lower()
+
+
+# Nachschlagetabelle: Code oder normalisierter Term -> Relator-Code
+RELATOR_TERMS: Dict[str, str] = {}
+for _code, _terms in RELATORS.items():
+    RELATOR_TERMS[_code] = _code
+    for _term in _terms:
+        RELATOR_TERMS[_normalize_term(_term)] = _code
+del _code, _terms
+
+# Pro Tag: (Zielfeld, Namens-Subfelder, Subfeld des Relator-Terms)
+# In 111/711 steht der Relator-Term in $j, $e ist dort die untergeordnete Einheit.
+TAG_RULES: Dict[str, tuple] = {
+    "100": ("author", "abcd", "e"),
+    "110": ("author_corporate", "ab", "e"),
+    "111": ("author_corporate", "abc", "j"),
+    "700": ("author2", "abcd", "e"),
+    "710": ("author_corporate", "ab", "e"),
+    "711": ("author_corporate", "abc", "j"),
+}
+
+AUTHOR_SLOTS = ("author", "author2", "author_corporate")
+
+
+def _parse_specs(slot: str, source: str) -> List[Tuple[str, str]]:
+    specs = []
+    for spec in (spec.strip() for spec in source.split(":")):
+        if not spec:
+            continue
+        tag, codes = spec[:3], spec[3:]
+        if not tag.isdigit() or not codes:
+            raise ValueError(f"Ungültige Feldspezifikation '{spec}' in Slot {slot}")
+        specs.append((tag, codes))
+    return specs
+
+
+def author_rules(sources: Dict[str, str]) -> Tuple[Dict[str, tuple], Tuple[str, ...]]:
+    """
+    Leitet TAG_RULES und die Reihenfolge für author_sort aus Feldspezifikationen ab.
+
+    Namens-Slots (author, author2, author_corporate) legen pro Tag die Namens-Subfelder fest,
+    z.B. "110ab:111abc". Rollen-Slots (author_role usw.) nennen pro Tag $4 und höchstens ein
+    Subfeld mit dem Relator-Term, z.B. "1104e:1114j". author_sort nennt die Tags in der
+    Reihenfolge der Sortierung mit denselben Subfeldern wie der Namens-Slot.
+
+    Args:
+        sources: Slotname -> source_marc für alle Slots mit function get_authors
+
+    Returns:
+        (Regeln pro Tag wie TAG_RULES, Tags für author_sort)
+
+    Raises:
+        ValueError: Wenn eine Spezifikation nicht als Regel des Einzeldurchlaufs abbildbar ist
+    """
+    rules: Dict[str, tuple] = {}
+    for slot in AUTHOR_SLOTS:
+        for tag, codes in _parse_specs(slot, sources.get(slot, "")):
+            if tag in rules:
+                raise ValueError(f"Feld {tag} ist in Slot {slot} und in Slot {rules[tag][0]} angegeben")
+            rules[tag] = (slot, codes, "")
+
+    for slot in AUTHOR_SLOTS:
+        role_slot = f"{slot}_role"
+        for tag, codes in _parse_specs(role_slot, sources.get(role_slot, "")):
+            if tag not in rules or rules[tag][0] != slot:
+                raise ValueError(f"Feld {tag} in Slot {role_slot} fehlt im Namens-Slot {slot}")
+            terms = codes.replace("4", "")
+            if "4" not in codes or len(terms) > 1:
+                raise ValueError(f"Slot {role_slot} erwartet für Feld {tag} $4 und höchstens ein "
+                                 f"Subfeld mit dem Relator-Term, nicht '{codes}'")
+            rules[tag] = (slot, rules[tag][1], terms)
+
+    sort_tags = []
+    for tag, codes in _parse_specs("author_sort", sources.get("author_sort", "")):
+        if tag not in rules or rules[tag][1] != codes:
+            expected = f"{tag}{rules[tag][1]}" if tag in rules else "einen Namens-Slot mit diesem Feld"
+            raise ValueError(f"author_sort wird aus den Namen gebildet: statt {tag}{codes} erwartet {expected}")
+        sort_tags.append(tag)
+    return rules, tuple(sort_tags)
+
+
+class AuthorExtractor:
+    """
+    Extrahiert Namen, Rollen und author_sort in einem Durchlauf über die Autorenfelder.
+
+    Example:
+        >>> extractor = AuthorExtractor()
+        >>> values = extractor.extract(record)
+        >>> values["author"], values["author_role"]
+        (['Schmeil, Otto 1860-1943'], ['aut|fon'])
+    """
+
+    def __init__(self, join: str = " ", skip_name_title: bool = True, rules: Optional[Dict[str, tuple]] = None,
+                 sort_tags: Optional[Tuple[str, ...]] = None):
+        """
+        Args:
+            join: Trennzeichen zwischen den Namens-Subfeldern eines Feldes
+            skip_name_title: Wenn True, werden Felder mit $t (Name/Titel-Eintragungen, also Werke) übersprungen
+            rules: Optional. Regeln pro Tag wie TAG_RULES, z.B. aus author_rules()
+            sort_tags: Optional. Tags in der Reihenfolge für author_sort, Standard AUTHOR_SORT_TAGS
+        """
+        self.log = getSlubLogger('help.authors')
+        self.join = join
+        self.skip_name_title = skip_name_title
+        self.rules = TAG_RULES if rules is None else rules
+        self.tags = tuple(self.rules)
+        self.sort_tags = AUTHOR_SORT_TAGS if sort_tags is None else tuple(sort_tags)
+        self.unresolved_terms = 0
+
+    @staticmethod
+    def resolve_relator(value: str) -> Optional[str]:
+        """
+        Löst einen Relator-Code oder -Term auf.
+
+        Args:
+            value: Inhalt von $4 (z.B. "aut" oder eine id.loc.gov-URI) oder $e/$j (z.B. "VerfasserIn")
+
+        Returns:
+            Der Relator-Code oder None, wenn der Wert unbekannt ist
+        """
+        code = RELATOR_TERMS.get(value) or RELATOR_TERMS.get(_normalize_term(value))
+        if code is None and value.startswith("http"):
+            code = RELATOR_TERMS.get(_normalize_term(value.rsplit("/", 1)[-1]))
+        return code
+
+    def extract(self, record) -> Dict[str, object]:
+        """
+        Extrahiert alle Autorenfelder eines Records.
+
+        Args:
+            record: Ein pymarc.Record-Objekt
+
+        Returns:
+            Dictionary mit author, author_role, author2, author2_role, author_corporate,
+            author_corporate_role (Listen gleicher Länge je Paar) und author_sort (oder None)
+        """
+        result: Dict[str, List[str]] = {}
+        for slot in AUTHOR_SLOTS:
+            result[slot] = []
+            result[f"{slot}_role"] = []
+        first_names: Dict[str, str] = {}
+        relator_terms = RELATOR_TERMS
+        join = self.join
+        rules = self.rules
+
+        for field in record.get_fields(*self.tags):
+            slot, name_codes, term_code = rules[field.tag]
+            parts = []
+            codes = []
+            terms = []
+            name_title = False
+            for code, value in field.subfields:
+                if code in name_codes:
+                    value = value.strip()
+                    if value:
+                        parts.append(value)
+                elif code == "4":
+                    codes.append(value.strip())
+                elif code == term_code:
+                    terms.append(value)
+                elif code == "t":
+                    name_title = True
+            if not parts or (name_title and self.skip_name_title):
+                continue
+
+            name = join.join(parts).rstrip(" ,;:/")
+            roles = []
+            # $4 hat Vorrang, die Terme aus $e/$j werden nur ohne Code ausgewertet
+            for value in codes or terms:
+                role = relator_terms.get(value) or self.resolve_relator(value)
+                if role is None:
+                    self.unresolved_terms += 1
+                    self.log.debug("Unbekannter Relator in %s: %s", field.tag, value)
+                elif role not in roles:
+                    roles.append(role)
+
+            result[slot].append(name)
+            result[f"{slot}_role"].append(RELATOR_SEPARATOR.join(roles) if roles else ROLE_PLACEHOLDER)
+            first_names.setdefault(field.tag, name)
+
+        result["author_sort"] = next((first_names[tag] for tag in self.sort_tags if tag in first_names), None)
+        return result
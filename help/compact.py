@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Kompakte Darstellung von Finc-Records für Läufe, die viele Records im Speicher halten.
+
+Ein Pydantic-Modell oder eine YAMLRoot-Dataclass hat pro Instanz ein eigenes
+__dict__ und eigene Listen; wiederkehrende Werte wie recordtype="marc", häufige
+Schlagwörter in topic oder Rollen-Codes liegen in jedem Record als eigene
+String-Kopie vor. Dieses Modul stellt dem gegenüber:
+
+- StringPool: ein Pool pro Lauf, über den gleiche Werte auf ein einziges
+  String-Objekt abgebildet werden (anders als sys.intern() wird er mit dem
+  Lauf freigegeben)
+- CompactRecord: Basisklasse für Records mit __slots__ statt __dict__,
+  mehrwertige Felder als Tupel
+- compact_class_for(): erzeugt die passende Klasse zu einem Pydantic-Modell,
+  die Felder werden aus dem Modell übernommen
+
+Die Umwandlung ist verlustfrei: to_model() erzeugt aus einem CompactRecord
+wieder ein Pydantic- oder Dataclass-Objekt, das dem direkt erzeugten gleicht.
+"""
+
+import typing
+from collections.abc import Sequence
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple, Type
+
+from help.slublogging import getSlubLogger
+
+# Felder, deren Werte praktisch nie wiederkehren; ein Pool-Eintrag würde nur Speicher kosten
+DEFAULT_UNIQUE_FIELDS = ("id", "record_id", "title", "allfields")
+
+
+class StringPool:
+    """
+    Pool für wiederkehrende Strings innerhalb eines Laufs.
+
+    Example:
+        >>> pool = StringPool()
+        >>> a = pool.intern("".join(["ma", "rc"]))
+        >>> b = pool.intern("".join(["m", "arc"]))
+        >>> a is b
+        True
+    """
+
+    __slots__ = ("_strings", "lookups", "hits")
+
+    def __init__(self):
+        self._strings: Dict[str, str] = {}
+        self.lookups = 0
+        self.hits = 0
+
+    def intern(self, value: str) -> str:
+        """
+        Liefert das kanonische String-Objekt für einen Wert.
+
+        Args:
+            value: Ein beliebiger String
+
+        Returns:
+            Ein gleicher String; für gleiche Werte immer dasselbe Objekt
+        """
+        self.lookups += 1
+        canonical = self._strings.setdefault(value, value)
+        if canonical is not value:
+            self.hits += 1
+        return canonical
+
+    def intern_all(self, values: Iterable[str]) -> Tuple[str, ...]:
+        """Interniert mehrere Werte und liefert sie als Tupel."""
+        intern = self.intern
+        return tuple(intern(value) for value in values)
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    @property
+    def hit_rate(self) -> float:
+        """Anteil der Werte, die schon im Pool lagen."""
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+def _is_multivalued(annotation) -> bool:
+    """Prüft, ob eine Typannotation (z.B. Optional[List[str]]) eine Liste beschreibt."""
+    if typing.get_origin(annotation) is list:
+        return True
+    return any(_is_multivalued(arg) for arg in typing.get_args(annotation))
+
+
+class CompactRecord:
+    """
+    Basisklasse für kompakte Records; konkrete Klassen entstehen über compact_class_for().
+
+    Einwertige Felder werden direkt gespeichert, mehrwertige als Tupel. None bedeutet
+    "nicht gesetzt", ein leeres Tupel eine leere Liste.
+    """
+
+    __slots__ = ()
+
+    FIELDS: Tuple[str, ...] = ()
+    MULTIVALUED: FrozenSet[str] = frozenset()
+    INTERNED: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_values(cls, values: Dict[str, object], pool: Optional[StringPool] = None) -> "CompactRecord":
+        """
+        Erzeugt einen kompakten Record aus den Feldwerten (z.B. aus map_record()).
+
+        Args:
+            values: Dictionary mit Feldnamen und Werten
+            pool: Optional. StringPool für wiederkehrende Werte
+
+        Returns:
+            Eine Instanz der kompakten Klasse
+        """
+        record = cls.__new__(cls)
+        multivalued = cls.MULTIVALUED
+        interned = cls.INTERNED if pool is not None else ()
+        for name in cls.FIELDS:
+            value = values.get(name)
+            if value is not None:
+                if name in multivalued:
+                    value = pool.intern_all(value) if name in interned else tuple(value)
+                elif name in interned and isinstance(value, str):
+                    value = pool.intern(value)
+            object.__setattr__(record, name, value)
+        return record
+
+    @classmethod
+    def from_model(cls, model, pool: Optional[StringPool] = None) -> "CompactRecord":
+        """
+        Erzeugt einen kompakten Record aus einem Pydantic- oder Dataclass-Objekt.
+
+        Args:
+            model: Ein Finc-Objekt (Pydantic oder YAMLRoot-Dataclass)
+            pool: Optional. StringPool für wiederkehrende Werte
+        """
+        values = model.model_dump() if hasattr(model, "model_dump") else vars(model)
+        return cls.from_values(values, pool)
+
+    def to_dict(self) -> Dict[str, object]:
+        """Liefert die gesetzten Felder als Dictionary mit Listen statt Tupeln."""
+        result = {}
+        multivalued = self.MULTIVALUED
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = list(value) if name in multivalued else value
+        return result
+
+    def to_model(self, model_class: Type):
+        """
+        Wandelt den Record verlustfrei in ein Modellobjekt um.
+
+        Args:
+            model_class: Die Pydantic- oder Dataclass-Klasse (z.B. aus generate_models_from_schema())
+        """
+        return model_class(**self.to_dict())
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} ist unveränderlich")
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS if getattr(self, name) is not None)
+        return f"{type(self).__name__}({values})"
+
+
+def compact_class_for(model_class: Type, unique_fields: Sequence[str] = DEFAULT_UNIQUE_FIELDS) -> Type[CompactRecord]:
+    """
+    Erzeugt eine CompactRecord-Klasse mit den Feldern eines Pydantic-Modells.
+
+    Args:
+        model_class: Die Pydantic-Klasse, deren Felder übernommen werden
+        unique_fields: Felder, deren Werte nicht über den StringPool laufen
+
+    Returns:
+        Eine Unterklasse von CompactRecord mit __slots__ für alle Felder
+    """
+    fields = tuple(model_class.model_fields)
+    multivalued = frozenset(name for name, info in model_class.model_fields.items()
+                            if _is_multivalued(info.annotation))
+    interned = frozenset(name for name in fields if name not in unique_fields)
+    getSlubLogger('help.compact').debug(f"Kompakte Klasse für {model_class.__name__}: {len(fields)} Felder, "
+                                        f"{len(multivalued)} mehrwertig")
+    return type(f"Compact{model_class.__name__}", (CompactRecord,), {
+        "__slots__": fields,
+        "FIELDS": fields,
+        "MULTIVALUED": multivalued,
+        "INTERNED": interned,
+    })
+
+
+class CompactModelView(Sequence):
+    """
+    Liste von CompactRecords, die beim Zugriff Modellobjekte liefert.
+
+    Damit kann process_marc_files() im kompakten Modus dieselbe Schnittstelle
+    (Listen von Pydantic- bzw. Dataclass-Objekten) anbieten, ohne die Modelle
+    im Speicher zu halten.
+    """
+
+    def __init__(self, records: Sequence[CompactRecord], model_class: Type):
+        self.records = records
+        self.model_class = model_class
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CompactModelView(self.records[index], self.model_class)
+        return self.records[index].to_model(self.model_class)
+
+    def __iter__(self):
+        model_class = self.model_class
+        for record in self.records:
+            yield record.to_model(model_class)
@@ -0,0 +1,401 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Speichersparende Deduplizierung von Records über Dateigrenzen hinweg.
+
+Beim Zusammenführen mehrerer Lieferantendateien tauchen dieselbe 001 oder dieselbe
+ISBN mehrfach auf. Dieses Modul erkennt Duplikate während der Konvertierung, ohne
+die Schlüssel als Python-Strings im Speicher zu halten:
+
+- HashedKeySet: offene Adressierung über array('Q') mit 64-Bit-Hashes der Schlüssel.
+  8 Byte pro Slot bei maximal 75 % Füllgrad, also 10,7 bis 21,3 Byte pro Schlüssel
+  (Python-set mit str-Schlüsseln: über 100 Byte pro Schlüssel). Die Wahrscheinlichkeit einer Hash-Kollision liegt bei
+  50 Mio. Schlüsseln bei etwa n²/2⁶⁵ ≈ 7·10⁻⁵.
+- BloomKeySet: Bloom-Filter in einer Datei (mmap, vom Betriebssystem auslagerbar)
+  mit exakter Bestätigung positiver Treffer über eine SQLite-Datenbank. Etwa
+  1,2 Byte pro Schlüssel im Speicher bei 1 % Fehlerrate, die Schlüssel selbst
+  liegen auf der Festplatte. Nur für die Richtlinie 'first'.
+
+Richtlinien:
+- 'first': der erste Record gewinnt (ein Durchlauf)
+- 'last': der letzte Record gewinnt (Vorlauf über alle Quellen nötig)
+- 'newest': der Record mit dem jüngsten 005 gewinnt, bei Gleichstand der spätere
+  (Vorlauf über alle Quellen nötig)
+
+Bei 'last' und 'newest' mit mehreren Schlüsselarten hängen Duplikate über verschiedene
+Schlüssel zusammen (A und B teilen die 001, B und C die ISBN). Die Records werden
+deshalb nach dem Vorlauf in der Reihenfolge der Richtlinie durchgegangen: Ein Record
+gewinnt, wenn keiner seiner Schlüssel schon von einem gewinnenden Record belegt ist.
+Damit geht keine 001 verloren, nur weil ihr bester Record über einen anderen
+Schlüssel verloren hat.
+"""
+
+import hashlib
+import math
+import mmap
+import sqlite3
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+
+from help.marc_utils import MarcUtils
+from help.slublogging import getSlubLogger
+
+DEDUP_KEYS = ("id", "isbn")
+DEDUP_POLICIES = ("first", "last", "newest")
+DEDUP_STORES = ("hash", "bloom")
+
+
+def key_hash(key: str) -> int:
+    """
+    Berechnet einen stabilen 64-Bit-Hash eines Schlüssels (0 ist als Leerwert reserviert).
+
+    Args:
+        key: Der Schlüssel, z.B. "id:1883795745"
+
+    Returns:
+        Ganzzahl im Bereich 1 bis 2⁶⁴-1
+    """
+    value = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1
+
+
+class HashedKeySet:
+    """
+    Kompakte Hash-Menge für 64-Bit-Schlüsselhashes.
+
+    Offene Adressierung mit linearer Sondierung in array('Q'). Die Tabelle wird
+    verdoppelt, sobald sie zu 75 % gefüllt ist.
+    """
+
+    MAX_LOAD = 0.75
+
+    def __init__(self, expected_keys: int = 1024):
+        """
+        Args:
+            expected_keys: Erwartete Anzahl an Schlüsseln (vermeidet Vergrößerungen)
+        """
+        capacity = 8
+        while capacity * self.MAX_LOAD < expected_keys:
+            capacity *= 2
+        self._allocate(capacity)
+        self.size = 0
+
+    def _allocate(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._limit = int(capacity * self.MAX_LOAD)
+        self._keys = array('Q', bytes(8 * capacity))
+
+    def _slot(self, hashed: int) -> int:
+        """Liefert den Slot des Hashes oder den ersten freien Slot der Sondierungskette."""
+        keys = self._keys
+        mask = self._mask
+        index = hashed & mask
+        while True:
+            current = keys[index]
+            if current == hashed or current == 0:
+                return index
+            index = (index + 1) & mask
+
+    def _grow(self) -> None:
+        keys = self._keys
+        self._allocate(self.capacity * 2)
+        for hashed in keys:
+            if hashed:
+                self._keys[self._slot(hashed)] = hashed
+
+    def add(self, hashed: int) -> bool:
+        """
+        Fügt einen Hash hinzu.
+
+        Returns:
+            True, wenn der Hash neu war, sonst False
+        """
+        slot = self._slot(hashed)
+        if self._keys[slot]:
+            return False
+        self._keys[slot] = hashed
+        self.size += 1
+        if self.size > self._limit:
+            self._grow()
+        return True
+
+    def __contains__(self, hashed: int) -> bool:
+        return self._keys[self._slot(hashed)] == hashed
+
+    @property
+    def memory_bytes(self) -> int:
+        """Belegter Speicher der Arrays in Byte."""
+        return self._keys.buffer_info()[1] * self._keys.itemsize
+
+
+class BloomKeySet:
+    """
+    Bloom-Filter in einer Datei mit exakter Bestätigung über SQLite.
+
+    Der Filter liegt in einer per mmap eingebundenen temporären Datei und kann vom
+    Betriebssystem ausgelagert werden. Meldet der Filter einen möglichen Treffer,
+    wird der Schlüssel in der SQLite-Datenbank nachgeschlagen. Damit ist das
+    Ergebnis exakt, auch bei falsch-positiven Treffern des Filters.
+    """
+
+    def __init__(self, expected_keys: int, error_rate: float = 0.01, spill_dir: Optional[Union[str, Path]] = None,
+                 batch_size: int = 10000):
+        """
+        Args:
+            expected_keys: Erwartete Anzahl an Schlüsseln (bestimmt die Filtergröße)
+            error_rate: Angestrebte Fehlerrate des Filters (Anteil der SQLite-Abfragen ohne Treffer)
+            spill_dir: Optional. Verzeichnis für Filterdatei und Datenbank (Standard: Temp-Verzeichnis)
+            batch_size: Anzahl der Einfügungen pro SQLite-Transaktion
+        """
+        expected_keys = max(expected_keys, 1)
+        self.bits = max(64, int(-expected_keys * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bits / expected_keys * math.log(2)))
+        self._tempdir = tempfile.TemporaryDirectory(dir=spill_dir, prefix="marclinkfinc-dedup-")
+        directory = Path(self._tempdir.name)
+
+        self._filter_file = open(directory / "bloom.bin", "w+b")
+        self._filter_file.truncate((self.bits + 7) // 8)
+        self._filter = mmap.mmap(self._filter_file.fileno(), (self.bits + 7) // 8)
+
+        self._db = sqlite3.connect(directory / "keys.sqlite")
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("CREATE TABLE seen (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._pending: List[tuple] = []
+        self.batch_size = batch_size
+        self.size = 0
+        self.confirmations = 0
+        self.false_positives = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hash_count)]
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._db.executemany("INSERT OR IGNORE INTO seen VALUES (?)", self._pending)
+            self._db.commit()
+            self._pending = []
+
+    def add(self, key: str) -> bool:
+        """
+        Fügt einen Schlüssel hinzu.
+
+        Returns:
+            True, wenn der Schlüssel neu war, sonst False
+        """
+        positions = self._positions(key)
+        bloom = self._filter
+        if all(bloom[pos >> 3] & (1 << (pos & 7)) for pos in positions):
+            self.confirmations += 1
+            self._flush()
+            if self._db.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone():
+                return False
+            self.false_positives += 1
+        for pos in positions:
+            bloom[pos >> 3] |= 1 << (pos & 7)
+        self._pending.append((key,))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        self.size += 1
+        return True
+
+    @property
+    def memory_bytes(self) -> int:
+        """Größe des Bloom-Filters in Byte (Datenbank liegt auf der Festplatte)."""
+        return len(self._filter)
+
+    def close(self) -> None:
+        """Schließt Filter und Datenbank und löscht die temporären Dateien."""
+        self._db.close()
+        self._filter.close()
+        self._filter_file.close()
+        self._tempdir.cleanup()
+
+
+def normalize_isbn(value: str) -> Optional[str]:
+    """
+    Normalisiert eine ISBN für den Vergleich: nur Ziffern/X, ISBN-10 als ISBN-13.
+
+    Args:
+        value: ISBN aus 020a, z.B. "3-494-01943-2" oder "978-3-494-01943-7 (kart.)"
+
+    Returns:
+        Die 13-stellige ISBN oder None, wenn der Wert keine ISBN ist
+    """
+    chars = "".join(c for c in value.split(" ")[0].upper() if c.isdigit() or c == "X")
+    if len(chars) == 13 and chars.isdigit():
+        return chars
+    if len(chars) == 10 and chars[:9].isdigit():
+        core = "978" + chars[:9]
+        check = (10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(core)) % 10) % 10
+        return core + str(check)
+    return None
+
+
+class RecordDeduplicator:
+    """
+    Entscheidet für jeden Record, ob er ein Duplikat ist.
+
+    Bei der Richtlinie 'first' genügt accept() in einem Durchlauf; ein Record wird
+    verworfen, sobald einer seiner Schlüssel schon gesehen wurde (seine übrigen
+    Schlüssel gelten danach ebenfalls als gesehen). Bei 'last' und 'newest' muss
+    vorher observe() für alle Records aller Quellen aufgerufen werden
+    (needs_prepass). Der Vorlauf merkt sich die Schlüsselhashes pro Record
+    (8 Byte pro Schlüssel und Record-Nummer); beim ersten accept() werden die
+    Records in der Reihenfolge der Richtlinie durchgegangen und ein Record gewinnt,
+    wenn keiner seiner Schlüssel schon von einem Gewinner belegt ist.
+    """
+
+    def __init__(self, keys: Iterable[str] = ("id",), policy: str = "first", store: str = "hash",
+                 expected_keys: int = 1024, spill_dir: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            keys: Schlüsselarten: 'id' (001) und/oder 'isbn' (020a, normalisiert)
+            policy: 'first', 'last' oder 'newest'
+            store: 'hash' (HashedKeySet) oder 'bloom' (BloomKeySet, nur mit 'first')
+            expected_keys: Erwartete Anzahl an Schlüsseln
+            spill_dir: Optional. Verzeichnis für die Dateien des Bloom-Filters
+
+        Raises:
+            ValueError: Bei unbekannten Schlüsseln, Richtlinien oder Speicherarten
+        """
+        self.log = getSlubLogger('help.dedup')
+        self.keys = tuple(keys)
+        unknown = set(self.keys) - set(DEDUP_KEYS)
+        if unknown or not self.keys:
+            raise ValueError(f"Unbekannte Deduplizierungsschlüssel: {unknown or 'keine'}. Erlaubt sind: {', '.join(DEDUP_KEYS)}")
+        if policy not in DEDUP_POLICIES:
+            raise ValueError(f"Unbekannte Richtlinie: {policy}. Erlaubt sind: {', '.join(DEDUP_POLICIES)}")
+        if store not in DEDUP_STORES:
+            raise ValueError(f"Unbekannte Speicherart: {store}. Erlaubt sind: {', '.join(DEDUP_STORES)}")
+        if store == "bloom" and policy != "first":
+            raise ValueError("Der Bloom-Filter unterstützt nur die Richtlinie 'first'")
+
+        self.policy = policy
+        self.store = store
+        if store == "bloom":
+            self._seen = BloomKeySet(expected_keys, spill_dir=spill_dir)
+        else:
+            self._seen = HashedKeySet(expected_keys)
+        # Vorlauf für 'last'/'newest': Schlüsselhashes aller Records, Beginn pro Record-Nummer, Score (005)
+        self._key_hashes = array('Q')
+        self._starts = array('Q')
+        self._scores = array('Q')
+        self._accepted: Optional[bytearray] = None
+        self.duplicates = 0
+
+    @property
+    def needs_prepass(self) -> bool:
+        """True, wenn vor accept() ein Durchlauf mit observe() nötig ist."""
+        return self.policy != "first"
+
+    def record_keys(self, record) -> List[str]:
+        """
+        Ermittelt die Deduplizierungsschlüssel eines Records.
+
+        Returns:
+            Liste von Schlüsseln wie "id:1883795745" oder "isbn:9783494019437"
+        """
+        result = []
+        if "id" in self.keys:
+            field = record.get('001')
+            if field is not None and field.data:
+                result.append(f"id:{field.data.strip()}")
+        if "isbn" in self.keys:
+            for value in MarcUtils.extract_marc_subfields(record, "020a"):
+                isbn = normalize_isbn(value)
+                if isbn:
+                    result.append(f"isbn:{isbn}")
+        return result
+
+    @staticmethod
+    def _score(record) -> int:
+        """005 (JJJJMMTTHHMMSS.F) als Ganzzahl, 0 wenn nicht vorhanden oder ungültig."""
+        field = record.get('005')
+        if field is None:
+            return 0
+        digits = field.data[:14]
+        return int(digits) if digits.isdigit() else 0
+
+    def observe(self, record, ordinal: int) -> None:
+        """
+        Vorlauf für 'last'/'newest': merkt sich den Gewinner pro Schlüssel.
+
+        Args:
+            record: Ein pymarc.Record-Objekt
+            ordinal: Laufende Nummer des Records über alle Quellen
+        """
+        starts = self._starts
+        # Nicht lesbare Records haben eine Nummer, aber keine Schlüssel
+        while len(starts) < ordinal:
+            starts.append(len(self._key_hashes))
+            if self.policy == "newest":
+                self._scores.append(0)
+        if self.policy == "newest":
+            self._scores[ordinal - 1] = self._score(record)
+        self._key_hashes.extend(key_hash(key) for key in self.record_keys(record))
+
+    def _resolve(self) -> None:
+        """Bestimmt nach dem Vorlauf die Gewinner in der Reihenfolge der Richtlinie."""
+        count = len(self._starts)
+        starts, key_hashes = self._starts, self._key_hashes
+        starts.append(len(key_hashes))
+        order = range(count - 1, -1, -1)
+        if self.policy == "newest":
+            # Stabil absteigend nach 005, bei Gleichstand bleibt der spätere Record vorn
+            order = sorted(order, key=self._scores.__getitem__, reverse=True)
+        claimed = self._seen
+        accepted = bytearray(count)
+        for index in order:
+            keys = key_hashes[starts[index]:starts[index + 1]]
+            if not any(hashed in claimed for hashed in keys):
+                accepted[index] = 1
+                for hashed in keys:
+                    claimed.add(hashed)
+        self._accepted = accepted
+        self._key_hashes = self._starts = self._scores = None
+
+    def accept(self, record, ordinal: int) -> bool:
+        """
+        Prüft, ob ein Record übernommen werden soll.
+
+        Args:
+            record: Ein pymarc.Record-Objekt
+            ordinal: Laufende Nummer des Records (wie bei observe())
+
+        Returns:
+            False, wenn der Record ein Duplikat ist, das verworfen werden soll
+        """
+        if self.policy == "first":
+            keys = self.record_keys(record)
+            if self.store == "bloom":
+                new = [self._seen.add(key) for key in keys]
+            else:
+                new = [self._seen.add(key_hash(key)) for key in keys]
+            accepted = all(new)
+        else:
+            if self._accepted is None:
+                self._resolve()
+            accepted = ordinal <= len(self._accepted) and bool(self._accepted[ordinal - 1])
+        if not accepted:
+            self.duplicates += 1
+        return accepted
+
+    def log_summary(self) -> None:
+        """Gibt Statistik und Speicherbedarf über den Logger aus."""
+        size = self._seen.size
+        per_key = self._seen.memory_bytes / size if size else 0
+        self.log.info(f"Deduplizierung ({self.policy}, {self.store}): {self.duplicates} Duplikate verworfen, "
+                      f"{size} Schlüssel, {self._seen.memory_bytes / 2**20:.1f} MiB ({per_key:.1f} Byte/Schlüssel)")
+
+    def close(self) -> None:
+        """Gibt die Ressourcen frei (temporäre Dateien des Bloom-Filters)."""
+        if isinstance(self._seen, BloomKeySet):
+            self._seen.close()
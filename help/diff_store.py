@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ausgabe gegen den letzten Lauf abgleichen: nur neue und geänderte Dokumente schreiben, gelöschte IDs melden.
+
+Jede Nacht alles neu zu indexieren kostet in Solr Commits und Merges für Dokumente, die sich
+nicht geändert haben. DiffStore merkt sich pro id einen Hash des zuletzt geschriebenen JSON.
+Der nächste Lauf vergleicht jedes Dokument direkt nach der Serialisierung mit diesem Hash:
+unverändert wird es weder geschrieben noch als Dataclass validiert. IDs aus dem letzten Lauf,
+die nicht mehr vorkommen, landen in einer Löschdatei (eine id pro Zeile).
+
+Der Speicher ist eine Datei, die erst am Ende eines erfolgreichen Laufs (atomar) ersetzt wird:
+Kennung, Anzahl n, drei Spalten array('Q') mit je n Einträgen (Hash der id, sortiert; Hash des
+Inhalts; Position der id dahinter), danach die IDs als UTF-8, jede mit Zeilenende. Die Datei
+wird per mmap gelesen, gesucht wird binär in der Spalte der id-Hashes. Für 50 Mio. IDs sind das
+1,2 GB Spalten plus die IDs, von denen das Betriebssystem nur die berührten Seiten im Speicher
+hält. Im Prozess liegen pro Lauf die neuen Einträge (24 Byte pro id) und ein
+Bit pro alter id. Ist NumPy installiert, wird damit sortiert, sonst mit sorted().
+
+Beide Hashes sind 64-Bit-BLAKE2b-Werte (der id-Hash wie bei der Deduplizierung); bei 50 Mio.
+IDs liegt die Wahrscheinlichkeit einer Kollision bei etwa 7·10⁻⁵.
+"""
+
+import hashlib
+import mmap
+import os
+import shutil
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from help.dedup import key_hash
+from help.slublogging import getSlubLogger
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - abhängig von der Installation
+    numpy = None
+
+# Kennung und Version der Indexdatei
+_STORE_MAGIC = b"MLFDIF1\0"
+_HEADER_LEN = len(_STORE_MAGIC) + 8
+
+
+def content_hash(data: bytes) -> int:
+    """64-Bit-Hash der serialisierten Bytes eines Dokuments."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class DiffStore:
+    """
+    Hashes der Dokumente des letzten Laufs und Sammlung der Hashes des aktuellen Laufs.
+
+    Example:
+        >>> store = DiffStore("index/finc.diffstore")
+        >>> if store.check(model.id, line.encode("utf-8")):
+        ...     out.write(line)
+        >>> store.commit("result.deletes.txt")
+        >>> store.close()
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Pfad des Speichers. Fehlt die Datei, gilt jedes Dokument als neu.
+
+        Raises:
+            ValueError: Wenn die Datei kein Index dieses Formats ist
+        """
+        self.log = getSlubLogger('help.diff_store')
+        self.path = Path(path)
+        self.added = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.kept = 0
+        self.deleted = 0
+        self._file = None
+        self._map = None
+        self._views = []
+        self._size = 0
+        self._heap_start = 0
+        self._id_hashes = self._content_hashes = self._offsets = None
+        if self.path.exists():
+            self._open_previous()
+        self._seen = bytearray((self._size + 7) // 8)
+        # Einträge des aktuellen Laufs; die IDs gehen sofort in eine temporäre Datei
+        self._new_id_hashes = array("Q")
+        self._new_content_hashes = array("Q")
+        self._new_offsets = array("Q")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._new_ids_path = Path(f"{self.path}.ids.tmp")
+        self._new_ids = open(self._new_ids_path, "wb")
+        self._new_ids_size = 0
+
+    def _open_previous(self) -> None:
+        self._file = open(self.path, "rb")
+        if os.fstat(self._file.fileno()).st_size < _HEADER_LEN:
+            self.close()
+            raise ValueError(f"{self.path} ist kein Diff-Speicher von marc2finc")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(_STORE_MAGIC)] != _STORE_MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} ist kein Diff-Speicher von marc2finc")
+        size = int.from_bytes(self._map[len(_STORE_MAGIC):_HEADER_LEN], "little")
+        self._heap_start = _HEADER_LEN + 24 * size
+        view = memoryview(self._map)
+        columns = view[_HEADER_LEN:self._heap_start].cast("Q")
+        self._id_hashes = columns[:size]
+        self._content_hashes = columns[size:2 * size]
+        self._offsets = columns[2 * size:]
+        # Alle Views müssen vor dem Schließen der mmap freigegeben werden
+        self._views = [self._id_hashes, self._content_hashes, self._offsets, columns, view]
+        self._size = size
+        self.log.info(f"Diff-Speicher {self.path} mit {size} IDs aus dem letzten Lauf geöffnet")
+
+    def __len__(self) -> int:
+        """Anzahl IDs aus dem letzten Lauf."""
+        return self._size
+
+    def _find(self, hashed: int) -> int:
+        """Index des id-Hashes im letzten Lauf oder -1."""
+        if not self._size:
+            return -1
+        index = bisect_left(self._id_hashes, hashed)
+        return index if index < self._size and self._id_hashes[index] == hashed else -1
+
+    def _record(self, doc_id: str, hashed: int, content: int) -> None:
+        data = doc_id.encode("utf-8") + b"\n"
+        self._new_id_hashes.append(hashed)
+        self._new_content_hashes.append(content)
+        self._new_offsets.append(self._new_ids_size)
+        self._new_ids.write(data)
+        self._new_ids_size += len(data)
+
+    def check(self, doc_id: str, data: bytes) -> bool:
+        """
+        Merkt sich den Hash eines Dokuments und prüft, ob es geschrieben werden muss.
+
+        Args:
+            doc_id: id des Dokuments
+            data: Serialisiertes Dokument, so wie es geschrieben würde
+
+        Returns:
+            True bei neuer id oder geändertem Inhalt, False wenn es seit dem letzten Lauf gleich ist
+        """
+        hashed = key_hash(doc_id)
+        content = content_hash(data)
+        self._record(doc_id, hashed, content)
+        index = self._find(hashed)
+        if index < 0:
+            self.added += 1
+            return True
+        self._seen[index >> 3] |= 1 << (index & 7)
+        if self._content_hashes[index] == content:
+            self.unchanged += 1
+            return False
+        self.changed += 1
+        return True
+
+    def keep(self, doc_id: Optional[str]) -> None:
+        """
+        Übernimmt den Eintrag einer id aus dem letzten Lauf, ohne dass ein Dokument geschrieben wurde.
+
+        Für Records, die in diesem Lauf fehlerhaft sind: ihr bisheriges Dokument wird nicht gelöscht.
+        """
+        if not doc_id:
+            return
+        hashed = key_hash(doc_id)
+        index = self._find(hashed)
+        if index >= 0:
+            self._seen[index >> 3] |= 1 << (index & 7)
+            self._record(doc_id, hashed, self._content_hashes[index])
+            self.kept += 1
+
+    def _old_id(self, index: int) -> str:
+        start = self._heap_start + self._offsets[index]
+        return self._map[start:self._map.find(b"\n", start)].decode("utf-8")
+
+    def deleted_ids(self) -> Iterator[str]:
+        """IDs aus dem letzten Lauf, die in diesem Lauf weder geprüft noch übernommen wurden."""
+        seen = self._seen
+        for index in range(self._size):
+            if not seen[index >> 3] & (1 << (index & 7)):
+                yield self._old_id(index)
+
+    def _sorted_order(self):
+        """Reihenfolge der neuen Einträge nach id-Hash; bei mehrfacher id nur der letzte Eintrag."""
+        hashes = self._new_id_hashes
+        if numpy is not None:
+            values = numpy.frombuffer(hashes, dtype=numpy.uint64)
+            order = numpy.argsort(values, kind="stable")
+            ordered = values[order]
+            last = numpy.ones(len(order), dtype=bool)
+            last[:-1] = ordered[:-1] != ordered[1:]
+            return order[last].tolist()
+        order = sorted(range(len(hashes)), key=hashes.__getitem__)
+        return [index for position, index in enumerate(order)
+                if position + 1 == len(order) or hashes[order[position + 1]] != hashes[index]]
+
+    def commit(self, deletes_path: Union[str, Path, None] = None) -> None:
+        """
+        Schreibt die Löschdatei und ersetzt den Speicher durch die Einträge dieses Laufs.
+
+        Args:
+            deletes_path: Optional. Datei für die IDs, die seit dem letzten Lauf verschwunden sind
+        """
+        if deletes_path is not None:
+            with open(deletes_path, "w", encoding="utf-8") as f:
+                for doc_id in self.deleted_ids():
+                    f.write(doc_id + "\n")
+                    self.deleted += 1
+            self.log.info(f"{self.deleted} gelöschte IDs in {deletes_path} gespeichert")
+        else:
+            self.deleted = sum(1 for _ in self.deleted_ids())
+
+        order = self._sorted_order()
+        self._new_ids.close()
+        new_path = Path(f"{self.path}.tmp")
+        with open(new_path, "wb") as f:
+            f.write(_STORE_MAGIC)
+            f.write(len(order).to_bytes(8, "little"))
+            for column in (self._new_id_hashes, self._new_content_hashes, self._new_offsets):
+                array("Q", (column[index] for index in order)).tofile(f)
+            with open(self._new_ids_path, "rb") as ids:
+                shutil.copyfileobj(ids, f, 1 << 20)
+        self._release_previous()
+        os.replace(new_path, self.path)
+        self._new_ids_path.unlink()
+        self.log.info(f"Diff-Speicher {self.path} mit {len(order)} IDs gespeichert")
+
+    def _release_previous(self) -> None:
+        self._id_hashes = self._content_hashes = self._offsets = None
+        for view in self._views:
+            view.release()
+        self._views = []
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def log_summary(self) -> None:
+        self.log.info(f"Abgleich mit dem letzten Lauf: {self.added} neu, {self.changed} geändert, "
+                      f"{self.unchanged} unverändert, {self.kept} fehlerhaft übernommen, {self.deleted} gelöscht")
+
+    def close(self) -> None:
+        """Gibt die Dateien frei; ohne commit() bleibt der Speicher des letzten Laufs unverändert."""
+        self._release_previous()
+        new_ids = getattr(self, "_new_ids", None)
+        if new_ids is not None and not new_ids.closed:
+            new_ids.close()
+        new_ids_path = getattr(self, "_new_ids_path", None)
+        if new_ids_path is not None and new_ids_path.exists():
+            new_ids_path.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
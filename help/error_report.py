@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Fehlerbehandlung für die Konvertierung: Dead-Letter-Ausgabe und aggregierter Fehlerbericht.
+
+Fehlerhafte Records werden nicht mehr einzeln mit Traceback geloggt und verworfen,
+sondern roh in eine Dead-Letter-Datei (.mrc) geschrieben, zusammen mit einer
+JSON-Zeile pro Record, die den Grund enthält. Alle Fehler werden nach Verarbeitungsschritt,
+Fehlertyp und Feld gezählt. Pro Kombination werden nur die ersten Vorkommen geloggt,
+sodass ein systematischer Mapping-Fehler nicht eine Million Logzeilen erzeugt.
+"""
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from help.slublogging import getSlubLogger
+
+# "id must be supplied" aus linkml_runtime.utils.yamlutils.YAMLRoot.MissingRequiredField
+_MISSING_REQUIRED = re.compile(r"^(\w+) must be supplied$")
+
+
+class MissingFieldError(ValueError):
+    """
+    Ein für das Mapping zwingend benötigtes MARC-Feld fehlt im Record.
+
+    Attributes:
+        field: Die MARC-Feldnummer bzw. -Spezifikation (z.B. "001" oder "245a")
+    """
+
+    def __init__(self, field: str, message: Optional[str] = None):
+        self.field = field
+        super().__init__(message or f"Pflichtfeld {field} fehlt im Record")
+
+
+def describe_error(error: BaseException) -> List[Tuple[str, Optional[str], str]]:
+    """
+    Zerlegt eine Exception in (Fehlertyp, Feld, Meldung)-Tupel, ohne einen Traceback zu erzeugen.
+
+    Pydantic-ValidationErrors liefern ein Tupel pro betroffenem Feld, fehlende Pflichtfelder
+    der Dataclass-Modelle und MissingFieldError werden dem jeweiligen Feld zugeordnet.
+
+    Args:
+        error: Die aufgetretene Exception (oder None für unbekannte Leserfehler)
+
+    Returns:
+        Liste von Tupeln (error_type, field, message); field ist None, wenn kein Feld zuordenbar ist
+    """
+    if error is None:
+        return [("UnknownError", None, "Unbekannter Fehler")]
+
+    if isinstance(error, MissingFieldError):
+        return [("MissingFieldError", error.field, str(error))]
+
+    errors = getattr(error, "errors", None)
+    if callable(errors) and type(error).__name__ == "ValidationError":
+        # pydantic.ValidationError: Details ohne teure String-Formatierung der gesamten Exception
+        return [
+            (f"ValidationError.{detail.get('type', 'unknown')}",
+             ".".join(str(part) for part in detail.get("loc", ())) or None,
+             detail.get("msg", ""))
+            for detail in errors(include_url=False)
+        ]
+
+    message = str(error)
+    match = _MISSING_REQUIRED.match(message)
+    if match:
+        return [("MissingRequiredField", match.group(1), message)]
+
+    return [(type(error).__name__, None, message)]
+
+
+class ErrorReport:
+    """
+    Aggregiert Fehler nach (Verarbeitungsschritt, Fehlertyp, Feld).
+
+    Für jede Kombination werden Anzahl, die erste Meldung und einige Beispiel-IDs
+    festgehalten. Geloggt werden pro Kombination nur die ersten log_limit Vorkommen.
+    """
+
+    def __init__(self, log_limit: int = 3, example_limit: int = 5):
+        """
+        Args:
+            log_limit: Anzahl der Vorkommen pro Fehlerart, die einzeln geloggt werden
+            example_limit: Anzahl der Record-IDs, die pro Fehlerart als Beispiel gespeichert werden
+        """
+        self.log = getSlubLogger('help.error_report')
+        self.log_limit = log_limit
+        self.example_limit = example_limit
+        self.counts: Counter = Counter()
+        self.messages: Dict[Tuple[str, str, Optional[str]], str] = {}
+        self.examples: Dict[Tuple[str, str, Optional[str]], List[str]] = {}
+        self.failed_records = 0
+
+    def add(self, stage: str, error: BaseException, record_id: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
+        """
+        Erfasst einen Fehler.
+
+        Args:
+            stage: Verarbeitungsschritt (z.B. "reader", "mapping", "pydantic", "dataclass")
+            error: Die aufgetretene Exception
+            record_id: Optional. ID des betroffenen Records
+
+        Returns:
+            Liste der Fehlerbeschreibungen als Dictionaries (für die Dead-Letter-Datei)
+        """
+        reasons = []
+        for error_type, field, message in describe_error(error):
+            key = (stage, error_type, field)
+            self.counts[key] += 1
+            count = self.counts[key]
+            if count == 1:
+                self.messages[key] = message
+            if record_id is not None:
+                examples = self.examples.setdefault(key, [])
+                if len(examples) < self.example_limit:
+                    examples.append(record_id)
+            if count <= self.log_limit:
+                self.log.warning("%s: %s in Feld %s (Record %s): %s", stage, error_type, field, record_id, message)
+                if count == self.log_limit:
+                    self.log.warning("%s: weitere Fehler %s in Feld %s werden nur noch gezählt", stage, error_type, field)
+            reasons.append({"stage": stage, "type": error_type, "field": field, "message": message})
+        return reasons
+
+    def summary(self) -> List[Dict[str, Union[str, int, None, List[str]]]]:
+        """
+        Liefert die aggregierten Fehler, absteigend nach Häufigkeit sortiert.
+
+        Returns:
+            Liste von Dictionaries mit stage, type, field, count, message und examples
+        """
+        return [
+            {
+                "stage": stage,
+                "type": error_type,
+                "field": field,
+                "count": count,
+                "message": self.messages[(stage, error_type, field)],
+                "examples": self.examples.get((stage, error_type, field), []),
+            }
+            for (stage, error_type, field), count in self.counts.most_common()
+        ]
+
+    def log_summary(self) -> None:
+        """Gibt die Zusammenfassung über den Logger aus."""
+        if not self.counts:
+            self.log.info("Keine fehlerhaften Records")
+            return
+        self.log.warning(f"{self.failed_records} fehlerhafte Records, {sum(self.counts.values())} Fehler:")
+        for entry in self.summary():
+            self.log.warning(f"  {entry['count']:>8} × {entry['stage']}: {entry['type']} in Feld {entry['field']} "
+                             f"- {entry['message']}")
+
+    def write(self, path: Union[str, Path]) -> None:
+        """
+        Schreibt die Zusammenfassung als JSON-Datei.
+
+        Args:
+            path: Pfad zur Ausgabedatei
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"failed_records": self.failed_records, "errors": self.summary()}, f,
+                      ensure_ascii=False, indent=2)
+
+
+class DeadLetterWriter:
+    """
+    Schreibt fehlerhafte Records roh in eine Dead-Letter-Datei.
+
+    Es entstehen zwei Dateien, die erst beim ersten Fehler angelegt werden:
+    - {basis}.deadletter.mrc: die Records im Originalformat (ISO 2709), einer nach dem anderen
+    - {basis}.deadletter.jsonl: pro Record eine Zeile mit Quelldatei, Position darin, ID und Fehlergründen
+
+    Records ohne Rohdaten (z.B. nicht lesbare MARCXML-Elemente) stehen nur in der
+    JSONL-Datei und sind dort mit "raw_written": false markiert.
+    """
+
+    def __init__(self, base_path: Union[str, Path]):
+        """
+        Args:
+            base_path: Basispfad ohne Erweiterung (z.B. "out/result")
+        """
+        base_path = Path(base_path)
+        self.marc_path = base_path.parent / f"{base_path.name}.deadletter.mrc"
+        self.reason_path = base_path.parent / f"{base_path.name}.deadletter.jsonl"
+        self._marc_file = None
+        self._reason_file = None
+        self.count = 0
+
+    def write(self, raw: Optional[bytes], position: int, record_id: Optional[str], reasons: List[dict],
+              source: Union[str, Path, None] = None) -> None:
+        """
+        Schreibt einen fehlerhaften Record und seine Fehlergründe.
+
+        Args:
+            raw: Der Record im ISO-2709-Format oder None, wenn keine Rohdaten vorliegen
+            position: Laufende Nummer des Records in der Quelldatei (ab 1)
+            record_id: Optional. ID des Records (001), falls lesbar
+            reasons: Fehlerbeschreibungen aus ErrorReport.add()
+            source: Optional. Pfad der Quelldatei, auf die sich position bezieht
+        """
+        if self._marc_file is None:
+            self.marc_path.parent.mkdir(parents=True, exist_ok=True)
+            self._marc_file = open(self.marc_path, 'wb')
+            self._reason_file = open(self.reason_path, 'w', encoding='utf-8')
+        if raw:
+            self._marc_file.write(raw)
+        entry = {"source": str(source) if source is not None else None, "position": position, "record_id": record_id, "raw_written": bool(raw), "reasons": reasons}
+        self._reason_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.count += 1
+
+    def close(self) -> None:
+        """Schließt die Dateien, falls sie geöffnet wurden."""
+        if self._marc_file is not None:
+            self._marc_file.close()
+            self._reason_file.close()
+            self._marc_file = None
+            self._reason_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
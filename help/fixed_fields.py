@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Zeichenpositionen aus Leader und Kontrollfeldern für viele Records auf einmal.
+
+In index.slub.tit.properties stehen Angaben wie ``008[35-37]`` (Sprache), ``000[19]``
+(multipart_set) oder ``005[0-13]`` (update_time_str): Ausschnitte fester Länge aus dem
+Leader bzw. einem Kontrollfeld. Pro Record und Angabe einzeln ausgeschnitten kostet das
+jeweils einen Feldzugriff, eine Dekodierung und einen Slice.
+
+FixedFieldBatch packt stattdessen für einen Stapel von N Records jedes benötigte Feld
+einmal als Zeile fester Breite in ein NumPy-Bytearray (N × Breite) und schneidet alle
+Angaben als Spalten aus. Bei einem LazyRecord werden dafür die Rohbytes gelesen, ohne
+das Feld zu dekodieren. Ohne NumPy werden dieselben Bytes pro Record ausgeschnitten,
+das Ergebnis ist identisch.
+
+Positionen zählen wie in MARC21 in Bytes. Ist ein Feld kürzer als die Angabe, enthält
+das Ergebnis nur die vorhandenen Zeichen; fehlt das Feld oder bleibt nichts übrig, ist
+der Wert None.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from help.slublogging import getSlubLogger
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - abhängig von der Installation
+    numpy = None
+
+# Vorgeschlagene Größe eines Stapels (--fixed-batch) und im Benchmark
+DEFAULT_BATCH_SIZE = 1024
+
+# SolrMarc "008[35-37]" oder MARCspec "008/35-37", LDR als Synonym für 000
+_SPEC_PATTERN = re.compile(r"^(LDR|\d{3})(?:\[(\d+)(?:-(\d+))?\]|/(\d+)(?:-(\d+))?)$")
+
+
+class CharPositionSpec(NamedTuple):
+    tag: str
+    start: int
+    end: int
+
+    @property
+    def width(self) -> int:
+        return self.end - self.start
+
+
+def parse_char_spec(spec: str) -> Optional[CharPositionSpec]:
+    """
+    Zerlegt eine Angabe mit Zeichenpositionen.
+
+    Args:
+        spec: z.B. "008[35-37]", "000[19]", "LDR/19" oder "005/0-13"
+
+    Returns:
+        CharPositionSpec mit Tag und halboffenem Bereich [start, end) oder None, wenn spec keine
+        Zeichenpositionen eines Leaders oder Kontrollfelds (000 bis 009) beschreibt
+    """
+    match = _SPEC_PATTERN.match(spec.strip())
+    if match is None:
+        return None
+    tag, start, end = match.group(1), match.group(2) or match.group(4), match.group(3) or match.group(5)
+    tag = "000" if tag == "LDR" else tag
+    if tag >= "010":
+        return None
+    start = int(start)
+    end = int(end) + 1 if end is not None else start + 1
+    if end <= start:
+        raise ValueError(f"Ungültiger Zeichenbereich in '{spec}'")
+    return CharPositionSpec(tag, start, end)
+
+
+def control_bytes(record, tag: str) -> Optional[bytes]:
+    """Liefert Leader (000) oder das erste Kontrollfeld als Bytes, bei einem LazyRecord undekodiert."""
+    raw_control_field = getattr(record, "raw_control_field", None)
+    if raw_control_field is not None:
+        return raw_control_field(tag)
+    if tag == "000":
+        return str(record.leader).encode("utf-8") if record.leader is not None else None
+    field = record.get(tag)
+    if field is None or field.data is None:
+        return None
+    return field.data.encode("utf-8")
+
+
+class FixedFieldBatch:
+    """
+    Extrahiert Zeichenpositionen für einen Stapel von Records.
+
+    Example:
+        >>> batch = FixedFieldBatch({"multipart_set": "000[19]", "update_time_str": "005[0-13]"})
+        >>> batch.extract(records)
+        [{'multipart_set': 'a', 'update_time_str': '20240611101316'}, ...]
+    """
+
+    def __init__(self, specs: Dict[str, str], use_numpy: Optional[bool] = None):
+        """
+        Args:
+            specs: Slotname -> Angabe wie "008[35-37]"
+            use_numpy: Optional. False erzwingt die reine Python-Variante; ohne Angabe wird NumPy
+                       verwendet, wenn es installiert ist
+
+        Raises:
+            ValueError: Wenn eine Angabe keine Zeichenpositionen beschreibt
+        """
+        self.log = getSlubLogger('help.fixed_fields')
+        self.specs: Dict[str, CharPositionSpec] = {}
+        for name, spec in specs.items():
+            parsed = parse_char_spec(spec)
+            if parsed is None:
+                raise ValueError(f"Keine Zeichenpositionen in '{spec}' (Slot {name}), erwartet z.B. 008[35-37]")
+            self.specs[name] = parsed
+        # Pro Feld die benötigte Breite und die Angaben, die daraus gelesen werden
+        self.widths: Dict[str, int] = {}
+        self._columns: Dict[str, List[Tuple[str, int, int]]] = {}
+        for name, spec in self.specs.items():
+            self.widths[spec.tag] = max(self.widths.get(spec.tag, 0), spec.end)
+            self._columns.setdefault(spec.tag, []).append((name, spec.start, spec.end))
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy and numpy is not None
+
+    def __bool__(self) -> bool:
+        return bool(self.specs)
+
+    def extract_one(self, record) -> Dict[str, Optional[str]]:
+        """Extrahiert die Angaben für einen einzelnen Record (ohne Stapel)."""
+        result: Dict[str, Optional[str]] = {}
+        for tag, columns in self._columns.items():
+            data = control_bytes(record, tag)
+            for name, start, end in columns:
+                value = data[start:end] if data else b""
+                result[name] = value.decode("utf-8", "replace") if value else None
+        return result
+
+    def extract(self, records: Sequence) -> List[Dict[str, Optional[str]]]:
+        """
+        Extrahiert die Angaben für einen Stapel von Records.
+
+        Args:
+            records: Records (pymarc.Record oder LazyRecord); None-Einträge (nicht lesbare Records) sind erlaubt
+
+        Returns:
+            Pro Record ein Dictionary Slotname -> Wert (None, wenn nicht vorhanden), in der Reihenfolge von records
+        """
+        if not self.use_numpy:
+            return [self.extract_one(record) if record is not None else {} for record in records]
+
+        count = len(records)
+        results: List[Dict[str, Optional[str]]] = [{} for _ in range(count)]
+        if not count:
+            return results
+        for tag, columns in self._columns.items():
+            # Alle Felder eines Tags hintereinander in einem Puffer, Beginn und Länge pro Record
+            rows = [(control_bytes(record, tag) or b"") if record is not None else b"" for record in records]
+            lengths = numpy.fromiter(map(len, rows), dtype=numpy.int64, count=count)
+            buffer = numpy.frombuffer(b"".join(rows) + b"\0", dtype=numpy.uint8)
+            starts = numpy.cumsum(lengths) - lengths
+            for name, start, end in columns:
+                positions = numpy.arange(start, end)
+                # Spalten start..end-1 aller Records; Positionen hinter dem Feldende werden 0
+                valid = positions < lengths[:, None]
+                index = numpy.where(valid, starts[:, None] + positions, len(buffer) - 1)
+                column = numpy.ascontiguousarray(buffer[index]).view(f"S{end - start}").ravel()
+                try:
+                    # Reine ASCII-Werte (der Normalfall) in einem Schritt dekodieren
+                    values = column.astype(f"U{end - start}").tolist()
+                except UnicodeDecodeError:
+                    values = [value.decode("utf-8", "replace") for value in column.tolist()]
+                for result, value in zip(results, values):
+                    result[name] = value or None
+        for result, record in zip(results, records):
+            if record is None:
+                result.clear()
+        return results
+
+
+def benchmark(marc_file: str, specs: Dict[str, str], limit: Optional[int] = None) -> Dict[str, float]:
+    """
+    Vergleicht NumPy-Stapel, Python-Variante und MARCSpecExecutor._apply_char_positions (µs pro Record).
+
+    Die Records werden vorab mit LazyMARCReader gelesen, gemessen wird nur das Ausschneiden.
+    """
+    import time
+
+    from help.lazy_marc import LazyMARCReader
+    from marc_example import MARCSpecExecutor
+
+    with open(marc_file, "rb") as f:
+        records = []
+        for record in LazyMARCReader(f):
+            if record is not None:
+                records.append(record)
+            if limit and len(records) >= limit:
+                break
+    timings: Dict[str, float] = {}
+
+    def measure(label, function):
+        started = time.perf_counter()
+        function()
+        timings[label] = (time.perf_counter() - started) / len(records) * 1e6
+
+    for label, use_numpy in (("numpy", True), ("python", False)):
+        if use_numpy and numpy is None:
+            continue
+        batch = FixedFieldBatch(specs, use_numpy=use_numpy)
+        measure(label, lambda: [batch.extract(records[i:i + DEFAULT_BATCH_SIZE])
+                                for i in range(0, len(records), DEFAULT_BATCH_SIZE)])
+
+    # Bisheriger Weg pro Record: Feld holen (dekodiert) und die Position als String ausschneiden
+    parsed = [(name, spec.tag, f"{spec.start}-{spec.end - 1}") for name, spec in FixedFieldBatch(specs).specs.items()]
+    executor = MARCSpecExecutor(None)
+
+    def per_record():
+        for record in records:
+            for _, tag, char_spec in parsed:
+                value = str(record.leader) if tag == "000" else (record.get(tag).data if tag in record else None)
+                if value is not None:
+                    executor._apply_char_positions([value], char_spec)
+
+    measure("marcspec", per_record)
+    return timings
+
+
+if __name__ == "__main__":
+    import sys
+
+    SPECS = {"language": "008[35-37]", "multipart_set": "000[19]", "update_time_str": "005[0-13]"}
+    for label, micros in benchmark(sys.argv[1], SPECS, int(sys.argv[2]) if len(sys.argv) > 2 else None).items():
+        print(f"{label:>10}: {micros:.2f} µs pro Record")
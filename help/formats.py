@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Formatbestimmung (format, format_finc, format_de14) über eine Entscheidungstabelle.
+
+In index.slub.tit.properties kommen die Formatfelder aus info.finc.FormatCalculator bzw.
+format.bsh. Beide werten dieselben Positionen aus: Leader/06 (Art des Inhalts), Leader/07
+(bibliografische Ebene), 007/00-01 (physische Form) und 008/21, /23, /29, /33 (Art der
+fortlaufenden Ressource, Erscheinungsform, Art des visuellen Materials).
+
+Statt einer Kette von Bedingungen steht die Zuordnung deklarativ in FORMAT_TABLE; die
+erste passende Zeile gewinnt. FormatCalculator bildet aus den acht Rohbytes dieser
+Positionen einen Schlüssel und wertet die Tabelle nur beim ersten Auftreten eines
+Schlüssels aus. Jeder weitere Record mit denselben Bytes kostet einen Dict-Zugriff.
+In realen Daten gibt es nur wenige tausend verschiedene Schlüssel.
+
+Die Mapping-Dateien format_map_finc.properties und format_map_de14.properties liegen
+nicht vor; die Werte für format_finc und format_de14 stehen deshalb direkt in der Tabelle.
+"""
+
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from help.fixed_fields import control_bytes
+from help.slublogging import getSlubLogger
+
+# Positionen im Schlüssel, so auch als source_marc der formatCalculator-Slots im Schema
+FORMAT_SOURCE = "000[6-7]:007[0-1]:008[21]:008[23]:008[29]:008[33]"
+
+# Obergrenze für gespeicherte Schlüssel; darüber wird die Tabelle ohne Speichern ausgewertet
+DEFAULT_MAX_KEYS = 65536
+
+# Träger, abgeleitet aus 007/00-01 und der Erscheinungsform (008/23 bzw. 008/29)
+CARRIER_MICROFORM = "micro"
+CARRIER_ONLINE = "online"
+CARRIER_DISC = "disc"
+CARRIER_PRINT = "print"
+
+# Entscheidungstabelle, die erste passende Zeile gewinnt.
+# Spalten: Leader/06, Leader/07, Träger, Untertyp -> (format, format_finc, format_de14)
+# "*" passt auf alles, mehrere Zeichen auf jedes davon. Der Untertyp ist 008/21 bei
+# fortlaufenden Ressourcen (Leader/07 i, s) und 008/33 bei visuellem Material (g, k),
+# dort gilt 007/00 v ebenfalls als Videoaufnahme (v).
+FORMAT_TABLE: Tuple[Tuple[str, str, str, str, Tuple[str, str, str]], ...] = (
+    ("*", "*", CARRIER_MICROFORM, "*", ("Microform", "Microform", "Microform")),
+    # Unselbständige Teile
+    ("a", "abd", CARRIER_ONLINE, "*", ("eArticle", "Article, E-Article", "E-Article")),
+    ("a", "abd", "*", "*", ("Article", "Article, E-Article", "Article")),
+    # Fortlaufende Ressourcen nach 008/21
+    ("a", "is", CARRIER_ONLINE, "n", ("eNewspaper", "Newspaper", "E-Newspaper")),
+    ("a", "is", "*", "n", ("Newspaper", "Newspaper", "Newspaper")),
+    ("a", "is", CARRIER_ONLINE, "*", ("eJournal", "Journal, E-Journal", "E-Journal")),
+    ("a", "is", "*", "*", ("Journal", "Journal, E-Journal", "Journal")),
+    # Monografien
+    ("a", "*", CARRIER_ONLINE, "*", ("eBook", "Book, E-Book", "E-Book")),
+    ("a", "*", CARRIER_DISC, "*", ("DataCarrier", "Electronic Resource (Data Carrier)", "Electronic Resource")),
+    ("a", "*", "*", "*", ("Book", "Book, E-Book", "Book")),
+    ("t", "*", "*", "*", ("Manuscript", "Manuscript", "Manuscript")),
+    # Noten, Karten
+    ("cd", "*", CARRIER_ONLINE, "*", ("eMusicalScore", "Musical Score", "E-Musical Score")),
+    ("cd", "*", "*", "*", ("MusicalScore", "Musical Score", "Musical Score")),
+    ("ef", "*", CARRIER_ONLINE, "*", ("eMap", "Map", "E-Map")),
+    ("ef", "*", "*", "*", ("Map", "Map", "Map")),
+    # Visuelles Material nach 008/33
+    ("g", "*", CARRIER_ONLINE, "mv", ("eVideo", "Video", "E-Video")),
+    ("g", "*", "*", "mv", ("Video", "Video", "Video")),
+    ("g", "*", CARRIER_ONLINE, "*", ("eVideo", "Video", "E-Video")),
+    ("g", "*", "*", "*", ("ProjectedMedium", "Image", "Image")),
+    ("k", "*", "*", "*", ("Photo", "Image", "Image")),
+    # Tonträger
+    ("i", "*", CARRIER_ONLINE, "*", ("eAudio", "Audio", "E-Audio")),
+    ("i", "*", "*", "*", ("SoundRecording", "Audio", "Audio")),
+    ("j", "*", CARRIER_ONLINE, "*", ("eMusicRecording", "Audio", "E-Audio")),
+    ("j", "*", "*", "*", ("MusicRecording", "Audio", "Audio")),
+    # Elektronische Ressourcen und Sonstiges
+    ("m", "*", CARRIER_DISC, "*", ("DataCarrier", "Electronic Resource (Data Carrier)", "Electronic Resource")),
+    ("m", "*", "*", "*", ("Electronic", "Electronic Resource (Remote Access)", "Electronic Resource")),
+    ("o", "*", "*", "*", ("Kit", "Kit", "Kit")),
+    ("p", "*", "*", "*", ("MixedMaterials", "Mixed Materials", "Mixed Materials")),
+    ("r", "*", "*", "*", ("PhysicalObject", "Object", "Object")),
+    ("*", "*", "*", "*", ("Unknown", "Other", "Other")),
+)
+
+# Träger aus 007/00-01 bzw. der Erscheinungsform
+_MICROFORM_FORMS = "abc"
+_ONLINE_FORMS = "os"
+_DISC_FORMS = "q"
+
+# Leader/06, bei denen die Erscheinungsform in 008/29 statt 008/23 steht
+_FORM_AT_29 = "efgk"
+
+
+class FormatResult(NamedTuple):
+    format: Tuple[str, ...]
+    format_finc: Tuple[str, ...]
+    format_de14: Tuple[str, ...]
+
+
+def _matches(pattern: str, value: str) -> bool:
+    return pattern == "*" or (value != "" and value in pattern)
+
+
+def _carrier(record_type: str, category: str, material: str, form_23: str, form_29: str) -> str:
+    form = form_29 if record_type in _FORM_AT_29 else form_23
+    if category == "h" or (form and form in _MICROFORM_FORMS):
+        return CARRIER_MICROFORM
+    if (category == "c" and material == "r") or (form and form in _ONLINE_FORMS):
+        return CARRIER_ONLINE
+    if category == "c" or (form and form in _DISC_FORMS):
+        return CARRIER_DISC
+    return CARRIER_PRINT
+
+
+def decide(key: bytes) -> FormatResult:
+    """
+    Wertet FORMAT_TABLE für einen Schlüssel aus (ohne Cache).
+
+    Args:
+        key: Acht Bytes aus Leader/06-07, 007/00-01 und 008/21, /23, /29, /33; fehlende Positionen als \\0
+
+    Returns:
+        FormatResult der ersten passenden Zeile
+    """
+    values = ["" if byte == 0 else chr(byte) for byte in key]
+    record_type, level, category, material, serial_type, form_23, form_29, visual_type = values
+    carrier = _carrier(record_type, category, material, form_23, form_29)
+    if level in "is" and level:
+        subtype = serial_type
+    elif record_type in "gk" and record_type:
+        # 008/33 ist oft nicht codiert (|); 007/00 v kennzeichnet ebenfalls eine Videoaufnahme
+        subtype = "v" if category == "v" else visual_type
+    else:
+        subtype = ""
+    for type_pattern, level_pattern, carrier_pattern, subtype_pattern, formats in FORMAT_TABLE:
+        if (_matches(type_pattern, record_type) and _matches(level_pattern, level)
+                and (carrier_pattern == "*" or carrier_pattern == carrier) and _matches(subtype_pattern, subtype)):
+            return FormatResult(*((value,) for value in formats))
+    raise ValueError("FORMAT_TABLE braucht eine letzte Zeile mit '*' in allen Spalten")
+
+
+def format_key(record) -> bytes:
+    """Bildet den Schlüssel aus den Rohbytes von Leader, 007 und 008 (fehlende Positionen als \\0)."""
+    leader = control_bytes(record, "000") or b""
+    field_007 = control_bytes(record, "007") or b""
+    field_008 = control_bytes(record, "008") or b""
+    if len(leader) < 8:
+        leader = leader.ljust(8, b"\0")
+    if len(field_007) < 2:
+        field_007 = field_007.ljust(2, b"\0")
+    if len(field_008) < 34:
+        field_008 = field_008.ljust(34, b"\0")
+    return (leader[6:8] + field_007[:2] + field_008[21:22] + field_008[23:24]
+            + field_008[29:30] + field_008[33:34])
+
+
+class FormatCalculator:
+    """
+    Bestimmt format, format_finc und format_de14 mit einem Dict-Zugriff pro Record.
+
+    Example:
+        >>> calculator = FormatCalculator()
+        >>> calculator.lookup(record)
+        FormatResult(format=('Book',), format_finc=('Book, E-Book',), format_de14=('Book',))
+    """
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS):
+        """
+        Args:
+            max_keys: Höchstzahl gespeicherter Schlüssel; weitere werden pro Record ausgewertet
+        """
+        self.log = getSlubLogger('help.formats')
+        self.max_keys = max_keys
+        self._table: Dict[bytes, FormatResult] = {}
+        self.misses = 0
+
+    def lookup(self, record) -> FormatResult:
+        """Liefert die Formate eines Records (pymarc.Record oder LazyRecord)."""
+        key = format_key(record)
+        result = self._table.get(key)
+        if result is None:
+            self.misses += 1
+            result = decide(key)
+            if len(self._table) < self.max_keys:
+                self._table[key] = result
+        return result
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+
+def benchmark(marc_file: str, limit: Optional[int] = None) -> Dict[str, float]:
+    """
+    Misst die Formatbestimmung in Sekunden pro Million Records.
+
+    Verglichen werden FormatCalculator.lookup() und decide() pro Record ohne Dict; die Records
+    werden vorab mit LazyMARCReader gelesen.
+    """
+    import time
+
+    from help.lazy_marc import LazyMARCReader
+
+    with open(marc_file, "rb") as f:
+        records = []
+        for record in LazyMARCReader(f):
+            if record is not None:
+                records.append(record)
+            if limit and len(records) >= limit:
+                break
+    timings: Dict[str, float] = {}
+    calculator = FormatCalculator()
+
+    def measure(label, function):
+        started = time.perf_counter()
+        for record in records:
+            function(record)
+        timings[label] = (time.perf_counter() - started) / len(records) * 1e6
+
+    measure("lookup", calculator.lookup)
+    measure("decide", lambda record: decide(format_key(record)))
+    measure("key", format_key)
+    timings["keys"] = len(calculator)
+    return timings
+
+
+if __name__ == "__main__":
+    import sys
+
+    results = benchmark(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    print(f"{int(results.pop('keys'))} verschiedene Schlüssel")
+    for label, seconds in results.items():
+        print(f"{label:>8}: {seconds:.2f} s pro Million Records")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Vollständiger Record im ISO-2709-Format für das Feld fullrecord (SolrMarc: FullRecordAsMarc).
+
+Der naheliegende Weg, record.as_marc(), dekodiert bei einem LazyRecord alle Felder und
+kodiert sie danach wieder, obwohl die Originalbytes schon vorliegen: LazyMARCReader hält
+den Record als Bytes des Lesepuffers (LazyRecord.raw). full_record() gibt diese Bytes
+unverändert aus und serialisiert nur dann neu, wenn der Record geändert wurde
+(LazyRecord.modified) oder keine Originalbytes hat (pymarc.MARCReader, MARCXML, MARC-in-JSON).
+
+Kodierungen (Annotation encoding des Slots):
+- escaped: der Record als Text; Steuerzeichen wie Feld- und Subfeldtrenner schreibt die
+  JSON-Ausgabe als \\u001e bzw. \\u001f. MARC-8-Records werden dafür wie bei SolrMarc als
+  UTF-8 neu serialisiert (Leader-Position 9 = 'a').
+- base64: die Bytes Base64-kodiert; MARC-8-Records bleiben byte-genau erhalten.
+"""
+
+import base64
+from typing import Union
+
+from pymarc import Record
+
+# Erlaubte Werte der Annotation encoding
+FULLRECORD_ENCODINGS = ("escaped", "base64")
+DEFAULT_ENCODING = "escaped"
+
+
+def original_bytes(record: Record) -> Union[bytes, memoryview, None]:
+    """Originalbytes eines unveränderten Records oder None, wenn neu serialisiert werden muss."""
+    raw = getattr(record, "raw", None)
+    if raw is None or record.modified:
+        return None
+    return raw
+
+
+def _as_utf8_marc(record: Record) -> bytes:
+    """Serialisiert einen Record als UTF-8, auch wenn er als MARC-8 gelesen wurde."""
+    force_utf8 = record.force_utf8
+    record.force_utf8 = True
+    try:
+        data = record.as_marc()
+    finally:
+        record.force_utf8 = force_utf8
+    # as_marc() kodiert mit force_utf8 als UTF-8, übernimmt aber Leader-Position 9 unverändert
+    return data if data[9:10] == b"a" else data[:9] + b"a" + data[10:]
+
+
+def full_record(record: Record, encoding: str = DEFAULT_ENCODING) -> str:
+    """
+    Liefert den Record für fullrecord, aus den Originalbytes, wenn er unverändert ist.
+
+    Args:
+        record: pymarc.Record oder LazyRecord
+        encoding: 'escaped' (Text) oder 'base64'
+
+    Raises:
+        ValueError: Bei unbekannter Kodierung
+    """
+    raw = original_bytes(record)
+    if encoding == "base64":
+        return base64.b64encode(raw if raw is not None else record.as_marc()).decode("ascii")
+    if encoding != "escaped":
+        raise ValueError(f"Unbekannte Kodierung für fullrecord: {encoding}. "
+                         f"Erlaubt sind: {', '.join(FULLRECORD_ENCODINGS)}")
+    if raw is not None and raw[9:10] == b"a":
+        try:
+            return str(raw, "utf-8")
+        except UnicodeDecodeError:
+            pass
+    return _as_utf8_marc(record).decode("utf-8", "replace")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Records anhand von ID-Listen verwerfen, bevor sie geparst werden.
+
+In index.slub.tit.properties wird die ID über
+``filterByIDFile("import/records_with_display_suppression.csv,import/sekkor_kxp_title_ids.csv", "0-")``
+gebildet: Steht die 001 in einer der Listen, entfällt der Record. Die Listen enthalten
+Millionen von IDs, als Python-set mit str-Einträgen wären das über 100 Byte pro ID.
+
+IdFilter lädt die Listen einmal in ein sortiertes array('Q') mit den 64-Bit-Hashes der IDs
+(8 Byte pro ID, gleicher Hash wie bei der Deduplizierung) und sucht darin binär. Das Array
+wird neben der ersten Liste zwischengespeichert und beim nächsten Lauf direkt geladen,
+solange sich Pfade, Größen und Änderungszeiten der Listen nicht geändert haben.
+
+Bei ISO-2709-Quellen mit lazy Dekodierung prüft LazyMARCReader die 001 direkt im
+Directory der Rohdaten; verworfene Records werden weder geparst noch konvertiert oder
+validiert. Bei den übrigen Lesern wird nach dem Lesen, aber vor der Extraktion geprüft.
+
+Zwei verschiedene IDs mit demselben Hash würden verwechselt; bei 10 Mio. IDs in den Listen
+liegt die Wahrscheinlichkeit dafür bei etwa 5·10⁻¹³ pro Record.
+"""
+
+import hashlib
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from help.dedup import key_hash
+from help.lazy_marc import DIRECTORY_ENTRY_LEN, LEADER_LEN
+from help.slublogging import getSlubLogger
+
+# Präfix der Finc-ID wie im zweiten Argument von filterByIDFile
+DEFAULT_PREFIX = "0-"
+
+# Kennung und Version der Cachedatei
+_CACHE_MAGIC = b"MLFIDS1\0"
+
+
+def raw_record_id(chunk: bytes) -> Optional[str]:
+    """
+    Liest die 001 aus den Rohdaten eines ISO-2709-Records, ohne ihn zu parsen.
+
+    Returns:
+        Die 001 ohne Leerraum oder None, wenn sie fehlt oder Leader/Directory nicht lesbar sind
+    """
+    try:
+        base_address = int(chunk[12:17])
+        for start in range(LEADER_LEN, base_address - 1, DIRECTORY_ENTRY_LEN):
+            if chunk[start:start + 3] == b"001":
+                offset = base_address + int(chunk[start + 7:start + 12])
+                data = chunk[offset:offset + int(chunk[start + 3:start + 7]) - 1]
+                # Die 001 besteht aus ASCII-Zeichen, eine Dekodierung über MARC-8 ist nicht nötig
+                return data.decode("utf-8", "replace").strip() or None
+    except ValueError:
+        return None
+    return None
+
+
+def _read_ids(path: Path, prefix: str) -> Iterable[str]:
+    """Liefert die IDs einer Liste: erste Spalte pro Zeile, ohne Anführungszeichen und ohne prefix."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            value = line.split(",", 1)[0].strip().strip('"').strip()
+            if not value or value.startswith("#"):
+                continue
+            if prefix and value.startswith(prefix):
+                value = value[len(prefix):]
+            yield value
+
+
+class IdFilter:
+    """
+    Sortierte Hashes der IDs aus einer oder mehreren Listen.
+
+    Example:
+        >>> id_filter = IdFilter(["import/records_with_display_suppression.csv"])
+        >>> "1883795745" in id_filter
+        False
+        >>> reader = LazyMARCReader(f, skip=id_filter.drops_chunk)
+    """
+
+    def __init__(self, id_files: Iterable[Union[str, Path]], prefix: str = DEFAULT_PREFIX,
+                 cache_dir: Union[str, Path, None] = None, use_cache: bool = True):
+        """
+        Args:
+            id_files: Pfade der ID-Listen (CSV, die ID in der ersten Spalte; eine Zeile pro ID)
+            prefix: Präfix, das in den Listen vor der 001 stehen kann (wie bei filterByIDFile)
+            cache_dir: Optional. Ordner der Cachedatei; Standard ist der Ordner der ersten Liste
+            use_cache: Optional. False lädt die Listen immer neu und schreibt keinen Cache
+
+        Raises:
+            ValueError: Wenn keine Liste angegeben ist
+            OSError: Wenn eine Liste nicht lesbar ist
+        """
+        self.log = getSlubLogger('help.id_filter')
+        self.id_files = [Path(path) for path in id_files]
+        if not self.id_files:
+            raise ValueError("IdFilter braucht mindestens eine ID-Liste")
+        self.prefix = prefix
+        self.dropped = 0
+        self.checked = 0
+        directory = Path(cache_dir) if cache_dir is not None else self.id_files[0].parent
+        self.cache_file = directory / f"{self.id_files[0].stem}.{self._signature()[:16]}.idcache"
+
+        hashes = self._load_cache() if use_cache else None
+        if hashes is None:
+            hashes = array("Q", sorted({key_hash(value) for path in self.id_files
+                                        for value in _read_ids(path, prefix)}))
+            self.log.info(f"{len(hashes)} IDs aus {', '.join(str(path) for path in self.id_files)} geladen")
+            if use_cache:
+                self._write_cache(hashes)
+        self._hashes = hashes
+
+    def _signature(self) -> str:
+        """Hash über Pfade, Größen und Änderungszeiten der Listen und das Präfix."""
+        parts = [self.prefix]
+        for path in self.id_files:
+            stat = path.stat()
+            parts.append(f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}")
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _load_cache(self) -> Optional[array]:
+        try:
+            with open(self.cache_file, "rb") as f:
+                if f.read(len(_CACHE_MAGIC)) != _CACHE_MAGIC:
+                    return None
+                hashes = array("Q")
+                hashes.frombytes(f.read())
+        except (OSError, ValueError):
+            return None
+        self.log.info(f"{len(hashes)} IDs aus dem Cache {self.cache_file} geladen")
+        return hashes
+
+    def _write_cache(self, hashes: array) -> None:
+        try:
+            with open(self.cache_file, "wb") as f:
+                f.write(_CACHE_MAGIC)
+                hashes.tofile(f)
+        except OSError as e:
+            self.log.warning(f"Cache der ID-Listen nicht geschrieben ({self.cache_file}): {e}")
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, record_id: str) -> bool:
+        hashed = key_hash(record_id)
+        hashes = self._hashes
+        index = bisect_left(hashes, hashed)
+        return index < len(hashes) and hashes[index] == hashed
+
+    def drops_chunk(self, chunk: bytes) -> bool:
+        """Prüft die 001 in den Rohdaten eines Records; True, wenn der Record entfällt."""
+        self.checked += 1
+        record_id = raw_record_id(chunk)
+        if record_id is not None and record_id in self:
+            self.dropped += 1
+            return True
+        return False
+
+    def drops_record(self, record) -> bool:
+        """Prüft die 001 eines gelesenen Records; True, wenn der Record entfällt."""
+        self.checked += 1
+        field = record.get('001')
+        if field is not None and field.data and field.data.strip() in self:
+            self.dropped += 1
+            return True
+        return False
+
+    def reset_counts(self) -> None:
+        """Setzt die Zähler zurück (z.B. nach einem Vorlauf über dieselben Quellen)."""
+        self.dropped = 0
+        self.checked = 0
+
+    def memory_bytes(self) -> int:
+        return self._hashes.itemsize * len(self._hashes)
+
+    def log_summary(self) -> None:
+        self.log.info(f"ID-Listen: {self.dropped} von {self.checked} Records verworfen "
+                      f"({len(self)} IDs, {self.memory_bytes() / 1024 / 1024:.1f} MiB)")
@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Lazy Dekodierung von ISO-2709-Records mit schnellem MARC-8-Pfad.
+
+pymarc.MARCReader dekodiert beim Lesen jedes Feld jedes Records in Python-Strings,
+auch wenn die Extraktion nur eine Handvoll Felder benötigt. Dieses Modul liest
+zunächst nur Leader und Directory eines Records und dekodiert ein Feld erst dann,
+wenn es über get_fields(), get() oder record['245'] angefordert wird.
+
+Die Zeichenkodierung wird über Leader-Position 9 bestimmt ('a' = UTF-8, sonst MARC-8).
+Für MARC-8 wird eine vorberechnete Tabelle für die Standard-Zeichensätze
+(Basic Latin + ANSEL) verwendet; nur Werte mit Escape-Sequenzen laufen über den
+vollständigen Konverter von pymarc. Wiederkehrende Bytefolgen werden in einem
+LRU-Cache gehalten. Ungültige Bytes werden gemäß einer konfigurierbaren
+Fehlerstrategie ('replace', 'ignore' oder 'strict') behandelt.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+from pymarc import Field, Indicators, Record, Subfield
+from pymarc import exceptions as marc_exceptions
+from pymarc import marc8_mapping
+from pymarc.leader import Leader
+from pymarc.marc8 import MARC8ToUnicode
+
+LEADER_LEN = 24
+DIRECTORY_ENTRY_LEN = 12
+END_OF_RECORD = 0x1D
+SUBFIELD_INDICATOR = b"\x1f"
+
+# Erlaubte Strategien für ungültige Bytefolgen
+ERROR_POLICIES = ("replace", "ignore", "strict")
+REPLACEMENT_CHAR = "\ufffd"
+
+_CONTROL_BYTES = re.compile(rb"[\x00-\x1f]")
+
+
+def _build_marc8_table() -> List[Optional[Tuple[str, bool]]]:
+    """
+    Berechnet die Zeichentabelle für die MARC-8-Standardbelegung G0=Basic Latin, G1=ANSEL.
+
+    Die Tabelle bildet jedes Byte auf (Zeichen, ist_kombinierend) ab. Steuerzeichen
+    werden wie in pymarc verworfen (leerer String), unbekannte Bytes sind None.
+    """
+    basic_latin = marc8_mapping.CODESETS[MARC8ToUnicode.basic_latin]
+    ansel = marc8_mapping.CODESETS[MARC8ToUnicode.ansel]
+    table: List[Optional[Tuple[str, bool]]] = [None] * 256
+    for code in range(256):
+        if code < 0x20 or 0x80 < code < 0xA0:
+            table[code] = ("", False)
+            continue
+        entry = ansel.get(code) if code > 0x80 else basic_latin.get(code)
+        if entry is not None:
+            table[code] = (chr(entry[0]), bool(entry[1]))
+        elif code in marc8_mapping.ODD_MAP:
+            table[code] = (chr(marc8_mapping.ODD_MAP[code]), False)
+    return table
+
+
+_MARC8_TABLE = _build_marc8_table()
+
+
+class Marc8Decoder:
+    """
+    Schneller, memoisierender MARC-8-nach-Unicode-Dekoder.
+
+    Reine ASCII-Werte werden direkt dekodiert, Werte ohne Escape-Sequenz über die
+    vorberechnete Tabelle und nur Werte mit Zeichensatzwechsel über pymarc.
+    Die Ergebnisse werden in einem LRU-Cache nach Bytefolge gespeichert.
+    """
+
+    def __init__(self, errors: str = "replace", cache_size: int = 65536):
+        """
+        Args:
+            errors: Strategie für ungültige Bytes: 'replace' (U+FFFD), 'ignore' oder 'strict'
+            cache_size: Maximale Anzahl gemerkter Bytefolgen
+
+        Raises:
+            ValueError: Wenn die Fehlerstrategie unbekannt ist
+        """
+        if errors not in ERROR_POLICIES:
+            raise ValueError(f"Unbekannte Fehlerstrategie: {errors}. Erlaubt sind: {', '.join(ERROR_POLICIES)}")
+        self.errors = errors
+        self.decode = lru_cache(maxsize=cache_size)(self._decode)
+
+    def _invalid(self, data: bytes, pos: int, reason: str) -> str:
+        """Behandelt ein ungültiges Byte gemäß der Fehlerstrategie."""
+        if self.errors == "strict":
+            raise UnicodeDecodeError("marc8", data, pos, pos + 1, reason)
+        return REPLACEMENT_CHAR if self.errors == "replace" else ""
+
+    def _decode_table(self, data: bytes) -> str:
+        """Dekodiert über die vorberechnete Tabelle (keine Escape-Sequenzen)."""
+        chars = []
+        combinings = []
+        for pos, code in enumerate(data):
+            entry = _MARC8_TABLE[code]
+            if entry is None:
+                char, combining = self._invalid(data, pos, "unbekanntes MARC-8-Zeichen"), False
+            else:
+                char, combining = entry
+            if not char:
+                continue
+            # In MARC-8 stehen kombinierende Zeichen vor dem Basiszeichen, in Unicode danach
+            if combining:
+                combinings.append(char)
+            else:
+                chars.append(char)
+                if combinings:
+                    chars.extend(combinings)
+                    combinings = []
+        return unicodedata.normalize("NFC", "".join(chars))
+
+    def _decode(self, data: bytes) -> str:
+        if not data:
+            return ""
+        if data.isascii() and not _CONTROL_BYTES.search(data):
+            return data.decode("ascii")
+        if b"\x1b" not in data:
+            return self._decode_table(data)
+        try:
+            return MARC8ToUnicode(quiet=True).translate(data)
+        except (IndexError, TypeError, ValueError, KeyError) as e:
+            return self._invalid(data, 0, f"ungültige MARC-8-Escape-Sequenz: {e}")
+
+
+class LazyRecord(Record):
+    """
+    pymarc.Record, das seine Felder erst bei Bedarf dekodiert.
+
+    Beim Erzeugen werden nur Leader und Directory gelesen. get_fields(), get(),
+    record['245'] und 'tag' in record dekodieren ausschließlich die angefragten
+    Felder und merken sie sich. Jeder Zugriff auf record.fields (z.B. durch
+    as_marc() oder Iteration) dekodiert alle übrigen Felder, danach verhält sich
+    das Objekt wie ein gewöhnliches pymarc.Record.
+
+    raw bleibt die Bytefolge des Lesers; ob sie den Record noch beschreibt, sagt modified.
+    """
+
+    __slots__ = ("raw", "_base_address", "_entries", "_tags", "_decoded",
+                 "_materialized", "_utf8", "_errors", "_marc8", "_modified", "_links")
+
+    def __init__(self, chunk: bytes, errors: str = "replace", marc8_decoder: Optional[Marc8Decoder] = None):
+        """
+        Args:
+            chunk: Der vollständige Record im ISO-2709-Format
+            errors: Strategie für ungültige Bytefolgen ('replace', 'ignore', 'strict')
+            marc8_decoder: Optional. Gemeinsamer MARC-8-Dekoder (teilt den Cache über Records)
+
+        Raises:
+            pymarc.exceptions.RecordLeaderInvalid, BaseAddressInvalid, RecordDirectoryInvalid,
+            NoFieldsFound: Wenn Leader oder Directory nicht lesbar sind
+        """
+        super().__init__()
+        self._materialized = False
+        self._modified = False
+        # Index der 880-Felder (help/linked_fields.py), erst bei Bedarf aufgebaut
+        self._links = None
+        self.raw = chunk
+        self._errors = errors
+        self._decoded = {}
+
+        if len(chunk) < LEADER_LEN:
+            raise marc_exceptions.RecordLeaderInvalid
+        self.leader = Leader(chunk[:LEADER_LEN].decode("ascii"))
+        self._utf8 = self.leader[9] == "a"
+        self._marc8 = marc8_decoder if marc8_decoder is not None else Marc8Decoder(errors)
+
+        base_address = int(chunk[12:17])
+        if base_address <= 0:
+            raise marc_exceptions.BaseAddressNotFound
+        if base_address >= len(chunk):
+            raise marc_exceptions.BaseAddressInvalid
+        self._base_address = base_address
+
+        directory = chunk[LEADER_LEN:base_address - 1]
+        if len(directory) % DIRECTORY_ENTRY_LEN != 0:
+            raise marc_exceptions.RecordDirectoryInvalid
+        entries = []
+        for start in range(0, len(directory), DIRECTORY_ENTRY_LEN):
+            entry = directory[start:start + DIRECTORY_ENTRY_LEN]
+            offset = base_address + int(entry[7:12])
+            entries.append((entry[0:3].decode("ascii"), offset, offset + int(entry[3:7]) - 1))
+        if not entries:
+            raise marc_exceptions.NoFieldsFound
+        self._entries = entries
+        self._tags = {tag for tag, _, _ in entries}
+
+    @property
+    def fields(self) -> List[Field]:
+        if not self._materialized:
+            Record.fields.__set__(self, [self._field(i) for i in range(len(self._entries))])
+            self._materialized = True
+        return Record.fields.__get__(self)
+
+    @fields.setter
+    def fields(self, value: List[Field]) -> None:
+        Record.fields.__set__(self, value)
+        self._materialized = True
+
+    @property
+    def modified(self) -> bool:
+        """
+        True, wenn der Record nicht mehr den Originalbytes (raw) entspricht.
+
+        Erkannt werden geänderte Leader-Positionen sowie hinzugefügte, entfernte, ersetzte oder
+        umsortierte Felder (add_field(), remove_field(), record.fields = ...). Änderungen innerhalb
+        eines Field-Objekts (z.B. record['245']['a'] = ...) sind nicht erkennbar; dafür
+        mark_modified() aufrufen.
+        """
+        if self._modified:
+            return True
+        leader = str(self.leader).encode("ascii", "replace")
+        if leader[5:12] != self.raw[5:12] or leader[17:LEADER_LEN] != self.raw[17:LEADER_LEN]:
+            return True
+        if not self._materialized:
+            return False
+        fields = Record.fields.__get__(self)
+        if len(fields) != len(self._entries):
+            return True
+        decoded = self._decoded
+        return any(field is not decoded.get(index) for index, field in enumerate(fields))
+
+    def mark_modified(self) -> None:
+        """Markiert den Record als geändert, z.B. nach der Änderung eines Subfelds."""
+        self._modified = True
+
+    def _text(self, data: bytes) -> str:
+        """Dekodiert einen Feld- oder Subfeldwert gemäß Leader-Position 9."""
+        if self._utf8:
+            return data.decode("utf-8", self._errors)
+        return self._marc8.decode(data)
+
+    def _field(self, index: int) -> Field:
+        """Dekodiert das Feld an Position index des Directorys (mit Cache)."""
+        field = self._decoded.get(index)
+        if field is not None:
+            return field
+
+        tag, start, end = self._entries[index]
+        data = self.raw[start:end]
+        if tag < "010" and tag.isdigit():
+            field = Field(tag=tag, data=self._text(data))
+        else:
+            subs = data.split(SUBFIELD_INDICATOR)
+            indicators = subs[0].decode("ascii", "replace").ljust(2)
+            subfields = [
+                Subfield(code=chr(sub[0]), value=self._text(sub[1:]))
+                for sub in subs[1:]
+                if sub
+            ]
+            field = Field(
+                tag=tag,
+                indicators=Indicators(indicators[0], indicators[1]),
+                subfields=subfields,
+            )
+        self._decoded[index] = field
+        return field
+
+    def get_fields(self, *args) -> List[Field]:
+        if self._materialized or not args:
+            return super().get_fields(*args)
+        return [self._field(i) for i, (tag, _, _) in enumerate(self._entries) if tag in args]
+
+    def get_fields_in(self, tags) -> List[Field]:
+        """
+        Liefert die Felder, deren Tag in einer Menge liegt, in Directory-Reihenfolge.
+
+        Für große Tag-Mengen (z.B. 100 bis 899 für allfields) günstiger als get_fields(*tags),
+        und es werden nur die passenden Felder dekodiert.
+
+        Args:
+            tags: Menge der Tags (set oder frozenset)
+        """
+        if self._materialized:
+            return [field for field in Record.fields.__get__(self) if field.tag in tags]
+        return [self._field(i) for i, (tag, _, _) in enumerate(self._entries) if tag in tags]
+
+    def raw_control_field(self, tag: str) -> Optional[bytes]:
+        """
+        Liefert die undekodierten Bytes des ersten Kontrollfelds mit diesem Tag (für "000" den Leader).
+
+        Für Zeichenpositionen (z.B. 008/35-37), die nach MARC21 Bytepositionen sind; es wird
+        kein Field-Objekt erzeugt. Nach einer Änderung der Felder (materialisiert) wird das
+        Feld aus den aktuellen Feldern kodiert.
+        """
+        if tag == "000":
+            return self.raw[:LEADER_LEN] if not self._materialized else str(self.leader).encode("utf-8")
+        if self._materialized:
+            field = self.get(tag)
+            return field.data.encode("utf-8") if field is not None and field.data is not None else None
+        for entry_tag, start, end in self._entries:
+            if entry_tag == tag:
+                return self.raw[start:end]
+        return None
+
+    def __contains__(self, tag: str) -> bool:
+        if self._materialized:
+            return super().__contains__(tag)
+        return tag in self._tags
+
+    @property
+    def decoded_field_count(self) -> int:
+        """Anzahl der bisher dekodierten Felder (für Diagnose und Tests)."""
+        if self._materialized:
+            return len(self._entries)
+        return len(self._decoded)
+
+
+class LazyMARCReader:
+    """
+    Leser für binäre ISO-2709-Dateien, der LazyRecord-Objekte liefert.
+
+    Die Schnittstelle entspricht pymarc.MARCReader: Defekte Records werden als None
+    geliefert, die Ursache steht in current_exception, die Rohdaten in current_chunk.
+    Alle Records teilen sich einen MARC-8-Dekoder und damit dessen Cache.
+    """
+
+    def __init__(self, file_handle: BinaryIO, errors: str = "replace", cache_size: int = 65536,
+                 skip: Optional[Callable[[bytes], bool]] = None):
+        """
+        Args:
+            file_handle: Binär geöffnete Quelldatei
+            errors: Strategie für ungültige Bytefolgen ('replace', 'ignore', 'strict')
+            cache_size: Größe des MARC-8-Caches
+            skip: Optional. Prüft die Rohdaten eines vollständigen Records; liefert sie True, wird der
+                  Record ohne Parsen übersprungen und in dropped gezählt (z.B. IdFilter.drops_chunk)
+        """
+        self.file_handle = file_handle
+        self.errors = errors
+        self.marc8_decoder = Marc8Decoder(errors, cache_size)
+        self.skip = skip
+        self.dropped = 0
+        self.current_chunk: Optional[bytes] = None
+        self.current_exception: Optional[Exception] = None
+
+    def __iter__(self) -> Iterator[Optional[LazyRecord]]:
+        for chunk, exception in iter_marc_chunks(self.file_handle):
+            self.current_chunk = chunk
+            self.current_exception = exception
+            if exception is not None:
+                yield None
+                continue
+            if self.skip is not None and self.skip(chunk):
+                self.dropped += 1
+                continue
+            try:
+                record = LazyRecord(chunk, self.errors, self.marc8_decoder)
+            except Exception as e:
+                self.current_exception = e
+                record = None
+            yield record
+
+
+def iter_marc_chunks(file_handle: BinaryIO) -> Iterator[Tuple[bytes, Optional[Exception]]]:
+    """
+    Liefert die Rohdaten der Records einer ISO-2709-Datei, ohne sie zu parsen.
+
+    Die Recordlänge wird aus den ersten fünf Bytes des Leaders gelesen.
+
+    Args:
+        file_handle: Binär geöffnete Quelldatei
+
+    Yields:
+        Tupel (chunk, exception). exception ist None, wenn der Record vollständig ist,
+        sonst eine pymarc-Exception (z.B. TruncatedRecord, RecordLengthInvalid).
+    """
+    while True:
+        first5 = file_handle.read(5)
+        if not first5:
+            return
+        if len(first5) < 5:
+            yield first5, marc_exceptions.TruncatedRecord()
+            return
+        try:
+            length = int(first5)
+        except ValueError:
+            yield first5, marc_exceptions.RecordLengthInvalid()
+            return
+
+        chunk = first5 + file_handle.read(length - 5)
+        if len(chunk) < length:
+            yield chunk, marc_exceptions.TruncatedRecord()
+            return
+        if chunk[-1] != END_OF_RECORD:
+            yield chunk, marc_exceptions.EndOfRecordNotFound()
+            continue
+        yield chunk, None
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Verknüpfte 880-Felder (Alternate Graphic Representation) für Spezifikationen mit LNK-Präfix.
+
+In SolrMarc liefert eine Spezifikation wie LNK245ab die Subfelder a und b der 880-Felder,
+die über $6 mit einem Feld 245 verknüpft sind (title_orig, series_orig, Teile von
+description). $6 eines 880-Felds beginnt mit dem Tag des Basisfelds und der Nummer des
+Paars, z.B. "245-01/$1"; das Basisfeld verweist mit "880-01" zurück. Nicht gepaarte
+880-Felder tragen die Nummer 00.
+
+Statt für jede LNK-Spezifikation alle 880-Felder zu durchsuchen, baut link_index() pro
+Record einmal einen Index nach Tag des Basisfelds und nach Paar auf. Bei einem LazyRecord
+werden dafür nur die 880-Felder dekodiert und der Index am Record gemerkt. pymarc.Record hat
+__slots__ und keine schwachen Referenzen; für diese Records wird der Index des zuletzt
+angefragten Records gemerkt, was bei der Konvertierung Record für Record genügt. Der Index
+beschreibt die Felder beim ersten Zugriff; wer danach 880-Felder ändert, ruft
+link_index(record, rebuild=True).
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from pymarc import Field, Record
+
+LINK_PREFIX = "LNK"
+ALTERNATE_GRAPHIC_TAG = "880"
+
+
+def split_link_spec(spec: str) -> Tuple[bool, str]:
+    """
+    Trennt das LNK-Präfix von einer Feldspezifikation.
+
+    Returns:
+        (verknüpft, Spezifikation ohne Präfix), z.B. (True, "245ab") für "LNK245ab"
+    """
+    if spec.startswith(LINK_PREFIX):
+        return True, spec[len(LINK_PREFIX):]
+    return False, spec
+
+
+def parse_linkage(value: str) -> Tuple[str, str]:
+    """Zerlegt $6 wie "245-01/$1/r" in Tag und Nummer des Paars ("245", "01")."""
+    tag, _, occurrence = value.partition("/")[0].partition("-")
+    return tag.strip(), occurrence.strip()
+
+
+class LinkIndex:
+    """
+    880-Felder eines Records nach dem Tag ihres Basisfelds und nach Paar.
+
+    Example:
+        >>> links = link_index(record)
+        >>> links.fields("245")           # alle 880-Felder zu 245
+        >>> links.linked(record["245"])   # das 880-Feld, auf das 245 $6 verweist
+    """
+
+    __slots__ = ("_by_tag", "_by_pair")
+
+    def __init__(self, fields: List[Field]):
+        """
+        Args:
+            fields: Die 880-Felder des Records
+        """
+        by_tag: Dict[str, List[Field]] = {}
+        by_pair: Dict[Tuple[str, str], Field] = {}
+        for field in fields:
+            linkage = field.get("6")
+            if not linkage:
+                continue
+            tag, occurrence = parse_linkage(linkage)
+            by_tag.setdefault(tag, []).append(field)
+            if occurrence and occurrence != "00":
+                by_pair.setdefault((tag, occurrence), field)
+        self._by_tag = by_tag
+        self._by_pair = by_pair
+
+    def fields(self, tag: str) -> List[Field]:
+        """880-Felder, deren $6 auf ein Feld mit diesem Tag verweist, in der Reihenfolge im Record."""
+        return self._by_tag.get(tag, [])
+
+    def linked(self, field: Field) -> Optional[Field]:
+        """Das 880-Feld, auf das $6 eines Basisfelds (z.B. "880-01") verweist, oder None."""
+        linkage = field.get("6")
+        if not linkage:
+            return None
+        tag, occurrence = parse_linkage(linkage)
+        if tag != ALTERNATE_GRAPHIC_TAG:
+            return None
+        return self._by_pair.get((field.tag, occurrence))
+
+    def __len__(self) -> int:
+        """Anzahl der verknüpften 880-Felder."""
+        return sum(len(fields) for fields in self._by_tag.values())
+
+
+# Zuletzt angefragter pymarc.Record und sein Index (als ein Tupel, damit Threads ein Paar sehen)
+_last: Tuple[Optional[Record], Optional[LinkIndex]] = (None, None)
+
+
+def link_index(record: Record, rebuild: bool = False) -> LinkIndex:
+    """
+    Liefert den Index der 880-Felder eines Records, beim ersten Aufruf aufgebaut.
+
+    Args:
+        record: pymarc.Record oder LazyRecord
+        rebuild: Optional. Index neu aufbauen, z.B. nachdem 880-Felder geändert wurden
+    """
+    global _last
+    if hasattr(record, "_links"):
+        index = None if rebuild else record._links
+        if index is None:
+            index = record._links = LinkIndex(record.get_fields(ALTERNATE_GRAPHIC_TAG))
+        return index
+    last_record, index = _last
+    if rebuild or last_record is not record:
+        index = LinkIndex(record.get_fields(ALTERNATE_GRAPHIC_TAG))
+        _last = (record, index)
+    return index
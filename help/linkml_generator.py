@@ -4,12 +4,20 @@ LinkML Modellgenerator-Funktionalität.
 Dieses Modul bietet Funktionen zum Generieren von Pydantic- und Dataclass-Modellen
 aus LinkML-Schemas. Die generierten Modelle werden im slubmodels-Ordner gespeichert
 und können dynamisch geladen werden.
+
+Zusätzlich wird eine schlanke Klasse mit __slots__ erzeugt (slotted_model.py), deren
+Validierung als geradliniger Code pro Slot generiert wird. Sie prüft Pflichtfelder
+wie die YAMLRoot-Dataclass, baut mehrwertige Felder aber nur bei Bedarf neu auf.
 """
 
+import hashlib
 import importlib
+import re
 import sys
 from pathlib import Path
-from typing import Dict, Type
+from typing import Dict, List, Optional, Type
+
+from jsonasobj2 import as_dict
 
 # LinkML-Importe für die Modellerzeugung
 from linkml.generators.pythongen import PythonGenerator
@@ -17,8 +25,489 @@ from linkml.generators.pydanticgen import PydanticGenerator
 from linkml_runtime.utils.schemaview import SchemaView
 
 # Lokale Importe
+from help.authors import author_rules
+from help.fixed_fields import parse_char_spec
+from help.formats import FORMAT_SOURCE, FormatResult
+from help.fullrecord import DEFAULT_ENCODING, FULLRECORD_ENCODINGS
+from help.linked_fields import ALTERNATE_GRAPHIC_TAG, split_link_spec
 from help.slublogging import getSlubLogger
 
+# Abbildung der LinkML-Typen auf Python-Typen für die schlanke Klasse
+SLOTTED_TYPES = {
+    "string": "str",
+    "integer": "int",
+    "float": "float",
+    "double": "float",
+    "decimal": "float",
+    "boolean": "bool",
+}
+
+
+def _slotted_slot_code(name: str, type_name: str, required: bool, multivalued: bool) -> List[str]:
+    """Erzeugt die Validierungszeilen für einen Slot der schlanken Klasse."""
+    lines = []
+    if required:
+        # Wie YAMLRoot._is_empty: None, leere Liste und leeres Dictionary gelten als fehlend
+        lines += [
+            f"        if {name} is None or {name} == [] or {name} == {{}}:",
+            f"            raise ValueError(\"{name} must be supplied\")",
+        ]
+    if multivalued:
+        lines += [
+            f"        if {name} is None:",
+            f"            {name} = []",
+            f"        elif type({name}) is not list:",
+            f"            {name} = [{name}]",
+            # map() mit __instancecheck__ vermeidet einen Generator-Frame pro Element
+            f"        if not all(map({type_name}.__instancecheck__, {name})):",
+            f"            {name} = [v if isinstance(v, {type_name}) else {type_name}(v) for v in {name}]",
+        ]
+    elif required:
+        lines += [
+            f"        if not isinstance({name}, {type_name}):",
+            f"            {name} = {type_name}({name})",
+        ]
+    else:
+        lines += [
+            f"        if {name} is not None and not isinstance({name}, {type_name}):",
+            f"            {name} = {type_name}({name})",
+        ]
+    lines.append(f"        self.{name} = {name}")
+    return lines
+
+
+def generate_slotted_model(schema_view: SchemaView, class_name: str, schema_file: str = "") -> str:
+    """
+    Erzeugt den Quelltext einer schlanken Klasse mit __slots__ für eine Schema-Klasse.
+
+    Die Reihenfolge der Attribute entspricht der YAMLRoot-Dataclass (Pflichtfelder zuerst),
+    damit to_json_dict() dieselbe Ausgabe liefert wie die bisherige Dataclass-Serialisierung.
+    Muster (pattern) werden wie bei der Dataclass nicht geprüft, das übernimmt das Pydantic-Modell.
+
+    Args:
+        schema_view: SchemaView des LinkML-Schemas
+        class_name: Name der Klasse im Schema (z.B. "Finc")
+        schema_file: Optional. Name der Schemadatei für den Kopfkommentar
+
+    Returns:
+        Python-Quelltext des Moduls
+    """
+    slots = schema_view.class_induced_slots(class_name)
+    ordered = [slot for slot in slots if slot.required] + [slot for slot in slots if not slot.required]
+    names = [slot.name for slot in ordered]
+    description = schema_view.get_class(class_name).description or ""
+
+    lines = [
+        f"# Auto generated from {schema_file} by help/linkml_generator.py (slotted)",
+        f"# Schema: {schema_view.schema.name}",
+        "#",
+        "# Nicht von Hand bearbeiten, wird bei jedem Lauf neu erzeugt.",
+        "",
+        "from typing import Any, Dict",
+        "",
+        "",
+        f"class {class_name}:",
+        '    """',
+        f"    {description}",
+        "",
+        "    Schlanke Variante mit __slots__ und generierter Validierung.",
+        '    """',
+        "",
+        f"    __slots__ = ({', '.join(repr(name) for name in names)},)",
+        "",
+        f"    MULTIVALUED = frozenset(({', '.join(repr(slot.name) for slot in ordered if slot.multivalued)},))",
+        "",
+        f"    def __init__(self, {', '.join(f'{name}=None' for name in names)}, **kwargs):",
+        "        if kwargs:",
+        '            raise ValueError("\\n".join(f"Unknown argument: {key} = {value!r:.40}" for key, value in kwargs.items()))',
+    ]
+    for slot in ordered:
+        type_name = SLOTTED_TYPES.get(slot.range or "string", "str")
+        lines += _slotted_slot_code(slot.name, type_name, bool(slot.required), bool(slot.multivalued))
+    lines += [
+        "",
+        "    def to_json_dict(self) -> Dict[str, Any]:",
+        '        """Liefert die gesetzten Felder ohne None-Werte und leere Listen."""',
+        "        result = {}",
+    ]
+    for slot in ordered:
+        if slot.required:
+            lines.append(f"        result[{slot.name!r}] = self.{slot.name}")
+        elif slot.multivalued:
+            lines += [f"        if self.{slot.name}:", f"            result[{slot.name!r}] = self.{slot.name}"]
+        else:
+            lines += [f"        if self.{slot.name} is not None:", f"            result[{slot.name!r}] = self.{slot.name}"]
+    lines += [
+        "        return result",
+        "",
+        "    def __eq__(self, other):",
+        "        if type(other) is not type(self):",
+        "            return NotImplemented",
+        f"        return {' and '.join(f'self.{name} == other.{name}' for name in names)}",
+        "",
+        "    __hash__ = None",
+        "",
+        "    def __repr__(self):",
+        '        return f"{type(self).__name__}({self.to_json_dict()!r})"',
+        "",
+    ]
+    return "\n".join(lines)
+
+
+# Funktionen, die in der Annotation "function" eines Slots stehen dürfen (siehe generate_converter())
+CONVERTER_FUNCTIONS = ("get_id", "first", "single", "get_authors", "getAllSearchableFieldsAsSet", "formatCalculator",
+                       "titleSortLower")
+
+# source_marc für den vollständigen Record wie in SolrMarc (fullrecord = FullRecordAsMarc)
+FULLRECORD_SOURCE = "FullRecordAsMarc"
+
+# Felder, die AuthorExtractor.extract() liefert
+AUTHOR_RESULT_SLOTS = ("author", "author_role", "author2", "author2_role", "author_corporate",
+                       "author_corporate_role", "author_sort")
+
+
+def _slot_annotations(slot) -> Dict[str, str]:
+    """Liefert die Annotationen eines Slots als einfaches Dictionary (Name -> Wert)."""
+    annotations = as_dict(slot.annotations) if slot.annotations else {}
+    return {key: (value["value"] if isinstance(value, dict) else value) for key, value in annotations.items()}
+
+
+def _flag(value) -> bool:
+    """Wertet eine Annotation als Wahrheitswert aus (true/yes/1, auch als String)."""
+    return value is True or str(value).strip().lower() in ("true", "yes", "1")
+
+
+def _normalizer_options(name: str, annotations: Dict[str, str]) -> Optional[tuple]:
+    """
+    Liefert die Argumente für get_normalizer() aus den Annotationen clean, remove_patterns und nfc.
+
+    Returns:
+        (strip, remove_patterns, clean_punctuation, nfc) oder None, wenn keine der Annotationen gesetzt ist
+
+    Raises:
+        ValueError: Bei einem ungültigen Muster in remove_patterns
+    """
+    if not any(key in annotations for key in ("clean", "remove_patterns", "nfc")):
+        return None
+    # Annotationen sind in LinkML Skalare: mehrere Muster durch Leerzeichen getrennt
+    patterns = tuple(str(annotations.get("remove_patterns") or "").split())
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Ungültiges Muster '{pattern}' in remove_patterns von Slot {name}: {e}") from e
+    return True, patterns, _flag(annotations.get("clean", False)), _flag(annotations.get("nfc", False))
+
+
+def _spec_lines(constant: str, tag: str, codes: str, join: Optional[str], normalize: Optional[str] = None,
+                linked: bool = False) -> List[str]:
+    """
+    Erzeugt die Extraktion einer Feldspezifikation wie MarcUtils.extract_marc_subfields().
+
+    Die Werte eines Feldes erscheinen in der Reihenfolge der Subfeldcodes in der Spezifikation,
+    innerhalb eines Codes in der Reihenfolge im Feld. Statt einer Schleife pro Code wird das Feld
+    einmal durchlaufen und stabil nach dem Rang des Codes sortiert. Mit normalize wird jeder Wert
+    statt mit strip() mit dieser Funktion (aus get_normalizer()) bereinigt. Mit linked (LNK-Präfix)
+    stammen die Felder aus dem Index der verknüpften 880-Felder (links = link_index(record)).
+    """
+    clean = f"{normalize}(value)" if normalize else "value.strip()"
+    fields = f"links.fields({tag!r})" if linked else f"record.get_fields({tag!r})"
+    if join is not None:
+        target, lines = "parts", [f"    for field in {fields}:", "        parts = []"]
+    else:
+        target, lines = "values", [f"    for field in {fields}:"]
+    if len(codes) == 1:
+        lines += [
+            "        for code, value in field.subfields:",
+            f"            if code == {codes!r}:",
+            f"                value = {clean}",
+            "                if value:",
+            f"                    {target}.append(value)",
+        ]
+    else:
+        lines += [
+            f"        for _, value in sorted([({constant}[code], value) for code, value in field.subfields"
+            f" if code in {constant}], key=_rank):",
+            f"            value = {clean}",
+            "            if value:",
+            f"                {target}.append(value)",
+        ]
+    if join is not None:
+        lines += ["        if parts:", f"            values.append({join!r}.join(parts))"]
+    return lines
+
+
+def generate_converter(schema_view: SchemaView, class_name: str, schema_file: str = "", schema_hash: str = "") -> str:
+    """
+    Erzeugt den Quelltext eines Konverter-Moduls (MARC21 -> Finc-Feldwerte) aus den Slot-Annotationen.
+
+    Ausgewertet werden die Annotationen der Slots:
+    - source_marc: Feldspezifikation(en) wie "245ab" oder "600abc:650a", mit LNK-Präfix wie
+      "LNK245ab" für die über $6 verknüpften 880-Felder (help/linked_fields.py), ein Bereich wie "100-900"
+      (für getAllSearchableFieldsAsSet), eine Konstante in Anführungszeichen wie '"marc"' oder
+      Zeichenpositionen aus Leader bzw. Kontrollfeld wie "000[19]" oder "008[35-37]"; diese stehen
+      im Modul als FIXED_FIELDS (help/fixed_fields.py) und convert() nimmt sie optional vorab
+      für einen Stapel extrahiert entgegen; FULLRECORD_SOURCE für den ganzen Record über
+      help/fullrecord.py (unveränderte Records aus den Originalbytes)
+    - function: Optional. Eine der Funktionen aus CONVERTER_FUNCTIONS
+      - get_id: Inhalt des Kontrollfelds (mit optionalem prefix), Pflichtfeld -> MissingFieldError
+      - first: erster Wert; fehlt bei einem Pflichtfeld das MARC-Feld ganz -> MissingFieldError
+      - single: Wert nur, wenn genau einer vorhanden ist
+      - get_authors: Wert aus AuthorExtractor (ein Durchlauf für alle Autorenfelder); die Regeln
+        des Durchlaufs werden mit author_rules() aus source_marc dieser Slots abgeleitet
+      - getAllSearchableFieldsAsSet: allfields über AllFieldsBuilder
+      - formatCalculator: format, format_finc bzw. format_de14 über FormatCalculator (ein
+        Dict-Zugriff pro Record); source_marc muss FORMAT_SOURCE entsprechen
+      - titleSortLower: Sortierschlüssel des ersten Werts über SortKeyBuilder.title() (Artikel
+        nach 008/35-37 bzw. 245 Indikator 2, Diakritika gefaltet)
+      Ohne function liefern mehrwertige Slots alle Werte, einwertige den ersten.
+    - join: Optional. Trennzeichen zwischen den Subfeldern eines Feldes
+    - sort_key: Optional. Nur einwertige Slots: der fertige Wert wird zum Sortierschlüssel
+      (SortKeyBuilder.key(), klein geschrieben und gefaltet)
+    - prefix: Optional. Präfix für get_id
+    - encoding: Optional. Nur mit FULLRECORD_SOURCE: 'escaped' (Standard) oder 'base64'
+    - clean, remove_patterns, nfc: Optional. Jeder Subfeldwert wird über einen gemeinsamen
+      TextNormalizer (get_normalizer()) bereinigt statt nur mit strip(): clean entfernt Satzzeichen
+      am Ende wie SolrMarc, remove_patterns sind durch Leerzeichen getrennte Muster (ein Leerzeichen
+      im Muster als \\x20), deren Treffer der Reihe nach entfernt werden, nfc normalisiert nach
+      Unicode NFC. Gleiche Optionen teilen sich einen Cache, dessen Trefferquote am Ende der
+      Konvertierung geloggt wird.
+
+    Slots ohne source_marc werden nicht befüllt. Der erzeugte Code enthält pro Slot
+    geradlinigen Code; Spezifikationen werden beim Import des Moduls vorberechnet.
+
+    Args:
+        schema_view: SchemaView des LinkML-Schemas
+        class_name: Name der Klasse im Schema (z.B. "Finc")
+        schema_file: Optional. Name der Schemadatei für den Kopfkommentar
+        schema_hash: Optional. Hash des Schemas, anhand dessen der Cache erkannt wird
+
+    Returns:
+        Python-Quelltext des Moduls mit der Funktion convert(record)
+
+    Raises:
+        ValueError: Bei unbekannten Funktionen oder ungültigen Spezifikationen
+    """
+    constants: List[str] = []
+    body: List[str] = []
+    uses_authors = False
+    uses_formats = False
+    allfields_builders: Dict[str, str] = {}
+    normalizers: Dict[tuple, str] = {}
+    author_sources: Dict[str, str] = {}
+    fixed_specs: Dict[str, str] = {}
+    sort_slots: List[str] = []
+    uses_sort_keys = False
+    uses_fullrecord = False
+    uses_links = False
+
+    for slot in schema_view.class_induced_slots(class_name):
+        annotations = _slot_annotations(slot)
+        source = annotations.get("source_marc")
+        if source is None:
+            continue
+        source = str(source).strip()
+        function = annotations.get("function")
+        if function is not None and function not in CONVERTER_FUNCTIONS:
+            raise ValueError(f"Unbekannte Funktion '{function}' in Slot {slot.name}. "
+                             f"Erlaubt sind: {', '.join(CONVERTER_FUNCTIONS)}")
+        join = annotations.get("join")
+        name = slot.name
+        if _flag(annotations.get("sort_key", False)):
+            if slot.multivalued:
+                raise ValueError(f"sort_key in Slot {name} ist nur für einwertige Slots möglich")
+            sort_slots.append(name)
+        body += ["", f"    # {name}: {source}" + (f" ({function})" if function else "")]
+
+        if source == FULLRECORD_SOURCE:
+            encoding = str(annotations.get("encoding", DEFAULT_ENCODING))
+            if encoding not in FULLRECORD_ENCODINGS:
+                raise ValueError(f"Unbekannte Kodierung '{encoding}' in Slot {name}. "
+                                 f"Erlaubt sind: {', '.join(FULLRECORD_ENCODINGS)}")
+            if slot.multivalued or function is not None:
+                raise ValueError(f"{FULLRECORD_SOURCE} in Slot {name} ist nur für einwertige Slots ohne function möglich")
+            uses_fullrecord = True
+            body.append(f"    result[{name!r}] = full_record(record, {encoding!r})")
+            continue
+
+        if source.startswith('"') and source.endswith('"'):
+            body.append(f"    result[{name!r}] = {source[1:-1]!r}")
+            continue
+
+        if parse_char_spec(source) is not None:
+            if function is not None:
+                raise ValueError(f"Zeichenpositionen '{source}' in Slot {name} erlauben keine function")
+            if not fixed_specs:
+                body += ["    if fixed is None:", "        fixed = FIXED_FIELDS.extract_one(record)"]
+            fixed_specs[name] = source
+            body.append(f"    result[{name!r}] = fixed.get({name!r})")
+            continue
+
+        if function == "get_id":
+            prefix = annotations.get("prefix", "")
+            body += [f"    field = record.get({source!r})", "    if field is None or not field.data:"]
+            body.append(f"        raise MissingFieldError({source!r})" if slot.required else f"        result[{name!r}] = None")
+            body += (["    else:", f"        result[{name!r}] = {prefix!r} + field.data"] if not slot.required
+                     else [f"    result[{name!r}] = {prefix!r} + field.data" if prefix else f"    result[{name!r}] = field.data"])
+            continue
+
+        if function == "get_authors":
+            if name not in AUTHOR_RESULT_SLOTS:
+                raise ValueError(f"get_authors liefert keinen Wert für Slot {name}")
+            if not uses_authors:
+                body.append("    authors = _AUTHORS.extract(record)")
+                uses_authors = True
+            author_sources[name] = source
+            body.append(f"    result[{name!r}] = authors[{name!r}]")
+            continue
+
+        if function == "formatCalculator":
+            if name not in FormatResult._fields:
+                raise ValueError(f"formatCalculator liefert keinen Wert für Slot {name}")
+            if source != FORMAT_SOURCE:
+                raise ValueError(f"formatCalculator in Slot {name} liest {FORMAT_SOURCE}, nicht '{source}'")
+            if not uses_formats:
+                body.append("    formats = _FORMATS.lookup(record)")
+                uses_formats = True
+            body.append(f"    result[{name!r}] = list(formats.{name})")
+            continue
+
+        if function == "getAllSearchableFieldsAsSet":
+            lower, _, upper = source.partition("-")
+            if not (lower.isdigit() and upper.isdigit()):
+                raise ValueError(f"Ungültiger Feldbereich '{source}' in Slot {name}, erwartet z.B. 100-900")
+            builder = allfields_builders.setdefault(source, f"_ALLFIELDS_{lower}_{upper}")
+            body.append(f"    result[{name!r}] = {builder}.build(record)")
+            continue
+
+        options = _normalizer_options(name, annotations)
+        normalize = normalizers.setdefault(options, f"_{name.upper()}_NORMALIZE") if options else None
+        specs = [spec.strip() for spec in source.split(":") if spec.strip()]
+        body.append("    values = []")
+        tags = []
+        for index, spec in enumerate(specs):
+            linked, field_spec = split_link_spec(spec)
+            tag, codes = field_spec[:3], field_spec[3:]
+            if not tag.isdigit() or not codes:
+                raise ValueError(f"Ungültige Feldspezifikation '{spec}' in Slot {name}")
+            if linked and not uses_links:
+                body.append("    links = link_index(record)")
+                uses_links = True
+            tags.append(ALTERNATE_GRAPHIC_TAG if linked else tag)
+            constant = f"_{name.upper()}_{index}"
+            if len(codes) > 1:
+                constants.append(f"{constant} = {{{', '.join(f'{code!r}: {rank}' for rank, code in enumerate(codes))}}}")
+            body += _spec_lines(constant, tag, codes, join, normalize, linked)
+
+        if slot.multivalued and function is None:
+            body.append(f"    result[{name!r}] = values")
+        elif function == "single":
+            body.append(f"    result[{name!r}] = values[0] if len(values) == 1 else None")
+        elif function == "titleSortLower":
+            if slot.multivalued:
+                raise ValueError(f"titleSortLower liefert nur einen Wert, Slot {name} ist mehrwertig")
+            uses_sort_keys = True
+            body.append(f"    result[{name!r}] = _SORT_KEYS.title(values[0], record) if values else None")
+        elif slot.required:
+            tags = tuple(dict.fromkeys(tags))
+            body += [
+                "    if not values:",
+                f"        if not any(tag in record for tag in {tags!r}):",
+                f"            raise MissingFieldError({tags[0]!r})",
+                "        values.append(\"\")",
+                f"    result[{name!r}] = values[0]",
+            ]
+        else:
+            body.append(f"    result[{name!r}] = values[0] if values else None")
+
+    if sort_slots:
+        uses_sort_keys = True
+        body += ["", "    # Sortierschlüssel (sort_key)"]
+        for name in sort_slots:
+            body += [f"    if result[{name!r}] is not None:",
+                     f"        result[{name!r}] = _SORT_KEYS.key(result[{name!r}])"]
+
+    header = [
+        f"# Auto generated from {schema_file} by help/linkml_generator.py (converter)",
+        f"# Schema: {schema_view.schema.name}",
+        f"# Schema-Hash: {schema_hash}",
+        "#",
+        "# Nicht von Hand bearbeiten, wird bei Änderungen am Schema neu erzeugt.",
+        "",
+        "from help.allfields import AllFieldsBuilder",
+        "from help.authors import AuthorExtractor",
+        "from help.error_report import MissingFieldError",
+    ]
+    if fixed_specs:
+        header.append("from help.fixed_fields import FixedFieldBatch")
+    if uses_formats:
+        header.append("from help.formats import FormatCalculator")
+    if uses_fullrecord:
+        header.append("from help.fullrecord import full_record")
+    if uses_links:
+        header.append("from help.linked_fields import link_index")
+    if normalizers:
+        header.append("from help.normalize import get_normalizer")
+    if uses_sort_keys:
+        header.append("from help.sort_keys import get_sort_keys")
+    header += [
+        "",
+        "# Rang der Subfeldcodes pro Feldspezifikation, beim Import vorberechnet",
+    ]
+    header += constants
+    if author_sources:
+        rules, sort_tags = author_rules(author_sources)
+        header += ["", "# Regeln für den Durchlauf über die Autorenfelder, aus den get_authors-Slots",
+                   "_AUTHORS = AuthorExtractor(rules={"]
+        header += [f"    {tag!r}: {rule!r}," for tag, rule in rules.items()]
+        header.append(f"}}, sort_tags={sort_tags!r})")
+    else:
+        header += ["", "_AUTHORS = AuthorExtractor()"]
+    header += [f"{builder} = AllFieldsBuilder({source.split('-')[0]}, {source.split('-')[1]})"
+               for source, builder in allfields_builders.items()]
+    if uses_formats:
+        header += ["", "# Entscheidungstabelle für die Formate, pro Schlüssel einmal ausgewertet",
+                   "_FORMATS = FormatCalculator()"]
+    if fixed_specs:
+        header += ["", "# Zeichenpositionen aus Leader und Kontrollfeldern, auch für Stapel (process_marc_files)",
+                   f"FIXED_FIELDS = FixedFieldBatch({fixed_specs!r})"]
+    if uses_sort_keys:
+        header += ["", "# Gemeinsame Sortierschlüssel mit LRU-Cache (siehe help/sort_keys.py)",
+                   "_SORT_KEYS = get_sort_keys()"]
+    if normalizers:
+        header += ["", "# Gemeinsame Normalisierer (siehe help/normalize.py), beim Import aufgebaut"]
+        header += [f"{constant} = get_normalizer({', '.join(repr(option) for option in options)}).function"
+                   for options, constant in normalizers.items()]
+    header += [
+        "",
+        "",
+        "def _rank(item):",
+        "    return item[0]",
+        "",
+        "",
+        "def convert(record, fixed=None):" if fixed_specs else "def convert(record):",
+        '    """',
+        f"    Extrahiert die {class_name}-Felder aus einem MARC21-Record.",
+        "",
+        "    Args:",
+        "        record: Ein pymarc.Record-Objekt",
+    ]
+    if fixed_specs:
+        header += ["        fixed: Optional. Die Zeichenpositionen des Records aus FIXED_FIELDS.extract() für einen Stapel;",
+                   "               ohne Angabe werden sie hier einzeln ausgeschnitten"]
+    header += [
+        "",
+        "    Returns:",
+        "        Dictionary mit den Feldwerten für die Modelle",
+        "",
+        "    Raises:",
+        "        MissingFieldError: Wenn ein Pflichtfeld fehlt",
+        '    """',
+        "    result = {}",
+    ]
+    return "\n".join(header + body + ["", "    return result", ""])
+
+
 def generate_models_from_schema(schema_path: str) -> Dict[str, Type]:
     """
     Generiert Pydantic- und Dataclass-Modelle direkt aus dem LinkML-Schema und speichert sie im slubmodels-Ordner.
@@ -27,7 +516,9 @@ def generate_models_from_schema(schema_path: str) -> Dict[str, Type]:
         schema_path: Pfad zur LinkML-Schema-Datei (YAML)
     
     Returns:
-        Dictionary mit Modellklassen: {"PydanticFinc": PydanticClass, "DataclassFinc": DataclassClass}
+        Dictionary mit Modellklassen: {"PydanticFinc": PydanticClass, "DataclassFinc": DataclassClass,
+        "SlottedFinc": SlottedClass} sowie unter "converter" die aus dem Schema erzeugte Funktion convert(record)
+        und unter "fixed_fields" deren FixedFieldBatch (oder None, wenn das Schema keine Zeichenpositionen nutzt)
     """
     log = getSlubLogger('help.linkml_generator')
     log.info(f"Generiere Modelle aus Schema: {schema_path}")
@@ -66,6 +557,33 @@ def generate_models_from_schema(schema_path: str) -> Dict[str, Type]:
             f.write(python_output)
         log.info(f"Dataclass-Modell in {python_path} gespeichert")
         
+        # Schema-Name extrahieren
+        schema_name = schema_view.schema.name
+        if not schema_name:
+            schema_name = "Finc"  # Fallback, falls kein Name im Schema definiert ist
+        
+        schema_name = schema_name.capitalize()
+        
+        # Generiere die schlanke Klasse mit __slots__
+        slotted_output = generate_slotted_model(schema_view, schema_name, Path(schema_path).name)
+        slotted_path = models_dir / "slotted_model.py"
+        with open(slotted_path, 'w') as f:
+            f.write(slotted_output)
+        log.info(f"Schlankes Modell in {slotted_path} gespeichert")
+        
+        # Generiere den Konverter nur neu, wenn sich das Schema geändert hat
+        schema_hash = hashlib.sha256(Path(schema_path).read_bytes()).hexdigest()
+        converter_path = models_dir / "converter.py"
+        converter_changed = not (converter_path.exists() and f"# Schema-Hash: {schema_hash}\n"
+                                 in converter_path.read_text(encoding="utf-8"))
+        if converter_changed:
+            converter_output = generate_converter(schema_view, schema_name, Path(schema_path).name, schema_hash)
+            with open(converter_path, 'w', encoding="utf-8") as f:
+                f.write(converter_output)
+            log.info(f"Konverter in {converter_path} gespeichert")
+        else:
+            log.debug(f"Konverter in {converter_path} ist aktuell (Schema-Hash {schema_hash[:12]})")
+        
         # Dynamisch die Klassen aus den erzeugten Modulen importieren
         # (erfordert einen sys.path.append, falls der slubmodels-Ordner nicht im Pythonpath ist)
         if str(models_dir.absolute()) not in sys.path:
@@ -74,25 +592,27 @@ def generate_models_from_schema(schema_path: str) -> Dict[str, Type]:
         # Dynamisches Importieren der generierten Module
         pydantic_module = importlib.import_module("slubmodels.pydantic_model")
         python_module = importlib.import_module("slubmodels.dataclass_model")
-        
-        # Schema-Name extrahieren
-        schema_name = schema_view.schema.name
-        if not schema_name:
-            schema_name = "Finc"  # Fallback, falls kein Name im Schema definiert ist
-        
-        schema_name = schema_name.capitalize()
+        slotted_module = importlib.import_module("slubmodels.slotted_model")
+        converter_module = importlib.import_module("slubmodels.converter")
+        if converter_changed:
+            converter_module = importlib.reload(converter_module)
         
         # Klassen aus den Modulen bekommen
         # In Pydantic-Modellen wird kein Prefix verwendet
         PydanticClass = getattr(pydantic_module, schema_name)
         DataclassClass = getattr(python_module, schema_name)
+        SlottedClass = getattr(slotted_module, schema_name)
         
-        log.info(f"Modelle erfolgreich geladen: {PydanticClass.__name__} und {DataclassClass.__name__}")
+        log.info(f"Modelle erfolgreich geladen: {PydanticClass.__name__}, {DataclassClass.__name__} "
+                 f"und {SlottedClass.__name__} (slotted)")
         
         # Rückgabe der Klassen als Dictionary
         return {
             "PydanticFinc": PydanticClass,
-            "DataclassFinc": DataclassClass
+            "DataclassFinc": DataclassClass,
+            "SlottedFinc": SlottedClass,
+            "converter": converter_module.convert,
+            "fixed_fields": getattr(converter_module, "FIXED_FIELDS", None),
         }
             
     except Exception as e:
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Streamende Leser für MARCXML und zeilenweises MARC-in-JSON.
+
+Die Leser in diesem Modul liefern pymarc.Record-Objekte mit derselben Schnittstelle
+wie pymarc.MARCReader, sodass die Extraktion über MarcUtils unverändert funktioniert.
+Im Gegensatz zu pymarc.parse_xml_to_array bzw. pymarc.JSONReader wird die Quelle
+nie vollständig in den Speicher geladen: Der Speicherbedarf bleibt auch bei
+mehreren Gigabyte großen Collection-Dateien konstant.
+"""
+
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Union
+
+from pymarc import Field, Indicators, Leader, MARCReader, Record, Subfield
+
+from help.lazy_marc import LazyMARCReader
+
+MARC_XML_NS = "http://www.loc.gov/MARC21/slim"
+
+# Unterstützte Eingabeformate und die zugehörigen Dateiendungen
+INPUT_FORMATS = ("marc", "xml", "json")
+_FORMAT_BY_SUFFIX = {
+    ".xml": "xml",
+    ".marcxml": "xml",
+    ".json": "json",
+    ".jsonl": "json",
+    ".ndjson": "json",
+}
+
+
+def _local_name(tag: str) -> str:
+    """Entfernt einen eventuellen XML-Namespace ('{ns}record' -> 'record')."""
+    return tag.rsplit("}", 1)[-1]
+
+
+class MarcXmlStreamReader:
+    """
+    Streamender Leser für MARCXML-Dateien (einzelne Records oder Collections).
+
+    Verwendet ElementTree.iterparse und verwirft jedes <record>-Element direkt nach
+    der Umwandlung in ein pymarc.Record. Dadurch wächst der Elementbaum nicht mit
+    der Dateigröße.
+
+    Wie pymarc.MARCReader liefert der Leser None für Records, die nicht verarbeitet
+    werden konnten. Die Ursache steht dann in current_exception, der Rohinhalt
+    (serialisiertes XML-Element) in current_chunk. Ist die Datei nicht wohlgeformt
+    (ParseError), liefert der Leser einmal None ohne Rohinhalt und endet.
+    """
+
+    def __init__(self, source: Union[str, Path, BinaryIO], strict: bool = False):
+        """
+        Args:
+            source: Pfad oder binäres Dateiobjekt mit MARCXML-Inhalt
+            strict: Wenn True, werden nur Elemente im MARC21-slim-Namespace ausgewertet
+        """
+        self.source = source
+        self.strict = strict
+        self.current_chunk: Optional[bytes] = None
+        self.current_exception: Optional[Exception] = None
+
+    def _is_marc_element(self, tag: str) -> bool:
+        """Prüft den Namespace eines Elements, wenn strict gesetzt ist."""
+        if not self.strict:
+            return True
+        return tag.startswith(f"{{{MARC_XML_NS}}}")
+
+    def _element_to_record(self, element: ET.Element) -> Record:
+        """Wandelt ein <record>-Element in ein pymarc.Record um."""
+        record = Record()
+        for child in element:
+            if not self._is_marc_element(child.tag):
+                continue
+            name = _local_name(child.tag)
+            if name == "leader":
+                record.leader = Leader(child.text or "")
+            elif name == "controlfield":
+                record.add_field(Field(tag=child.get("tag"), data=child.text or ""))
+            elif name == "datafield":
+                subfields = [
+                    Subfield(code=sub.get("code"), value=sub.text or "")
+                    for sub in child
+                    if _local_name(sub.tag) == "subfield"
+                ]
+                record.add_field(
+                    Field(
+                        tag=child.get("tag"),
+                        indicators=Indicators(child.get("ind1", " "), child.get("ind2", " ")),
+                        subfields=subfields,
+                    )
+                )
+        return record
+
+    def __iter__(self) -> Iterator[Optional[Record]]:
+        root = None
+        events = ET.iterparse(self.source, events=("start", "end"))
+        while True:
+            try:
+                event, element = next(events)
+            except StopIteration:
+                return
+            except ET.ParseError as e:
+                # Nicht wohlgeformtes XML: Danach kann kein Record mehr gelesen werden
+                self.current_chunk = None
+                self.current_exception = e
+                yield None
+                return
+            if root is None:
+                # Das erste Element ist die Wurzel (collection oder record)
+                root = element
+            if event != "end" or _local_name(element.tag) != "record":
+                continue
+            if not self._is_marc_element(element.tag):
+                continue
+
+            self.current_chunk = None
+            self.current_exception = None
+            try:
+                record = self._element_to_record(element)
+            except Exception as e:
+                self.current_chunk = ET.tostring(element)
+                self.current_exception = e
+                record = None
+
+            # Speicher freigeben: Record-Element leeren und aus der Wurzel lösen
+            element.clear()
+            if root is not element:
+                root.clear()
+
+            yield record
+
+
+class MarcJsonLinesReader:
+    """
+    Streamender Leser für zeilenweises MARC-in-JSON (ein Record pro Zeile).
+
+    Jede Zeile enthält ein Objekt im Format {"leader": ..., "fields": [...]}, wie es
+    pymarc.Record.as_json() erzeugt. Leerzeilen werden übersprungen. Zeilen, die
+    nicht gelesen werden können, liefern wie bei pymarc.MARCReader None mit
+    gesetztem current_exception/current_chunk.
+    """
+
+    def __init__(self, source: BinaryIO):
+        """
+        Args:
+            source: Binäres Dateiobjekt mit MARC-in-JSON-Zeilen
+        """
+        self.source = source
+        self.current_chunk: Optional[bytes] = None
+        self.current_exception: Optional[Exception] = None
+
+    @staticmethod
+    def json_to_record(data: dict) -> Record:
+        """
+        Wandelt ein MARC-in-JSON-Objekt in ein pymarc.Record um.
+
+        Args:
+            data: Dictionary mit den Schlüsseln 'leader' und 'fields'
+
+        Returns:
+            Das entsprechende pymarc.Record-Objekt
+        """
+        record = Record()
+        record.leader = Leader(data["leader"])
+        for entry in data["fields"]:
+            for tag, value in entry.items():
+                if isinstance(value, dict):
+                    subfields = [
+                        Subfield(code=code, value=content)
+                        for sub in value.get("subfields", [])
+                        for code, content in sub.items()
+                    ]
+                    record.add_field(
+                        Field(
+                            tag=tag,
+                            indicators=Indicators(value.get("ind1", " "), value.get("ind2", " ")),
+                            subfields=subfields,
+                        )
+                    )
+                else:
+                    record.add_field(Field(tag=tag, data=value))
+        return record
+
+    def __iter__(self) -> Iterator[Optional[Record]]:
+        for line in self.source:
+            if not line.strip():
+                continue
+            self.current_chunk = line
+            self.current_exception = None
+            try:
+                record = self.json_to_record(json.loads(line))
+            except Exception as e:
+                self.current_exception = e
+                record = None
+            yield record
+
+
+def detect_input_format(path: Union[str, Path]) -> str:
+    """
+    Ermittelt das Eingabeformat anhand der Dateiendung.
+
+    Args:
+        path: Pfad zur Quelldatei
+
+    Returns:
+        'xml', 'json' oder 'marc' (ISO 2709, Standard für unbekannte Endungen)
+    """
+    return _FORMAT_BY_SUFFIX.get(Path(path).suffix.lower(), "marc")
+
+
+def create_marc_reader(file_handle: BinaryIO, input_format: str = "marc", lazy: bool = True,
+                       errors: str = "replace", id_filter=None):
+    """
+    Erstellt einen passenden Leser für das angegebene Eingabeformat.
+
+    Alle Leser liefern pymarc.Record-Objekte (bzw. None bei defekten Records) und
+    stellen current_chunk und current_exception bereit.
+
+    Args:
+        file_handle: Binär geöffnete Quelldatei
+        input_format: 'marc' (ISO 2709), 'xml' (MARCXML) oder 'json' (MARC-in-JSON-Zeilen)
+        lazy: Nur für 'marc'. Wenn True, werden Felder erst bei Zugriff dekodiert (LazyMARCReader),
+              sonst dekodiert pymarc.MARCReader alle Felder sofort.
+        errors: Nur für lazy 'marc'. Strategie für ungültige Bytefolgen ('replace', 'ignore', 'strict')
+        id_filter: Optional. Nur für lazy 'marc'. IdFilter, dessen IDs schon in den Rohdaten verworfen werden
+
+    Returns:
+        Ein iterierbarer Leser
+
+    Raises:
+        ValueError: Wenn das Eingabeformat unbekannt ist
+    """
+    if input_format == "marc":
+        if lazy:
+            return LazyMARCReader(file_handle, errors=errors,
+                                  skip=id_filter.drops_chunk if id_filter is not None else None)
+        return MARCReader(file_handle)
+    if input_format == "xml":
+        return MarcXmlStreamReader(file_handle)
+    if input_format == "json":
+        return MarcJsonLinesReader(file_handle)
+    raise ValueError(f"Unbekanntes Eingabeformat: {input_format}. Erlaubt sind: {', '.join(INPUT_FORMATS)}")
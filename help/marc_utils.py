@@ -11,6 +11,8 @@ insbesondere für die Extraktion von Feldern und Subfeldern nach spezifischen Kr
 import logging
 from typing import List, Optional, Tuple, Union, Pattern, Dict, Any
 import re
+from help.linked_fields import link_index, split_link_spec
+from help.normalize import TextNormalizer, get_normalizer
 from help.slublogging import getSlubLogger
 
 class MarcUtils:
@@ -134,18 +136,24 @@ class MarcUtils:
         return separator.join(values)
     
     @staticmethod
-    def extract_marc_subfields(record, *field_specs, join=None, clean=True, remove_patterns=None) -> List[str]:
+    def extract_marc_subfields(record, *field_specs, join=None, clean=True, remove_patterns=None,
+                               normalizer: Optional[TextNormalizer] = None) -> List[str]:
         """
         Extrahiert die Inhalte der angegebenen MARC-Subfelder aus einem Record.
         
         Args:
             record: Ein pymarc.Record-Objekt
-            *field_specs: Eine unbestimmte Anzahl von Strings im Format '600abcdefg' (Feldnummer + Subfeldcodes)
+            *field_specs: Eine unbestimmte Anzahl von Strings im Format '600abcdefg' (Feldnummer + Subfeldcodes).
+                          Mit LNK-Präfix (z.B. 'LNK245ab') werden die über $6 verknüpften 880-Felder
+                          gelesen; der Index dafür wird pro Record einmal aufgebaut (help/linked_fields.py).
             join: Optional. Wenn angegeben, werden die Subfelder eines Feldes mit diesem String verbunden
                  (z.B. join=": " -> "Titel: Untertitel"). Jedes Feld bleibt separat.
             clean: Optional. Wenn True, werden Leerzeichen am Anfang und Ende jedes Wertes entfernt.
             remove_patterns: Optional. Liste von RegEx-Mustern, die aus den Werten entfernt werden sollen.
                            Z.B. ['\\d', '\\W'] würde alle Ziffern und Nicht-Wortzeichen entfernen.
+            normalizer: Optional. Ein TextNormalizer (z.B. mit SolrMarc-Bereinigung oder NFC), der clean und
+                        remove_patterns ersetzt. Ohne Angabe wird ein gemeinsam genutzter Normalisierer
+                        für clean/remove_patterns verwendet, die Muster werden also nur einmal kompiliert.
         
         Returns:
             Eine Liste der Inhalte aller angegebenen Subfelder. Wenn join angegeben ist, enthält die Liste
@@ -153,21 +161,22 @@ class MarcUtils:
         """
         results = []
         
-        # RegEx-Muster kompilieren, wenn vorhanden
-        compiled_patterns = MarcUtils.compile_regex_patterns(remove_patterns) if remove_patterns else []
+        # Normalisierer mit vorkompilierten Mustern und Cache für wiederkehrende Werte
+        normalize = (normalizer or get_normalizer(clean, tuple(remove_patterns or ()))).function
         
         for spec in field_specs:
             # Feldnummer und Subfeldcodes extrahieren
+            linked, spec = split_link_spec(spec)
             field_number, subfield_codes = MarcUtils.parse_marc_field_spec(spec)
             if not field_number or not subfield_codes:
                 continue
             
-            # Hole alle passenden Felder aus dem Record
-            fields = record.get_fields(field_number)
+            # Hole alle passenden Felder aus dem Record (bei LNK die verknüpften 880-Felder)
+            fields = link_index(record).fields(field_number) if linked else record.get_fields(field_number)
             
             # Debug-Information für die gefundenen Felder
             if not fields:
-                MarcUtils.log.debug(f"Keine Felder mit Nummer {field_number} gefunden.")
+                MarcUtils.log.debug("Keine Felder mit Nummer %s gefunden.", field_number)
             
             # Wenn join angegeben ist, fasse Subfelder pro Feld zusammen
             if join is not None:
@@ -176,12 +185,7 @@ class MarcUtils:
                     for code in subfield_codes:
                         for content in field.get_subfields(code):
                             if content:
-                                # Bereinige den Inhalt mit der Helper-Methode
-                                cleaned_content = MarcUtils.clean_field_content(
-                                    content, 
-                                    clean=clean, 
-                                    patterns=compiled_patterns
-                                )
+                                cleaned_content = normalize(content)
                                 
                                 if cleaned_content:  # Prüfen, ob nach Bereinigung noch Inhalt übrig ist
                                     field_values.append(cleaned_content)
@@ -197,17 +201,12 @@ class MarcUtils:
                         subfields = field.get_subfields(code)
                         for content in subfields:
                             if content:
-                                # Bereinige den Inhalt mit der Helper-Methode
-                                cleaned_content = MarcUtils.clean_field_content(
-                                    content, 
-                                    clean=clean, 
-                                    patterns=compiled_patterns
-                                )
+                                cleaned_content = normalize(content)
                                 
                                 if cleaned_content:  # Prüfen, ob nach Bereinigung noch Inhalt übrig ist
                                     results.append(cleaned_content)
         
-        MarcUtils.log.debug(f"Extrahierte {len(results)} Inhalte aus {len(field_specs)} Feldspezifikationen.")
+        MarcUtils.log.debug("Extrahierte %d Inhalte aus %d Feldspezifikationen.", len(results), len(field_specs))
         return results
     
     @staticmethod
@@ -297,5 +296,5 @@ class MarcUtils:
         # Entferne Leerzeichen und leere Spezifikationen
         specs = [spec.strip() for spec in specs if spec.strip()]
         
-        MarcUtils.log.debug(f"Komplexe Spezifikation '{complex_spec}' in {len(specs)} Einzelspezifikationen zerlegt.")
+        MarcUtils.log.debug("Komplexe Spezifikation '%s' in %d Einzelspezifikationen zerlegt.", complex_spec, len(specs))
         return specs 
\ No newline at end of file
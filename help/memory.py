@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Speicherbeobachtung und Speicherbudget für die Konvertierung.
+
+- MemoryProfiler: misst pro Verarbeitungsschritt (Modellgenerierung, Vorlauf, Konvertierung,
+  Ausgabe) den belegten Speicher (RSS aus /proc bzw. resource) und optional über tracemalloc
+  die Python-Allokationen; die Zusammenfassung landet im Log am Ende des Laufs
+- MemoryBudget: prüft alle ``interval`` Records den RSS gegen eine Obergrenze (--max-memory)
+  und meldet, wie stark der Druck ist. process_marc_files() reagiert darauf statt abzustürzen:
+  - ab ``soft_ratio`` (Standard 80 %): Garbage Collection, Caches leeren, freien Speicher an das
+    Betriebssystem zurückgeben (malloc_trim) und häufiger prüfen (kleinere Abschnitte)
+  - ab der Obergrenze: bisher erzeugte Modelle in die Ausgabedateien schreiben und aus dem
+    Speicher entfernen; lässt sich nichts mehr freigeben (z.B. ohne Ausgabedatei), wird einmal
+    pro Überschreitung gewarnt und weitergearbeitet. Angehalten wird nicht: Die Konvertierung
+    läuft in einem Thread, durch Warten sinkt der eigene RSS nicht
+"""
+
+import ctypes
+import ctypes.util
+import gc
+import os
+import re
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from help.slublogging import getSlubLogger
+
+# Druckstufen, die MemoryBudget.check() liefert
+PRESSURE_OK = 0
+PRESSURE_SOFT = 1
+PRESSURE_HARD = 2
+
+PROFILE_MODES = ("rss", "tracemalloc")
+
+_SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def parse_size(value: str) -> int:
+    """
+    Wandelt eine Größenangabe wie "2G", "512M", "1.5g" oder "1000000" in Bytes um.
+
+    Raises:
+        ValueError: Bei einer ungültigen Angabe
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*", str(value).lower())
+    if not match:
+        raise ValueError(f"Ungültige Speichergröße: {value} (erwartet z.B. 2G, 512M oder Bytes)")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def format_size(size: Optional[int]) -> str:
+    """Formatiert eine Anzahl Bytes in MiB für die Zusammenfassung."""
+    return "-" if size is None else f"{size / 1024 ** 2:,.1f} MiB"
+
+
+def current_rss() -> Optional[int]:
+    """
+    Liefert den aktuell belegten physischen Speicher (RSS) des Prozesses in Bytes.
+
+    Unter Linux aus /proc/self/statm; sonst der bisherige Höchstwert aus resource.getrusage()
+    (als Näherung) oder None, wenn beides nicht verfügbar ist.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS liefert Bytes, Linux/BSD KiB
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def _load_malloc_trim() -> Optional[Callable[[int], int]]:
+    """malloc_trim() aus der glibc, falls vorhanden (gibt freigegebenen Heap an das Betriebssystem zurück)."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        return libc.malloc_trim
+    except (OSError, AttributeError):
+        return None
+
+
+_malloc_trim = _load_malloc_trim()
+
+
+def release_memory() -> None:
+    """Räumt Zyklen auf und gibt freien Heap-Speicher an das Betriebssystem zurück (wenn möglich)."""
+    gc.collect()
+    if _malloc_trim is not None:
+        _malloc_trim(0)
+
+
+class MemoryProfiler:
+    """
+    Misst den Speicher pro Verarbeitungsschritt.
+
+    Example:
+        >>> profiler = MemoryProfiler("tracemalloc")
+        >>> profiler.start_stage("konvertierung")
+        >>> for record in records:
+        ...     profiler.sample()
+        >>> profiler.end_stage()
+        >>> profiler.log_summary()
+    """
+
+    def __init__(self, mode: str = "rss", sample_interval: int = 1000):
+        """
+        Args:
+            mode: "rss" (nur RSS, praktisch ohne Kosten) oder "tracemalloc" (zusätzlich Python-Allokationen,
+                  verlangsamt die Verarbeitung deutlich)
+            sample_interval: Innerhalb eines Schritts wird der RSS alle sample_interval Aufrufe von sample() gemessen
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unbekannter Modus '{mode}', erlaubt: {', '.join(PROFILE_MODES)}")
+        self.log = getSlubLogger('help.memory')
+        self.mode = mode
+        self.sample_interval = max(1, sample_interval)
+        self.stages: List[Dict[str, object]] = []
+        self._current: Optional[Dict[str, object]] = None
+        self._countdown = self.sample_interval
+        if mode == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def start_stage(self, name: str) -> None:
+        """Beginnt einen neuen Schritt; ein noch offener Schritt wird vorher beendet."""
+        if self._current is not None:
+            self.end_stage()
+        rss = current_rss()
+        self._current = {"stage": name, "samples": 0, "rss_start": rss, "rss_peak": rss,
+                         "rss_end": None, "traced_peak": None, "seconds": time.perf_counter()}
+        self._countdown = self.sample_interval
+        if self.mode == "tracemalloc":
+            tracemalloc.reset_peak()
+
+    def sample(self) -> None:
+        """Zählt einen Record; alle sample_interval Aufrufe wird der RSS gemessen."""
+        self._countdown -= 1
+        if self._countdown:
+            return
+        self._countdown = self.sample_interval
+        self.measure()
+
+    def measure(self) -> Optional[int]:
+        """Misst den RSS sofort und aktualisiert den Höchstwert des laufenden Schritts."""
+        rss = current_rss()
+        stage = self._current
+        if stage is not None and rss is not None:
+            stage["samples"] += 1
+            if stage["rss_peak"] is None or rss > stage["rss_peak"]:
+                stage["rss_peak"] = rss
+        return rss
+
+    def end_stage(self) -> None:
+        """Beendet den laufenden Schritt."""
+        stage = self._current
+        if stage is None:
+            return
+        rss = self.measure()
+        stage["rss_end"] = rss
+        stage["seconds"] = time.perf_counter() - stage["seconds"]
+        if self.mode == "tracemalloc":
+            stage["traced_peak"] = tracemalloc.get_traced_memory()[1]
+        self.stages.append(stage)
+        self._current = None
+
+    def summary(self) -> List[Dict[str, object]]:
+        """Liefert die beendeten Schritte mit Start-, End- und Höchstwert des RSS und dem Zuwachs."""
+        result = []
+        for stage in self.stages:
+            entry = dict(stage)
+            start, end = stage["rss_start"], stage["rss_end"]
+            entry["rss_growth"] = end - start if start is not None and end is not None else None
+            result.append(entry)
+        return result
+
+    def log_summary(self) -> None:
+        """Schreibt die Zusammenfassung pro Schritt ins Log."""
+        if self._current is not None:
+            self.end_stage()
+        self.log.info("Speicher pro Schritt (%s):", self.mode)
+        for entry in self.summary():
+            traced = f", Python-Allokationen max. {format_size(entry['traced_peak'])}" \
+                if entry["traced_peak"] is not None else ""
+            growth = entry["rss_growth"]
+            self.log.info("  %-16s RSS %s -> %s (max. %s, %s%s), %.2f s%s", entry["stage"],
+                          format_size(entry["rss_start"]), format_size(entry["rss_end"]),
+                          format_size(entry["rss_peak"]), "+" if growth and growth > 0 else "",
+                          format_size(growth), entry["seconds"], traced)
+
+    def close(self) -> None:
+        """Beendet tracemalloc, falls der Profiler es gestartet hat."""
+        if self.mode == "tracemalloc" and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class MemoryBudget:
+    """
+    Obergrenze für den Speicher eines Laufs mit Stufen für den Gegendruck.
+
+    Example:
+        >>> budget = MemoryBudget(parse_size("2G"))
+        >>> if budget.due():
+        ...     pressure = budget.check()
+    """
+
+    def __init__(self, limit: int, soft_ratio: float = 0.8, interval: int = 1000, min_interval: int = 10,
+                 rss_reader: Callable[[], Optional[int]] = current_rss):
+        """
+        Args:
+            limit: Obergrenze in Bytes
+            soft_ratio: Anteil der Obergrenze, ab dem Speicher freigegeben und häufiger geprüft wird
+            interval: Anzahl Records zwischen zwei Prüfungen (Abschnittsgröße)
+            min_interval: Kleinste Abschnittsgröße unter Druck
+            rss_reader: Funktion zum Messen des RSS (für Tests austauschbar)
+        """
+        if limit <= 0:
+            raise ValueError("Das Speicherbudget muss größer als 0 sein")
+        self.log = getSlubLogger('help.memory')
+        self.limit = limit
+        self.soft_limit = int(limit * soft_ratio)
+        self.base_interval = max(1, interval)
+        self.min_interval = max(1, min(min_interval, self.base_interval))
+        self.interval = self.base_interval
+        self.rss_reader = rss_reader
+        self._countdown = self.interval
+        self.peak_rss = 0
+        self.soft_events = 0
+        self.hard_events = 0
+        self.flushes = 0
+        self.overruns = 0
+        # Pro Überschreitung wird nur einmal gewarnt, bis der Druck zwischendurch nachgelassen hat
+        self._warned = False
+        self._last_pressure = PRESSURE_OK
+
+    def due(self) -> bool:
+        """Zählt einen Record und liefert True, wenn eine Prüfung fällig ist."""
+        self._countdown -= 1
+        if self._countdown > 0:
+            return False
+        self._countdown = self.interval
+        return True
+
+    def check(self) -> int:
+        """
+        Misst den RSS und liefert die Druckstufe (PRESSURE_OK, PRESSURE_SOFT, PRESSURE_HARD).
+
+        Unter Druck wird die Abschnittsgröße halbiert, ohne Druck schrittweise wieder verdoppelt.
+        """
+        rss = self.rss_reader()
+        if rss is None:
+            return PRESSURE_OK
+        self.peak_rss = max(self.peak_rss, rss)
+        if rss >= self.limit:
+            pressure = PRESSURE_HARD
+        elif rss >= self.soft_limit:
+            pressure = PRESSURE_SOFT
+        else:
+            pressure = PRESSURE_OK
+        if pressure != PRESSURE_HARD:
+            self._warned = False
+        elif self._last_pressure != PRESSURE_HARD:
+            self.hard_events += 1
+        self._last_pressure = pressure
+        if pressure:
+            self.interval = max(self.min_interval, self.interval // 2)
+        else:
+            self.interval = min(self.base_interval, self.interval * 2)
+        self._countdown = self.interval
+        return pressure
+
+    def relieve(self, clear_caches: Optional[Callable[[], None]] = None) -> int:
+        """
+        Reaktion auf weichen Druck: Caches leeren, Speicher freigeben und erneut messen.
+
+        Args:
+            clear_caches: Optional. Funktion, die Caches des Laufs leert
+
+        Returns:
+            Die Druckstufe nach dem Freigeben
+        """
+        self.soft_events += 1
+        if clear_caches is not None:
+            clear_caches()
+        release_memory()
+        return self.check()
+
+    def flushed(self) -> int:
+        """
+        Nach dem vorzeitigen Schreiben der Modelle: Speicher freigeben und erneut messen.
+
+        Returns:
+            Die Druckstufe nach dem Freigeben
+        """
+        self.flushes += 1
+        release_memory()
+        return self.check()
+
+    def overrun(self) -> None:
+        """
+        Die Obergrenze ist überschritten und es lässt sich nichts mehr freigeben.
+
+        Zählt die Überschreitung und warnt einmal, bis der Druck wieder unter die Obergrenze sinkt.
+        """
+        self.overruns += 1
+        if not self._warned:
+            self._warned = True
+            self.log.warning("Speicherbudget von %s überschritten (RSS %s), es lässt sich nichts mehr freigeben; "
+                             "Verarbeitung wird fortgesetzt", format_size(self.limit), format_size(self.peak_rss))
+
+    def log_summary(self) -> None:
+        """Schreibt die Reaktionen auf das Budget ins Log."""
+        self.log.info("Speicherbudget %s: höchster RSS %s, %d× Speicher freigegeben, %d× Obergrenze erreicht, "
+                      "%d× Modelle vorzeitig geschrieben", format_size(self.limit),
+                      format_size(self.peak_rss), self.soft_events, self.hard_events, self.flushes)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Normalisierung von Feldinhalten mit Zwischenspeicher.
+
+MarcUtils.clean_field_content() wendet jedes Muster einzeln auf jeden Wert an, und
+extract_marc_subfields() hat die Muster bei jedem Aufruf neu kompiliert. Schlagwörter,
+Rollen oder Verlagsnamen wiederholen sich in einem Katalog aber sehr oft. TextNormalizer
+bündelt die Schritte in einem Objekt, das einmal aufgebaut wird:
+
+1. Leerzeichen am Anfang und Ende entfernen (strip)
+2. Unicode-Normalisierung nach NFC (nfc), damit die Muster zusammengesetzte Zeichen sehen
+3. Muster entfernen (remove_patterns); aufeinanderfolgende Muster, die genau ein Zeichen
+   ohne Kontextbedingung treffen (z.B. ``\\d``, ``\\W``, ``[()]``), werden zu einer
+   Alternation zusammengefasst, alle anderen bleiben in ihrer Reihenfolge einzelne Schritte
+4. Satzzeichen am Ende wie SolrMarc (Utils.cleanData) entfernen (clean_punctuation)
+
+Die Ergebnisse werden in einem begrenzten LRU-Cache pro Objekt abgelegt, Schlüssel ist
+der unveränderte Rohwert. get_normalizer() liefert für gleiche Optionen dasselbe Objekt.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+from help.slublogging import getSlubLogger
+
+# Der Parser für reguläre Ausdrücke ist ein privates Modul (bis 3.10 sre_parse). Fehlt er,
+# wird nicht zusammengefasst und jedes Muster bleibt ein eigener Schritt.
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # pragma: no cover - abhängig von der Python-Version
+    try:
+        import sre_parse
+        import sre_constants
+    except ImportError:
+        sre_parse = sre_constants = None
+
+# Standardgröße des LRU-Caches pro TextNormalizer
+DEFAULT_CACHE_SIZE = 65536
+
+# Operationen, deren Treffer vom umgebenden Text abhängen (Anker, Lookarounds, Rückverweise)
+_CONTEXT_OPCODES = frozenset((sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT,
+                              sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS)) if sre_constants else frozenset()
+
+# SolrMarc cleanData: Satzzeichen am Ende, Punkt nach zwei Buchstaben bzw. nach einem Satzzeichen
+_TRAILING_PUNCTUATION = re.compile(r" *[,/;:]$")
+_TRAILING_PERIOD = re.compile(r"(?:\w\w|[^\w\s])\.$")
+
+
+def _has_context(parsed) -> bool:
+    """Prüft rekursiv, ob ein geparstes Muster Anker, Lookarounds oder Rückverweise enthält."""
+    for op, arg in parsed:
+        if op in _CONTEXT_OPCODES:
+            return True
+        for item in (arg if isinstance(arg, (list, tuple)) else (arg,)):
+            if isinstance(item, sre_parse.SubPattern) and _has_context(item):
+                return True
+            if isinstance(item, (list, tuple)) and any(
+                    isinstance(sub, sre_parse.SubPattern) and _has_context(sub) for sub in item):
+                return True
+    return False
+
+
+def is_single_char_pattern(pattern: Pattern) -> bool:
+    """
+    Prüft, ob ein Muster genau ein Zeichen ohne Kontextbedingung trifft.
+
+    Nur solche Muster können gefahrlos zusammengefasst werden: Das Entfernen eines Zeichens
+    verändert nicht, ob ein anderes Zeichen getroffen wird. Bei längeren Mustern kann dagegen
+    ein früheres Muster durch sein Entfernen erst einen Treffer für ein späteres erzeugen.
+    Ohne den Parser des re-Moduls oder wenn er das Muster nicht versteht, ist die Antwort
+    immer False.
+    """
+    if sre_parse is None or pattern.flags & ~re.UNICODE:
+        return False
+    try:
+        parsed = sre_parse.parse(pattern.pattern)
+    except Exception:
+        return False
+    return parsed.getwidth() == (1, 1) and not _has_context(parsed)
+
+
+def solrmarc_clean(value: str) -> str:
+    """
+    Entfernt Satzzeichen am Ende eines Wertes wie SolrMarc (Utils.cleanData).
+
+    Wiederholt bis keine Änderung mehr erfolgt: Leerzeichen entfernen, abschließendes
+    ``,/;:`` entfernen, einen Punkt nach zwei Buchstaben oder nach einem Satzzeichen
+    entfernen (Initialen wie in "Goethe, J. W." bleiben erhalten) und äußere
+    eckige Klammern entfernen, wenn innen keine weiteren stehen.
+
+    Example:
+        >>> solrmarc_clean("Botanik /")
+        'Botanik'
+        >>> solrmarc_clean("[Elektronische Ressource].")
+        'Elektronische Ressource'
+    """
+    previous = None
+    while value != previous:
+        previous = value
+        value = _TRAILING_PUNCTUATION.sub("", value.strip())
+        if value.endswith(".") and _TRAILING_PERIOD.search(value):
+            value = value[:-1]
+        if value.startswith("[") and value.endswith("]") and "[" not in value[1:-1] and "]" not in value[1:-1]:
+            value = value[1:-1]
+    return value
+
+
+class TextNormalizer:
+    """
+    Normalisierungskette für Feldinhalte mit LRU-Cache.
+
+    Example:
+        >>> normalize = TextNormalizer(remove_patterns=[r"\\d", r"\\W"], clean_punctuation=True)
+        >>> normalize("  Botanik 1860 /")
+        'Botanik'
+        >>> normalize.hit_rate
+        0.0
+    """
+
+    def __init__(self, strip: bool = True, remove_patterns: Optional[Iterable[Union[str, Pattern]]] = None,
+                 clean_punctuation: bool = False, nfc: bool = False, cache_size: Optional[int] = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            strip: Leerzeichen am Anfang und Ende entfernen
+            remove_patterns: Optional. Reguläre Ausdrücke (als String oder kompiliert), deren Treffer entfernt werden;
+                             ungültige Muster werden mit einer Warnung übersprungen
+            clean_punctuation: Satzzeichen am Ende wie SolrMarc entfernen
+            nfc: Wert vor dem Entfernen der Muster nach Unicode NFC normalisieren
+            cache_size: Größe des LRU-Caches; 0 schaltet den Cache ab, None macht ihn unbegrenzt
+        """
+        self.log = getSlubLogger('help.normalize')
+        self.strip = strip
+        self.clean_punctuation = clean_punctuation
+        self.nfc = nfc
+        self.steps = self._fuse(self._compile(remove_patterns or ()))
+        self.cache_size = cache_size
+        # Besteht die Kette nur aus strip, ist der Cache teurer als die Arbeit selbst
+        trivial = not (self.steps or clean_punctuation or nfc)
+        self._cached = lru_cache(maxsize=cache_size)(self._normalize) if cache_size != 0 and not trivial else None
+        # Schnellster Aufruf für nicht leere Werte, z.B. für Schleifen über viele Subfelder
+        if self._cached is not None:
+            self.function = self._cached
+        elif trivial:
+            self.function = str.strip if strip else str
+        else:
+            self.function = self._normalize
+
+    def _compile(self, patterns: Iterable[Union[str, Pattern]]) -> List[Pattern]:
+        compiled = []
+        for pattern in patterns:
+            if isinstance(pattern, re.Pattern):
+                compiled.append(pattern)
+                continue
+            try:
+                compiled.append(re.compile(pattern))
+            except re.error as e:
+                self.log.warning(f"Ungültiges RegEx-Muster: {pattern}, Fehler: {e}")
+        return compiled
+
+    @staticmethod
+    def _fuse(patterns: List[Pattern]) -> Tuple[Pattern, ...]:
+        """Fasst aufeinanderfolgende Ein-Zeichen-Muster zu einer Alternation zusammen."""
+        steps: List[Pattern] = []
+        run: List[Pattern] = []
+        for pattern in patterns + [None]:
+            if pattern is not None and is_single_char_pattern(pattern):
+                run.append(pattern)
+                continue
+            if len(run) > 1:
+                try:
+                    run = [re.compile("|".join(f"(?:{p.pattern})" for p in run))]
+                except re.error:
+                    # z.B. gleichnamige Gruppen in mehreren Mustern; dann bleiben es einzelne Schritte
+                    pass
+            steps.extend(run)
+            run = []
+            if pattern is not None:
+                steps.append(pattern)
+        return tuple(steps)
+
+    def _normalize(self, value: str) -> str:
+        if self.strip:
+            value = value.strip()
+        if self.nfc and not value.isascii():
+            value = unicodedata.normalize("NFC", value)
+        for step in self.steps:
+            value = step.sub("", value)
+        if self.clean_punctuation:
+            value = solrmarc_clean(value)
+        return value
+
+    def __call__(self, value: str) -> str:
+        """
+        Normalisiert einen Wert.
+
+        Args:
+            value: Der Rohwert, z.B. ein Subfeldinhalt
+
+        Returns:
+            Der normalisierte Wert; ein leerer String, wenn nichts übrig bleibt
+        """
+        return self.function(value) if value else ""
+
+    normalize = __call__
+
+    @property
+    def hits(self) -> int:
+        return self._cached.cache_info().hits if self._cached else 0
+
+    @property
+    def misses(self) -> int:
+        return self._cached.cache_info().misses if self._cached else 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Anteil der Aufrufe, die aus dem Cache beantwortet wurden."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, object]:
+        """Liefert Treffer, Fehlzugriffe, Trefferquote und Füllstand des Caches."""
+        info = self._cached.cache_info() if self._cached else None
+        return {
+            "hits": info.hits if info else 0,
+            "misses": info.misses if info else 0,
+            "hit_rate": self.hit_rate,
+            "size": info.currsize if info else 0,
+            "maxsize": self.cache_size,
+        }
+
+    def clear_cache(self) -> None:
+        if self._cached:
+            self._cached.cache_clear()
+
+    def __repr__(self):
+        return (f"TextNormalizer(strip={self.strip}, steps={[step.pattern for step in self.steps]}, "
+                f"clean_punctuation={self.clean_punctuation}, nfc={self.nfc})")
+
+
+# Gemeinsam genutzte Normalisierer pro Optionssatz (siehe get_normalizer())
+_SHARED_NORMALIZERS: Dict[tuple, TextNormalizer] = {}
+
+
+def get_normalizer(strip: bool = True, remove_patterns: Tuple[str, ...] = (), clean_punctuation: bool = False,
+                   nfc: bool = False) -> TextNormalizer:
+    """
+    Liefert einen gemeinsam genutzten TextNormalizer für die angegebenen Optionen.
+
+    Args:
+        strip: Leerzeichen am Anfang und Ende entfernen
+        remove_patterns: Muster, deren Treffer entfernt werden
+        clean_punctuation: Satzzeichen am Ende wie SolrMarc entfernen
+        nfc: Ergebnis nach Unicode NFC normalisieren
+
+    Returns:
+        Für gleiche Optionen immer dasselbe Objekt (mit demselben Cache)
+    """
+    key = (strip, tuple(remove_patterns), clean_punctuation, nfc)
+    normalizer = _SHARED_NORMALIZERS.get(key)
+    if normalizer is None:
+        normalizer = _SHARED_NORMALIZERS[key] = TextNormalizer(strip, key[1], clean_punctuation, nfc)
+    return normalizer
+
+
+def shared_normalizers() -> List[TextNormalizer]:
+    """Liefert alle über get_normalizer() erzeugten Normalisierer (z.B. für die Cache-Statistik)."""
+    return list(_SHARED_NORMALIZERS.values())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pipe-Modus: Records von stdin lesen, JSON-Zeilen nach stdout schreiben (``-s - -t -``).
+
+Mit ``-`` als Quelle liest marc2finc.py die Records aus stdin, ISO 2709 Record für Record
+(LazyMARCReader liest erst die fünf Bytes der Recordlänge, dann den Rest), sodass jeder
+Record verarbeitet wird, sobald er vollständig angekommen ist. Mit ``-`` als Ziel wird
+jedes FINC-Dokument sofort als JSON-Zeile nach stdout geschrieben statt gesammelt; die
+Logs gehen dann nach stderr.
+
+JsonLinesWriter schreibt über den gepufferten Binärstrom von stdout und leert den Puffer
+nach flush_every Zeilen und/oder spätestens alle flush_seconds Sekunden. flush_every=1
+liefert jede Zeile sofort an den nächsten Prozess der Pipeline, größere Werte sparen
+Systemaufrufe bei Massenimporten.
+"""
+
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Union
+
+# Pfad, der für stdin bzw. stdout steht
+STDIO = "-"
+DEFAULT_FLUSH_EVERY = 1
+DEFAULT_FLUSH_SECONDS = 0.0
+
+
+def is_stdio(path: Union[str, Path, None]) -> bool:
+    return path is not None and str(path) == STDIO
+
+
+@contextmanager
+def open_source(path: Union[str, Path]) -> Iterator[BinaryIO]:
+    """Öffnet eine Quelldatei binär; ``-`` liefert stdin, das nicht geschlossen wird."""
+    if is_stdio(path):
+        yield sys.stdin.buffer
+    else:
+        with open(path, 'rb') as f:
+            yield f
+
+
+class JsonLinesWriter:
+    """
+    Schreibt JSON-Zeilen in einen Binärstrom und leert den Puffer nach Anzahl und/oder Zeit.
+
+    Example:
+        >>> writer = JsonLinesWriter(sys.stdout.buffer, flush_every=100, flush_seconds=0.5)
+        >>> writer.write('{"id": "0-1"}\\n')
+        >>> writer.close()
+    """
+
+    def __init__(self, stream: BinaryIO, flush_every: int = DEFAULT_FLUSH_EVERY,
+                 flush_seconds: float = DEFAULT_FLUSH_SECONDS):
+        """
+        Args:
+            stream: Binärstrom, z.B. sys.stdout.buffer (wird von close() nicht geschlossen)
+            flush_every: Optional. Puffer nach so vielen Zeilen leeren; 0 = nur nach Zeit bzw. am Ende
+            flush_seconds: Optional. Puffer spätestens nach so vielen Sekunden leeren, auch wenn
+                           gerade kein Record eintrifft; 0 = nur nach Anzahl bzw. am Ende
+        """
+        self.stream = stream
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.count = 0
+        self.flushes = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+        if flush_seconds > 0:
+            self._timer = threading.Thread(target=self._flush_periodically, name="jsonl-flush", daemon=True)
+            self._timer.start()
+
+    def write(self, line: str) -> None:
+        """Schreibt eine Zeile (mit Zeilenende); BrokenPipeError, wenn der Leser die Pipe geschlossen hat."""
+        data = line.encode("utf-8")
+        with self._lock:
+            self.stream.write(data)
+            self.count += 1
+            self._pending += 1
+            if self.flush_every and self._pending >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._pending:
+            self.stream.flush()
+            self._pending = 0
+            self.flushes += 1
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except (BrokenPipeError, ValueError):
+                # Pipe geschlossen; der nächste write() meldet den Fehler im Hauptthread
+                return
+
+    def close(self) -> None:
+        """Beendet den Zeitgeber und leert den Puffer; der Strom bleibt offen."""
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Offsetindex für ISO-2709-Dateien zum seitenweisen Blättern und Suchen.
+
+Das Notebook hat bisher die ganze MARC-Datei gelesen, um eine Titelliste anzuzeigen.
+RecordIndex liest die Datei einmal als Rohdaten (iter_marc_chunks) und legt pro Record
+Nummer, Byte-Offset, Länge, 001 und Titel (245 $a $b) in einer SQLite-Datenbank neben
+der Quelldatei ab. Danach gilt:
+
+- Eine Seite ohne Suche ist eine Bereichsabfrage über die fortlaufende Nummer (n ist die
+  rowid), die Kosten hängen also nicht davon ab, wie weit hinten die Seite liegt.
+- Die Suche läuft über einen FTS5-Index auf ID und Titel (Präfixsuche pro Wort), ohne
+  FTS5 über LIKE. Eine exakte 001 wird immer über den Index auf der ID gefunden.
+- Nur die Records der angezeigten Seite werden per seek() gelesen und dekodiert.
+
+Der Index wird neu aufgebaut, wenn sich Größe oder Änderungszeit der Quelldatei ändern.
+ConversionCache hält die Konvertierungsergebnisse pro Record-ID in einem LRU-Cache,
+so dass das Zurückblättern nichts neu konvertiert.
+"""
+
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from help.lazy_marc import (DIRECTORY_ENTRY_LEN, LEADER_LEN, SUBFIELD_INDICATOR, LazyRecord, Marc8Decoder,
+                             iter_marc_chunks)
+from help.slublogging import getSlubLogger
+
+# Version des Tabellenlayouts; ein Index mit anderer Version wird neu aufgebaut
+INDEX_VERSION = 1
+
+# Standardgröße einer Seite und des Caches für Konvertierungen
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_CACHE_SIZE = 4096
+
+# Records pro executemany() beim Aufbau
+_BATCH_SIZE = 10000
+
+
+class IndexEntry(NamedTuple):
+    """Ein Eintrag im Offsetindex."""
+    n: int
+    offset: int
+    length: int
+    id: Optional[str]
+    title: Optional[str]
+
+
+def _fts5_available() -> bool:
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def _fts_query(text: str) -> str:
+    """Wandelt eine Eingabe in eine FTS5-Abfrage: jedes Wort als Präfix, alle Wörter müssen vorkommen."""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _subfields_text(data: bytes, utf8: bool, decoder: Marc8Decoder, errors: str) -> Optional[str]:
+    """Verbindet die Subfelder $a und $b eines Feldes aus den Rohdaten mit Leerzeichen."""
+    parts = []
+    for sub in data.split(SUBFIELD_INDICATOR)[1:]:
+        if sub[:1] == b"a" or sub[:1] == b"b":
+            value = (sub[1:].decode("utf-8", errors) if utf8 else decoder.decode(sub[1:])).strip()
+            if value:
+                parts.append(value)
+    return " ".join(parts) or None
+
+
+def _scan_id_and_title(chunk: bytes, decoder: Marc8Decoder, errors: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Liest 001 und 245 $a $b direkt aus den Rohdaten.
+
+    Im Directory werden nur die Tags verglichen, bis beide Felder gefunden sind; es wird
+    kein Record-Objekt erzeugt.
+    """
+    base_address = int(chunk[12:17])
+    utf8 = chunk[9:10] == b"a"
+    record_id = title = None
+    for start in range(LEADER_LEN, base_address - 1, DIRECTORY_ENTRY_LEN):
+        tag = chunk[start:start + 3]
+        if tag != b"001" and tag != b"245":
+            continue
+        offset = base_address + int(chunk[start + 7:start + 12])
+        data = chunk[offset:offset + int(chunk[start + 3:start + 7]) - 1]
+        if tag == b"001":
+            record_id = (data.decode("utf-8", errors) if utf8 else decoder.decode(data)).strip() or None
+        else:
+            title = _subfields_text(data, utf8, decoder, errors)
+        if record_id is not None and title is not None:
+            break
+    return record_id, title
+
+
+class RecordIndex:
+    """
+    SQLite-Offsetindex einer ISO-2709-Datei.
+
+    Example:
+        >>> with RecordIndex("samples/output.mrc") as index:
+        ...     entries = index.page(0, page_size=5)
+        ...     record = index.record(entries[0])
+    """
+
+    def __init__(self, marc_file: Union[str, Path], index_file: Union[str, Path, None] = None,
+                 encoding_errors: str = "replace", rebuild: bool = False):
+        """
+        Öffnet den Index und baut ihn bei Bedarf (fehlt, veraltet oder rebuild=True) auf.
+
+        Args:
+            marc_file: Pfad zur ISO-2709-Datei
+            index_file: Optional. Pfad zur Indexdatenbank; Standard ist ``<marc_file>.index.sqlite``
+            encoding_errors: Fehlerstrategie für ungültige Bytes ('replace', 'ignore' oder 'strict')
+            rebuild: Index in jedem Fall neu aufbauen
+        """
+        self.log = getSlubLogger('help.record_index')
+        self.marc_file = Path(marc_file)
+        self.index_file = Path(index_file) if index_file else self.marc_file.with_name(
+            self.marc_file.name + ".index.sqlite")
+        self.encoding_errors = encoding_errors
+        self.decoder = Marc8Decoder(encoding_errors)
+        self._db = sqlite3.connect(self.index_file, check_same_thread=False)
+        self._marc = None
+        if rebuild or not self.is_current():
+            self.build()
+        self.fts = bool(self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'records_fts'").fetchone())
+        self._size = self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def _source_stamp(self) -> Tuple[int, int]:
+        stat = self.marc_file.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def is_current(self) -> bool:
+        """Prüft, ob der Index zur aktuellen Quelldatei passt."""
+        try:
+            meta = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+        except sqlite3.Error:
+            return False
+        size, mtime = self._source_stamp()
+        return meta.get("version") == str(INDEX_VERSION) and meta.get("size") == str(size) \
+            and meta.get("mtime_ns") == str(mtime)
+
+    def build(self) -> int:
+        """
+        Baut den Index in einem Durchlauf über die Rohdaten auf.
+
+        Returns:
+            Anzahl der indexierten Records; unvollständige Records werden übersprungen
+        """
+        self.log.info(f"Baue Offsetindex für {self.marc_file} in {self.index_file}")
+        db = self._db
+        db.execute("PRAGMA journal_mode=OFF")
+        db.execute("PRAGMA synchronous=OFF")
+        for table in ("records_fts", "records", "meta"):
+            db.execute(f"DROP TABLE IF EXISTS {table}")
+        db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        db.execute("CREATE TABLE records (n INTEGER PRIMARY KEY, offset INTEGER, length INTEGER, id TEXT, title TEXT)")
+
+        count = skipped = offset = 0
+        batch = []
+        with open(self.marc_file, "rb") as marc:
+            for chunk, exception in iter_marc_chunks(marc):
+                if exception is None:
+                    try:
+                        record_id, title = _scan_id_and_title(chunk, self.decoder, self.encoding_errors)
+                    except (ValueError, IndexError, UnicodeDecodeError) as e:
+                        self.log.debug("Record an Offset %d nicht lesbar: %s", offset, e)
+                        skipped += 1
+                    else:
+                        batch.append((count, offset, len(chunk), record_id, title))
+                        count += 1
+                else:
+                    skipped += 1
+                offset += len(chunk)
+                if len(batch) >= _BATCH_SIZE:
+                    db.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?)", batch)
+                    batch.clear()
+        db.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?)", batch)
+        db.execute("CREATE INDEX records_id ON records (id)")
+
+        if _fts5_available():
+            db.execute("CREATE VIRTUAL TABLE records_fts USING fts5(id, title, content='records', content_rowid='n')")
+            db.execute("INSERT INTO records_fts (rowid, id, title) SELECT n, id, title FROM records")
+
+        size, mtime = self._source_stamp()
+        db.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("version", str(INDEX_VERSION)), ("source", str(self.marc_file)), ("size", str(size)),
+            ("mtime_ns", str(mtime))])
+        db.commit()
+        if skipped:
+            self.log.warning(f"{skipped} unvollständige Records beim Indexieren übersprungen")
+        self.log.info(f"Offsetindex mit {count} Records aufgebaut")
+        return count
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _search_clause(self, query: str) -> Tuple[str, tuple]:
+        if self.fts and _fts_query(query):
+            return ("n IN (SELECT n FROM records WHERE id = ? "
+                    "UNION SELECT rowid FROM records_fts WHERE records_fts MATCH ?)", (query.strip(), _fts_query(query)))
+        pattern = f"%{query.strip()}%"
+        return "(id = ? OR title LIKE ?)", (query.strip(), pattern)
+
+    def count(self, query: Optional[str] = None) -> int:
+        """Anzahl der Records insgesamt oder der Treffer einer Suche."""
+        if not query or not query.strip():
+            return self._size
+        clause, params = self._search_clause(query)
+        return self._db.execute(f"SELECT COUNT(*) FROM records WHERE {clause}", params).fetchone()[0]
+
+    def page_count(self, page_size: int = DEFAULT_PAGE_SIZE, query: Optional[str] = None) -> int:
+        return max(1, -(-self.count(query) // page_size))
+
+    def page(self, page_number: int, page_size: int = DEFAULT_PAGE_SIZE, query: Optional[str] = None) -> List[IndexEntry]:
+        """
+        Liefert die Einträge einer Seite.
+
+        Args:
+            page_number: Seitennummer ab 0
+            page_size: Einträge pro Seite
+            query: Optional. Suchtext (Wörter aus ID oder Titel, jeweils als Präfix)
+
+        Returns:
+            Liste von IndexEntry in Dateireihenfolge
+        """
+        start = max(page_number, 0) * page_size
+        if not query or not query.strip():
+            rows = self._db.execute("SELECT * FROM records WHERE n >= ? AND n < ? ORDER BY n",
+                                    (start, start + page_size))
+        else:
+            clause, params = self._search_clause(query)
+            rows = self._db.execute(f"SELECT * FROM records WHERE {clause} ORDER BY n LIMIT ? OFFSET ?",
+                                    params + (page_size, start))
+        return [IndexEntry(*row) for row in rows]
+
+    def find(self, record_id: str) -> Optional[IndexEntry]:
+        """Sucht einen Record über seine 001."""
+        row = self._db.execute("SELECT * FROM records WHERE id = ? ORDER BY n LIMIT 1", (record_id,)).fetchone()
+        return IndexEntry(*row) if row else None
+
+    def read_chunk(self, entry: IndexEntry) -> bytes:
+        """Liest die Rohdaten eines Records über Offset und Länge."""
+        if self._marc is None:
+            self._marc = open(self.marc_file, "rb")
+        self._marc.seek(entry.offset)
+        return self._marc.read(entry.length)
+
+    def record(self, entry: IndexEntry) -> LazyRecord:
+        """Liest einen Record; Felder werden erst beim Zugriff dekodiert."""
+        return LazyRecord(self.read_chunk(entry), self.encoding_errors, self.decoder)
+
+    def close(self) -> None:
+        if self._marc is not None:
+            self._marc.close()
+            self._marc = None
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ConversionCache:
+    """
+    LRU-Cache für Konvertierungsergebnisse pro Record-ID.
+
+    Das Ergebnis ist ein JSON-fähiges Dict wie in der JSONL-Ausgabe (ohne None-Werte und
+    leere Listen); schlägt Konvertierung oder Validierung fehl, ein Dict mit dem Schlüssel
+    ``error``. Auch Fehler werden zwischengespeichert.
+    """
+
+    def __init__(self, convert: Callable[[Any], Dict[str, Any]], model_class: Optional[type] = None,
+                 maxsize: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            convert: Konvertierungsfunktion Record -> Dict (z.B. slubmodels.converter.convert)
+            model_class: Optional. Modellklasse zur Validierung (z.B. das Pydantic-Modell)
+            maxsize: Maximale Anzahl zwischengespeicherter Records
+        """
+        self.convert = convert
+        self.model_class = model_class
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _convert(self, record) -> Dict[str, Any]:
+        try:
+            values = self.convert(record)
+            if self.model_class is not None:
+                model = self.model_class(**values)
+                values = (model.model_dump(exclude_none=True, exclude_defaults=True) if hasattr(model, "model_dump")
+                          else dict(model.__dict__))
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+        return {key: value for key, value in values.items() if value is not None and value != []}
+
+    def get(self, index: RecordIndex, entry: IndexEntry) -> Dict[str, Any]:
+        """
+        Liefert die Konvertierung eines Records, aus dem Cache oder frisch konvertiert.
+
+        Args:
+            index: Der Offsetindex, aus dem der Record gelesen wird
+            entry: Der Eintrag des Records
+
+        Returns:
+            JSON-fähiges Dict des konvertierten Records
+        """
+        key = entry.id if entry.id is not None else f"#{entry.n}"
+        result = self._cache.get(key)
+        if result is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return result
+        self.misses += 1
+        result = self._cache[key] = self._convert(index.record(entry))
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def clear(self) -> None:
+        self._cache.clear()
@@ -0,0 +1,486 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Konvertierung einzelner Records als lokaler HTTP-Dienst (``marc2finc.py --serve``).
+
+Die Ingest-Pipeline konvertiert bei jedem Update-Ereignis wenige Records. Ein Aufruf von
+marc2finc.py pro Ereignis zahlt jedes Mal den Start von LinkML und die Modellgenerierung.
+Der Dienst lädt Modelle, Konverter und Caches einmal und nimmt danach Records per HTTP an:
+
+- ``POST /convert``: ISO 2709, MARCXML oder MARC-in-JSON-Zeilen im Body, Format über
+  ``?format=``, den Content-Type oder das erste Zeichen; Antwort ist
+  ``{"records": [...], "errors": [...]}`` mit den FINC-Dokumenten wie in der
+  .pydantic.jsonl-Ausgabe und den Fehlern pro Record wie in der Dead-Letter-Datei
+- ``GET /metrics``: Zähler und Latenzhistogramme im Textformat von Prometheus
+- ``GET /health``: ``ok``, sobald der Dienst Anfragen annimmt
+
+Anfragen landen in einer Warteschlange. Ein Sammelthread fasst gleichzeitig eintreffende
+Anfragen zu Stapeln zusammen (bis batch_size Anfragen oder batch_wait Sekunden nach der
+ersten) und gibt jeden Stapel als eine Aufgabe an einen Pool von Arbeitsprozessen. Die
+Prozesse entstehen per fork, nachdem die Modelle geladen sind, und übernehmen sie fertig;
+übertragen werden nur Rohdaten hin und JSON-Zeilen zurück, ihre Logs laufen über
+create_worker_log_queue() an die Handler des Elternprozesses. Ohne fork (oder mit workers=0)
+konvertiert der Sammelthread selbst.
+"""
+
+import io
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from help.error_report import ErrorReport
+from help.marc_readers import INPUT_FORMATS, create_marc_reader
+from help.slublogging import (configure_worker_logging, create_worker_log_queue, getSlubLogger,
+                               stop_worker_log_queue)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8484
+# Ein Kern bleibt für HTTP und Sammelthread; bei einem Kern konvertiert der Sammelthread selbst
+DEFAULT_WORKERS = max(0, min(4, (os.cpu_count() or 1) - 1))
+DEFAULT_BATCH_SIZE = 32
+# Sekunden, die der Sammelthread nach der ersten Anfrage auf weitere wartet; 0 nimmt nur, was
+# schon in der Warteschlange steht (Stapel entstehen dann nur unter Last, ohne zusätzliche Latenz)
+DEFAULT_BATCH_WAIT = 0.0
+# Größter angenommener Body (eine Anfrage wird vollständig im Speicher gehalten)
+MAX_BODY_BYTES = 64 * 1024 * 1024
+# Sekunden, nach denen eine Anfrage mit 504 abgebrochen wird
+REQUEST_TIMEOUT = 60.0
+
+# Obergrenzen der Histogramm-Buckets in Sekunden
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Obergrenzen der Buckets für die Anzahl Anfragen pro Stapel
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+_CONTENT_TYPES = {"xml": "xml", "marc": "marc", "ndjson": "json", "jsonl": "json", "json": "json"}
+
+
+class Histogram:
+    """
+    Kumulatives Histogramm mit festen Buckets wie bei Prometheus, threadsicher.
+
+    Example:
+        >>> latency = Histogram(LATENCY_BUCKETS)
+        >>> latency.observe(0.003)
+        >>> latency.count, latency.quantile(0.5)
+        (1, 0.005)
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Obergrenze des Buckets, in dem das Quantil q liegt (inf über dem letzten Bucket); None ohne Werte."""
+        with self._lock:
+            counts, total = list(self._counts), self.count
+        if not total:
+            return None
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            if cumulative >= q * total:
+                return bound
+        return float("inf")
+
+    def prometheus(self, name: str, description: str) -> List[str]:
+        """Zeilen im Textformat von Prometheus (Buckets kumuliert, dazu _sum und _count)."""
+        with self._lock:
+            counts, total, value_sum = list(self._counts), self.count, self.sum
+        lines = [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound:g}"}} {cumulative}')
+        lines += [f'{name}_bucket{{le="+Inf"}} {total}', f"{name}_sum {value_sum:.6f}", f"{name}_count {total}"]
+        return lines
+
+
+class RecordConverter:
+    """
+    Konvertiert den Body einer Anfrage mit den einmal geladenen Modellen zu FINC-JSON-Zeilen.
+
+    Validiert wird mit dem Pydantic-Modell; die Dataclass-Ausgabe entfällt im Dienst.
+    """
+
+    def __init__(self, models: Dict, serialize: Callable, convert: Callable, lazy_decoding: bool = True,
+                 encoding_errors: str = "replace"):
+        """
+        Args:
+            models: Modellklassen aus generate_models_from_schema() (PydanticFinc)
+            serialize: Serialisiert ein Pydantic-Modell zu einer JSON-Zeile (wie _pydantic_json)
+            convert: Konverter record -> Feldwerte (convert aus dem Schema oder map_record)
+            lazy_decoding: Optional. ISO-2709-Felder erst bei Zugriff dekodieren
+            encoding_errors: Optional. Strategie für ungültige Bytefolgen
+        """
+        self.model_class = models["PydanticFinc"]
+        self.serialize = serialize
+        self.convert = convert
+        self.lazy_decoding = lazy_decoding
+        self.encoding_errors = encoding_errors
+        self.report = ErrorReport()
+
+    def convert_body(self, data: bytes, input_format: str) -> Tuple[List[str], List[dict]]:
+        """
+        Konvertiert alle Records eines Bodys.
+
+        Returns:
+            (FINC-Dokumente als JSON ohne Zeilenende, Fehler pro Record mit position, record_id und reasons)
+        """
+        documents: List[str] = []
+        errors: List[dict] = []
+        reader = create_marc_reader(io.BytesIO(data), input_format, lazy=self.lazy_decoding,
+                                    errors=self.encoding_errors)
+        for position, record in enumerate(reader, start=1):
+            record_id = None
+            if record is None:
+                reasons = self.report.add("reader", getattr(reader, "current_exception", None)
+                                          or ValueError("Record nicht lesbar"))
+            else:
+                try:
+                    values = self.convert(record)
+                    record_id = values["record_id"]
+                except Exception as e:
+                    field = record.get("001")
+                    record_id = field.data if field is not None else None
+                    reasons = self.report.add("mapping", e, record_id)
+                else:
+                    try:
+                        documents.append(self.serialize(self.model_class(**values)).rstrip("\n"))
+                        continue
+                    except Exception as e:
+                        reasons = self.report.add("pydantic", e, record_id)
+            errors.append({"position": position, "record_id": record_id, "reasons": reasons})
+        return documents, errors
+
+    def convert_batch(self, bodies: Sequence[Tuple[bytes, str]]) -> Tuple[List[Tuple[List[str], List[dict]]], float]:
+        """Konvertiert einen Stapel von Bodys; liefert die Ergebnisse und die Dauer in Sekunden."""
+        started = time.perf_counter()
+        results = []
+        for data, input_format in bodies:
+            try:
+                results.append(self.convert_body(data, input_format))
+            except Exception as e:
+                results.append(([], [{"position": None, "record_id": None,
+                                      "reasons": self.report.add("reader", e)}]))
+        return results, time.perf_counter() - started
+
+
+# Konverter der Arbeitsprozesse, vor dem fork gesetzt und von ihnen übernommen
+_WORKER_CONVERTER: Optional[RecordConverter] = None
+
+
+def _init_worker(log_queue) -> None:
+    # Strg+C trifft die ganze Prozessgruppe; beendet wird nur über den Elternprozess
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    configure_worker_logging(log_queue)
+
+
+def _convert_in_worker(bodies):
+    return _WORKER_CONVERTER.convert_batch(bodies)
+
+
+class ConversionService:
+    """
+    Warteschlange, Sammelthread und Pool der Arbeitsprozesse mit den Metriken des Dienstes.
+
+    Example:
+        >>> service = ConversionService(converter, workers=2).start()
+        >>> documents, errors = service.submit(marc_bytes, "marc").result()
+        >>> service.stop()
+    """
+
+    def __init__(self, converter: RecordConverter, workers: int = DEFAULT_WORKERS,
+                 batch_size: int = DEFAULT_BATCH_SIZE, batch_wait: float = DEFAULT_BATCH_WAIT):
+        """
+        Args:
+            converter: RecordConverter mit den geladenen Modellen
+            workers: Anzahl Arbeitsprozesse; 0 konvertiert im Sammelthread
+            batch_size: Höchstzahl Anfragen pro Stapel
+            batch_wait: Sekunden, die nach der ersten Anfrage eines Stapels auf weitere gewartet wird
+        """
+        self.log = getSlubLogger('help.serve')
+        self.converter = converter
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self._queue: "queue.Queue[Optional[Tuple[bytes, str, Future]]]" = queue.Queue()
+        self._pool = None
+        self._log_queue = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.request_latency = Histogram(LATENCY_BUCKETS)
+        self.batch_latency = Histogram(LATENCY_BUCKETS)
+        self.batch_sizes = Histogram(BATCH_BUCKETS)
+        self.counters = {"requests": 0, "records": 0, "failed_records": 0, "rejected_requests": 0}
+
+    def start(self) -> "ConversionService":
+        """Startet Pool und Sammelthread; der Pool entsteht vor allen Threads, damit fork sicher ist."""
+        global _WORKER_CONVERTER
+        if self.workers > 0:
+            if "fork" in multiprocessing.get_all_start_methods():
+                _WORKER_CONVERTER = self.converter
+                context = multiprocessing.get_context("fork")
+                # Logs der Arbeitsprozesse laufen über die Handler dieses Prozesses
+                self._log_queue = create_worker_log_queue(context)
+                self._pool = context.Pool(self.workers, initializer=_init_worker,
+                                          initargs=(self._log_queue,))
+            else:
+                self.log.warning("Arbeitsprozesse brauchen fork, konvertiere im Sammelthread")
+                self.workers = 0
+        self._thread = threading.Thread(target=self._collect, name="serve-batcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Beendet Sammelthread und Pool; offene Anfragen werden noch konvertiert."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            stop_worker_log_queue(self._log_queue)
+            self._log_queue = None
+
+    def submit(self, data: bytes, input_format: str) -> Future:
+        """Stellt einen Body in die Warteschlange; das Future liefert (Dokumente, Fehler)."""
+        future: Future = Future()
+        self._queue.put((data, input_format, future))
+        return future
+
+    def _collect(self) -> None:
+        """Sammelt Anfragen zu Stapeln und gibt sie an den Pool (oder konvertiert sie selbst)."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.perf_counter() + self.batch_wait
+            stopping = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._dispatch(batch)
+            if stopping:
+                return
+
+    def _dispatch(self, batch: List[Tuple[bytes, str, Future]]) -> None:
+        self.batch_sizes.observe(len(batch))
+        bodies = [(data, input_format) for data, input_format, _ in batch]
+        futures = [future for _, _, future in batch]
+        if self._pool is None:
+            try:
+                self._deliver(futures, self.converter.convert_batch(bodies))
+            except Exception as e:
+                self._fail(futures, e)
+            return
+        self._pool.apply_async(_convert_in_worker, (bodies,),
+                               callback=lambda result: self._deliver(futures, result),
+                               error_callback=lambda error: self._fail(futures, error))
+
+    def _deliver(self, futures: List[Future], result) -> None:
+        results, seconds = result
+        self.batch_latency.observe(seconds)
+        records = failed = 0
+        for future, (documents, errors) in zip(futures, results):
+            records += len(documents) + len(errors)
+            failed += len(errors)
+            future.set_result((documents, errors))
+        with self._lock:
+            self.counters["records"] += records
+            self.counters["failed_records"] += failed
+
+    @staticmethod
+    def _fail(futures: List[Future], error: BaseException) -> None:
+        for future in futures:
+            future.set_exception(error)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def metrics(self) -> str:
+        """Alle Metriken im Textformat von Prometheus."""
+        with self._lock:
+            counters = dict(self.counters)
+        lines = []
+        for name, value in counters.items():
+            lines += [f"# TYPE marc2finc_{name}_total counter", f"marc2finc_{name}_total {value}"]
+        lines += ["# TYPE marc2finc_workers gauge", f"marc2finc_workers {self.workers}"]
+        lines += self.request_latency.prometheus("marc2finc_request_seconds",
+                                                 "Dauer einer Anfrage an /convert einschließlich Warteschlange")
+        lines += self.batch_latency.prometheus("marc2finc_batch_seconds",
+                                               "Dauer der Konvertierung eines Stapels im Arbeitsprozess")
+        lines += self.batch_sizes.prometheus("marc2finc_batch_requests", "Anzahl Anfragen pro Stapel")
+        return "\n".join(lines) + "\n"
+
+    def log_summary(self) -> None:
+        with self._lock:
+            counters = dict(self.counters)
+        median, p99 = self.request_latency.quantile(0.5), self.request_latency.quantile(0.99)
+        self.log.info(f"Dienst: {counters['requests']} Anfragen, {counters['records']} Records "
+                      f"({counters['failed_records']} fehlerhaft), {self.batch_sizes.count} Stapel"
+                      + (f", Latenz Median <= {median * 1000:g} ms, p99 <= {p99 * 1000:g} ms"
+                         if median is not None else ""))
+
+
+def detect_body_format(data: bytes, content_type: Optional[str] = None, requested: Optional[str] = None) -> str:
+    """
+    Bestimmt das Format eines Bodys: ?format=, dann Content-Type, dann das erste Zeichen.
+
+    Raises:
+        ValueError: Bei einem unbekannten Format in ?format=
+    """
+    if requested:
+        if requested not in INPUT_FORMATS:
+            raise ValueError(f"Unbekanntes Format: {requested}. Erlaubt sind: {', '.join(INPUT_FORMATS)}")
+        return requested
+    if content_type:
+        subtype = content_type.split(";", 1)[0].strip().lower().rpartition("/")[2]
+        for marker, input_format in _CONTENT_TYPES.items():
+            if marker in subtype:
+                return input_format
+    start = data.lstrip()[:1]
+    if start == b"<":
+        return "xml"
+    if start == b"{":
+        return "json"
+    return "marc"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "marc2finc"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        self.server.log.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: str, content_type: str = "application/json; charset=utf-8") -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status: int, message: str) -> None:
+        self.server.service.count("rejected_requests")
+        self._send(status, json.dumps({"error": message}, ensure_ascii=False))
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/metrics":
+            self._send(200, self.server.service.metrics(), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/health":
+            self._send(200, "ok\n", "text/plain; charset=utf-8")
+        else:
+            self._error(404, f"Unbekannter Pfad: {path}")
+
+    def do_POST(self):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        if url.path not in ("/", "/convert"):
+            self._error(404, f"Unbekannter Pfad: {url.path}")
+            return
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            self._error(411, "Content-Length fehlt")
+            return
+        if int(length) > self.server.max_body:
+            self.close_connection = True
+            self._error(413, f"Body größer als {self.server.max_body} Bytes")
+            return
+        data = self.rfile.read(int(length))
+        try:
+            input_format = detect_body_format(data, self.headers.get("Content-Type"),
+                                              parse_qs(url.query).get("format", [None])[0])
+        except ValueError as e:
+            self._error(400, str(e))
+            return
+        service = self.server.service
+        service.count("requests")
+        try:
+            documents, errors = service.submit(data, input_format).result(timeout=self.server.timeout_seconds)
+        except TimeoutError:
+            self._error(504, "Zeitüberschreitung bei der Konvertierung")
+            return
+        except Exception as e:
+            self.server.log.error(f"Konvertierung fehlgeschlagen: {e}")
+            self._error(500, str(e))
+            return
+        # Die Dokumente sind schon serialisiert und werden nicht erneut geparst
+        body = '{"records": [' + ", ".join(documents) + '], "errors": ' + json.dumps(errors, ensure_ascii=False) + "}"
+        service.request_latency.observe(time.perf_counter() - started)
+        self._send(200, body)
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer, dessen Handler Anfragen an einen ConversionService weitergeben."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: ConversionService,
+                 max_body: int = MAX_BODY_BYTES, timeout_seconds: float = REQUEST_TIMEOUT):
+        self.service = service
+        self.max_body = max_body
+        self.timeout_seconds = timeout_seconds
+        self.log = getSlubLogger('help.serve')
+        super().__init__(address, _Handler)
+
+
+def serve(converter: RecordConverter, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          workers: int = DEFAULT_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE,
+          batch_wait: float = DEFAULT_BATCH_WAIT) -> None:
+    """Startet den Dienst und bedient Anfragen bis Strg+C (SIGINT) oder SIGTERM."""
+    log = getSlubLogger('help.serve')
+    service = ConversionService(converter, workers=workers, batch_size=batch_size, batch_wait=batch_wait)
+    # Erst binden (schlägt bei belegtem Port fehl), dann den Pool starten
+    server = ConversionServer((host, port), service)
+    if threading.current_thread() is threading.main_thread():
+        # shutdown() wartet auf serve_forever() und muss deshalb aus einem anderen Thread kommen
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    service.start()
+    log.info(f"Dienst läuft auf http://{host}:{server.server_address[1]}/convert "
+             f"({service.workers} Arbeitsprozesse, Stapel bis {service.batch_size} Anfragen)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log.info("Dienst wird beendet")
+        server.server_close()
+        service.stop()
+        service.log_summary()
@@ -1,5 +1,25 @@
+"""
+Zentrale Logging-Konfiguration für SLUB-Anwendungen.
+
+Die Konfiguration (logging.toml oder die eingebettete Standardkonfiguration) wird
+einmal pro Prozess angewendet, nicht bei jedem Aufruf von getSlubLogger(). Die
+Handler aus der Konfiguration laufen hinter einem QueueListener in einem eigenen
+Thread; am Root-Logger hängt nur ein QueueHandler. Die Konvertierungsschleife
+wartet damit nie auf die Ausgabe auf stdout oder in eine Datei.
+
+Für mehrere Prozesse leitet create_worker_log_queue() die Logs der Worker über eine
+multiprocessing-Queue an die Handler des Elternprozesses weiter; im Worker wird
+configure_worker_logging() aufgerufen (z.B. als initializer eines Pools).
+log_to_stderr() verlegt die Ausgabe auf stderr, wenn stdout Daten trägt (Pipe-Modus).
+"""
+
+import atexit
 import logging
 import logging.config
+import logging.handlers
+import queue
+import sys
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -66,7 +86,7 @@ def load_logging_config(config_file: Optional[Path] = None) -> dict:
             with open(default_config_file, 'rb') as f:
                 config = tomllib.load(f)
             log = logging.getLogger('help.slublogging')
-            log.info(f"Logging-Konfiguration aus {default_config_file} geladen")
+            log.info("Logging-Konfiguration aus %s geladen", default_config_file)
         else:
             # Als letzten Ausweg die eingebaute Standardkonfiguration verwenden
             config = tomllib.loads(DEFAULT_LOGGING_CONFIG)
@@ -82,12 +102,168 @@ def load_logging_config(config_file: Optional[Path] = None) -> dict:
     
     return config
 
+# Zustand der Konfiguration pro Prozess, geschützt durch _CONFIG_LOCK
+_CONFIG_LOCK = threading.Lock()
+_configured = False
+_configured_file: Optional[Path] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_listener() -> None:
+    """Beendet den QueueListener; alle bis dahin eingereihten Records werden noch ausgegeben."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _start_queue(root: logging.Logger) -> None:
+    """Ersetzt die Handler des Root-Loggers durch einen QueueHandler und startet den Listener."""
+    global _listener
+    handlers = list(root.handlers)
+    if not handlers:
+        return
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def configure_logging(config_file: Optional[Path] = None, use_queue: bool = True, force: bool = False) -> bool:
+    """
+    Wendet die Logging-Konfiguration einmal pro Prozess an.
+
+    Weitere Aufrufe kehren sofort zurück, außer es wird eine andere Konfigurationsdatei
+    übergeben oder force gesetzt. Mit use_queue laufen die konfigurierten Handler hinter
+    einem QueueListener in einem eigenen Thread.
+
+    Args:
+        config_file: Optionaler Pfad zur TOML-Konfigurationsdatei
+        use_queue: Handler über QueueHandler/QueueListener entkoppeln (Standard: True)
+        force: Konfiguration auch dann neu anwenden, wenn sie schon angewendet wurde
+
+    Returns:
+        True, wenn die Konfiguration bei diesem Aufruf angewendet wurde
+    """
+    global _configured, _configured_file
+    if _configured and not force and (config_file is None or config_file == _configured_file):
+        return False
+    with _CONFIG_LOCK:
+        if _configured and not force and (config_file is None or config_file == _configured_file):
+            return False
+        _stop_listener()
+        logging.config.dictConfig(load_logging_config(config_file))
+        if use_queue:
+            _start_queue(logging.getLogger())
+        if not _configured:
+            atexit.register(_stop_listener)
+        _configured = True
+        _configured_file = config_file
+        return True
+
+
+def flush_logging() -> None:
+    """Wartet, bis alle eingereihten Records ausgegeben sind (z.B. vor fork() oder in Tests)."""
+    with _CONFIG_LOCK:
+        if _listener is not None:
+            _listener.stop()
+            _listener.start()
+
+
+def log_to_stderr() -> None:
+    """
+    Leitet alle Handler, die auf sys.stdout schreiben, auf sys.stderr um.
+
+    Für den Pipe-Modus, in dem stdout die Daten trägt. Wendet die Konfiguration an,
+    falls das noch nicht geschehen ist.
+    """
+    configure_logging()
+    with _CONFIG_LOCK:
+        handlers = list(_listener.handlers) if _listener is not None else []
+        handlers += logging.getLogger().handlers
+        for handler in handlers:
+            if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+                handler.setStream(sys.stderr)
+
+
+class _ParentDispatchHandler(logging.Handler):
+    """Gibt Records aus Worker-Prozessen an den gleichnamigen Logger im Elternprozess weiter."""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+        return True
+
+
+# Listener für Worker-Queues, pro Queue
+_worker_listeners = {}
+
+
+def create_worker_log_queue(context=None):
+    """
+    Erzeugt eine Queue für die Logs von Worker-Prozessen und startet den Listener im Elternprozess.
+
+    Args:
+        context: Optional. multiprocessing-Kontext (z.B. multiprocessing.get_context("spawn"))
+
+    Returns:
+        Die Queue, die an configure_worker_logging() im Worker übergeben wird
+
+    Example:
+        >>> log_queue = create_worker_log_queue()
+        >>> with Pool(4, initializer=configure_worker_logging, initargs=(log_queue,)) as pool:
+        ...     pool.map(work, items)
+        >>> stop_worker_log_queue(log_queue)
+    """
+    import multiprocessing
+    configure_logging()
+    log_queue = (context or multiprocessing).Queue()
+    listener = logging.handlers.QueueListener(log_queue, _ParentDispatchHandler())
+    listener.start()
+    _worker_listeners[id(log_queue)] = listener
+    return log_queue
+
+
+def stop_worker_log_queue(log_queue) -> None:
+    """Beendet den Listener einer Worker-Queue, nachdem alle Worker fertig sind."""
+    listener = _worker_listeners.pop(id(log_queue), None)
+    if listener is not None:
+        listener.stop()
+
+
+def configure_worker_logging(log_queue, level: int = logging.INFO) -> None:
+    """
+    Konfiguriert das Logging in einem Worker-Prozess: alle Records gehen in die Queue des Elternprozesses.
+
+    Records unterhalb von level werden schon im Worker verworfen und nicht formatiert.
+
+    Args:
+        log_queue: Queue aus create_worker_log_queue()
+        level: Log-Level im Worker
+    """
+    global _configured, _listener
+    with _CONFIG_LOCK:
+        # Bei fork() erbt der Worker Handler und Listener-Zustand des Elternprozesses, der Thread läuft hier aber nicht
+        _listener = None
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(level)
+        _configured = True
+
+
 def getSlubLogger(name: str, config_file: Optional[Path] = None) -> logging.Logger:
     """
     Erstellt und konfiguriert einen Logger für SLUB-Anwendungen.
     
     Verwende immer explizite, aussagekräftige Namen für Logger, NICHT __name__.
     Empfohlen ist ein hierarchisches Benennungsschema wie 'appname.module.submodule'.
+    Die Konfiguration wird nur beim ersten Aufruf im Prozess (bzw. für eine neue
+    Konfigurationsdatei) angewendet, siehe configure_logging().
     
     Args:
         name: Name des Loggers (expliziter Name, NICHT __name__)
@@ -97,11 +273,9 @@ def getSlubLogger(name: str, config_file: Optional[Path] = None) -> logging.Logg
         logging.Logger: Die konfigurierte Logger-Instanz.
     """
     try:
-        # Lade die Logging-Konfiguration und wende sie an
-        config = load_logging_config(config_file)
-        logging.config.dictConfig(config)
+        if configure_logging(config_file):
+            logging.getLogger('help.slublogging').debug("Logging konfiguriert (Logger '%s')", name)
         logger = logging.getLogger(name)
-        logger.debug(f"Logger '{name}' wurde erfolgreich konfiguriert")
     except Exception as e:
         # Im Fehlerfall: Fallback-Konfiguration, aber vermeide doppelte Handler
         logger = logging.getLogger(name)
@@ -114,4 +288,4 @@ def getSlubLogger(name: str, config_file: Optional[Path] = None) -> logging.Logg
             logger.addHandler(handler)
         logger.setLevel(logging.INFO)
         logger.warning(f"Fehler beim Konfigurieren des Loggers: {str(e)}. Verwende Basic-Konfiguration.")
-    return logger 
\ No newline at end of file
+    return logger
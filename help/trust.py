@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Vertrauensmodus: bekannte Eingaben ohne volle Validierung ausgeben, nur eine Stichprobe prüfen.
+
+Bei Eingaben, die schon einmal vollständig geprüft wurden (Wiederholungsläufe, Staging nach
+Produktion), kostet die Validierung einen großen Teil der Rechenzeit: Pydantic mit
+validate_default und extra="forbid", die LinkML-Dataclass mit __post_init__ und danach
+model_dump() für die Ausgabe. Mit TrustPolicy entstehen für die meisten Records keine
+Modelle, sondern TrustedDocument-Objekte, die das JSON direkt aus den Feldwerten des
+Konverters schreiben, in derselben Form wie _pydantic_json() bzw. _dataclass_json().
+
+Voll validiert (wie ohne Vertrauensmodus) werden:
+- eine zufällige Stichprobe, im Mittel jeder sample_rate-te Record
+- jeder verdächtige Record: ein Pflichtfeld fehlt oder ist leer, oder der Konverter liefert
+  ein Feld, das das Modell nicht kennt
+
+Für die Stichprobe wird zusätzlich geprüft, ob das direkt geschriebene JSON dem validierten
+entspricht (z.B. keine Typumwandlung durch Pydantic). Fehler und Abweichungen erscheinen in
+der Zusammenfassung am Ende des Laufs, hochgerechnet auf die ungeprüften Records.
+"""
+
+import dataclasses
+import json
+import random
+from typing import Any, Dict, Optional, Type
+
+from help.slublogging import getSlubLogger
+
+DEFAULT_SAMPLE_RATE = 1000
+
+# Gründe für eine volle Validierung
+SAMPLED = "stichprobe"
+SUSPICIOUS = "verdächtig"
+
+
+def _dataclass_fields(dataclass_class: Type) -> tuple:
+    """Feldreihenfolge der Dataclass-Ausgabe (YAMLRoot-Dataclass oder schlanke Klasse mit __slots__)."""
+    if dataclasses.is_dataclass(dataclass_class):
+        return tuple(field.name for field in dataclasses.fields(dataclass_class))
+    return tuple(dataclass_class.__slots__)
+
+
+class TrustedDocument:
+    """Ungeprüftes Dokument: die Feldwerte aus dem Konverter und die Reihenfolge der Ausgaben."""
+
+    __slots__ = ("values", "policy")
+
+    def __init__(self, values: Dict[str, Any], policy: "TrustPolicy"):
+        self.values = values
+        self.policy = policy
+
+    @property
+    def id(self) -> Optional[str]:
+        return self.values.get("id")
+
+    def pydantic_json(self) -> str:
+        """JSON-Zeile wie _pydantic_json(): ohne None-Werte, Standardwerte und leere Listen."""
+        values = self.values
+        defaults = self.policy.pydantic_defaults
+        cleaned = {}
+        for name in self.policy.pydantic_fields:
+            value = values.get(name)
+            if value is None or value == [] or (name in defaults and value == defaults[name]):
+                continue
+            cleaned[name] = value
+        return json.dumps(cleaned, ensure_ascii=False) + '\n'
+
+    def dataclass_json(self) -> str:
+        """JSON-Zeile wie _dataclass_json(): ohne None-Werte und leere Listen."""
+        values = self.values
+        cleaned = {}
+        for name in self.policy.dataclass_fields:
+            value = values.get(name)
+            if value is not None and value != []:
+                cleaned[name] = value
+        return json.dumps(cleaned, ensure_ascii=False) + '\n'
+
+
+class TrustPolicy:
+    """
+    Entscheidet pro Record, ob er voll validiert wird, und zählt die Ergebnisse der Stichprobe.
+
+    Example:
+        >>> trust = TrustPolicy(PydanticFinc, DataclassFinc, sample_rate=1000)
+        >>> reason = trust.validation_reason(values)
+        >>> if reason is None:
+        ...     document = trust.document(values)
+        ... else:
+        ...     model = PydanticFinc(**values)
+        ...     trust.observe(reason, values, model)
+    """
+
+    def __init__(self, pydantic_class: Type, dataclass_class: Type, sample_rate: int = DEFAULT_SAMPLE_RATE,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            pydantic_class: Pydantic-Modell, aus dem Pflichtfelder, Standardwerte und Reihenfolge stammen
+            dataclass_class: Dataclass (oder schlanke Klasse) für die Reihenfolge der Dataclass-Ausgabe
+            sample_rate: Optional. Im Mittel jeden so vielten Record voll validieren; 0 = keine Stichprobe
+            seed: Optional. Startwert des Zufallsgenerators für reproduzierbare Stichproben
+
+        Raises:
+            ValueError: Bei negativer sample_rate
+        """
+        if sample_rate < 0:
+            raise ValueError(f"Stichprobenrate darf nicht negativ sein: {sample_rate}")
+        self.log = getSlubLogger('help.trust')
+        self.sample_rate = sample_rate
+        self._random = random.Random(seed)
+        fields = pydantic_class.model_fields
+        self.pydantic_fields = tuple(fields)
+        self.required = tuple(name for name, field in fields.items() if field.is_required())
+        self.known = frozenset(fields)
+        self.pydantic_defaults = {}
+        for name, field in fields.items():
+            if field.is_required():
+                continue
+            default = field.get_default(call_default_factory=True)
+            if default is not None:
+                self.pydantic_defaults[name] = default
+        self.dataclass_fields = _dataclass_fields(dataclass_class)
+        self.trusted = 0
+        self.validated = {SAMPLED: 0, SUSPICIOUS: 0}
+        self.failed = {SAMPLED: 0, SUSPICIOUS: 0}
+        self.mismatched = 0
+
+    def validation_reason(self, values: Dict[str, Any]) -> Optional[str]:
+        """
+        Prüft, ob ein Record voll validiert werden muss.
+
+        Returns:
+            SUSPICIOUS, SAMPLED oder None, wenn der Record ungeprüft ausgegeben werden kann
+        """
+        for name in self.required:
+            value = values.get(name)
+            if value is None or value == "" or value == []:
+                return SUSPICIOUS
+        if not self.known.issuperset(values):
+            return SUSPICIOUS
+        if self.sample_rate and self._random.random() * self.sample_rate < 1:
+            return SAMPLED
+        self.trusted += 1
+        return None
+
+    def document(self, values: Dict[str, Any]) -> TrustedDocument:
+        return TrustedDocument(values, self)
+
+    def observe(self, reason: str, values: Dict[str, Any], model=None, serialize=None) -> None:
+        """
+        Erfasst das Ergebnis der vollen Validierung eines Records.
+
+        Args:
+            reason: Rückgabe von validation_reason()
+            values: Feldwerte des Records
+            model: Optional. Das validierte Pydantic-Modell; None, wenn die Validierung fehlschlug
+            serialize: Optional. Serialisierung des Modells (z.B. _pydantic_json); für Records der
+                       Stichprobe wird damit geprüft, ob die direkte Ausgabe dasselbe JSON liefert
+        """
+        self.validated[reason] += 1
+        if model is None:
+            self.failed[reason] += 1
+        elif reason == SAMPLED and serialize is not None and serialize(model) != self.document(values).pydantic_json():
+            self.failed[reason] += 1
+            self.mismatched += 1
+
+    def log_summary(self) -> None:
+        sampled, failed = self.validated[SAMPLED], self.failed[SAMPLED]
+        self.log.info(f"Vertrauensmodus: {self.trusted} Records ungeprüft, {sampled} in der Stichprobe "
+                      f"(1 von {self.sample_rate or '-'}), {self.validated[SUSPICIOUS]} verdächtig")
+        if self.failed[SUSPICIOUS]:
+            self.log.warning(f"Vertrauensmodus: {self.failed[SUSPICIOUS]} von {self.validated[SUSPICIOUS]} "
+                             f"verdächtigen Records fehlerhaft (nicht ausgegeben)")
+        if failed:
+            estimate = round(self.trusted * failed / sampled)
+            self.log.warning(f"Vertrauensmodus: {failed} von {sampled} Records der Stichprobe fehlerhaft "
+                             f"({self.mismatched} mit abweichendem JSON), hochgerechnet etwa {estimate} "
+                             f"ungeprüft ausgegebene Records betroffen; ohne --trust erneut prüfen")
+        elif sampled:
+            self.log.info("Vertrauensmodus: keine Fehler in der Stichprobe")
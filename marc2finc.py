@@ -1,172 +1,768 @@
 import click
-from pymarc import MARCReader
 import json
+import os
 from pathlib import Path
 import sys
+from typing import NamedTuple, Optional
 
 # Lokale Importe
 from help.marc_utils import MarcUtils
-from help.slublogging import getSlubLogger
+from help.normalize import get_normalizer, shared_normalizers
+from help.memory import (PRESSURE_HARD, PROFILE_MODES, MemoryBudget, MemoryProfiler,
+                         parse_size)
+from help.marc_readers import INPUT_FORMATS, create_marc_reader, detect_input_format
+from help.lazy_marc import ERROR_POLICIES
+from help.error_report import DeadLetterWriter, ErrorReport, MissingFieldError
+from help.allfields import AllFieldsBuilder
+from help.fixed_fields import DEFAULT_BATCH_SIZE
+from help.formats import FormatCalculator
+from help.fullrecord import full_record
+from help.authors import AuthorExtractor
+from help.compact import CompactModelView, StringPool, compact_class_for
+from help.dedup import DEDUP_KEYS, DEDUP_POLICIES, DEDUP_STORES, RecordDeduplicator
+from help.hierarchy import HierarchyIndex
+from help.id_filter import IdFilter
+from help import serve as service
+from help.sort_keys import get_sort_keys
+from help.diff_store import DiffStore
+from help.trust import DEFAULT_SAMPLE_RATE, TrustedDocument, TrustPolicy
+from help.shards import SHARD_ROUTERS, OutputLayout, write_manifest
+from help.pipe import DEFAULT_FLUSH_EVERY, DEFAULT_FLUSH_SECONDS, JsonLinesWriter, is_stdio, open_source
+from help.slublogging import getSlubLogger, log_to_stderr
 from help.linkml_generator import generate_models_from_schema
 
-def process_marc_files(sourcefile, targetfile=None, models=None):
+# Feldspezifikationen werden einmal beim Import zerlegt, nicht pro Record
+TOPIC_SPECS = MarcUtils.parse_complex_field_spec(
+    "600abcdefghjklmnopqrstuvxyz:610abcdefghklmnoprstuvxyz:611acdefghjklnpqstuvxyz:630adefghklmnoprstvxyz:"
+    "650abcdevxyz:689agxz:655abvxyz:651avxyz:648avxyz:970de:937abc:653a"
+)
+ISBN_SPECS = MarcUtils.parse_complex_field_spec("020a:772z:773z")
+AUTHOR_EXTRACTOR = AuthorExtractor()
+# allfields = custom, getAllSearchableFieldsAsSet(100, 900)
+ALLFIELDS_BUILDER = AllFieldsBuilder(100, 900)
+# format/format_finc/format_de14 = custom(info.finc.FormatCalculator), formatCalculator
+FORMAT_CALCULATOR = FormatCalculator()
+
+
+def _output_base(targetfile):
+    """Liefert den Basispfad der Ausgabedateien (Zielpfad ohne Erweiterung)."""
+    output_path = Path(targetfile)
+    return output_path.parent / output_path.stem
+
+
+def _control_field(record, tag):
+    """Liefert den Inhalt eines Kontrollfelds oder None, wenn es fehlt."""
+    field = record.get(tag)
+    return field.data if field is not None else None
+
+
+class _ReadState(NamedTuple):
+    """Zustand des Lesers direkt nach einem Record; bleibt beim Vorauslesen eines Stapels gültig."""
+    reader: object
+    current_chunk: Optional[bytes]
+    current_exception: Optional[Exception]
+    # Bis hierher in der Quelldatei über die ID-Listen verworfene Records
+    dropped: int = 0
+
+
+def _raw_marc(reader, record, input_format):
+    """
+    Liefert die Rohdaten eines Records im ISO-2709-Format für die Dead-Letter-Datei.
+
+    Bei ISO-2709-Quellen sind das die Originalbytes des Lesers (reader oder _ReadState).
+    Bei MARCXML und MARC-in-JSON wird der gelesene Record serialisiert; ist er nicht lesbar,
+    gibt es keine ISO-2709-Darstellung (None).
+    """
+    if input_format == "marc":
+        return reader.current_chunk
+    if record is None:
+        return None
+    try:
+        return record.as_marc()
+    except Exception:
+        return None
+
+
+def _iter_records(sourcefiles, input_format, lazy_decoding, encoding_errors, id_filter=None):
+    """
+    Liefert alle Records aller Quelldateien nacheinander.
+
+    Records, deren 001 in den ID-Listen von id_filter steht, werden übersprungen: bei lazy
+    ISO 2709 schon in den Rohdaten, sonst direkt nach dem Lesen.
+
+    Yields:
+        Tupel (_ReadState, record, input_format, sourcefile); record ist None, wenn der Leser ihn nicht lesen konnte
+    """
+    for sourcefile in sourcefiles:
+        source_format = input_format or detect_input_format(sourcefile)
+        with open_source(sourcefile) as f:
+            reader = create_marc_reader(f, source_format, lazy=lazy_decoding, errors=encoding_errors,
+                                        id_filter=id_filter)
+            raw_filter = source_format == "marc" and lazy_decoding
+            dropped = 0
+            for record in reader:
+                if id_filter is not None and not raw_filter and record is not None and id_filter.drops_record(record):
+                    dropped += 1
+                    continue
+                state = _ReadState(reader, getattr(reader, "current_chunk", None),
+                                   getattr(reader, "current_exception", None),
+                                   reader.dropped if raw_filter else dropped)
+                yield state, record, source_format, sourcefile
+
+
+def _iter_batched(items, fixed_fields=None, batch_size=0):
+    """
+    Liest bei Bedarf stapelweise voraus und schneidet die Zeichenpositionen pro Stapel aus.
+
+    Mit fixed_fields und batch_size > 1 werden batch_size Records gelesen und die
+    Zeichenpositionen des ganzen Stapels mit FixedFieldBatch.extract() ausgeschnitten.
+
+    Yields:
+        Tupel (_ReadState, record, input_format, sourcefile, fixed); fixed ist das Ergebnis für den Record
+        oder None, wenn nicht gestapelt wird
+    """
+    if not fixed_fields or batch_size <= 1:
+        for state, record, source_format, sourcefile in items:
+            yield state, record, source_format, sourcefile, None
+        return
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield from _with_fixed_fields(batch, fixed_fields)
+            batch = []
+    if batch:
+        yield from _with_fixed_fields(batch, fixed_fields)
+
+
+def _with_fixed_fields(batch, fixed_fields):
+    """Hängt an jeden Eintrag eines Stapels die ausgeschnittenen Zeichenpositionen an."""
+    fixed = fixed_fields.extract([record for _, record, _, _ in batch])
+    for (state, record, source_format, sourcefile), values in zip(batch, fixed):
+        yield state, record, source_format, sourcefile, values
+
+
+def map_record(record):
+    """
+    Extrahiert die Finc-Felder aus einem MARC21-Record.
+
+    Args:
+        record: Ein pymarc.Record-Objekt
+
+    Returns:
+        Dictionary mit den Feldwerten für die Finc-Modelle
+
+    Raises:
+        MissingFieldError: Wenn 001 oder 245 fehlen
+    """
+    # PPN als ID verwenden
+    record_id = _control_field(record, '001')
+    if not record_id:
+        raise MissingFieldError('001')
+    id = f"0-{record_id}"
+
+    # title = 245ab, clean, join(": "), first
+    if '245' not in record:
+        raise MissingFieldError('245')
+    titles = MarcUtils.extract_marc_subfields(record, "245ab", join=": ",
+                                              normalizer=get_normalizer(True, (), True, False))
+    # Nur ein Titel sollte verwendet werden, wenn mehrere vorhanden sind (ungewöhnlich)
+    title = titles[0] if titles else ""
+
+    # title_sort = 245abkp, join(" "), titleSortLower
+    title_sort_values = MarcUtils.extract_marc_subfields(record, "245abkp", join=" ")
+    title_sort = get_sort_keys().title(title_sort_values[0], record) if title_sort_values else None
+
+    # multipart_set = 000[19]
+    leader = str(record.leader) if record.leader is not None else ""
+    multipart_set = leader[19:20] or None
+
+    # update_time_str = 005[0-13]
+    update_time_str = (_control_field(record, '005') or "")[:14] or None
+
+    # format, format_finc, format_de14 aus Leader/06-07, 007 und 008
+    formats = FORMAT_CALCULATOR.lookup(record)
+
+    # topic = 600abcdefghjklmnopqrstuvxyz:610abcdefghklmnoprstuvxyz:611acdefghjklnpqstuvxyz:630adefghklmnoprstvxyz:650abcdevxyz:689agxz:655abvxyz:651avxyz:648avxyz:970de:937abc:653a
+    topics = MarcUtils.extract_marc_subfields(record, *TOPIC_SPECS)
+
+    # DEMO: recordtype ist Pflichtfeld und soll String sein!
+    recordtype = "marc"
+
+    # isbn = 020a:772z:773z
+    isbn = MarcUtils.extract_marc_subfields(record, *ISBN_SPECS)
+
+    # isbn liefert eine Liste, ist aber nicht Multi-Valued
+    if isbn and isinstance(isbn, list) and len(isbn) == 1:
+        isbn = isbn[0]
+    else:
+        isbn = None
+
+    # DEMO: ISBN die nicht auf den RegEx passt
+    # isbn = "DIESDAS112"
+
+    # author/author2/author_corporate mit Rollen und author_sort in einem Durchlauf über 100/110/111/700/710/711
+    authors = AUTHOR_EXTRACTOR.extract(record)
+    if authors["author_sort"] is not None:
+        authors["author_sort"] = get_sort_keys().key(authors["author_sort"])
+
+    # title_orig = LNK245ab, join(" : "), first; series_orig = LNK800abc:LNK810abc:LNK811abc (880 über $6)
+    titles_orig = MarcUtils.extract_marc_subfields(record, "LNK245ab", join=" : ")
+    title_orig = titles_orig[0] if titles_orig else None
+    series_orig = MarcUtils.extract_marc_subfields(record, "LNK800abc", "LNK810abc", "LNK811abc", join=" ")
+
+    # fullrecord = FullRecordAsMarc, unverändert aus den Originalbytes
+    fullrecord = full_record(record)
+
+    return {
+        "id": id,
+        "record_id": record_id,
+        "title": title,
+        "title_sort": title_sort,
+        "topic": topics,
+        **authors,
+        "allfields": ALLFIELDS_BUILDER.build(record),
+        "recordtype": recordtype,
+        "isbn": isbn,
+        "multipart_set": multipart_set,
+        "update_time_str": update_time_str,
+        "format": list(formats.format),
+        "format_finc": list(formats.format_finc),
+        "format_de14": list(formats.format_de14),
+        "title_orig": title_orig,
+        "series_orig": series_orig,
+        "fullrecord": fullrecord,
+    }
+
+
+def _pydantic_json(model):
+    """Serialisiert ein Pydantic-Modell für die JSONL-Ausgabe (ohne None-Werte, Standardwerte und leere Listen)."""
+    if isinstance(model, TrustedDocument):
+        return model.pydantic_json()
+    # exclude_none=True entfernt alle None-Werte und exclude_unset=True entfernt ungesetzte Felder
+    model_dict = model.model_dump(exclude_none=True, exclude_defaults=True)
+    # Zusätzlich leere Listen entfernen
+    cleaned_dict = {k: v for k, v in model_dict.items() if not (isinstance(v, list) and len(v) == 0)}
+    return json.dumps(cleaned_dict, ensure_ascii=False) + '\n'
+
+
+def _dataclass_json(model):
+    """Serialisiert ein Dataclass-Modell für die JSONL-Ausgabe (ohne None-Werte und leere Listen)."""
+    if isinstance(model, TrustedDocument):
+        return model.dataclass_json()
+    if hasattr(model, "to_json_dict"):
+        # Schlanke Klasse: generierte Serialisierung ohne Kopie des __dict__
+        cleaned_dict = model.to_json_dict()
+    else:
+        model_dict = model.__dict__.copy()
+        cleaned_dict = {k: v for k, v in model_dict.items() if v is not None and not (isinstance(v, list) and len(v) == 0)}
+    return json.dumps(cleaned_dict, ensure_ascii=False) + '\n'
+
+
+def _clear_caches():
+    """Leert die Caches des Laufs, wenn das Speicherbudget knapp wird."""
+    for normalizer in shared_normalizers():
+        normalizer.clear_cache()
+    get_sort_keys().clear_cache()
+
+
+def process_marc_files(sourcefile, targetfile=None, models=None, input_format=None,
+                       lazy_decoding=True, encoding_errors="replace", deduplicator=None, compact=False,
+                       slotted=False, memory_budget=None, memory_profiler=None, hierarchy=None,
+                       fixed_batch_size=0, id_filter=None, output_stream=None, layout=None, diff_store=None,
+                       trust=None):
     """
     Verarbeite Marc21-Dateien und erstelle Pydantic- und Dataclass-Objekte
     
     Args:
-        sourcefile: Pfad zur MARC21-Quelldatei
+        sourcefile: Pfad zur MARC21-Quelldatei (ISO 2709, MARCXML oder MARC-in-JSON-Zeilen)
+                    oder eine Liste von Pfaden, die nacheinander verarbeitet werden
         targetfile: Optional. Pfad zur JSON-Zieldatei
         models: Optional. Dictionary mit den zu verwendenden Modellklassen
+        input_format: Optional. 'marc', 'xml' oder 'json'. Ohne Angabe wird das Format
+                      anhand der Dateiendung ermittelt.
+        lazy_decoding: Optional. ISO-2709-Felder erst bei Zugriff dekodieren (Standard: True)
+        encoding_errors: Optional. Strategie für ungültige Bytefolgen: 'replace', 'ignore' oder 'strict'
+        deduplicator: Optional. RecordDeduplicator, der Duplikate über alle Quelldateien verwirft
+        compact: Optional. Records kompakt im Speicher halten (StringPool und __slots__ statt Modellobjekten);
+                 die Modellobjekte entstehen erst beim Zugriff
+        slotted: Optional. Statt der YAMLRoot-Dataclass die schlanke Klasse mit __slots__ (SlottedFinc) verwenden
+        memory_budget: Optional. MemoryBudget; unter Speicherdruck werden Caches geleert, die bisherigen Modelle
+                       vorzeitig in die Ausgabedateien geschrieben
+        memory_profiler: Optional. MemoryProfiler, der den Speicher pro Verarbeitungsschritt misst
+        hierarchy: Optional. HierarchyIndex; wird im Vorlauf befüllt und setzt die Felder hierarchy_* und
+                   is_hierarchy_* aus den Verknüpfungen in 773/800/830
+        fixed_batch_size: Optional. Anzahl Records, deren Zeichenpositionen (z.B. 000[19], 005[0-13]) gemeinsam
+                          ausgeschnitten werden (mit NumPy); 0 oder 1 schneidet pro Record aus (Standard: 0)
+        id_filter: Optional. IdFilter; Records, deren 001 in den ID-Listen steht, werden vor dem Parsen
+                   verworfen (wie filterByIDFile im Mapping der id)
+        output_stream: Optional. JsonLinesWriter (Pipe-Modus); jedes Pydantic-Modell wird sofort als JSON-Zeile
+                       geschrieben statt gesammelt, Dataclass-Modelle entfallen. Quelle "-" liest von stdin
+        layout: Optional. OutputLayout; verteilt die Ausgabedateien auf Shards nach der id und/oder rotiert sie
+                nach Größe bzw. Anzahl, die Dateiliste steht dann in <ziel>.shards.json
+        diff_store: Optional. DiffStore; nur neue und seit dem letzten Lauf geänderte Dokumente werden geschrieben,
+                    verschwundene IDs in <ziel>.deletes.txt (bzw. <speicher>.deletes.txt mit output_stream). Der
+                    Speicher wird am Ende eines erfolgreichen Laufs ersetzt
+        trust: Optional. TrustPolicy (Vertrauensmodus); nur die Stichprobe und verdächtige Records werden
+               validiert, die übrigen ohne Modelle als TrustedDocument geschrieben
     
     Returns:
-        Tuple aus (PydanticFinc-Liste, DataclassFinc-Liste)
+        Tuple aus (PydanticFinc-Liste, DataclassFinc-Liste); im kompakten Modus CompactModelView-Objekte,
+        mit trust für ungeprüfte Records TrustedDocument-Objekte.
+        Wurden Modelle wegen des Speicherbudgets vorzeitig geschrieben, enthalten die Listen nur die übrigen,
+        mit output_stream sind beide leer.
+
+    Raises:
+        ValueError: Wenn ein Vorlauf (Hierarchie, Deduplizierung mit last/newest) von stdin lesen soll oder
+                    output_stream mit einem aufteilenden layout kombiniert wird
     """
     log = getSlubLogger('process_marc_files')
-    log.info(f"Verarbeite Datei: {sourcefile}")
+    sourcefiles = [sourcefile] if isinstance(sourcefile, (str, Path)) else list(sourcefile)
+    log.info(f"Verarbeite Datei(en): {', '.join(str(source) for source in sourcefiles)}")
     
     # Wenn keine Modelle übergeben wurden, verwende die Standardmodelle
     if models is None:
         log.info("Keine Modelle übergeben, generiere Modelle aus Schema")
+        if memory_profiler is not None:
+            memory_profiler.start_stage("modelle")
         models = generate_models_from_schema("schema/finc.yaml")
     
+    if input_format is not None:
+        log.info(f"Eingabeformat: {input_format}")
+
+    if layout is None:
+        layout = OutputLayout()
+    if output_stream is not None and layout.split:
+        raise ValueError("Shards und Rotation brauchen Ausgabedateien, nicht stdout (-)")
+
+    # Vorlauf für die Deduplizierung, wenn nicht der erste Record gewinnt, und für den Hierarchieindex
+    dedup_prepass = deduplicator is not None and deduplicator.needs_prepass
+    if (dedup_prepass or hierarchy is not None) and any(is_stdio(source) for source in sourcefiles):
+        raise ValueError("Hierarchien und Deduplizierung mit last/newest lesen die Quellen zweimal, "
+                         "das geht nicht mit stdin (-)")
+    if dedup_prepass or hierarchy is not None:
+        if dedup_prepass:
+            log.info(f"Vorlauf für die Deduplizierung ({deduplicator.policy})")
+        if hierarchy is not None:
+            log.info("Vorlauf für den Hierarchieindex")
+        if memory_profiler is not None:
+            memory_profiler.start_stage("vorlauf")
+        for ordinal, (_, record, _, _) in enumerate(
+                _iter_records(sourcefiles, input_format, lazy_decoding, encoding_errors, id_filter), start=1):
+            if record is not None:
+                if dedup_prepass:
+                    deduplicator.observe(record, ordinal)
+                if hierarchy is not None:
+                    hierarchy.observe(record)
+        if hierarchy is not None:
+            hierarchy.finish()
+
     PydanticFinc = models["PydanticFinc"]
-    DataclassFinc = models["DataclassFinc"]
+    DataclassFinc = models["SlottedFinc"] if slotted else models["DataclassFinc"]
+    # Aus dem Schema erzeugter Konverter; ohne ihn (z.B. bei eigenen Modellen) die handgeschriebene Abbildung
+    convert = models.get("converter", map_record)
+    # Zeichenpositionen stapelweise nur mit NumPy, die Python-Variante schneidet ohnehin pro Record aus
+    fixed_fields = models.get("fixed_fields") if "converter" in models else None
+    if fixed_fields is not None and not fixed_fields.use_numpy:
+        fixed_fields = None
     
     pydantics = []
     dataclasses = []
-    # Marc21 Datei einlesen
-    with open(sourcefile, 'rb') as f:
-        reader = MARCReader(f)
-        
-        # PPN und Titel ausgeben zur Kontrolle
-        for record in reader:
-            log.info(f"PPN: {record['001'].data} - Titel: {record['245']['a']}")
-
-            # PPN als ID verwenden
-            id = f"0-{record['001'].data}"
-            record_id = record['001'].data
-
-            # title = 245ab, clean, join(": "), first
-            titles = MarcUtils.extract_marc_subfields(record, "245ab", join=": ")
-            # Nur ein Titel sollte verwendet werden, wenn mehrere vorhanden sind (ungewöhnlich)
-            title = titles[0] if titles else ""
-            
-            # topic = 600abcdefghjklmnopqrstuvxyz:610abcdefghklmnoprstuvxyz:611acdefghjklnpqstuvxyz:630adefghklmnoprstvxyz:650abcdevxyz:689agxz:655abvxyz:651avxyz:648avxyz:970de:937abc:653a
-            complex_topic_spec = "600abcdefghjklmnopqrstuvxyz:610abcdefghklmnoprstuvxyz:611acdefghjklnpqstuvxyz:630adefghklmnoprstvxyz:650abcdevxyz:689agxz:655abvxyz:651avxyz:648avxyz:970de:937abc:653a"
-            
-            # Verwende die parse_complex_field_spec Methode, um die komplexe Spezifikation zu zerlegen
-            topic_specs = MarcUtils.parse_complex_field_spec(complex_topic_spec)
-            
-            log.debug(f"Verarbeite {len(topic_specs)} Themen-Feldspezifikationen")
-            topics = MarcUtils.extract_marc_subfields(record, *topic_specs)
-            log.debug(f"Extrahierte {len(topics)} Themen aus dem Record")
-
-            # DEMO: recordtype ist Pflichtfeld und soll String sein!
-            recordtype = "marc"
-
-            # isbn = 020a:772z:773z
-            complex_isbn_spec = "020a:772z:773z"
-            isbn_specs = MarcUtils.parse_complex_field_spec(complex_isbn_spec)
-            isbn = MarcUtils.extract_marc_subfields(record, *isbn_specs)
-
-            # isbn liefert eine Liste, ist aber nicht Multi-Valued
-            if isbn and isinstance(isbn, list) and len(isbn) == 1:
-                isbn = isbn[0]
-            else:
-                isbn = None
+    if compact:
+        CompactFinc = compact_class_for(PydanticFinc)
+        pool = StringPool()
+    report = ErrorReport()
+    dead_letter = DeadLetterWriter(_output_base(targetfile)) if targetfile else None
+    # Laufende Nummer über alle Quellen (für die Deduplizierung) und innerhalb der aktuellen Quelldatei
+    position = 0
+    source_position = 0
+    current_reader = None
+    # Records, für die wegen eines Fehlers bei der Abbildung keine id bekannt ist
+    unmapped = 0
 
-            # DEMO: ISBN die nicht auf den RegEx passt
-            # isbn = "DIESDAS112"
-
-            try:
-                pydantic_record = PydanticFinc(
-                    id=id,
-                    record_id=record_id,
-                    title=title,
-                    topic=topics,
-                    recordtype=recordtype,
-                    isbn=isbn
-                )
-                pydantics.append(pydantic_record)
-            except Exception as e:
-                log.error(f"Pydantic: Fehler beim Erstellen des PydanticFinc Objekts: {e}")
-
-            try:
-                dataclass_record = DataclassFinc(
-                    id=id,
-                    record_id=record_id,
-                    title=title,
-                    topic=topics,
-                    recordtype=recordtype,
-                    isbn=isbn
-                )
-                dataclasses.append(dataclass_record)
-            except Exception as e:
-                log.error(f"Dataclass: Fehler beim Erstellen des Dataclass Finc Objekts: {e}")
-
-    # Anschließende Ausgabe oder Verarbeitung der erstellten Objekte, z.B. als JSON speichern
+    # Ausgabedateien werden erst geöffnet, wenn geschrieben wird (am Ende oder vorzeitig wegen des Speicherbudgets)
+    outputs = []
+    written = [0, 0]
     if targetfile:
         output_path = Path(targetfile)
-        # Stelle sicher, dass der Zielordner existiert
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
         # Extrahiere den Basisnamen ohne Erweiterung
         base_name = output_path.stem
         base_dir = output_path.parent
-
         # Erzeuge die Dateinamen für die Ausgabedateien
         pydantic_file = base_dir / f"{base_name}.pydantic.jsonl"
         dataclass_file = base_dir / f"{base_name}.dataclass.jsonl"
-        
-        log.info(f"Speichere Pydantic-Modelle in {pydantic_file}")
-        log.info(f"Speichere Dataclass-Modelle in {dataclass_file}")
-        
+
+    def write_models(release=True):
+        """Schreibt die bisher erzeugten Modelle in die Ausgabedateien; mit release werden die Listen geleert."""
+        if not outputs:
+            # Stelle sicher, dass der Zielordner existiert
+            base_dir.mkdir(parents=True, exist_ok=True)
+            if layout.split:
+                log.info(f"Verteile die Ausgabe nach {base_dir}: {layout.describe()}")
+            else:
+                log.info(f"Speichere Pydantic-Modelle in {pydantic_file}")
+                log.info(f"Speichere Dataclass-Modelle in {dataclass_file}")
+            # Ein gepufferter Writer pro Shard; ohne Aufteilung genau die beiden Dateien von oben
+            outputs.extend((layout.open(base_dir, base_name, "pydantic"), layout.open(base_dir, base_name, "dataclass")))
+        pydantic_out, dataclass_out = outputs
+        # Speichere die Modelle im JsonL-Format (ein JSON pro Zeile)
+        for model in (CompactModelView(pydantics, PydanticFinc) if compact else pydantics):
+            pydantic_out.write(model.id, _pydantic_json(model))
+        for model in (CompactModelView(dataclasses, DataclassFinc) if compact else dataclasses):
+            dataclass_out.write(model.id, _dataclass_json(model))
+        written[0] += len(pydantics)
+        written[1] += len(dataclasses)
+        if release:
+            pydantics.clear()
+            dataclasses.clear()
+
+    if memory_profiler is not None:
+        memory_profiler.start_stage("konvertierung")
+    # Marc21 Dateien einlesen (ISO 2709, MARCXML oder MARC-in-JSON werden gestreamt)
+    if id_filter is not None:
+        # Im Vorlauf gezählte Records nicht doppelt ausweisen
+        id_filter.reset_counts()
+    records = _iter_records(sourcefiles, input_format, lazy_decoding, encoding_errors, id_filter)
+    for state, record, source_format, sourcefile, fixed in _iter_batched(records, fixed_fields, fixed_batch_size):
+        position += 1
+        if state.reader is not current_reader:
+            # Neue Quelldatei (jede Datei hat ihren eigenen Leser)
+            current_reader = state.reader
+            source_position = 0
+        source_position += 1
+        reasons = []
+        record_id = None
+
+        if memory_profiler is not None:
+            memory_profiler.sample()
+        if memory_budget is not None and memory_budget.due():
+            pressure = memory_budget.check()
+            if pressure:
+                pressure = memory_budget.relieve(_clear_caches)
+            if pressure == PRESSURE_HARD and targetfile:
+                log.info("Speicherbudget erreicht, schreibe %d Modelle vorzeitig", len(pydantics))
+                write_models()
+                pressure = memory_budget.flushed()
+            if pressure == PRESSURE_HARD:
+                # Einziger Thread: Warten würde keinen Speicher freigeben
+                memory_budget.overrun()
+
+        if record is None:
+            # Record konnte vom Leser nicht gelesen werden
+            reasons = report.add("reader", state.current_exception)
+        elif deduplicator is not None and not deduplicator.accept(record, position):
+            # Duplikat aus einer früheren (oder späteren) Quelle
+            continue
+        else:
+            try:
+                values = convert(record) if fixed is None else convert(record, fixed)
+                record_id = values["record_id"]
+                if hierarchy is not None:
+                    values.update(hierarchy.resolve(record_id))
+            except Exception as e:
+                record_id = _control_field(record, '001')
+                reasons = report.add("mapping", e, record_id)
+                unmapped += 1
+            else:
+                # PPN und Titel ausgeben zur Kontrolle
+                log.debug("PPN: %s - Titel: %s", record_id, values["title"])
+
+                # Vertrauensmodus: Records außerhalb der Stichprobe ohne Modelle direkt aus den Feldwerten
+                trust_reason = trust.validation_reason(values) if trust is not None else None
+                if trust is not None and trust_reason is None:
+                    document = trust.document(values)
+                    if output_stream is not None or diff_store is not None:
+                        line = document.pydantic_json()
+                        if diff_store is not None and not diff_store.check(document.id, line.encode("utf-8")):
+                            continue
+                    if output_stream is not None:
+                        output_stream.write(line)
+                    else:
+                        # Im kompakten Modus entstehen die Modelle erst bei der Ausgabe (und werden dann validiert)
+                        document = CompactFinc.from_values(values, pool) if compact else document
+                        pydantics.append(document)
+                        dataclasses.append(document)
+                elif output_stream is not None:
+                    # Pipe-Modus: sofort schreiben, nichts sammeln
+                    try:
+                        model = PydanticFinc(**values)
+                    except Exception as e:
+                        reasons.extend(report.add("pydantic", e, record_id))
+                        if trust_reason is not None:
+                            trust.observe(trust_reason, values)
+                        if diff_store is not None:
+                            diff_store.keep(values.get("id"))
+                    else:
+                        if trust_reason is not None:
+                            trust.observe(trust_reason, values, model, _pydantic_json)
+                        line = _pydantic_json(model)
+                        if diff_store is None or diff_store.check(model.id, line.encode("utf-8")):
+                            output_stream.write(line)
+                else:
+                    # Im kompakten Modus werden die Modelle nur zur Validierung erzeugt
+                    compact_record = CompactFinc.from_values(values, pool) if compact else None
+
+                    try:
+                        model = PydanticFinc(**values)
+                    except Exception as e:
+                        reasons.extend(report.add("pydantic", e, record_id))
+                        if trust_reason is not None:
+                            trust.observe(trust_reason, values)
+                        if diff_store is not None:
+                            # Das Dokument aus dem letzten Lauf bleibt im Index
+                            diff_store.keep(values.get("id"))
+                    else:
+                        if trust_reason is not None:
+                            trust.observe(trust_reason, values, model, _pydantic_json)
+                        if diff_store is not None and not diff_store.check(model.id,
+                                                                           _pydantic_json(model).encode("utf-8")):
+                            # Unverändert seit dem letzten Lauf: weder schreiben noch als Dataclass validieren
+                            continue
+                        pydantics.append(model if compact_record is None else compact_record)
+
+                    try:
+                        model = DataclassFinc(**values)
+                        dataclasses.append(model if compact_record is None else compact_record)
+                    except Exception as e:
+                        reasons.extend(report.add("dataclass", e, record_id))
+
+        if reasons:
+            report.failed_records += 1
+            if dead_letter is not None:
+                # Position in der Quelldatei, einschließlich der über die ID-Listen verworfenen Records
+                dead_letter.write(_raw_marc(state, record, source_format), source_position + state.dropped,
+                                  record_id, reasons, sourcefile)
+
+    if memory_profiler is not None:
+        memory_profiler.end_stage()
+    if dead_letter is not None:
+        dead_letter.close()
+    report.log_summary()
+    if trust is not None:
+        trust.log_summary()
+    if diff_store is not None:
+        if unmapped:
+            log.warning(f"{unmapped} Records ohne id (Fehler bei der Abbildung); ihre Dokumente aus dem letzten Lauf "
+                        f"gelten als gelöscht")
+    if deduplicator is not None:
+        deduplicator.log_summary()
+    if hierarchy is not None:
+        hierarchy.log_summary()
+    if id_filter is not None:
+        id_filter.log_summary()
+    for normalizer in shared_normalizers():
+        stats = normalizer.stats()
+        if stats["hits"] or stats["misses"]:
+            log.info(f"Normalisierung {normalizer!r}: {stats['size']} Werte im Cache, "
+                     f"Trefferquote {stats['hit_rate']:.1%}")
+    stats = get_sort_keys().stats()
+    if stats["hits"] or stats["misses"]:
+        log.info(f"Sortierschlüssel: {stats['size']} Werte im Cache, Trefferquote {stats['hit_rate']:.1%}")
+    if compact:
+        log.info(f"Kompakter Modus: {len(pool)} Werte im StringPool, Trefferquote {pool.hit_rate:.1%}")
+    if diff_store is not None and not targetfile:
+        if output_stream is not None:
+            # Nur was beim Leser angekommen ist, zählt für den nächsten Lauf
+            output_stream.flush()
+        diff_store.commit(Path(f"{diff_store.path}.deletes.txt"))
+        diff_store.log_summary()
+
+    # Anschließende Ausgabe oder Verarbeitung der erstellten Objekte, z.B. als JSON speichern
+    if targetfile:
+        if memory_profiler is not None:
+            memory_profiler.start_stage("ausgabe")
         try:
-            # Speichere Pydantic-Modelle im JsonL-Format (ein JSON pro Zeile)
-            with open(pydantic_file, 'w', encoding='utf-8') as f:
-                for model in pydantics:
-                    # exclude_none=True entfernt alle None-Werte und exclude_unset=True entfernt ungesetzte Felder
-                    model_dict = model.model_dump(exclude_none=True, exclude_defaults=True)
-                    # Zusätzlich leere Listen entfernen
-                    cleaned_dict = {k: v for k, v in model_dict.items() if not (isinstance(v, list) and len(v) == 0)}
-                    f.write(json.dumps(cleaned_dict, ensure_ascii=False) + '\n')
-            
-            # Speichere Dataclass-Modelle im JsonL-Format (ein JSON pro Zeile)
-            with open(dataclass_file, 'w', encoding='utf-8') as f:
-                for model in dataclasses:
-                    # Konvertiere Dataclass in Dict und entferne None-Werte und leere Listen
-                    model_dict = model.__dict__.copy()
-                    cleaned_dict = {k: v for k, v in model_dict.items() if v is not None and not (isinstance(v, list) and len(v) == 0)}
-                    f.write(json.dumps(cleaned_dict, ensure_ascii=False) + '\n')
-            
-            log.info(f"Ergebnisse erfolgreich gespeichert: {len(pydantics)} Pydantic-Modelle, {len(dataclasses)} Dataclass-Modelle")
+            write_models(release=False)
+            log.info(f"Ergebnisse erfolgreich gespeichert: {written[0]} Pydantic-Modelle, {written[1]} Dataclass-Modelle")
+            if layout.split:
+                for output in outputs:
+                    output.close()
+                write_manifest(base_dir / f"{base_name}.shards.json", layout, outputs)
+            if diff_store is not None:
+                # Erst wenn alle Dokumente geschrieben sind, wird der Speicher des letzten Laufs ersetzt
+                diff_store.commit(base_dir / f"{base_name}.deletes.txt")
+                diff_store.log_summary()
+
+            # Aggregierten Fehlerbericht neben die Dead-Letter-Dateien legen
+            if report.failed_records:
+                error_file = base_dir / f"{base_name}.errors.json"
+                report.write(error_file)
+                log.warning(f"Fehlerbericht in {error_file} gespeichert, "
+                            f"{dead_letter.count} fehlerhafte Records in {dead_letter.marc_path}")
         except Exception as e:
             log.error(f"Fehler beim Speichern der Ergebnisse: {e}")
+        finally:
+            for output in outputs:
+                output.close()
+        if memory_profiler is not None:
+            memory_profiler.end_stage()
+
+    if memory_budget is not None:
+        memory_budget.log_summary()
+    if memory_profiler is not None:
+        memory_profiler.log_summary()
+    if compact:
+        pydantics = CompactModelView(pydantics, PydanticFinc)
+        dataclasses = CompactModelView(dataclasses, DataclassFinc)
     
     return pydantics, dataclasses
 
 @click.command()
-@click.option('-s', '--source', required=True, help='Pfad zur MARC21 Quelldatei')
-@click.option('-t', '--target', required=True, help='Pfad zur Ausgabedatei (ohne Erweiterung)')
+@click.option('-s', '--source', multiple=True,
+              help='Pfad zur MARC21 Quelldatei oder - für stdin (mehrfach angebbar, die Dateien werden '
+                   'nacheinander verarbeitet); Pflicht außer mit --serve')
+@click.option('-t', '--target', help='Pfad zur Ausgabedatei (ohne Erweiterung) oder - für JSON-Zeilen nach stdout; '
+                                     'Pflicht außer mit --serve')
 @click.option('--schema', default='schema/finc.yaml', help='Pfad zum LinkML-Schema (default: schema/finc.yaml)')
-def main(source, target, schema):
+@click.option('--input-format', type=click.Choice(('auto',) + INPUT_FORMATS), default='auto',
+              help='Format der Quelldatei: marc (ISO 2709), xml (MARCXML), json (MARC-in-JSON-Zeilen) oder auto (nach Dateiendung)')
+@click.option('--eager-decoding', is_flag=True, default=False,
+              help='Alle Felder sofort mit pymarc dekodieren statt erst bei Zugriff (nur ISO 2709)')
+@click.option('--encoding-errors', type=click.Choice(ERROR_POLICIES), default='replace',
+              help='Behandlung ungültiger Bytefolgen beim Dekodieren (default: replace)')
+@click.option('--dedup', 'dedup_keys', type=click.Choice(DEDUP_KEYS), multiple=True,
+              help='Duplikate über alle Quelldateien anhand von 001 (id) und/oder ISBN (isbn) verwerfen (mehrfach angebbar)')
+@click.option('--dedup-policy', type=click.Choice(DEDUP_POLICIES), default='first',
+              help='Welcher Record bei Duplikaten gewinnt: first, last oder newest (jüngstes 005) (default: first)')
+@click.option('--dedup-store', type=click.Choice(DEDUP_STORES), default='hash',
+              help='Speicher für gesehene Schlüssel: hash (im Speicher) oder bloom (Bloom-Filter auf Festplatte, nur first)')
+@click.option('--dedup-expected', type=int, default=1_000_000,
+              help='Erwartete Anzahl an Schlüsseln für die Deduplizierung (default: 1000000)')
+@click.option('--compact', is_flag=True,
+              help='Records kompakt im Speicher halten (StringPool, __slots__), Modelle erst bei der Ausgabe erzeugen')
+@click.option('--slotted', is_flag=True,
+              help='Schlanke Klasse mit __slots__ statt der YAMLRoot-Dataclass für die Dataclass-Ausgabe verwenden')
+@click.option('--max-memory', default=None,
+              help='Speicherbudget (RSS) wie 2G oder 512M; unter Druck werden Caches geleert, Modelle vorzeitig '
+                   'geschrieben')
+@click.option('--memory-check-interval', type=click.IntRange(min=1), default=1000,
+              help='Anzahl Records zwischen zwei Prüfungen des Speicherbudgets bzw. Messungen (default: 1000)')
+@click.option('--memory-profile', type=click.Choice(PROFILE_MODES), default=None,
+              help='Speicher pro Verarbeitungsschritt messen: rss oder tracemalloc (zusätzlich Python-Allokationen, langsam)')
+@click.option('--hierarchy', 'resolve_hierarchy', is_flag=True,
+              help='Hierarchien über 773/800/830 in einem Vorlauf indexieren und hierarchy_* / is_hierarchy_* setzen')
+@click.option('--hierarchy-index', default=None,
+              help='Pfad zur SQLite-Datei des Hierarchieindex (default: temporäre Datei, wird danach gelöscht)')
+@click.option('--fixed-batch', 'fixed_batch_size', type=click.IntRange(min=0), default=0,
+              help=f'Zeichenpositionen aus Leader/Kontrollfeldern für so viele Records gemeinsam mit NumPy '
+                   f'ausschneiden, z.B. {DEFAULT_BATCH_SIZE} (default: 0 = pro Record)')
+@click.option('--suppress-ids', 'suppress_ids', multiple=True, type=click.Path(exists=True, dir_okay=False),
+              help='ID-Liste (CSV, 001 in der ersten Spalte); Records mit diesen IDs werden vor dem Parsen verworfen '
+                   '(mehrfach angebbar, wie filterByIDFile)')
+@click.option('--suppress-ids-cache', default=None, type=click.Path(file_okay=False),
+              help='Ordner für den Cache der ID-Listen (default: Ordner der ersten Liste)')
+@click.option('--serve', 'serve_mode', is_flag=True,
+              help='Statt Dateien zu konvertieren als HTTP-Dienst laufen: POST /convert, GET /metrics')
+@click.option('--host', default=service.DEFAULT_HOST, help=f'Adresse des Dienstes (default: {service.DEFAULT_HOST})')
+@click.option('--port', type=click.IntRange(min=0, max=65535), default=service.DEFAULT_PORT,
+              help=f'Port des Dienstes (default: {service.DEFAULT_PORT})')
+@click.option('--workers', type=click.IntRange(min=0), default=service.DEFAULT_WORKERS,
+              help=f'Arbeitsprozesse des Dienstes, 0 = im Sammelthread (default: {service.DEFAULT_WORKERS})')
+@click.option('--batch-size', type=click.IntRange(min=1), default=service.DEFAULT_BATCH_SIZE,
+              help=f'Höchstzahl Anfragen pro Stapel im Dienst (default: {service.DEFAULT_BATCH_SIZE})')
+@click.option('--batch-wait', type=click.FloatRange(min=0), default=service.DEFAULT_BATCH_WAIT * 1000,
+              help=f'Millisekunden, die der Dienst auf weitere Anfragen für einen Stapel wartet '
+                   f'(default: {service.DEFAULT_BATCH_WAIT * 1000:g})')
+@click.option('--flush-every', type=click.IntRange(min=0), default=DEFAULT_FLUSH_EVERY,
+              help=f'Mit -t -: stdout nach so vielen JSON-Zeilen leeren, 0 = nur nach Zeit '
+                   f'(default: {DEFAULT_FLUSH_EVERY})')
+@click.option('--flush-seconds', type=click.FloatRange(min=0), default=DEFAULT_FLUSH_SECONDS,
+              help='Mit -t -: stdout spätestens nach so vielen Sekunden leeren, 0 = nur nach Anzahl (default: 0)')
+@click.option('--diff-store', 'diff_store_path', default=None, type=click.Path(dir_okay=False),
+              help='Speicher mit den Hashes des letzten Laufs; nur neue und geänderte Dokumente schreiben, '
+                   'verschwundene IDs in <ziel>.deletes.txt')
+@click.option('--trust', 'trusted', is_flag=True,
+              help='Vertrauensmodus für schon geprüfte Eingaben: nur eine Stichprobe und verdächtige Records '
+                   'validieren, die übrigen direkt ausgeben')
+@click.option('--trust-sample', type=click.IntRange(min=0), default=DEFAULT_SAMPLE_RATE,
+              help=f'Mit --trust im Mittel jeden so vielten Record voll validieren, 0 = keine Stichprobe '
+                   f'(default: {DEFAULT_SAMPLE_RATE})')
+@click.option('--shards', type=click.IntRange(min=1), default=1,
+              help='Ausgabe nach dem Hash der id auf so viele Dateien verteilen (default: 1)')
+@click.option('--shard-router', type=click.Choice(SHARD_ROUTERS), default='hash',
+              help='hash (MurmurHash3 modulo N) oder solr (Hash-Bereiche wie der compositeId-Router) (default: hash)')
+@click.option('--rotate-size', default=None,
+              help='Neue Ausgabedatei beginnen, bevor eine Datei diese Größe überschreitet, z.B. 512M')
+@click.option('--rotate-records', type=click.IntRange(min=0), default=0,
+              help='Neue Ausgabedatei nach so vielen Records beginnen, 0 = keine Grenze (default: 0)')
+def main(source, target, schema, input_format, eager_decoding, encoding_errors,
+         dedup_keys, dedup_policy, dedup_store, dedup_expected, compact, slotted,
+         max_memory, memory_check_interval, memory_profile, resolve_hierarchy, hierarchy_index, fixed_batch_size,
+         suppress_ids, suppress_ids_cache, serve_mode, host, port, workers, batch_size, batch_wait,
+         flush_every, flush_seconds, diff_store_path, trusted, trust_sample, shards, shard_router, rotate_size, rotate_records):
     """Konvertiere MARC21 zu FINC JSON."""
+    pipe_output = is_stdio(target)
+    if pipe_output:
+        # stdout trägt die JSON-Zeilen, die Logs gehen nach stderr
+        log_to_stderr()
     # Optional: Pfad zur Logging-Konfigurationsdatei angeben, falls gewünscht
     log = getSlubLogger('marc2finc')
+
+    if serve_mode:
+        log.info(f"Schema: {schema}")
+        try:
+            models = generate_models_from_schema(schema)
+            converter = service.RecordConverter(models, _pydantic_json, models.get("converter", map_record),
+                                                lazy_decoding=not eager_decoding, encoding_errors=encoding_errors)
+            service.serve(converter, host=host, port=port, workers=workers, batch_size=batch_size,
+                          batch_wait=batch_wait / 1000)
+        except Exception as e:
+            log.error(f"Fehler im Dienst: {e}")
+            click.echo(f"Fehler: {e}", err=True)
+            sys.exit(1)
+        return
+    if not source or not target:
+        raise click.UsageError("--source und --target sind ohne --serve Pflicht")
     
     sourcefile = source
     targetfile = target
     schema_file = schema
 
-    log.info(f"Quelle: {sourcefile}")
+    log.info(f"Quelle: {', '.join(sourcefile)}")
     log.info(f"Ziel-Basis: {targetfile}")
     log.info(f"Schema: {schema_file}")
+    if input_format == 'auto':
+        input_format = None
     
     # Generiere die Modelle aus dem Schema
+    deduplicator = None
+    memory_profiler = None
+    hierarchy = None
+    output_stream = None
+    diff_store = None
     try:
+        memory_budget = MemoryBudget(parse_size(max_memory), interval=memory_check_interval) if max_memory else None
+        if memory_profile:
+            memory_profiler = MemoryProfiler(memory_profile, sample_interval=memory_check_interval)
+            memory_profiler.start_stage("modelle")
+        if dedup_keys:
+            deduplicator = RecordDeduplicator(dedup_keys, policy=dedup_policy, store=dedup_store,
+                                              expected_keys=dedup_expected)
+        if resolve_hierarchy or hierarchy_index:
+            hierarchy = HierarchyIndex(hierarchy_index)
+        id_filter = IdFilter(suppress_ids, cache_dir=suppress_ids_cache) if suppress_ids else None
+        layout = OutputLayout(shards=shards, router=shard_router,
+                              max_bytes=parse_size(rotate_size) if rotate_size else 0, max_records=rotate_records)
+        if diff_store_path:
+            diff_store = DiffStore(diff_store_path)
         models = generate_models_from_schema(schema_file)
-        process_marc_files(sourcefile, targetfile, models)
-        
+        trust = None
+        if trusted:
+            trust = TrustPolicy(models["PydanticFinc"], models["SlottedFinc" if slotted else "DataclassFinc"],
+                                sample_rate=trust_sample)
+        if pipe_output:
+            output_stream = JsonLinesWriter(sys.stdout.buffer, flush_every=flush_every, flush_seconds=flush_seconds)
+        process_marc_files(list(sourcefile), None if pipe_output else targetfile, models, input_format=input_format,
+                           lazy_decoding=not eager_decoding, encoding_errors=encoding_errors,
+                           deduplicator=deduplicator, compact=compact, slotted=slotted,
+                           memory_budget=memory_budget, memory_profiler=memory_profiler, hierarchy=hierarchy,
+                           fixed_batch_size=fixed_batch_size, id_filter=id_filter, output_stream=output_stream,
+                           layout=layout, diff_store=diff_store, trust=trust)
+        if output_stream is not None:
+            output_stream.close()
+            log.info(f"{output_stream.count} JSON-Zeilen nach stdout geschrieben")
+            return
+
         # Erstelle Dateinamen für die Ausgabe
         output_path = Path(targetfile)
         base_name = output_path.stem
@@ -175,12 +771,29 @@ def main(source, target, schema):
         dataclass_file = base_dir / f"{base_name}.dataclass.jsonl"
         
         click.echo("Verarbeitung abgeschlossen!")
+        if layout.split:
+            click.echo(f"Die Ausgabedateien sind in {base_dir / f'{base_name}.shards.json'} aufgelistet.")
+            return
         click.echo(f"Pydantic-Modelle wurden in {pydantic_file} gespeichert.")
         click.echo(f"Dataclass-Modelle wurden in {dataclass_file} gespeichert.")
+    except BrokenPipeError:
+        # Der Leser hat stdout geschlossen (z.B. head); weitere Ausgaben, auch beim Beenden, ins Leere
+        log.warning("stdout wurde vom Leser geschlossen, Verarbeitung abgebrochen")
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
     except Exception as e:
         log.error(f"Fehler bei der Verarbeitung: {e}")
         click.echo(f"Fehler: {e}", err=True)
         sys.exit(1)
+    finally:
+        if deduplicator is not None:
+            deduplicator.close()
+        if memory_profiler is not None:
+            memory_profiler.close()
+        if hierarchy is not None:
+            hierarchy.close()
+        if diff_store is not None:
+            diff_store.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
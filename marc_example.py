@@ -3,6 +3,8 @@ from typing import Optional, List, Union, Dict
 import re
 from dataclasses import dataclass
 
+from help.linked_fields import LINK_PREFIX, link_index
+
 
 @dataclass
 class SubSpec:
@@ -22,6 +24,7 @@ class MARCSpec:
     char_positions: Optional[List[str]] = None  # Für Positionen wie /0-2
     subfields: Optional[List[str]] = None
     subspecs: Optional[Dict[str, SubSpec]] = None
+    linked: bool = False  # LNK-Präfix: die über $6 verknüpften 880-Felder
 
 
 class MARCSpecParser:
@@ -42,6 +45,11 @@ class MARCSpecParser:
         # Basis-Spec initialisieren
         spec = MARCSpec(field_tag="")
 
+        # LNK-Präfix wie in SolrMarc (z.B. LNK245$a)
+        if spec_string.startswith(LINK_PREFIX) and len(spec_string) > len(LINK_PREFIX) + 2:
+            spec.linked = True
+            spec_string = spec_string[len(LINK_PREFIX):]
+
         # Field Tag extrahieren (obligatorisch)
         field_match = re.match(self.field_tag_pattern, spec_string)
         if not field_match:
@@ -124,8 +132,11 @@ class MARCSpecExecutor:
         spec = self.parser.parse(spec_string)
         results = []
 
-        # Felder holen
-        fields = self.record.get_fields(spec.field_tag)
+        # Felder holen; bei LNK aus dem Index der 880-Felder, der pro Record einmal aufgebaut wird
+        if spec.linked:
+            fields = link_index(self.record).fields(spec.field_tag)
+        else:
+            fields = self.record.get_fields(spec.field_tag)
 
         # Index anwenden
         if spec.index is not None:
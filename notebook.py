@@ -1,23 +1,77 @@
 import marimo
 
-__generated_with = "0.10.19"
+__generated_with = "0.11.13"
 app = marimo.App(width="medium")
 
 
 @app.cell
 def _():
+    import json
+    from pathlib import Path
+
     import marimo as mo
-    from pymarc import MARCReader
 
-    titles = []
+    from help.record_index import ConversionCache, RecordIndex
+    from slubmodels.converter import convert
+    from slubmodels.pydantic_model import Finc
+    return ConversionCache, Finc, Path, RecordIndex, convert, json, mo
+
+
+@app.cell
+def _(mo):
+    marc_path = mo.ui.text(value="samples/output.mrc", label="MARC-Datei (ISO 2709)", full_width=True)
+    query = mo.ui.text(placeholder="Wörter aus dem Titel oder eine 001", label="Suche")
+    page_size = mo.ui.dropdown(["25", "50", "100", "200"], value="50", label="Records pro Seite")
+    mo.vstack([marc_path, mo.hstack([query, page_size], justify="start")])
+    return marc_path, page_size, query
+
+
+@app.cell
+def _(ConversionCache, Finc, Path, RecordIndex, convert, marc_path, mo):
+    # Der Offsetindex liegt neben der Quelldatei und wird nur bei Änderungen neu aufgebaut
+    mo.stop(not Path(marc_path.value).is_file(), mo.callout(f"Datei nicht gefunden: {marc_path.value}", kind="warn"))
+    index = RecordIndex(marc_path.value)
+    # Konvertierungen pro Record-ID, damit das Zurückblättern nichts neu berechnet
+    conversions = ConversionCache(convert, Finc)
+    return conversions, index
+
+
+@app.cell
+def _(index, mo, page_size, query):
+    total = index.count(query.value)
+    size = int(page_size.value)
+    pages = max(1, -(-total // size))
+    # Wird bei jeder neuen Suche neu erzeugt und springt damit auf Seite 1
+    page = mo.ui.number(start=1, stop=pages, value=1, label=f"Seite (von {pages})")
+    mo.hstack([page, mo.md(f"**{total}** Records")], justify="start")
+    return page, pages, size, total
 
-    with open("samples/output.mrc", "rb") as marc_file:
-        reader = MARCReader(marc_file)
 
-        for record in reader:
-            title = record.title
-            mo.output.append(f'Titel: {title}')
-    return MARCReader, marc_file, mo, reader, record, title, titles
+@app.cell
+def _(index, mo, page, query, size):
+    # Nur die Einträge der aktuellen Seite; dekodiert wird erst der ausgewählte Record
+    entries = {entry.n + 1: entry for entry in index.page(int(page.value) - 1, size, query.value)}
+    table = mo.ui.table([{"Nr": number, "ID": entry.id, "Titel": entry.title} for number, entry in entries.items()],
+                        selection="single", pagination=False)
+    table
+    return entries, table
+
+
+@app.cell
+def _(conversions, entries, index, json, mo, table):
+    mo.stop(not entries, mo.md("Keine Treffer."))
+    selected = entries[table.value[0]["Nr"]] if table.value else next(iter(entries.values()))
+    record = index.record(selected)
+    finc = conversions.get(index, selected)
+    mo.vstack([
+        mo.md(f"### {selected.id}: {selected.title or ''}"),
+        mo.hstack([
+            mo.plain_text(str(record)),
+            mo.md(f"```json\n{json.dumps(finc, ensure_ascii=False, indent=2)}\n```"),
+        ], widths="equal", align="start"),
+        mo.md(f"Cache: {len(conversions)} Konvertierungen, {conversions.hits} Treffer, {conversions.misses} neu"),
+    ])
+    return finc, record, selected
 
 
 if __name__ == "__main__":
@@ -0,0 +1,302 @@
+# Auto generated from finc.yaml by help/linkml_generator.py (converter)
+# Schema: finc
+# Schema-Hash: 788cf2bde39671683adb088b5228fb0a74a0978a223a259ae95587b8563c2b3c
+#
+# Nicht von Hand bearbeiten, wird bei Änderungen am Schema neu erzeugt.
+
+from help.allfields import AllFieldsBuilder
+from help.authors import AuthorExtractor
+from help.error_report import MissingFieldError
+from help.fixed_fields import FixedFieldBatch
+from help.formats import FormatCalculator
+from help.fullrecord import full_record
+from help.linked_fields import link_index
+from help.normalize import get_normalizer
+from help.sort_keys import get_sort_keys
+
+# Rang der Subfeldcodes pro Feldspezifikation, beim Import vorberechnet
+_TITLE_0 = {'a': 0, 'b': 1}
+_TITLE_SORT_0 = {'a': 0, 'b': 1, 'k': 2, 'p': 3}
+_TOPIC_0 = {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'f': 5, 'g': 6, 'h': 7, 'j': 8, 'k': 9, 'l': 10, 'm': 11, 'n': 12, 'o': 13, 'p': 14, 'q': 15, 'r': 16, 's': 17, 't': 18, 'u': 19, 'v': 20, 'x': 21, 'y': 22, 'z': 23}
+_TOPIC_1 = {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'f': 5, 'g': 6, 'h': 7, 'k': 8, 'l': 9, 'm': 10, 'n': 11, 'o': 12, 'p': 13, 'r': 14, 's': 15, 't': 16, 'u': 17, 'v': 18, 'x': 19, 'y': 20, 'z': 21}
+_TOPIC_2 = {'a': 0, 'c': 1, 'd': 2, 'e': 3, 'f': 4, 'g': 5, 'h': 6, 'j': 7, 'k': 8, 'l': 9, 'n': 10, 'p': 11, 'q': 12, 's': 13, 't': 14, 'u': 15, 'v': 16, 'x': 17, 'y': 18, 'z': 19}
+_TOPIC_3 = {'a': 0, 'd': 1, 'e': 2, 'f': 3, 'g': 4, 'h': 5, 'k': 6, 'l': 7, 'm': 8, 'n': 9, 'o': 10, 'p': 11, 'r': 12, 's': 13, 't': 14, 'v': 15, 'x': 16, 'y': 17, 'z': 18}
+_TOPIC_4 = {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'v': 5, 'x': 6, 'y': 7, 'z': 8}
+_TOPIC_5 = {'a': 0, 'g': 1, 'x': 2, 'z': 3}
+_TOPIC_6 = {'a': 0, 'b': 1, 'v': 2, 'x': 3, 'y': 4, 'z': 5}
+_TOPIC_7 = {'a': 0, 'v': 1, 'x': 2, 'y': 3, 'z': 4}
+_TOPIC_8 = {'a': 0, 'v': 1, 'x': 2, 'y': 3, 'z': 4}
+_TOPIC_9 = {'d': 0, 'e': 1}
+_TOPIC_10 = {'a': 0, 'b': 1, 'c': 2}
+_TITLE_ORIG_0 = {'a': 0, 'b': 1}
+_SERIES_ORIG_0 = {'a': 0, 'b': 1, 'c': 2}
+_SERIES_ORIG_1 = {'a': 0, 'b': 1, 'c': 2}
+_SERIES_ORIG_2 = {'a': 0, 'b': 1, 'c': 2}
+
+# Regeln für den Durchlauf über die Autorenfelder, aus den get_authors-Slots
+_AUTHORS = AuthorExtractor(rules={
+    '100': ('author', 'abcd', 'e'),
+    '700': ('author2', 'abcd', 'e'),
+    '110': ('author_corporate', 'ab', 'e'),
+    '111': ('author_corporate', 'abc', 'j'),
+    '710': ('author_corporate', 'ab', 'e'),
+    '711': ('author_corporate', 'abc', 'j'),
+}, sort_tags=('100', '110', '111', '700'))
+_ALLFIELDS_100_900 = AllFieldsBuilder(100, 900)
+
+# Entscheidungstabelle für die Formate, pro Schlüssel einmal ausgewertet
+_FORMATS = FormatCalculator()
+
+# Zeichenpositionen aus Leader und Kontrollfeldern, auch für Stapel (process_marc_files)
+FIXED_FIELDS = FixedFieldBatch({'multipart_set': '000[19]', 'update_time_str': '005[0-13]'})
+
+# Gemeinsame Sortierschlüssel mit LRU-Cache (siehe help/sort_keys.py)
+_SORT_KEYS = get_sort_keys()
+
+# Gemeinsame Normalisierer (siehe help/normalize.py), beim Import aufgebaut
+_TITLE_NORMALIZE = get_normalizer(True, (), True, False).function
+
+
+def _rank(item):
+    return item[0]
+
+
+def convert(record, fixed=None):
+    """
+    Extrahiert die Finc-Felder aus einem MARC21-Record.
+
+    Args:
+        record: Ein pymarc.Record-Objekt
+        fixed: Optional. Die Zeichenpositionen des Records aus FIXED_FIELDS.extract() für einen Stapel;
+               ohne Angabe werden sie hier einzeln ausgeschnitten
+
+    Returns:
+        Dictionary mit den Feldwerten für die Modelle
+
+    Raises:
+        MissingFieldError: Wenn ein Pflichtfeld fehlt
+    """
+    result = {}
+
+    # id: 001 (get_id)
+    field = record.get('001')
+    if field is None or not field.data:
+        raise MissingFieldError('001')
+    result['id'] = '0-' + field.data
+
+    # record_id: 001 (get_id)
+    field = record.get('001')
+    if field is None or not field.data:
+        raise MissingFieldError('001')
+    result['record_id'] = field.data
+
+    # title: 245ab (first)
+    values = []
+    for field in record.get_fields('245'):
+        parts = []
+        for _, value in sorted([(_TITLE_0[code], value) for code, value in field.subfields if code in _TITLE_0], key=_rank):
+            value = _TITLE_NORMALIZE(value)
+            if value:
+                parts.append(value)
+        if parts:
+            values.append(': '.join(parts))
+    if not values:
+        if not any(tag in record for tag in ('245',)):
+            raise MissingFieldError('245')
+        values.append("")
+    result['title'] = values[0]
+
+    # title_sort: 245abkp (titleSortLower)
+    values = []
+    for field in record.get_fields('245'):
+        parts = []
+        for _, value in sorted([(_TITLE_SORT_0[code], value) for code, value in field.subfields if code in _TITLE_SORT_0], key=_rank):
+            value = value.strip()
+            if value:
+                parts.append(value)
+        if parts:
+            values.append(' '.join(parts))
+    result['title_sort'] = _SORT_KEYS.title(values[0], record) if values else None
+
+    # topic: 600abcdefghjklmnopqrstuvxyz:610abcdefghklmnoprstuvxyz:611acdefghjklnpqstuvxyz:630adefghklmnoprstvxyz:650abcdevxyz:689agxz:655abvxyz:651avxyz:648avxyz:970de:937abc:653a
+    values = []
+    for field in record.get_fields('600'):
+        for _, value in sorted([(_TOPIC_0[code], value) for code, value in field.subfields if code in _TOPIC_0], key=_rank):
+            value = value.strip()
+            if value:
+                values.append(value)
+    for field in record.get_fields('610'):
+        for _, value in sorted([(_TOPIC_1[code], value) for code, value in field.subfields if code in _TOPIC_1], key=_rank):
+            value = value.strip()
+            if value:
+                values.append(value)
+    for field in record.get_fields('611'):
+        for _, value in sorted([(_TOPIC_2[code], value) for code, value in field.subfields if code in _TOPIC_2], key=_rank):
+            value = value.strip()
+            if value:
+                values.append(value)
+    for field in record.get_fields('630'):
+        for _, value in sorted([(_TOPIC_3[code], value) for code, value in field.subfields if code in _TOPIC_3], key=_rank):
+            value = value.strip()
+            if value:
+                values.append(value)
+    for field in record.get_fields('650'):
+        for _, value in sorted([(_TOPIC_4[code], value) for code, value in field.subfields if code in _TOPIC_4], key=_rank):
+            value = value.strip()
+            if value:
+                values.append(value)
+    for field in record.get_fields('689'):
+        for _, value in sorted([(_TOPIC_5[code], value) for code, value in field.subfields if code in _TOPIC_5], key=_rank):
+            value = value.strip()
+            if value:
+                values.append(value)
+    for field in record.get_fields('655'):
+        for _, value in sorted([(_TOPIC_6[code], value) for code, value in field.subfields if code in _TOPIC_6], key=_rank):
+            value = value.strip()
+            if value:
+                values.append(value)
+    for field in record.get_fields('651'):
+        for _, value in sorted([(_TOPIC_7[code], value) for code, value in field.subfields if code in _TOPIC_7], key=_rank):
+            value = value.strip()
+            if value:
+                values.append(value)
+    for field in record.get_fields('648'):
+        for _, value in sorted([(_TOPIC_8[code], value) for code, value in field.subfields if code in _TOPIC_8], key=_rank):
+            value = value.strip()
+            if value:
+                values.append(value)
+    for field in record.get_fields('970'):
+        for _, value in sorted([(_TOPIC_9[code], value) for code, value in field.subfields if code in _TOPIC_9], key=_rank):
+            value = value.strip()
+            if value:
+                values.append(value)
+    for field in record.get_fields('937'):
+        for _, value in sorted([(_TOPIC_10[code], value) for code, value in field.subfields if code in _TOPIC_10], key=_rank):
+            value = value.strip()
+            if value:
+                values.append(value)
+    for field in record.get_fields('653'):
+        for code, value in field.subfields:
+            if code == 'a':
+                value = value.strip()
+                if value:
+                    values.append(value)
+    result['topic'] = values
+
+    # author: 100abcd (get_authors)
+    authors = _AUTHORS.extract(record)
+    result['author'] = authors['author']
+
+    # author2: 700abcd (get_authors)
+    result['author2'] = authors['author2']
+
+    # author_corporate: 110ab:111abc:710ab:711abc (get_authors)
+    result['author_corporate'] = authors['author_corporate']
+
+    # author_role: 1004e (get_authors)
+    result['author_role'] = authors['author_role']
+
+    # author2_role: 7004e (get_authors)
+    result['author2_role'] = authors['author2_role']
+
+    # author_corporate_role: 1104e:1114j:7104e:7114j (get_authors)
+    result['author_corporate_role'] = authors['author_corporate_role']
+
+    # author_sort: 100abcd:110ab:111abc:700abcd (get_authors)
+    result['author_sort'] = authors['author_sort']
+
+    # allfields: 100-900 (getAllSearchableFieldsAsSet)
+    result['allfields'] = _ALLFIELDS_100_900.build(record)
+
+    # isbn: 020a:772z:773z (single)
+    values = []
+    for field in record.get_fields('020'):
+        for code, value in field.subfields:
+            if code == 'a':
+                value = value.strip()
+                if value:
+                    values.append(value)
+    for field in record.get_fields('772'):
+        for code, value in field.subfields:
+            if code == 'z':
+                value = value.strip()
+                if value:
+                    values.append(value)
+    for field in record.get_fields('773'):
+        for code, value in field.subfields:
+            if code == 'z':
+                value = value.strip()
+                if value:
+                    values.append(value)
+    result['isbn'] = values[0] if len(values) == 1 else None
+
+    # multipart_set: 000[19]
+    if fixed is None:
+        fixed = FIXED_FIELDS.extract_one(record)
+    result['multipart_set'] = fixed.get('multipart_set')
+
+    # update_time_str: 005[0-13]
+    result['update_time_str'] = fixed.get('update_time_str')
+
+    # format: 000[6-7]:007[0-1]:008[21]:008[23]:008[29]:008[33] (formatCalculator)
+    formats = _FORMATS.lookup(record)
+    result['format'] = list(formats.format)
+
+    # format_finc: 000[6-7]:007[0-1]:008[21]:008[23]:008[29]:008[33] (formatCalculator)
+    result['format_finc'] = list(formats.format_finc)
+
+    # format_de14: 000[6-7]:007[0-1]:008[21]:008[23]:008[29]:008[33] (formatCalculator)
+    result['format_de14'] = list(formats.format_de14)
+
+    # title_orig: LNK245ab (first)
+    values = []
+    links = link_index(record)
+    for field in links.fields('245'):
+        parts = []
+        for _, value in sorted([(_TITLE_ORIG_0[code], value) for code, value in field.subfields if code in _TITLE_ORIG_0], key=_rank):
+            value = value.strip()
+            if value:
+                parts.append(value)
+        if parts:
+            values.append(' : '.join(parts))
+    result['title_orig'] = values[0] if values else None
+
+    # series_orig: LNK800abc:LNK810abc:LNK811abc
+    values = []
+    for field in links.fields('800'):
+        parts = []
+        for _, value in sorted([(_SERIES_ORIG_0[code], value) for code, value in field.subfields if code in _SERIES_ORIG_0], key=_rank):
+            value = value.strip()
+            if value:
+                parts.append(value)
+        if parts:
+            values.append(' '.join(parts))
+    for field in links.fields('810'):
+        parts = []
+        for _, value in sorted([(_SERIES_ORIG_1[code], value) for code, value in field.subfields if code in _SERIES_ORIG_1], key=_rank):
+            value = value.strip()
+            if value:
+                parts.append(value)
+        if parts:
+            values.append(' '.join(parts))
+    for field in links.fields('811'):
+        parts = []
+        for _, value in sorted([(_SERIES_ORIG_2[code], value) for code, value in field.subfields if code in _SERIES_ORIG_2], key=_rank):
+            value = value.strip()
+            if value:
+                parts.append(value)
+        if parts:
+            values.append(' '.join(parts))
+    result['series_orig'] = values
+
+    # fullrecord: FullRecordAsMarc
+    result['fullrecord'] = full_record(record, 'escaped')
+
+    # recordtype: "marc"
+    result['recordtype'] = 'marc'
+
+    # Sortierschlüssel (sort_key)
+    if result['author_sort'] is not None:
+        result['author_sort'] = _SORT_KEYS.key(result['author_sort'])
+
+    return result
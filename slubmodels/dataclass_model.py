@@ -1,5 +1,5 @@
 # Auto generated from finc.yaml by pythongen.py version: 0.0.1
-# Generation date: 2025-03-03T11:32:04
+# Generation date: 2026-10-19T19:16:34
 # Schema: finc
 #
 # id: https://www.slub-dresden.de/linkml/finc
@@ -94,6 +94,7 @@ class Finc(YAMLRoot):
     record_id: str = None
     title: str = None
     recordtype: str = None
+    title_sort: Optional[str] = None
     topic: Optional[Union[str, List[str]]] = empty_list()
     author: Optional[Union[str, List[str]]] = empty_list()
     author2: Optional[Union[str, List[str]]] = empty_list()
@@ -102,7 +103,23 @@ class Finc(YAMLRoot):
     author2_role: Optional[Union[str, List[str]]] = empty_list()
     author_corporate_role: Optional[Union[str, List[str]]] = empty_list()
     author_sort: Optional[str] = None
+    allfields: Optional[Union[str, List[str]]] = empty_list()
     isbn: Optional[str] = None
+    multipart_set: Optional[str] = None
+    update_time_str: Optional[str] = None
+    format: Optional[Union[str, List[str]]] = empty_list()
+    format_finc: Optional[Union[str, List[str]]] = empty_list()
+    format_de14: Optional[Union[str, List[str]]] = empty_list()
+    hierarchy_parent_id: Optional[Union[str, List[str]]] = empty_list()
+    hierarchy_parent_title: Optional[Union[str, List[str]]] = empty_list()
+    hierarchy_sequence: Optional[Union[str, List[str]]] = empty_list()
+    hierarchy_top_id: Optional[Union[str, List[str]]] = empty_list()
+    hierarchy_top_title: Optional[Union[str, List[str]]] = empty_list()
+    is_hierarchy_id: Optional[str] = None
+    is_hierarchy_title: Optional[str] = None
+    title_orig: Optional[str] = None
+    series_orig: Optional[Union[str, List[str]]] = empty_list()
+    fullrecord: Optional[str] = None
 
     def __post_init__(self, *_: List[str], **kwargs: Dict[str, Any]):
         if self._is_empty(self.id):
@@ -125,6 +142,9 @@ class Finc(YAMLRoot):
         if not isinstance(self.recordtype, str):
             self.recordtype = str(self.recordtype)
 
+        if self.title_sort is not None and not isinstance(self.title_sort, str):
+            self.title_sort = str(self.title_sort)
+
         if not isinstance(self.topic, list):
             self.topic = [self.topic] if self.topic is not None else []
         self.topic = [v if isinstance(v, str) else str(v) for v in self.topic]
@@ -156,9 +176,67 @@ class Finc(YAMLRoot):
         if self.author_sort is not None and not isinstance(self.author_sort, str):
             self.author_sort = str(self.author_sort)
 
+        if not isinstance(self.allfields, list):
+            self.allfields = [self.allfields] if self.allfields is not None else []
+        self.allfields = [v if isinstance(v, str) else str(v) for v in self.allfields]
+
         if self.isbn is not None and not isinstance(self.isbn, str):
             self.isbn = str(self.isbn)
 
+        if self.multipart_set is not None and not isinstance(self.multipart_set, str):
+            self.multipart_set = str(self.multipart_set)
+
+        if self.update_time_str is not None and not isinstance(self.update_time_str, str):
+            self.update_time_str = str(self.update_time_str)
+
+        if not isinstance(self.format, list):
+            self.format = [self.format] if self.format is not None else []
+        self.format = [v if isinstance(v, str) else str(v) for v in self.format]
+
+        if not isinstance(self.format_finc, list):
+            self.format_finc = [self.format_finc] if self.format_finc is not None else []
+        self.format_finc = [v if isinstance(v, str) else str(v) for v in self.format_finc]
+
+        if not isinstance(self.format_de14, list):
+            self.format_de14 = [self.format_de14] if self.format_de14 is not None else []
+        self.format_de14 = [v if isinstance(v, str) else str(v) for v in self.format_de14]
+
+        if not isinstance(self.hierarchy_parent_id, list):
+            self.hierarchy_parent_id = [self.hierarchy_parent_id] if self.hierarchy_parent_id is not None else []
+        self.hierarchy_parent_id = [v if isinstance(v, str) else str(v) for v in self.hierarchy_parent_id]
+
+        if not isinstance(self.hierarchy_parent_title, list):
+            self.hierarchy_parent_title = [self.hierarchy_parent_title] if self.hierarchy_parent_title is not None else []
+        self.hierarchy_parent_title = [v if isinstance(v, str) else str(v) for v in self.hierarchy_parent_title]
+
+        if not isinstance(self.hierarchy_sequence, list):
+            self.hierarchy_sequence = [self.hierarchy_sequence] if self.hierarchy_sequence is not None else []
+        self.hierarchy_sequence = [v if isinstance(v, str) else str(v) for v in self.hierarchy_sequence]
+
+        if not isinstance(self.hierarchy_top_id, list):
+            self.hierarchy_top_id = [self.hierarchy_top_id] if self.hierarchy_top_id is not None else []
+        self.hierarchy_top_id = [v if isinstance(v, str) else str(v) for v in self.hierarchy_top_id]
+
+        if not isinstance(self.hierarchy_top_title, list):
+            self.hierarchy_top_title = [self.hierarchy_top_title] if self.hierarchy_top_title is not None else []
+        self.hierarchy_top_title = [v if isinstance(v, str) else str(v) for v in self.hierarchy_top_title]
+
+        if self.is_hierarchy_id is not None and not isinstance(self.is_hierarchy_id, str):
+            self.is_hierarchy_id = str(self.is_hierarchy_id)
+
+        if self.is_hierarchy_title is not None and not isinstance(self.is_hierarchy_title, str):
+            self.is_hierarchy_title = str(self.is_hierarchy_title)
+
+        if self.title_orig is not None and not isinstance(self.title_orig, str):
+            self.title_orig = str(self.title_orig)
+
+        if not isinstance(self.series_orig, list):
+            self.series_orig = [self.series_orig] if self.series_orig is not None else []
+        self.series_orig = [v if isinstance(v, str) else str(v) for v in self.series_orig]
+
+        if self.fullrecord is not None and not isinstance(self.fullrecord, str):
+            self.fullrecord = str(self.fullrecord)
+
         super().__post_init__(**kwargs)
 
 
@@ -178,6 +256,9 @@ slots.finc__record_id = Slot(uri=DEFAULT_.record_id, name="finc__record_id", cur
 slots.finc__title = Slot(uri=DEFAULT_.title, name="finc__title", curie=DEFAULT_.curie('title'),
                    model_uri=DEFAULT_.finc__title, domain=None, range=str)
 
+slots.finc__title_sort = Slot(uri=DEFAULT_.title_sort, name="finc__title_sort", curie=DEFAULT_.curie('title_sort'),
+                   model_uri=DEFAULT_.finc__title_sort, domain=None, range=Optional[str])
+
 slots.finc__topic = Slot(uri=DEFAULT_.topic, name="finc__topic", curie=DEFAULT_.curie('topic'),
                    model_uri=DEFAULT_.finc__topic, domain=None, range=Optional[Union[str, List[str]]])
 
@@ -202,9 +283,57 @@ slots.finc__author_corporate_role = Slot(uri=DEFAULT_.author_corporate_role, nam
 slots.finc__author_sort = Slot(uri=DEFAULT_.author_sort, name="finc__author_sort", curie=DEFAULT_.curie('author_sort'),
                    model_uri=DEFAULT_.finc__author_sort, domain=None, range=Optional[str])
 
+slots.finc__allfields = Slot(uri=DEFAULT_.allfields, name="finc__allfields", curie=DEFAULT_.curie('allfields'),
+                   model_uri=DEFAULT_.finc__allfields, domain=None, range=Optional[Union[str, List[str]]])
+
 slots.finc__isbn = Slot(uri=DEFAULT_.isbn, name="finc__isbn", curie=DEFAULT_.curie('isbn'),
                    model_uri=DEFAULT_.finc__isbn, domain=None, range=Optional[str],
                    pattern=re.compile(r'^(?:ISBN(?:-1[03])?:? )?(?=[0-9X]{10}$|(?=(?:[0-9]+[- ]){3})[- 0-9X]{13}$|97[89][0-9]{10}$|(?=(?:[0-9]+[- ]){4})[- 0-9]{17}$)(?:97[89][- ]?)?[0-9]{1,5}[- ]?[0-9]+[- ]?[0-9]+[- ]?[0-9X]$'))
 
+slots.finc__multipart_set = Slot(uri=DEFAULT_.multipart_set, name="finc__multipart_set", curie=DEFAULT_.curie('multipart_set'),
+                   model_uri=DEFAULT_.finc__multipart_set, domain=None, range=Optional[str])
+
+slots.finc__update_time_str = Slot(uri=DEFAULT_.update_time_str, name="finc__update_time_str", curie=DEFAULT_.curie('update_time_str'),
+                   model_uri=DEFAULT_.finc__update_time_str, domain=None, range=Optional[str])
+
+slots.finc__format = Slot(uri=DEFAULT_.format, name="finc__format", curie=DEFAULT_.curie('format'),
+                   model_uri=DEFAULT_.finc__format, domain=None, range=Optional[Union[str, List[str]]])
+
+slots.finc__format_finc = Slot(uri=DEFAULT_.format_finc, name="finc__format_finc", curie=DEFAULT_.curie('format_finc'),
+                   model_uri=DEFAULT_.finc__format_finc, domain=None, range=Optional[Union[str, List[str]]])
+
+slots.finc__format_de14 = Slot(uri=DEFAULT_.format_de14, name="finc__format_de14", curie=DEFAULT_.curie('format_de14'),
+                   model_uri=DEFAULT_.finc__format_de14, domain=None, range=Optional[Union[str, List[str]]])
+
+slots.finc__hierarchy_parent_id = Slot(uri=DEFAULT_.hierarchy_parent_id, name="finc__hierarchy_parent_id", curie=DEFAULT_.curie('hierarchy_parent_id'),
+                   model_uri=DEFAULT_.finc__hierarchy_parent_id, domain=None, range=Optional[Union[str, List[str]]])
+
+slots.finc__hierarchy_parent_title = Slot(uri=DEFAULT_.hierarchy_parent_title, name="finc__hierarchy_parent_title", curie=DEFAULT_.curie('hierarchy_parent_title'),
+                   model_uri=DEFAULT_.finc__hierarchy_parent_title, domain=None, range=Optional[Union[str, List[str]]])
+
+slots.finc__hierarchy_sequence = Slot(uri=DEFAULT_.hierarchy_sequence, name="finc__hierarchy_sequence", curie=DEFAULT_.curie('hierarchy_sequence'),
+                   model_uri=DEFAULT_.finc__hierarchy_sequence, domain=None, range=Optional[Union[str, List[str]]])
+
+slots.finc__hierarchy_top_id = Slot(uri=DEFAULT_.hierarchy_top_id, name="finc__hierarchy_top_id", curie=DEFAULT_.curie('hierarchy_top_id'),
+                   model_uri=DEFAULT_.finc__hierarchy_top_id, domain=None, range=Optional[Union[str, List[str]]])
+
+slots.finc__hierarchy_top_title = Slot(uri=DEFAULT_.hierarchy_top_title, name="finc__hierarchy_top_title", curie=DEFAULT_.curie('hierarchy_top_title'),
+                   model_uri=DEFAULT_.finc__hierarchy_top_title, domain=None, range=Optional[Union[str, List[str]]])
+
+slots.finc__is_hierarchy_id = Slot(uri=DEFAULT_.is_hierarchy_id, name="finc__is_hierarchy_id", curie=DEFAULT_.curie('is_hierarchy_id'),
+                   model_uri=DEFAULT_.finc__is_hierarchy_id, domain=None, range=Optional[str])
+
+slots.finc__is_hierarchy_title = Slot(uri=DEFAULT_.is_hierarchy_title, name="finc__is_hierarchy_title", curie=DEFAULT_.curie('is_hierarchy_title'),
+                   model_uri=DEFAULT_.finc__is_hierarchy_title, domain=None, range=Optional[str])
+
+slots.finc__title_orig = Slot(uri=DEFAULT_.title_orig, name="finc__title_orig", curie=DEFAULT_.curie('title_orig'),
+                   model_uri=DEFAULT_.finc__title_orig, domain=None, range=Optional[str])
+
+slots.finc__series_orig = Slot(uri=DEFAULT_.series_orig, name="finc__series_orig", curie=DEFAULT_.curie('series_orig'),
+                   model_uri=DEFAULT_.finc__series_orig, domain=None, range=Optional[Union[str, List[str]]])
+
+slots.finc__fullrecord = Slot(uri=DEFAULT_.fullrecord, name="finc__fullrecord", curie=DEFAULT_.curie('fullrecord'),
+                   model_uri=DEFAULT_.finc__fullrecord, domain=None, range=Optional[str])
+
 slots.finc__recordtype = Slot(uri=DEFAULT_.recordtype, name="finc__recordtype", curie=DEFAULT_.curie('recordtype'),
                    model_uri=DEFAULT_.finc__recordtype, domain=None, range=str)
\ No newline at end of file
@@ -80,23 +80,117 @@ class Finc(ConfiguredBaseModel):
     """
     linkml_meta: ClassVar[LinkMLMeta] = LinkMLMeta({'from_schema': 'https://www.slub-dresden.de/linkml/finc'})
 
-    id: str = Field(default=..., description="""ID innerhalb eines Solr, zusammengesetzt aus einem Prefix mit der source_id und der record_id (teilweise encodiert)""", json_schema_extra = { "linkml_meta": {'alias': 'id', 'domain_of': ['Finc']} })
+    id: str = Field(default=..., description="""ID innerhalb eines Solr, zusammengesetzt aus einem Prefix mit der source_id und der record_id (teilweise encodiert)""", json_schema_extra = { "linkml_meta": {'alias': 'id',
+         'annotations': {'function': {'tag': 'function', 'value': 'get_id'},
+                         'prefix': {'tag': 'prefix', 'value': '0-'},
+                         'source_marc': {'tag': 'source_marc', 'value': '001'}},
+         'domain_of': ['Finc']} })
     record_id: str = Field(default=..., description="""Lieferanten-Identifier (original ID aus der Quelle)""", json_schema_extra = { "linkml_meta": {'alias': 'record_id',
          'annotations': {'function': {'tag': 'function', 'value': 'get_id'},
                          'source_marc': {'tag': 'source_marc', 'value': '001'}},
          'domain_of': ['Finc']} })
-    title: str = Field(default=..., description="""Titel im Titeldatensatz""", json_schema_extra = { "linkml_meta": {'alias': 'title', 'domain_of': ['Finc']} })
-    topic: Optional[List[str]] = Field(default=None, description="""Schlagwörter""", json_schema_extra = { "linkml_meta": {'alias': 'topic', 'domain_of': ['Finc']} })
-    author: Optional[List[str]] = Field(default=None, description="""nur Hauptautoren, als Liste, die die gleiche Reihenfolge wie die Werte in author_role haben müssen""", json_schema_extra = { "linkml_meta": {'alias': 'author', 'domain_of': ['Finc']} })
-    author2: Optional[List[str]] = Field(default=None, description="""weitere Autorennamen(Nebenautoren bzw. Autoren mit Nebeneintragungen), als Liste, die die gleiche Reihenfolge wie die Werte in author2_role haben müssen""", json_schema_extra = { "linkml_meta": {'alias': 'author2', 'domain_of': ['Finc']} })
-    author_corporate: Optional[List[str]] = Field(default=None, description="""Körperschaft und Event als Autor""", json_schema_extra = { "linkml_meta": {'alias': 'author_corporate', 'domain_of': ['Finc']} })
+    title: str = Field(default=..., description="""Titel im Titeldatensatz""", json_schema_extra = { "linkml_meta": {'alias': 'title',
+         'annotations': {'clean': {'tag': 'clean', 'value': True},
+                         'function': {'tag': 'function', 'value': 'first'},
+                         'join': {'tag': 'join', 'value': ': '},
+                         'source_marc': {'tag': 'source_marc', 'value': '245ab'}},
+         'domain_of': ['Finc']} })
+    title_sort: Optional[str] = Field(default=None, description="""Titel für Sortierung in Ergebnisliste: klein geschrieben, ohne führenden Artikel und Diakritika (help/sort_keys.py)""", json_schema_extra = { "linkml_meta": {'alias': 'title_sort',
+         'annotations': {'function': {'tag': 'function', 'value': 'titleSortLower'},
+                         'join': {'tag': 'join', 'value': ' '},
+                         'source_marc': {'tag': 'source_marc', 'value': '245abkp'}},
+         'domain_of': ['Finc']} })
+    topic: Optional[List[str]] = Field(default=None, description="""Schlagwörter""", json_schema_extra = { "linkml_meta": {'alias': 'topic',
+         'annotations': {'source_marc': {'tag': 'source_marc',
+                                         'value': '600abcdefghjklmnopqrstuvxyz:610abcdefghklmnoprstuvxyz:611acdefghjklnpqstuvxyz:630adefghklmnoprstvxyz:650abcdevxyz:689agxz:655abvxyz:651avxyz:648avxyz:970de:937abc:653a'}},
+         'domain_of': ['Finc']} })
+    author: Optional[List[str]] = Field(default=None, description="""nur Hauptautoren, als Liste, die die gleiche Reihenfolge wie die Werte in author_role haben müssen""", json_schema_extra = { "linkml_meta": {'alias': 'author',
+         'annotations': {'function': {'tag': 'function', 'value': 'get_authors'},
+                         'source_marc': {'tag': 'source_marc', 'value': '100abcd'}},
+         'domain_of': ['Finc']} })
+    author2: Optional[List[str]] = Field(default=None, description="""weitere Autorennamen(Nebenautoren bzw. Autoren mit Nebeneintragungen), als Liste, die die gleiche Reihenfolge wie die Werte in author2_role haben müssen""", json_schema_extra = { "linkml_meta": {'alias': 'author2',
+         'annotations': {'function': {'tag': 'function', 'value': 'get_authors'},
+                         'source_marc': {'tag': 'source_marc', 'value': '700abcd'}},
+         'domain_of': ['Finc']} })
+    author_corporate: Optional[List[str]] = Field(default=None, description="""Körperschaft und Event als Autor""", json_schema_extra = { "linkml_meta": {'alias': 'author_corporate',
+         'annotations': {'function': {'tag': 'function', 'value': 'get_authors'},
+                         'source_marc': {'tag': 'source_marc',
+                                         'value': '110ab:111abc:710ab:711abc'}},
+         'domain_of': ['Finc']} })
     author_role: Optional[List[str]] = Field(default=None, description="""Rollen der Hauptautoren der Veröffentlichung
 Müssen in der gleichen Reihenfolge wie die Werte in author haben
-Keine Angabe=leer, damit Anzahl Autoren=Anzahl Rollen""", json_schema_extra = { "linkml_meta": {'alias': 'author_role', 'domain_of': ['Finc']} })
-    author2_role: Optional[List[str]] = Field(default=None, description="""Rollen der weiteren Autoren""", json_schema_extra = { "linkml_meta": {'alias': 'author2_role', 'domain_of': ['Finc']} })
-    author_corporate_role: Optional[List[str]] = Field(default=None, description="""Rollen der Körperschaften und Events""", json_schema_extra = { "linkml_meta": {'alias': 'author_corporate_role', 'domain_of': ['Finc']} })
-    author_sort: Optional[str] = Field(default=None, description="""1. Autorenname für Sortierung in Ergebnisliste""", json_schema_extra = { "linkml_meta": {'alias': 'author_sort', 'domain_of': ['Finc']} })
-    isbn: Optional[str] = Field(default=None, description="""Internationale Standardbuchnummer (International Standard Book Number, ISBN)""", json_schema_extra = { "linkml_meta": {'alias': 'isbn', 'domain_of': ['Finc']} })
+Keine Angabe=leer, damit Anzahl Autoren=Anzahl Rollen""", json_schema_extra = { "linkml_meta": {'alias': 'author_role',
+         'annotations': {'function': {'tag': 'function', 'value': 'get_authors'},
+                         'source_marc': {'tag': 'source_marc', 'value': '1004e'}},
+         'domain_of': ['Finc']} })
+    author2_role: Optional[List[str]] = Field(default=None, description="""Rollen der weiteren Autoren""", json_schema_extra = { "linkml_meta": {'alias': 'author2_role',
+         'annotations': {'function': {'tag': 'function', 'value': 'get_authors'},
+                         'source_marc': {'tag': 'source_marc', 'value': '7004e'}},
+         'domain_of': ['Finc']} })
+    author_corporate_role: Optional[List[str]] = Field(default=None, description="""Rollen der Körperschaften und Events""", json_schema_extra = { "linkml_meta": {'alias': 'author_corporate_role',
+         'annotations': {'function': {'tag': 'function', 'value': 'get_authors'},
+                         'source_marc': {'tag': 'source_marc',
+                                         'value': '1104e:1114j:7104e:7114j'}},
+         'domain_of': ['Finc']} })
+    author_sort: Optional[str] = Field(default=None, description="""1. Autorenname für Sortierung in Ergebnisliste""", json_schema_extra = { "linkml_meta": {'alias': 'author_sort',
+         'annotations': {'function': {'tag': 'function', 'value': 'get_authors'},
+                         'sort_key': {'tag': 'sort_key', 'value': True},
+                         'source_marc': {'tag': 'source_marc',
+                                         'value': '100abcd:110ab:111abc:700abcd'}},
+         'domain_of': ['Finc']} })
+    allfields: Optional[List[str]] = Field(default=None, description="""Alle durchsuchbaren Datenfelder 100 bis 899 für die Freitextsuche, ohne Duplikate""", json_schema_extra = { "linkml_meta": {'alias': 'allfields',
+         'annotations': {'function': {'tag': 'function',
+                                      'value': 'getAllSearchableFieldsAsSet'},
+                         'source_marc': {'tag': 'source_marc', 'value': '100-900'}},
+         'domain_of': ['Finc']} })
+    isbn: Optional[str] = Field(default=None, description="""Internationale Standardbuchnummer (International Standard Book Number, ISBN)""", json_schema_extra = { "linkml_meta": {'alias': 'isbn',
+         'annotations': {'function': {'tag': 'function', 'value': 'single'},
+                         'source_marc': {'tag': 'source_marc',
+                                         'value': '020a:772z:773z'}},
+         'domain_of': ['Finc']} })
+    multipart_set: Optional[str] = Field(default=None, description="""Mehrteilige Ressource aus Leader-Position 19 (a = Gesamtheit, b/c = Teil mit/ohne eigenen Titel)""", json_schema_extra = { "linkml_meta": {'alias': 'multipart_set',
+         'annotations': {'source_marc': {'tag': 'source_marc', 'value': '000[19]'}},
+         'domain_of': ['Finc']} })
+    update_time_str: Optional[str] = Field(default=None, description="""Zeitpunkt der letzten Änderung aus 005 (JJJJMMTTHHMMSS)""", json_schema_extra = { "linkml_meta": {'alias': 'update_time_str',
+         'annotations': {'source_marc': {'tag': 'source_marc', 'value': '005[0-13]'}},
+         'domain_of': ['Finc']} })
+    format: Optional[List[str]] = Field(default=None, description="""Format aus Leader/06-07, 007 und 008 (FormatCalculator, help/formats.py)""", json_schema_extra = { "linkml_meta": {'alias': 'format',
+         'annotations': {'function': {'tag': 'function', 'value': 'formatCalculator'},
+                         'source_marc': {'tag': 'source_marc',
+                                         'value': '000[6-7]:007[0-1]:008[21]:008[23]:008[29]:008[33]'}},
+         'domain_of': ['Finc']} })
+    format_finc: Optional[List[str]] = Field(default=None, description="""Format für die Facette im finc-Index (FormatCalculator, help/formats.py)""", json_schema_extra = { "linkml_meta": {'alias': 'format_finc',
+         'annotations': {'function': {'tag': 'function', 'value': 'formatCalculator'},
+                         'source_marc': {'tag': 'source_marc',
+                                         'value': '000[6-7]:007[0-1]:008[21]:008[23]:008[29]:008[33]'}},
+         'domain_of': ['Finc']} })
+    format_de14: Optional[List[str]] = Field(default=None, description="""Format für die Facette im Katalog der SLUB (DE-14) (FormatCalculator, help/formats.py)""", json_schema_extra = { "linkml_meta": {'alias': 'format_de14',
+         'annotations': {'function': {'tag': 'function', 'value': 'formatCalculator'},
+                         'source_marc': {'tag': 'source_marc',
+                                         'value': '000[6-7]:007[0-1]:008[21]:008[23]:008[29]:008[33]'}},
+         'domain_of': ['Finc']} })
+    hierarchy_parent_id: Optional[List[str]] = Field(default=None, description="""IDs der übergeordneten Records aus 773/800/830 $w, soweit sie in den Eingabedaten enthalten sind (Hierarchiestufe, help/hierarchy.py)""", json_schema_extra = { "linkml_meta": {'alias': 'hierarchy_parent_id', 'domain_of': ['Finc']} })
+    hierarchy_parent_title: Optional[List[str]] = Field(default=None, description="""Titel der übergeordneten Records, in der Reihenfolge von hierarchy_parent_id (Hierarchiestufe, help/hierarchy.py)""", json_schema_extra = { "linkml_meta": {'alias': 'hierarchy_parent_title', 'domain_of': ['Finc']} })
+    hierarchy_sequence: Optional[List[str]] = Field(default=None, description="""Zählung innerhalb der übergeordneten Records (773 $q bzw. $g, 800/830 $v) (Hierarchiestufe, help/hierarchy.py)""", json_schema_extra = { "linkml_meta": {'alias': 'hierarchy_sequence', 'domain_of': ['Finc']} })
+    hierarchy_top_id: Optional[List[str]] = Field(default=None, description="""IDs der obersten Records der Hierarchie (Hierarchiestufe, help/hierarchy.py)""", json_schema_extra = { "linkml_meta": {'alias': 'hierarchy_top_id', 'domain_of': ['Finc']} })
+    hierarchy_top_title: Optional[List[str]] = Field(default=None, description="""Titel der obersten Records der Hierarchie (Hierarchiestufe, help/hierarchy.py)""", json_schema_extra = { "linkml_meta": {'alias': 'hierarchy_top_title', 'domain_of': ['Finc']} })
+    is_hierarchy_id: Optional[str] = Field(default=None, description="""Eigene ID, wenn andere Records auf diesen Record als Übergeordneten verweisen (Hierarchiestufe, help/hierarchy.py)""", json_schema_extra = { "linkml_meta": {'alias': 'is_hierarchy_id', 'domain_of': ['Finc']} })
+    is_hierarchy_title: Optional[str] = Field(default=None, description="""Eigener Titel, wenn andere Records auf diesen Record als Übergeordneten verweisen (Hierarchiestufe, help/hierarchy.py)""", json_schema_extra = { "linkml_meta": {'alias': 'is_hierarchy_title', 'domain_of': ['Finc']} })
+    title_orig: Optional[str] = Field(default=None, description="""Titel in Originalschrift aus dem über $6 verknüpften Feld 880 (help/linked_fields.py)""", json_schema_extra = { "linkml_meta": {'alias': 'title_orig',
+         'annotations': {'function': {'tag': 'function', 'value': 'first'},
+                         'join': {'tag': 'join', 'value': ' : '},
+                         'source_marc': {'tag': 'source_marc', 'value': 'LNK245ab'}},
+         'domain_of': ['Finc']} })
+    series_orig: Optional[List[str]] = Field(default=None, description="""Gesamttitel in Originalschrift aus den über $6 verknüpften Feldern 880 (help/linked_fields.py)""", json_schema_extra = { "linkml_meta": {'alias': 'series_orig',
+         'annotations': {'join': {'tag': 'join', 'value': ' '},
+                         'source_marc': {'tag': 'source_marc',
+                                         'value': 'LNK800abc:LNK810abc:LNK811abc'}},
+         'domain_of': ['Finc']} })
+    fullrecord: Optional[str] = Field(default=None, description="""Vollständiger Record im ISO-2709-Format (SolrMarc: FullRecordAsMarc), bei unveränderten Records aus den Originalbytes (help/fullrecord.py)""", json_schema_extra = { "linkml_meta": {'alias': 'fullrecord',
+         'annotations': {'encoding': {'tag': 'encoding', 'value': 'escaped'},
+                         'source_marc': {'tag': 'source_marc',
+                                         'value': 'FullRecordAsMarc'}},
+         'domain_of': ['Finc']} })
     recordtype: str = Field(default=..., description="""Typ der Quelle""", json_schema_extra = { "linkml_meta": {'alias': 'recordtype',
          'annotations': {'source_marc': {'tag': 'source_marc', 'value': '"marc"'}},
          'domain_of': ['Finc']} })
@@ -0,0 +1,259 @@
+# Auto generated from finc.yaml by help/linkml_generator.py (slotted)
+# Schema: finc
+#
+# Nicht von Hand bearbeiten, wird bei jedem Lauf neu erzeugt.
+
+from typing import Any, Dict
+
+
+class Finc:
+    """
+    Ein Datensatz für den Solr-Index
+
+    Schlanke Variante mit __slots__ und generierter Validierung.
+    """
+
+    __slots__ = ('id', 'record_id', 'title', 'recordtype', 'title_sort', 'topic', 'author', 'author2', 'author_corporate', 'author_role', 'author2_role', 'author_corporate_role', 'author_sort', 'allfields', 'isbn', 'multipart_set', 'update_time_str', 'format', 'format_finc', 'format_de14', 'hierarchy_parent_id', 'hierarchy_parent_title', 'hierarchy_sequence', 'hierarchy_top_id', 'hierarchy_top_title', 'is_hierarchy_id', 'is_hierarchy_title', 'title_orig', 'series_orig', 'fullrecord',)
+
+    MULTIVALUED = frozenset(('topic', 'author', 'author2', 'author_corporate', 'author_role', 'author2_role', 'author_corporate_role', 'allfields', 'format', 'format_finc', 'format_de14', 'hierarchy_parent_id', 'hierarchy_parent_title', 'hierarchy_sequence', 'hierarchy_top_id', 'hierarchy_top_title', 'series_orig',))
+
+    def __init__(self, id=None, record_id=None, title=None, recordtype=None, title_sort=None, topic=None, author=None, author2=None, author_corporate=None, author_role=None, author2_role=None, author_corporate_role=None, author_sort=None, allfields=None, isbn=None, multipart_set=None, update_time_str=None, format=None, format_finc=None, format_de14=None, hierarchy_parent_id=None, hierarchy_parent_title=None, hierarchy_sequence=None, hierarchy_top_id=None, hierarchy_top_title=None, is_hierarchy_id=None, is_hierarchy_title=None, title_orig=None, series_orig=None, fullrecord=None, **kwargs):
+        if kwargs:
+            raise ValueError("\n".join(f"Unknown argument: {key} = {value!r:.40}" for key, value in kwargs.items()))
+        if id is None or id == [] or id == {}:
+            raise ValueError("id must be supplied")
+        if not isinstance(id, str):
+            id = str(id)
+        self.id = id
+        if record_id is None or record_id == [] or record_id == {}:
+            raise ValueError("record_id must be supplied")
+        if not isinstance(record_id, str):
+            record_id = str(record_id)
+        self.record_id = record_id
+        if title is None or title == [] or title == {}:
+            raise ValueError("title must be supplied")
+        if not isinstance(title, str):
+            title = str(title)
+        self.title = title
+        if recordtype is None or recordtype == [] or recordtype == {}:
+            raise ValueError("recordtype must be supplied")
+        if not isinstance(recordtype, str):
+            recordtype = str(recordtype)
+        self.recordtype = recordtype
+        if title_sort is not None and not isinstance(title_sort, str):
+            title_sort = str(title_sort)
+        self.title_sort = title_sort
+        if topic is None:
+            topic = []
+        elif type(topic) is not list:
+            topic = [topic]
+        if not all(map(str.__instancecheck__, topic)):
+            topic = [v if isinstance(v, str) else str(v) for v in topic]
+        self.topic = topic
+        if author is None:
+            author = []
+        elif type(author) is not list:
+            author = [author]
+        if not all(map(str.__instancecheck__, author)):
+            author = [v if isinstance(v, str) else str(v) for v in author]
+        self.author = author
+        if author2 is None:
+            author2 = []
+        elif type(author2) is not list:
+            author2 = [author2]
+        if not all(map(str.__instancecheck__, author2)):
+            author2 = [v if isinstance(v, str) else str(v) for v in author2]
+        self.author2 = author2
+        if author_corporate is None:
+            author_corporate = []
+        elif type(author_corporate) is not list:
+            author_corporate = [author_corporate]
+        if not all(map(str.__instancecheck__, author_corporate)):
+            author_corporate = [v if isinstance(v, str) else str(v) for v in author_corporate]
+        self.author_corporate = author_corporate
+        if author_role is None:
+            author_role = []
+        elif type(author_role) is not list:
+            author_role = [author_role]
+        if not all(map(str.__instancecheck__, author_role)):
+            author_role = [v if isinstance(v, str) else str(v) for v in author_role]
+        self.author_role = author_role
+        if author2_role is None:
+            author2_role = []
+        elif type(author2_role) is not list:
+            author2_role = [author2_role]
+        if not all(map(str.__instancecheck__, author2_role)):
+            author2_role = [v if isinstance(v, str) else str(v) for v in author2_role]
+        self.author2_role = author2_role
+        if author_corporate_role is None:
+            author_corporate_role = []
+        elif type(author_corporate_role) is not list:
+            author_corporate_role = [author_corporate_role]
+        if not all(map(str.__instancecheck__, author_corporate_role)):
+            author_corporate_role = [v if isinstance(v, str) else str(v) for v in author_corporate_role]
+        self.author_corporate_role = author_corporate_role
+        if author_sort is not None and not isinstance(author_sort, str):
+            author_sort = str(author_sort)
+        self.author_sort = author_sort
+        if allfields is None:
+            allfields = []
+        elif type(allfields) is not list:
+            allfields = [allfields]
+        if not all(map(str.__instancecheck__, allfields)):
+            allfields = [v if isinstance(v, str) else str(v) for v in allfields]
+        self.allfields = allfields
+        if isbn is not None and not isinstance(isbn, str):
+            isbn = str(isbn)
+        self.isbn = isbn
+        if multipart_set is not None and not isinstance(multipart_set, str):
+            multipart_set = str(multipart_set)
+        self.multipart_set = multipart_set
+        if update_time_str is not None and not isinstance(update_time_str, str):
+            update_time_str = str(update_time_str)
+        self.update_time_str = update_time_str
+        if format is None:
+            format = []
+        elif type(format) is not list:
+            format = [format]
+        if not all(map(str.__instancecheck__, format)):
+            format = [v if isinstance(v, str) else str(v) for v in format]
+        self.format = format
+        if format_finc is None:
+            format_finc = []
+        elif type(format_finc) is not list:
+            format_finc = [format_finc]
+        if not all(map(str.__instancecheck__, format_finc)):
+            format_finc = [v if isinstance(v, str) else str(v) for v in format_finc]
+        self.format_finc = format_finc
+        if format_de14 is None:
+            format_de14 = []
+        elif type(format_de14) is not list:
+            format_de14 = [format_de14]
+        if not all(map(str.__instancecheck__, format_de14)):
+            format_de14 = [v if isinstance(v, str) else str(v) for v in format_de14]
+        self.format_de14 = format_de14
+        if hierarchy_parent_id is None:
+            hierarchy_parent_id = []
+        elif type(hierarchy_parent_id) is not list:
+            hierarchy_parent_id = [hierarchy_parent_id]
+        if not all(map(str.__instancecheck__, hierarchy_parent_id)):
+            hierarchy_parent_id = [v if isinstance(v, str) else str(v) for v in hierarchy_parent_id]
+        self.hierarchy_parent_id = hierarchy_parent_id
+        if hierarchy_parent_title is None:
+            hierarchy_parent_title = []
+        elif type(hierarchy_parent_title) is not list:
+            hierarchy_parent_title = [hierarchy_parent_title]
+        if not all(map(str.__instancecheck__, hierarchy_parent_title)):
+            hierarchy_parent_title = [v if isinstance(v, str) else str(v) for v in hierarchy_parent_title]
+        self.hierarchy_parent_title = hierarchy_parent_title
+        if hierarchy_sequence is None:
+            hierarchy_sequence = []
+        elif type(hierarchy_sequence) is not list:
+            hierarchy_sequence = [hierarchy_sequence]
+        if not all(map(str.__instancecheck__, hierarchy_sequence)):
+            hierarchy_sequence = [v if isinstance(v, str) else str(v) for v in hierarchy_sequence]
+        self.hierarchy_sequence = hierarchy_sequence
+        if hierarchy_top_id is None:
+            hierarchy_top_id = []
+        elif type(hierarchy_top_id) is not list:
+            hierarchy_top_id = [hierarchy_top_id]
+        if not all(map(str.__instancecheck__, hierarchy_top_id)):
+            hierarchy_top_id = [v if isinstance(v, str) else str(v) for v in hierarchy_top_id]
+        self.hierarchy_top_id = hierarchy_top_id
+        if hierarchy_top_title is None:
+            hierarchy_top_title = []
+        elif type(hierarchy_top_title) is not list:
+            hierarchy_top_title = [hierarchy_top_title]
+        if not all(map(str.__instancecheck__, hierarchy_top_title)):
+            hierarchy_top_title = [v if isinstance(v, str) else str(v) for v in hierarchy_top_title]
+        self.hierarchy_top_title = hierarchy_top_title
+        if is_hierarchy_id is not None and not isinstance(is_hierarchy_id, str):
+            is_hierarchy_id = str(is_hierarchy_id)
+        self.is_hierarchy_id = is_hierarchy_id
+        if is_hierarchy_title is not None and not isinstance(is_hierarchy_title, str):
+            is_hierarchy_title = str(is_hierarchy_title)
+        self.is_hierarchy_title = is_hierarchy_title
+        if title_orig is not None and not isinstance(title_orig, str):
+            title_orig = str(title_orig)
+        self.title_orig = title_orig
+        if series_orig is None:
+            series_orig = []
+        elif type(series_orig) is not list:
+            series_orig = [series_orig]
+        if not all(map(str.__instancecheck__, series_orig)):
+            series_orig = [v if isinstance(v, str) else str(v) for v in series_orig]
+        self.series_orig = series_orig
+        if fullrecord is not None and not isinstance(fullrecord, str):
+            fullrecord = str(fullrecord)
+        self.fullrecord = fullrecord
+
+    def to_json_dict(self) -> Dict[str, Any]:
+        """Liefert die gesetzten Felder ohne None-Werte und leere Listen."""
+        result = {}
+        result['id'] = self.id
+        result['record_id'] = self.record_id
+        result['title'] = self.title
+        result['recordtype'] = self.recordtype
+        if self.title_sort is not None:
+            result['title_sort'] = self.title_sort
+        if self.topic:
+            result['topic'] = self.topic
+        if self.author:
+            result['author'] = self.author
+        if self.author2:
+            result['author2'] = self.author2
+        if self.author_corporate:
+            result['author_corporate'] = self.author_corporate
+        if self.author_role:
+            result['author_role'] = self.author_role
+        if self.author2_role:
+            result['author2_role'] = self.author2_role
+        if self.author_corporate_role:
+            result['author_corporate_role'] = self.author_corporate_role
+        if self.author_sort is not None:
+            result['author_sort'] = self.author_sort
+        if self.allfields:
+            result['allfields'] = self.allfields
+        if self.isbn is not None:
+            result['isbn'] = self.isbn
+        if self.multipart_set is not None:
+            result['multipart_set'] = self.multipart_set
+        if self.update_time_str is not None:
+            result['update_time_str'] = self.update_time_str
+        if self.format:
+            result['format'] = self.format
+        if self.format_finc:
+            result['format_finc'] = self.format_finc
+        if self.format_de14:
+            result['format_de14'] = self.format_de14
+        if self.hierarchy_parent_id:
+            result['hierarchy_parent_id'] = self.hierarchy_parent_id
+        if self.hierarchy_parent_title:
+            result['hierarchy_parent_title'] = self.hierarchy_parent_title
+        if self.hierarchy_sequence:
+            result['hierarchy_sequence'] = self.hierarchy_sequence
+        if self.hierarchy_top_id:
+            result['hierarchy_top_id'] = self.hierarchy_top_id
+        if self.hierarchy_top_title:
+            result['hierarchy_top_title'] = self.hierarchy_top_title
+        if self.is_hierarchy_id is not None:
+            result['is_hierarchy_id'] = self.is_hierarchy_id
+        if self.is_hierarchy_title is not None:
+            result['is_hierarchy_title'] = self.is_hierarchy_title
+        if self.title_orig is not None:
+            result['title_orig'] = self.title_orig
+        if self.series_orig:
+            result['series_orig'] = self.series_orig
+        if self.fullrecord is not None:
+            result['fullrecord'] = self.fullrecord
+        return result
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.id == other.id and self.record_id == other.record_id and self.title == other.title and self.recordtype == other.recordtype and self.title_sort == other.title_sort and self.topic == other.topic and self.author == other.author and self.author2 == other.author2 and self.author_corporate == other.author_corporate and self.author_role == other.author_role and self.author2_role == other.author2_role and self.author_corporate_role == other.author_corporate_role and self.author_sort == other.author_sort and self.allfields == other.allfields and self.isbn == other.isbn and self.multipart_set == other.multipart_set and self.update_time_str == other.update_time_str and self.format == other.format and self.format_finc == other.format_finc and self.format_de14 == other.format_de14 and self.hierarchy_parent_id == other.hierarchy_parent_id and self.hierarchy_parent_title == other.hierarchy_parent_title and self.hierarchy_sequence == other.hierarchy_sequence and self.hierarchy_top_id == other.hierarchy_top_id and self.hierarchy_top_title == other.hierarchy_top_title and self.is_hierarchy_id == other.is_hierarchy_id and self.is_hierarchy_title == other.is_hierarchy_title and self.title_orig == other.title_orig and self.series_orig == other.series_orig and self.fullrecord == other.fullrecord
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_json_dict()!r})"
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die Erzeugung von allfields (getAllSearchableFieldsAsSet).
+"""
+
+import io
+
+from pymarc import Field, Record, Subfield
+
+from help.allfields import AllFieldsBuilder
+
+
+def reference_allfields(record, lower=100, upper=900):
+    """Direkte Umsetzung der SolrMarc-Logik als Vergleich."""
+    values = []
+    for field in record.get_fields():
+        if not field.is_control_field() and lower <= int(field.tag) < upper:
+            text = " ".join(value for _, value in field.subfields if value)
+            if text and text not in values:
+                values.append(text)
+    return values
+
+
+def test_entspricht_solrmarc_logik(sample_records):
+    builder = AllFieldsBuilder(100, 900)
+    for record in sample_records:
+        assert builder.build(record) == reference_allfields(record)
+
+
+def test_duplikate_und_reihenfolge():
+    record = Record()
+    for tag, value in [('650', "Botanik"), ('245', "Titel"), ('650', "Botanik"), ('950', "außerhalb")]:
+        record.add_field(Field(tag=tag, indicators=[' ', ' '], subfields=[Subfield('a', value)]))
+
+    assert AllFieldsBuilder().build(record) == ["Botanik", "Titel"]
+
+
+def test_groessenbegrenzung(sample_records):
+    record = sample_records[0]
+    full = AllFieldsBuilder().build(record)
+    builder = AllFieldsBuilder(max_chars=200)
+    capped = builder.build(record)
+
+    assert capped == full[:len(capped)]
+    assert sum(len(value) + 1 for value in capped) <= 201
+    assert builder.truncated_records == 1
+
+
+def test_write_joined(sample_records):
+    builder = AllFieldsBuilder()
+    for record in sample_records:
+        out = io.StringIO()
+        written = builder.write_joined(record, out, separator=" ")
+        assert out.getvalue() == " ".join(builder.build(record))
+        assert written == len(out.getvalue())
+
+
+def test_lazy_record_dekodiert_nur_felder_im_bereich(sample_bytes, sample_records):
+    from help.lazy_marc import LazyMARCReader
+    from slubmodels.converter import convert
+
+    records = list(LazyMARCReader(io.BytesIO(sample_bytes)))
+    builder = AllFieldsBuilder(100, 900)
+    for lazy, record in zip(records, sample_records):
+        assert builder.build(lazy) == reference_allfields(record)
+        convert(lazy)
+        decoded = {lazy._entries[i][0] for i in lazy._decoded}
+        # Außerhalb von 100 bis 899 liest der Konverter nur 001, 020 (ISBN) sowie 937 und 970 (Schlagwörter)
+        outside = {tag for tag, _, _ in lazy._entries if tag < "100" or tag >= "900"} - {"001", "020", "937", "970"}
+        assert outside
+        assert not lazy._materialized
+        assert not decoded & outside, decoded & outside
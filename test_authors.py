@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die Extraktion von Autoren, Körperschaften und Rollen.
+"""
+
+import pytest
+from pymarc import Field, Record, Subfield
+
+from help.authors import AuthorExtractor, ROLE_PLACEHOLDER, author_rules
+
+
+def person(tag, *subfields):
+    return Field(tag=tag, indicators=['1', ' '],
+                 subfields=[Subfield(code, value) for code, value in subfields])
+
+
+def test_listen_sind_ausgerichtet(sample_records):
+    extractor = AuthorExtractor()
+    for record in sample_records:
+        values = extractor.extract(record)
+        for slot in ("author", "author2", "author_corporate"):
+            assert len(values[slot]) == len(values[f"{slot}_role"])
+
+
+def test_rollen_aus_codes_und_termen():
+    record = Record()
+    record.add_field(
+        person('100', ('a', "Schmeil, Otto"), ('d', "1860-1943"), ('e', "VerfasserIn"), ('4', "aut"), ('4', "fon")),
+        person('700', ('a', "Kamera, Karl"), ('e', "Kameramann/Kamerafrau")),
+        person('700', ('a', "Ohne, Rolle")),
+        person('700', ('a', "Loc, Link"), ('4', "http://id.loc.gov/vocabulary/relators/trl")),
+        person('700', ('a', "Schubert, Franz"), ('t', "Die schöne Müllerin")),
+        person('711', ('a', "Tagung"), ('e', "Arbeitsgruppe"), ('c', "Dresden"), ('j', "VeranstalterIn")),
+    )
+    values = AuthorExtractor().extract(record)
+
+    assert values["author"] == ["Schmeil, Otto 1860-1943"]
+    assert values["author_role"] == ["aut|fon"]
+    assert values["author2"] == ["Kamera, Karl", "Ohne, Rolle", "Loc, Link"]
+    assert values["author2_role"] == ["cng", ROLE_PLACEHOLDER, "trl"]
+    assert values["author_corporate"] == ["Tagung Dresden"]
+    assert values["author_corporate_role"] == ["orm"]
+
+
+def test_author_sort_reihenfolge(sample_records):
+    records = {record['001'].data: record for record in sample_records}
+    extractor = AuthorExtractor()
+
+    # 100 vor 700
+    assert extractor.extract(records["1883795745"])["author_sort"] == "Schmeil, Otto 1860-1943"
+    # 111 ohne 100
+    assert extractor.extract(records["1662435290"])["author_sort"].startswith("Real Time Mining")
+    # nur 700
+    assert extractor.extract(records["1016147457"])["author_sort"] == "Kobiela, Dorota 1978-"
+    assert extractor.extract(Record())["author_sort"] is None
+
+
+def test_regeln_aus_feldspezifikationen():
+    rules, sort_tags = author_rules({
+        "author": "100abc", "author_role": "1004",
+        "author_corporate": "110a", "author_corporate_role": "1104e",
+        "author_sort": "110a:100abc",
+    })
+    assert rules == {"100": ("author", "abc", ""), "110": ("author_corporate", "a", "e")}
+    assert sort_tags == ("110", "100")
+
+    record = Record()
+    record.add_field(
+        person('100', ('a', "Schmeil, Otto"), ('d', "1860-1943"), ('e', "VerfasserIn")),
+        person('110', ('a', "Verlag"), ('b', "Abteilung"), ('e', "VerlegerIn")),
+        person('700', ('a', "Nicht, Abgebildet")),
+    )
+    values = AuthorExtractor(rules=rules, sort_tags=sort_tags).extract(record)
+
+    assert values["author"] == ["Schmeil, Otto"]
+    assert values["author_role"] == [ROLE_PLACEHOLDER]
+    assert values["author_corporate"] == ["Verlag"]
+    assert values["author_corporate_role"] == ["pbl"]
+    assert values["author2"] == []
+    assert values["author_sort"] == "Verlag"
+
+
+@pytest.mark.parametrize("sources, message", [
+    ({"author": "100a", "author2": "100a"}, "Feld 100 ist in Slot author2"),
+    ({"author": "100a", "author_role": "7004e"}, "fehlt im Namens-Slot author"),
+    ({"author": "100a", "author_role": "100e"}, "erwartet für Feld 100 \\$4"),
+    ({"author": "100a", "author_sort": "100ab"}, "erwartet 100a"),
+])
+def test_nicht_abbildbare_spezifikationen(sources, message):
+    with pytest.raises(ValueError, match=message):
+        author_rules(sources)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für den StringPool und die kompakte Record-Darstellung.
+"""
+
+import gc
+import tracemalloc
+
+import pytest
+
+from help.compact import CompactModelView, StringPool, compact_class_for
+from slubmodels.dataclass_model import Finc as DataclassFinc
+from slubmodels.pydantic_model import Finc as PydanticFinc
+
+CompactFinc = compact_class_for(PydanticFinc)
+
+
+def test_umwandlung_ist_verlustfrei(sample_values):
+    pool = StringPool()
+    for values in sample_values:
+        compact = CompactFinc.from_values(values, pool)
+        assert compact.to_model(PydanticFinc) == PydanticFinc(**values)
+        assert compact.to_model(DataclassFinc) == DataclassFinc(**values)
+        assert CompactFinc.from_model(PydanticFinc(**values), pool) == compact
+
+
+def test_pool_teilt_wiederkehrende_werte(sample_values):
+    pool = StringPool()
+    first, second = (CompactFinc.from_values(values, pool) for values in sample_values[:2])
+
+    assert first.recordtype is second.recordtype
+    assert "topic" in CompactFinc.MULTIVALUED and isinstance(first.topic, tuple)
+    assert pool.hits > 0
+    with pytest.raises(AttributeError):
+        first.title = "anders"
+
+
+def test_model_view_liefert_modelle(sample_values):
+    values = sample_values
+    view = CompactModelView([CompactFinc.from_values(v) for v in values], PydanticFinc)
+
+    assert len(view) == len(values)
+    assert view[0] == PydanticFinc(**values[0])
+    assert list(view[1:3]) == [PydanticFinc(**v) for v in values[1:3]]
+
+
+def measure(samples, make, count=40):
+    gc.collect()
+    tracemalloc.start()
+    records = []
+    for i in range(count):
+        for values in samples:
+            # Eigene String-Objekte pro Record, wie beim Einlesen echter Daten
+            values = {key: (list(map(str.lower, value)) if isinstance(value, list) else
+                            value.lower() if isinstance(value, str) else value)
+                      for key, value in values.items()}
+            values["id"] = f"{values['id']}-{i}"
+            records.append(make(values))
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(records)
+
+
+def test_kompakte_darstellung_spart_speicher(sample_values):
+    pool = StringPool()
+    pydantic_bytes = measure(sample_values, lambda values: PydanticFinc(**values))
+    compact_bytes = measure(sample_values, lambda values: CompactFinc.from_values(values, pool))
+
+    assert compact_bytes < pydantic_bytes * 0.8
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für den aus den Schema-Annotationen erzeugten Konverter (slubmodels/converter.py).
+"""
+
+import hashlib
+
+import pytest
+import yaml
+from linkml_runtime.utils.schemaview import SchemaView
+from pymarc import Field, Record, Subfield
+
+from help.error_report import MissingFieldError
+from help.linkml_generator import generate_converter
+from help.normalize import get_normalizer
+from marc2finc import map_record
+from slubmodels.converter import convert
+
+SCHEMA = "schema/finc.yaml"
+
+
+def _write_schema(schema: dict, tmp_path):
+    schema_file = tmp_path / "finc.yaml"
+    schema_file.write_text(yaml.safe_dump(schema, allow_unicode=True), encoding="utf-8")
+    return schema_file
+
+
+def compile_converter(schema: dict, tmp_path):
+    """Erzeugt den Konverter für ein (verändertes) Schema und liefert convert()."""
+    schema_file = _write_schema(schema, tmp_path)
+    namespace = {}
+    exec(compile(generate_converter(SchemaView(str(schema_file)), "Finc"), "converter", "exec"), namespace)
+    return namespace["convert"]
+
+
+def test_generierter_code_ist_aktuell():
+    with open(SCHEMA, 'rb') as f:
+        schema_hash = hashlib.sha256(f.read()).hexdigest()
+    source = generate_converter(SchemaView(SCHEMA), "Finc", "finc.yaml", schema_hash)
+    with open("slubmodels/converter.py", encoding="utf-8") as f:
+        assert f.read() == source
+
+
+def test_ergebnis_entspricht_map_record(sample_records):
+    for record in sample_records:
+        assert convert(record) == map_record(record)
+
+
+@pytest.mark.parametrize("tag", ["001", "245"])
+def test_fehlende_pflichtfelder(tag, sample_records):
+    record = sample_records[0]
+    record.remove_fields(tag)
+
+    with pytest.raises(MissingFieldError) as expected:
+        map_record(record)
+    with pytest.raises(MissingFieldError) as error:
+        convert(record)
+    assert error.value.field == expected.value.field == tag
+
+
+def test_neuer_slot_nur_im_schema(tmp_path):
+    with open(SCHEMA, encoding="utf-8") as f:
+        schema = yaml.safe_load(f)
+    schema["classes"]["Finc"]["attributes"]["edition"] = {
+        "range": "string",
+        "annotations": {"source_marc": "250ab", "join": " / ", "function": "first"},
+    }
+    converter = compile_converter(schema, tmp_path)
+
+    record = Record()
+    record.add_field(Field(tag="001", data="123"))
+    record.add_field(Field(tag="245", indicators=["0", "0"], subfields=[Subfield("a", "Titel")]))
+    record.add_field(Field(tag="250", indicators=[" ", " "],
+                           subfields=[Subfield("b", "überarb."), Subfield("a", "2. Aufl. ")]))
+    values = converter(record)
+
+    assert values["edition"] == "2. Aufl. / überarb."
+    assert values["id"] == "0-123"
+    assert values["title"] == "Titel"
+
+
+def test_normalisierer_aus_annotationen(tmp_path):
+    with open(SCHEMA, encoding="utf-8") as f:
+        schema = yaml.safe_load(f)
+    schema["classes"]["Finc"]["attributes"]["edition"] = {
+        "range": "string",
+        "multivalued": True,
+        "annotations": {"source_marc": "250a", "clean": True, "remove_patterns": r"\d \.", "nfc": True},
+    }
+    source = generate_converter(SchemaView(str(_write_schema(schema, tmp_path))), "Finc")
+    assert "_EDITION_NORMALIZE = get_normalizer(True, ('\\\\d', '\\\\.'), True, True).function" in source
+    assert "value = _EDITION_NORMALIZE(value)" in source
+    converter = compile_converter(schema, tmp_path)
+
+    record = Record()
+    record.add_field(Field(tag="001", data="123"))
+    record.add_field(Field(tag="245", indicators=["0", "0"], subfields=[Subfield("a", "[Titel]")]))
+    for _ in range(3):
+        record.add_field(Field(tag="250", indicators=[" ", " "], subfields=[Subfield("a", "2. Aufl. Cafe\u0301 /")]))
+    normalizer = get_normalizer(True, (r"\d", r"\."), True, True)
+    hits = normalizer.hits
+    values = converter(record)
+
+    assert values["edition"] == ["Aufl Café"] * 3
+    assert normalizer.hits == hits + 2
+    # title ist im Schema mit clean annotiert, wie in index.slub.tit.properties
+    assert values["title"] == "Titel"
+
+
+def test_ungueltiges_muster_in_remove_patterns(tmp_path):
+    with open(SCHEMA, encoding="utf-8") as f:
+        schema = yaml.safe_load(f)
+    schema["classes"]["Finc"]["attributes"]["isbn"]["annotations"]["remove_patterns"] = "[a-"
+
+    with pytest.raises(ValueError, match="remove_patterns von Slot isbn"):
+        compile_converter(schema, tmp_path)
+
+
+def test_autorenregeln_aus_source_marc(tmp_path):
+    with open(SCHEMA, encoding="utf-8") as f:
+        schema = yaml.safe_load(f)
+    schema["classes"]["Finc"]["attributes"]["author"]["annotations"]["source_marc"] = "100a"
+    schema["classes"]["Finc"]["attributes"]["author_sort"]["annotations"]["source_marc"] = "100a:110ab:111abc:700abcd"
+    converter = compile_converter(schema, tmp_path)
+
+    record = Record()
+    record.add_field(Field(tag="001", data="123"))
+    record.add_field(Field(tag="245", indicators=["0", "0"], subfields=[Subfield("a", "Titel")]))
+    record.add_field(Field(tag="100", indicators=["1", " "],
+                           subfields=[Subfield("a", "Schmeil, Otto"), Subfield("d", "1860-1943")]))
+    values = converter(record)
+    assert values["author"] == ["Schmeil, Otto"]
+    # author_sort ist der Sortierschlüssel (sort_key), klein geschrieben und ohne Satzzeichen
+    assert values["author_sort"] == "schmeil otto"
+
+    schema["classes"]["Finc"]["attributes"]["author_role"]["annotations"]["source_marc"] = "1004e:7004e"
+    with pytest.raises(ValueError, match="Feld 700 in Slot author_role fehlt im Namens-Slot author"):
+        compile_converter(schema, tmp_path)
+
+
+def test_unbekannte_funktion(tmp_path):
+    with open(SCHEMA, encoding="utf-8") as f:
+        schema = yaml.safe_load(f)
+    schema["classes"]["Finc"]["attributes"]["isbn"]["annotations"]["function"] = "getUnbekannt"
+
+    with pytest.raises(ValueError, match="Unbekannte Funktion 'getUnbekannt'"):
+        compile_converter(schema, tmp_path)
+
+
+@pytest.mark.parametrize("slot, source, message", [
+    ("isbn", "000[6-7]:007[0-1]:008[21]:008[23]:008[29]:008[33]", "keinen Wert für Slot isbn"),
+    ("format", "000[6-7]:008[23]", "liest 000"),
+])
+def test_format_calculator_im_schema(slot, source, message, tmp_path):
+    with open(SCHEMA, encoding="utf-8") as f:
+        schema = yaml.safe_load(f)
+    annotations = schema["classes"]["Finc"]["attributes"][slot]["annotations"]
+    annotations.update(source_marc=source, function="formatCalculator")
+
+    with pytest.raises(ValueError, match=message):
+        compile_converter(schema, tmp_path)
+
+
+@pytest.mark.parametrize("slot, annotations, message", [
+    ("topic", {"sort_key": True}, "sort_key in Slot topic ist nur für einwertige Slots"),
+    ("topic", {"function": "titleSortLower"}, "titleSortLower liefert nur einen Wert"),
+])
+def test_sortierschluessel_im_schema(slot, annotations, message, tmp_path):
+    with open(SCHEMA, encoding="utf-8") as f:
+        schema = yaml.safe_load(f)
+    schema["classes"]["Finc"]["attributes"][slot]["annotations"].update(annotations)
+
+    with pytest.raises(ValueError, match=message):
+        compile_converter(schema, tmp_path)
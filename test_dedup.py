@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die Deduplizierung über Dateigrenzen hinweg.
+"""
+
+import os
+import random
+
+import pytest
+from pymarc import Field, Record, Subfield
+
+from help.dedup import BloomKeySet, HashedKeySet, RecordDeduplicator, key_hash, normalize_isbn
+from marc2finc import process_marc_files
+from slubmodels.dataclass_model import Finc as DataclassFinc
+from slubmodels.pydantic_model import Finc as PydanticFinc
+
+MODELS = {"PydanticFinc": PydanticFinc, "DataclassFinc": DataclassFinc}
+
+
+def write_sources(tmp_path, records):
+    """Zwei Dateien mit denselben Records; in der ersten ist der erste Record neuer (005) und anders betitelt."""
+    first, second = tmp_path / "a.mrc", tmp_path / "b.mrc"
+    with open(second, 'wb') as f:
+        for record in records:
+            f.write(record.as_marc())
+
+    records[0]['005'].data = "29991231235959.0"
+    records[0]['245']['a'] = "Neuere Fassung"
+    with open(first, 'wb') as f:
+        for record in records:
+            f.write(record.as_marc())
+    return [first, second], records
+
+
+@pytest.mark.parametrize("policy, expected_title", [
+    ("first", "Neuere Fassung"),
+    ("last", None),
+    ("newest", "Neuere Fassung"),
+])
+def test_duplikate_ueber_dateien(tmp_path, sample_records, policy, expected_title):
+    sources, records = write_sources(tmp_path, sample_records)
+    deduplicator = RecordDeduplicator(("id",), policy=policy)
+    pydantics, _ = process_marc_files(sources, tmp_path / "out.json", MODELS, deduplicator=deduplicator)
+
+    assert len(pydantics) == len(records)
+    assert deduplicator.duplicates == len(records)
+    assert len({finc.record_id for finc in pydantics}) == len(records)
+
+    winner = next(finc for finc in pydantics if finc.record_id == records[0]['001'].data)
+    if expected_title is None:
+        assert "Neuere Fassung" not in winner.title
+    else:
+        assert winner.title.startswith(expected_title)
+
+
+def marc(record_id, isbn=None, updated=None):
+    record = Record()
+    record.add_field(Field(tag='001', data=record_id))
+    if updated:
+        record.add_field(Field(tag='005', data=updated))
+    if isbn:
+        record.add_field(Field(tag='020', indicators=[' ', ' '], subfields=[Subfield('a', isbn)]))
+    return record
+
+
+@pytest.mark.parametrize("policy", ["last", "newest"])
+def test_mehrere_schluessel_verlieren_keine_id(policy):
+    # Q gewinnt K1 vor P, verliert aber die ISBN an R; P darf deshalb nicht mit verschwinden
+    records = [marc("K1"), marc("K1", "3-494-01943-2"), marc("K3", "3-494-01943-2")]
+    deduplicator = RecordDeduplicator(("id", "isbn"), policy=policy)
+    for ordinal, record in enumerate(records, start=1):
+        deduplicator.observe(record, ordinal)
+
+    assert [deduplicator.accept(record, ordinal) for ordinal, record in enumerate(records, start=1)] == \
+        [True, False, True]
+    assert deduplicator.duplicates == 1
+
+
+def test_newest_entscheidet_vor_der_reihenfolge():
+    records = [marc("K1", updated="20240101000000.0"), marc("K1", updated="20200101000000.0"), marc("K1")]
+    deduplicator = RecordDeduplicator(("id",), policy="newest")
+    for ordinal, record in enumerate(records, start=1):
+        deduplicator.observe(record, ordinal)
+
+    assert [deduplicator.accept(record, ordinal) for ordinal, record in enumerate(records, start=1)] == \
+        [True, False, False]
+
+
+def test_isbn_normalisierung():
+    assert normalize_isbn("3-494-01943-2") == "9783494019437"
+    assert normalize_isbn("978-3-494-01943-7 (kart.)") == "9783494019437"
+    assert normalize_isbn("DIESDAS112") is None
+
+
+def test_hashed_key_set_speicher_pro_schluessel():
+    keys = HashedKeySet(expected_keys=1000)
+    hashes = [key_hash(f"id:{i}") for i in range(200_000)]
+    assert all(keys.add(h) for h in hashes)
+    assert not keys.add(hashes[123])
+    assert hashes[4711] in keys
+    assert key_hash("id:nicht-vorhanden") not in keys
+    # 8 Byte pro Slot bei höchstens 75 % Füllgrad
+    assert keys.memory_bytes / keys.size <= 8 / 0.375
+
+
+def test_hashed_key_set_bytes_pro_schluessel_formel():
+    # Kapazität ist die kleinste Zweierpotenz ab 8 mit höchstens 75 % Füllgrad, 8 Byte pro Slot
+    keys = HashedKeySet(expected_keys=1)
+    for count in range(1, 400_001):
+        keys.add(key_hash(f"id:{count}"))
+        if count in (6, 7, 1000, 98_304, 98_305, 400_000):
+            capacity = 8
+            while capacity * HashedKeySet.MAX_LOAD < count:
+                capacity *= 2
+            assert keys.capacity == capacity
+            assert keys.memory_bytes == 8 * capacity
+    # Kurz nach einer Verdopplung 21,3 Byte, kurz davor 10,7 Byte pro Schlüssel
+    assert 8 / 0.75 <= keys.memory_bytes / keys.size <= 8 / 0.375
+
+
+@pytest.mark.skipif(os.environ.get("MARCLINKFINC_LARGE_TESTS") != "1",
+                    reason="Großer Speichertest (50 Mio. Schlüssel), aktivieren mit MARCLINKFINC_LARGE_TESTS=1")
+def test_hashed_key_set_50_millionen_schluessel():
+    count = 50_000_000
+    keys = HashedKeySet(expected_keys=count)
+    rng = random.Random(42)
+    for _ in range(count):
+        keys.add(rng.getrandbits(64) or 1)
+    assert keys.size >= count - 1
+    # 2²⁷ Slots à 8 Byte = 1 GiB, also etwa 21,5 Byte pro Schlüssel
+    assert keys.memory_bytes / keys.size < 22
+
+
+def test_bloom_filter_ist_exakt():
+    # Winziger Filter erzwingt falsch-positive Treffer, die über SQLite korrigiert werden
+    bloom = BloomKeySet(expected_keys=10, batch_size=7)
+    try:
+        assert all(bloom.add(f"id:{i}") for i in range(2000))
+        assert not any(bloom.add(f"id:{i}") for i in range(0, 2000, 97))
+        assert bloom.false_positives > 0
+        assert bloom.size == 2000
+    finally:
+        bloom.close()
+
+
+def test_bloom_nur_mit_first():
+    with pytest.raises(ValueError):
+        RecordDeduplicator(("id",), policy="last", store="bloom")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für den Abgleich mit dem letzten Lauf (--diff-store).
+"""
+
+import io
+import json
+
+import pytest
+
+import help.diff_store
+from help.diff_store import DiffStore
+from help.pipe import JsonLinesWriter
+from marc2finc import process_marc_files
+
+
+def _run(path, documents, deletes=None, keep=()):
+    """Ein Lauf über documents (id -> Inhalt); liefert die IDs, die geschrieben würden."""
+    store = DiffStore(path)
+    try:
+        emitted = [doc_id for doc_id, content in documents.items() if store.check(doc_id, content.encode("utf-8"))]
+        for doc_id in keep:
+            store.keep(doc_id)
+        store.commit(deletes)
+        return store, emitted
+    finally:
+        store.close()
+
+
+def test_neu_geaendert_geloescht(tmp_path):
+    path = tmp_path / "finc.diffstore"
+    store, emitted = _run(path, {"0-1": "a", "0-2": "b", "0-3": "c"})
+    assert emitted == ["0-1", "0-2", "0-3"] and store.added == 3
+
+    store, emitted = _run(path, {"0-1": "a", "0-2": "B", "0-4": "d"}, tmp_path / "deletes.txt")
+
+    assert emitted == ["0-2", "0-4"]
+    assert (store.added, store.changed, store.unchanged, store.deleted) == (1, 1, 1, 1)
+    assert (tmp_path / "deletes.txt").read_text(encoding="utf-8") == "0-3\n"
+    # Der dritte Lauf vergleicht mit dem zweiten
+    store, emitted = _run(path, {"0-1": "a", "0-2": "B", "0-4": "d"}, tmp_path / "deletes.txt")
+    assert emitted == [] and store.unchanged == 3
+    assert (tmp_path / "deletes.txt").read_text(encoding="utf-8") == ""
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_keep_verhindert_loeschen(tmp_path):
+    path = tmp_path / "finc.diffstore"
+    _run(path, {"0-1": "a", "0-2": "b"})
+
+    store, _ = _run(path, {"0-1": "a"}, tmp_path / "deletes.txt", keep=["0-2", "0-9"])
+
+    assert store.kept == 1 and store.deleted == 0
+    store, emitted = _run(path, {"0-1": "a", "0-2": "b"})
+    assert emitted == [] and store.unchanged == 2
+
+
+def test_ohne_commit_bleibt_der_alte_stand(tmp_path):
+    path = tmp_path / "finc.diffstore"
+    _run(path, {"0-1": "a"})
+    store = DiffStore(path)
+    store.check("0-1", b"anders")
+    store.close()
+
+    assert not list(tmp_path.glob("*.tmp"))
+    _, emitted = _run(path, {"0-1": "a"})
+    assert emitted == []
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_mehrfache_id_letzter_gewinnt(tmp_path, monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(help.diff_store, "numpy", None)
+    path = tmp_path / "finc.diffstore"
+    store = DiffStore(path)
+    for number in range(200):
+        store.check(f"0-{number % 50}", f"{number}".encode("utf-8"))
+    store.commit()
+    store.close()
+
+    store = DiffStore(path)
+    try:
+        assert len(store) == 50
+        assert [store.check(f"0-{number}", f"{number + 150}".encode("utf-8")) for number in range(50)] == [False] * 50
+    finally:
+        store.close()
+
+
+def test_ungueltige_datei(tmp_path):
+    (tmp_path / "kaputt").write_bytes(b"kein Speicher")
+    with pytest.raises(ValueError, match="kein Diff-Speicher"):
+        DiffStore(tmp_path / "kaputt")
+
+
+def test_process_marc_files_schreibt_nur_aenderungen(tmp_path, sample_records):
+    store = tmp_path / "finc.diffstore"
+    first = tmp_path / "erster.mrc"
+    first.write_bytes(b"".join(record.as_marc() for record in sample_records))
+    with DiffStore(store) as diff_store:
+        process_marc_files(str(first), str(tmp_path / "eins" / "r"), diff_store=diff_store)
+    expected = (tmp_path / "eins" / "r.pydantic.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(expected) == len(sample_records)
+
+    # Zweiter Lauf: ein Titel geändert, der letzte Record fehlt
+    sample_records[0]["245"]["a"] = "Geänderter Titel"
+    second = tmp_path / "zweiter.mrc"
+    second.write_bytes(b"".join(record.as_marc() for record in sample_records[:-1]))
+    with DiffStore(store) as diff_store:
+        process_marc_files(str(second), str(tmp_path / "zwei" / "r"), diff_store=diff_store)
+
+    lines = (tmp_path / "zwei" / "r.pydantic.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["title"].split(":")[0] for line in lines] == ["Geänderter Titel"]
+    assert (tmp_path / "zwei" / "r.dataclass.jsonl").read_text(encoding="utf-8").count("\n") == 1
+    assert (tmp_path / "zwei" / "r.deletes.txt").read_text(encoding="utf-8").splitlines() == \
+        [json.loads(expected[-1])["id"]]
+
+
+def test_pipe_modus(tmp_path):
+    store = tmp_path / "finc.diffstore"
+    for expected in (13, 0):
+        buffer = io.BytesIO()
+        with DiffStore(store) as diff_store:
+            process_marc_files("samples/output.mrc", None, output_stream=JsonLinesWriter(buffer),
+                               diff_store=diff_store)
+        assert buffer.getvalue().count(b"\n") == expected
+    assert (tmp_path / "finc.diffstore.deletes.txt").read_text(encoding="utf-8") == ""
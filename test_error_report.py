@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für Dead-Letter-Ausgabe und aggregierten Fehlerbericht.
+"""
+
+import json
+
+import logging
+
+from pymarc import Field, MARCReader, Subfield
+
+from help.error_report import DeadLetterWriter, ErrorReport, MissingFieldError, describe_error
+from marc2finc import process_marc_files
+from slubmodels.dataclass_model import Finc as DataclassFinc
+from slubmodels.pydantic_model import Finc as PydanticFinc
+
+MODELS = {"PydanticFinc": PydanticFinc, "DataclassFinc": DataclassFinc}
+
+
+def write_faulty_source(path, records):
+
+    without_title = records[1]
+    without_title.remove_fields('245')
+    invalid_isbn = records[2]
+    invalid_isbn.remove_fields('020')
+    invalid_isbn.add_field(Field(tag='020', indicators=[' ', ' '], subfields=[Subfield('a', "DIESDAS112")]))
+
+    with open(path, 'wb') as f:
+        for record in records:
+            f.write(record.as_marc())
+        # Abgeschnittener Record am Ende der Datei
+        f.write(records[0].as_marc()[:100])
+    return records
+
+
+def test_fehlerhafte_records_landen_in_dead_letter(tmp_path, sample_records):
+    source = tmp_path / "quelle.mrc"
+    records = write_faulty_source(source, sample_records)
+
+    pydantics, dataclasses = process_marc_files(str(source), str(tmp_path / "result"), MODELS)
+
+    assert len(pydantics) == len(records) - 2
+    # Die Dataclass validiert keine ISBN-Muster
+    assert len(dataclasses) == len(records) - 1
+
+    dead_letters = list(MARCReader(open(tmp_path / "result.deadletter.mrc", 'rb')))
+    reasons = [json.loads(line) for line in open(tmp_path / "result.deadletter.jsonl", encoding='utf-8')]
+    # Der abgeschnittene Record wird ebenfalls roh übernommen und bleibt unlesbar
+    assert [r['001'].data for r in dead_letters[:2]] == [records[1]['001'].data, records[2]['001'].data]
+    assert dead_letters[2] is None
+    assert [entry["position"] for entry in reasons] == [2, 3, len(records) + 1]
+    assert {entry["source"] for entry in reasons} == {str(source)}
+    assert reasons[0]["reasons"][0]["field"] == "245"
+    assert reasons[1]["reasons"][0] == {
+        "stage": "pydantic", "type": "ValidationError.value_error", "field": "isbn",
+        "message": "Value error, Invalid isbn format: DIESDAS112",
+    }
+    assert reasons[2]["reasons"][0]["type"] == "TruncatedRecord"
+
+    summary = json.load(open(tmp_path / "result.errors.json", encoding='utf-8'))
+    assert summary["failed_records"] == 3
+
+
+def test_dead_letter_position_pro_quelldatei(tmp_path, sample_records):
+    first, second = tmp_path / "erste.mrc", tmp_path / "zweite.mrc"
+    records = write_faulty_source(first, sample_records)
+    with open(second, 'wb') as f:
+        for record in records[:2]:
+            f.write(record.as_marc())
+
+    process_marc_files([str(first), str(second)], str(tmp_path / "result"), MODELS)
+
+    reasons = [json.loads(line) for line in open(tmp_path / "result.deadletter.jsonl", encoding='utf-8')]
+    assert [(entry["source"], entry["position"]) for entry in reasons] == [
+        (str(first), 2), (str(first), 3), (str(first), len(records) + 1), (str(second), 2)]
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_fehler_werden_aggregiert_und_begrenzt_geloggt():
+    report = ErrorReport(log_limit=2)
+    handler = CollectingHandler()
+    report.log.addHandler(handler)
+    for number in range(1000):
+        report.add("mapping", MissingFieldError("245"), record_id=str(number))
+    report.add("dataclass", ValueError("title must be supplied"), record_id="x")
+
+    summary = report.summary()
+    assert summary[0]["count"] == 1000
+    assert summary[0]["examples"] == ["0", "1", "2", "3", "4"]
+    assert (summary[1]["type"], summary[1]["field"]) == ("MissingRequiredField", "title")
+    # 2 einzelne Meldungen + Hinweis auf weitere Fehler + 1 Meldung für die Dataclass
+    report.log.removeHandler(handler)
+    assert len(handler.records) == 4
+
+
+def test_describe_error_ohne_feldbezug():
+    assert describe_error(KeyError("x")) == [("KeyError", None, "'x'")]
+
+
+def test_dead_letter_legt_dateien_erst_bei_bedarf_an(tmp_path):
+    writer = DeadLetterWriter(tmp_path / "leer")
+    writer.close()
+    assert not writer.marc_path.exists()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für das stapelweise Ausschneiden von Zeichenpositionen.
+"""
+
+import io
+
+import pytest
+from pymarc import Field, Record
+
+from help.fixed_fields import FixedFieldBatch, numpy, parse_char_spec
+from help.lazy_marc import LazyMARCReader
+
+SPECS = {"language": "008[35-37]", "multipart_set": "000[19]", "update_time_str": "005[0-13]",
+         "form": "008/23"}
+
+
+def _expected(record):
+    leader = str(record.leader)
+    field_008 = record['008'].data if '008' in record else ""
+    field_005 = record['005'].data if '005' in record else ""
+    return {"language": field_008[35:38] or None, "multipart_set": leader[19:20] or None,
+            "update_time_str": field_005[:14] or None, "form": field_008[23:24] or None}
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("008[35-37]", ("008", 35, 38)),
+    ("000[19]", ("000", 19, 20)),
+    ("LDR/19", ("000", 19, 20)),
+    ("005/0-13", ("005", 0, 14)),
+    ("245a", None),
+    ("020[0-3]", None),
+])
+def test_parse_char_spec(spec, expected):
+    assert parse_char_spec(spec) == expected
+
+
+def test_parse_char_spec_ungueltiger_bereich():
+    with pytest.raises(ValueError, match="Ungültiger Zeichenbereich"):
+        parse_char_spec("008[37-35]")
+
+
+def test_keine_zeichenpositionen():
+    with pytest.raises(ValueError, match="Slot topic"):
+        FixedFieldBatch({"topic": "650a"})
+
+
+def test_python_entspricht_slices(sample_records):
+    batch = FixedFieldBatch(SPECS, use_numpy=False)
+
+    assert batch.extract(sample_records) == [_expected(record) for record in sample_records]
+
+
+@pytest.mark.skipif(numpy is None, reason="NumPy ist nicht installiert")
+def test_numpy_entspricht_python(sample_bytes, sample_records):
+    lazy_records = list(LazyMARCReader(io.BytesIO(sample_bytes)))
+    python_batch = FixedFieldBatch(SPECS, use_numpy=False)
+    numpy_batch = FixedFieldBatch(SPECS, use_numpy=True)
+
+    expected = python_batch.extract(sample_records)
+    assert numpy_batch.extract(sample_records) == expected
+    assert numpy_batch.extract(lazy_records) == expected
+    # Ausgeschnitten wird aus den Rohbytes, ohne ein Feld zu dekodieren
+    assert all(record.decoded_field_count == 0 for record in lazy_records)
+
+
+@pytest.mark.parametrize("use_numpy", [False, pytest.param(True, marks=pytest.mark.skipif(
+    numpy is None, reason="NumPy ist nicht installiert"))])
+def test_kurze_und_fehlende_felder(use_numpy):
+    short = Record()
+    short.add_field(Field(tag='001', data='1'), Field(tag='008', data='240611s2024'),
+                    Field(tag='005', data='2024'))
+    batch = FixedFieldBatch(SPECS, use_numpy=use_numpy)
+
+    result = batch.extract([short, None, Record()])
+
+    assert result[0] == {"language": None, "multipart_set": " ", "update_time_str": "2024", "form": None}
+    assert result[1] == {}
+    assert result[2]["update_time_str"] is None and result[2]["language"] is None
+
+
+def test_konverter_mit_stapel_entspricht_einzeln(sample_records):
+    from slubmodels.converter import FIXED_FIELDS, convert
+
+    fixed = FIXED_FIELDS.extract(sample_records)
+    assert [convert(record, values) for record, values in zip(sample_records, fixed)] == \
+        [convert(record) for record in sample_records]
+
+
+def test_stapel_in_process_marc_files(tmp_path):
+    from marc2finc import process_marc_files
+
+    batched = process_marc_files("samples/output.mrc", tmp_path / "stapel", fixed_batch_size=4)
+    single = process_marc_files("samples/output.mrc", tmp_path / "einzeln", fixed_batch_size=0)
+
+    assert [model.model_dump() for model in batched[0]] == [model.model_dump() for model in single[0]]
+    assert (tmp_path / "stapel.pydantic.jsonl").read_bytes() == (tmp_path / "einzeln.pydantic.jsonl").read_bytes()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die Formatbestimmung über die Entscheidungstabelle.
+"""
+
+import io
+
+import pytest
+from pymarc import Field, Record
+
+from help.formats import FormatCalculator, decide, format_key
+from help.lazy_marc import LazyMARCReader
+
+# Erwartete Formate der Beispielrecords in Dateireihenfolge
+SAMPLE_FORMATS = ["Book", "Video", "MusicRecording", "eBook", "eVideo", "eBook", "MusicalScore",
+                  "Article", "Book", "Book", "Book", "Video", "MusicalScore"]
+
+
+def _record(leader_06_07, field_007=None, field_008=None):
+    record = Record()
+    record.leader = record.leader[:6] + leader_06_07 + record.leader[8:]
+    if field_007 is not None:
+        record.add_field(Field(tag='007', data=field_007))
+    if field_008 is not None:
+        record.add_field(Field(tag='008', data=field_008))
+    return record
+
+
+def _field_008(**positions):
+    data = list(" " * 40)
+    for position, value in positions.items():
+        data[int(position[1:])] = value
+    return "".join(data)
+
+
+def test_beispielrecords(sample_records):
+    calculator = FormatCalculator()
+
+    assert [calculator.lookup(record).format[0] for record in sample_records] == SAMPLE_FORMATS
+
+
+def test_lazy_record_liefert_denselben_schluessel(sample_bytes, sample_records):
+    lazy_records = list(LazyMARCReader(io.BytesIO(sample_bytes)))
+
+    assert [format_key(record) for record in lazy_records] == [format_key(record) for record in sample_records]
+    assert all(record.decoded_field_count == 0 for record in lazy_records)
+
+
+@pytest.mark.parametrize("record, expected", [
+    (_record("as", field_008=_field_008(p21="n")), ("Newspaper", "Newspaper", "Newspaper")),
+    (_record("as", "cr", _field_008(p21="p")), ("eJournal", "Journal, E-Journal", "E-Journal")),
+    (_record("am", field_008=_field_008(p23="b")), ("Microform", "Microform", "Microform")),
+    (_record("am", "he"), ("Microform", "Microform", "Microform")),
+    (_record("am", "co"), ("DataCarrier", "Electronic Resource (Data Carrier)", "Electronic Resource")),
+    (_record("em", field_008=_field_008(p29="o")), ("eMap", "Map", "E-Map")),
+    # Bei Karten steht die Erscheinungsform in 008/29, 008/23 gehört zu einer anderen Angabe
+    (_record("em", field_008=_field_008(p23="o")), ("Map", "Map", "Map")),
+    (_record("km"), ("Photo", "Image", "Image")),
+    (_record("zm"), ("Unknown", "Other", "Other")),
+])
+def test_entscheidungstabelle(record, expected):
+    result = FormatCalculator().lookup(record)
+
+    assert (result.format[0], result.format_finc[0], result.format_de14[0]) == expected
+
+
+def test_kurze_felder_sind_eigene_schluessel():
+    # Ein fehlendes 007 ist nicht dasselbe wie ein 007 mit Leerzeichen
+    assert format_key(_record("am")) != format_key(_record("am", "  "))
+    assert len(format_key(_record("am", "c", "123"))) == 8
+    assert decide(format_key(_record("am", "c"))).format == ("DataCarrier",)
+
+
+def test_tabelle_einmal_pro_schluessel(sample_records):
+    calculator = FormatCalculator()
+    for _ in range(3):
+        for record in sample_records:
+            calculator.lookup(record)
+
+    assert calculator.misses == len(calculator) == len({format_key(record) for record in sample_records})
+
+    limited = FormatCalculator(max_keys=0)
+    assert [limited.lookup(record) for record in sample_records] == \
+        [calculator.lookup(record) for record in sample_records]
+    assert len(limited) == 0
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für fullrecord (FullRecordAsMarc) aus den Originalbytes des Lesers.
+"""
+
+import base64
+import io
+import json
+
+import pytest
+import yaml
+from pymarc import Field, Indicators, MARCReader, Subfield
+
+from help.fullrecord import full_record, original_bytes
+from help.lazy_marc import LazyMARCReader, LazyRecord
+from marc2finc import process_marc_files
+from test_converter import SCHEMA, compile_converter
+
+
+def _lazy_records(sample_bytes):
+    return list(LazyMARCReader(io.BytesIO(sample_bytes)))
+
+
+def test_unveraenderte_records_aus_den_originalbytes(sample_bytes):
+    for record in _lazy_records(sample_bytes):
+        assert original_bytes(record) is record.raw
+        assert full_record(record).encode("utf-8") == record.raw
+        assert base64.b64decode(full_record(record, "base64")) == record.raw
+        # Weder die Kodierung noch das Lesen einzelner Felder dekodiert alle Felder
+        record.get_fields("245")
+        assert not record.modified and record.decoded_field_count == 1
+
+
+def test_gleich_wie_as_marc(sample_bytes, sample_records):
+    assert [full_record(record) for record in _lazy_records(sample_bytes)] == \
+        [full_record(record) for record in sample_records] == \
+        [record.as_marc().decode("utf-8") for record in sample_records]
+
+
+@pytest.mark.parametrize("change", [
+    lambda record: record.add_field(Field(tag="500", indicators=Indicators(" ", " "),
+                                          subfields=[Subfield(code="a", value="Neu")])),
+    lambda record: record.remove_fields("245"),
+    lambda record: setattr(record, "fields", list(reversed(record.fields))),
+    lambda record: record.leader.__setitem__(5, "d"),
+], ids=["add_field", "remove_fields", "fields", "leader"])
+def test_geaenderte_records_werden_serialisiert(sample_bytes, change):
+    record = _lazy_records(sample_bytes)[0]
+    change(record)
+
+    assert record.modified and original_bytes(record) is None
+    assert full_record(record).encode("utf-8") == record.as_marc() != record.raw
+
+
+def test_aenderung_im_feld_ueber_mark_modified(sample_bytes):
+    record = _lazy_records(sample_bytes)[0]
+    _ = record.fields
+    assert not record.modified
+    record["245"]["a"] = "Geänderter Titel"
+    # Änderungen innerhalb eines Feldes sind nicht erkennbar
+    assert not record.modified
+
+    record.mark_modified()
+
+    assert "Geänderter Titel" in full_record(record)
+
+
+def test_marc8_record(sample_bytes):
+    source = next(MARCReader(io.BytesIO(sample_bytes)))
+    source["245"]["a"] = "MXuller"
+    chunk = source.as_marc()
+    chunk = chunk[:9] + b" " + chunk[10:]
+    chunk = chunk.replace(b"MXuller", b"M\xe8uller")
+    record = LazyRecord(chunk)
+
+    # base64 bleibt byte-genau, als Text wird wie bei SolrMarc in UTF-8 serialisiert
+    assert base64.b64decode(full_record(record, "base64")) == chunk
+    text = full_record(record)
+    assert text[9] == "a" and text.encode("utf-8") == LazyRecord(text.encode("utf-8")).raw
+    assert LazyRecord(text.encode("utf-8"))["245"]["a"] == record["245"]["a"] == "Müller"
+
+
+def test_unbekannte_kodierung(sample_records):
+    with pytest.raises(ValueError, match="Unbekannte Kodierung"):
+        full_record(sample_records[0], "hex")
+
+
+@pytest.mark.parametrize("annotations, message", [
+    ({"encoding": "hex"}, "Unbekannte Kodierung 'hex'"),
+    ({"function": "first"}, "nur für einwertige Slots ohne function"),
+])
+def test_fullrecord_im_schema(annotations, message, tmp_path):
+    with open(SCHEMA, encoding="utf-8") as f:
+        schema = yaml.safe_load(f)
+    schema["classes"]["Finc"]["attributes"]["fullrecord"]["annotations"].update(annotations)
+
+    with pytest.raises(ValueError, match=message):
+        compile_converter(schema, tmp_path)
+
+
+def test_base64_im_schema(sample_bytes, tmp_path):
+    with open(SCHEMA, encoding="utf-8") as f:
+        schema = yaml.safe_load(f)
+    schema["classes"]["Finc"]["attributes"]["fullrecord"]["annotations"]["encoding"] = "base64"
+    convert = compile_converter(schema, tmp_path)
+
+    record = _lazy_records(sample_bytes)[0]
+    assert base64.b64decode(convert(record)["fullrecord"]) == record.raw
+
+
+@pytest.mark.parametrize("lazy_decoding", [True, False])
+def test_process_marc_files(tmp_path, sample_bytes, lazy_decoding):
+    process_marc_files("samples/output.mrc", str(tmp_path / "r"), lazy_decoding=lazy_decoding)
+
+    lines = (tmp_path / "r.pydantic.jsonl").read_text(encoding="utf-8").splitlines()
+    chunks = [record.raw for record in _lazy_records(sample_bytes)]
+    assert [json.loads(line)["fullrecord"].encode("utf-8") for line in lines] == chunks
+    assert "\\u001e" in lines[0]
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die Hierarchieauflösung in zwei Durchläufen (help/hierarchy.py).
+"""
+
+import json
+
+import pytest
+from pymarc import Field, Indicators, Record, Subfield
+
+from help.hierarchy import HierarchyIndex
+from marc2finc import process_marc_files
+from slubmodels.converter import convert
+from slubmodels.dataclass_model import Finc as DataclassFinc
+from slubmodels.pydantic_model import Finc as PydanticFinc
+
+MODELS = {"PydanticFinc": PydanticFinc, "DataclassFinc": DataclassFinc, "converter": convert}
+
+
+def make_record(record_id, title, *links):
+    """Record mit 001, 245 $a und Verknüpfungen (tag, $w, Zählung)."""
+    record = Record()
+    record.add_field(Field(tag='001', data=record_id))
+    record.add_field(Field(tag='245', indicators=Indicators('1', '0'), subfields=[Subfield('a', title)]))
+    for tag, target, sequence in links:
+        code = 'q' if tag == '773' else 'v'
+        subfields = [Subfield('w', target)] + ([Subfield(code, sequence)] if sequence else [])
+        record.add_field(Field(tag=tag, indicators=Indicators(' ', '0'), subfields=subfields))
+    return record
+
+
+@pytest.fixture
+def records():
+    return [
+        make_record("A1", "Aufsatz", ("773", "(DE-627)H1", "12")),
+        make_record("H1", "Heft 3", ("773", "(DE-627)Z1", "3"), ("773", "(DE-600)ZDB-1", "")),
+        make_record("Z1", "Zeitschrift"),
+        make_record("B4", "Band 4", ("830", "(DE-627)R1", "Band 4"), ("800", "(DE-627)FEHLT", "")),
+        make_record("R1", "Reihe"),
+        make_record("X1", "Ohne Hierarchie"),
+        make_record("C1", "Zyklus eins", ("773", "(DE-627)C2", "")),
+        make_record("C2", "Zyklus zwei", ("773", "(DE-627)C1", "")),
+    ]
+
+
+@pytest.fixture
+def hierarchy(records):
+    index = HierarchyIndex(batch_size=3)
+    for record in records:
+        index.observe(record)
+    index.finish()
+    yield index
+    index.close()
+
+
+def test_verknuepfungen_aus_w(records):
+    index = HierarchyIndex()
+    try:
+        assert index.parent_links(records[1]) == [("Z1", "3")]
+        assert index.parent_links(records[3]) == [("R1", "Band 4"), ("FEHLT", "")]
+    finally:
+        index.close()
+
+
+def test_kette_bis_zur_spitze(hierarchy):
+    assert hierarchy.resolve("A1") == {
+        "hierarchy_parent_id": ["0-H1"],
+        "hierarchy_parent_title": ["Heft 3"],
+        "hierarchy_sequence": ["12"],
+        "hierarchy_top_id": ["0-Z1"],
+        "hierarchy_top_title": ["Zeitschrift"],
+    }
+    assert hierarchy.resolve("H1") == {
+        "hierarchy_parent_id": ["0-Z1"],
+        "hierarchy_parent_title": ["Zeitschrift"],
+        "hierarchy_sequence": ["3"],
+        "is_hierarchy_id": "0-H1",
+        "is_hierarchy_title": "Heft 3",
+        "hierarchy_top_id": ["0-Z1"],
+        "hierarchy_top_title": ["Zeitschrift"],
+    }
+    # Die Spitze verweist auf sich selbst
+    assert hierarchy.resolve("Z1") == {
+        "is_hierarchy_id": "0-Z1",
+        "is_hierarchy_title": "Zeitschrift",
+        "hierarchy_top_id": ["0-Z1"],
+        "hierarchy_top_title": ["Zeitschrift"],
+    }
+
+
+def test_fehlende_uebergeordnete_und_ohne_hierarchie(hierarchy):
+    result = hierarchy.resolve("B4")
+    assert result["hierarchy_parent_id"] == ["0-R1"]
+    assert result["hierarchy_sequence"] == ["Band 4"]
+    assert hierarchy.unresolved_links == 1
+    assert hierarchy.resolve("X1") == {}
+    assert hierarchy.resolve("UNBEKANNT") == {}
+
+
+def test_zyklus_bricht_ab(hierarchy):
+    assert hierarchy.resolve("C1")["hierarchy_top_id"] in (["0-C1"], ["0-C2"])
+    assert hierarchy.resolve("C2")["hierarchy_top_id"] in (["0-C1"], ["0-C2"])
+    assert hierarchy.cycles >= 1
+
+
+def test_knoten_cache(hierarchy):
+    for record_id in ("A1", "A1", "H1", "B4"):
+        hierarchy.resolve(record_id)
+    assert hierarchy.node.cache_info().hits > 0
+
+
+def test_resolve_ohne_vorlauf():
+    index = HierarchyIndex()
+    try:
+        with pytest.raises(RuntimeError, match="finish"):
+            index.resolve("A1")
+    finally:
+        index.close()
+
+
+def test_process_marc_files_mit_hierarchie(tmp_path, records, sample_records):
+    source = tmp_path / "hierarchie.mrc"
+    with open(source, "wb") as out:
+        for record in sample_records + records:
+            out.write(record.as_marc())
+
+    index = HierarchyIndex(tmp_path / "hierarchy.sqlite")
+    try:
+        process_marc_files(str(source), str(tmp_path / "out"), MODELS, hierarchy=index)
+    finally:
+        index.close()
+
+    lines = [json.loads(line) for line in (tmp_path / "out.pydantic.jsonl").read_text(encoding="utf-8").splitlines()]
+    by_id = {line["record_id"]: line for line in lines}
+    assert by_id["A1"]["hierarchy_top_title"] == ["Zeitschrift"]
+    assert by_id["R1"]["is_hierarchy_id"] == "0-R1"
+    # Die Beispieldaten verweisen nur auf Records außerhalb der Datei
+    assert not any(key.startswith(("hierarchy", "is_hierarchy")) for record in sample_records
+                   for key in by_id[record["001"].data])
+    dataclass_lines = (tmp_path / "out.dataclass.jsonl").read_text(encoding="utf-8").splitlines()
+    assert json.loads(dataclass_lines[len(sample_records)])["hierarchy_parent_id"] == ["0-H1"]
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für das Verwerfen von Records über ID-Listen vor dem Parsen.
+"""
+
+import io
+import json
+
+import pytest
+
+import help.id_filter
+from help.id_filter import IdFilter, raw_record_id
+from help.lazy_marc import LazyMARCReader, LazyRecord
+from marc2finc import process_marc_files
+from test_error_report import write_faulty_source
+
+
+def write_id_list(path, ids):
+    # Präfix, Anführungszeichen, weitere Spalten und Kommentare wie in den Listen aus der Produktion
+    lines = ["# unterdrückte Records"] + [f"0-{record_id},x" if number % 2 else f'"{record_id}"'
+                                          for number, record_id in enumerate(ids)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_raw_record_id(sample_records):
+    for record in sample_records:
+        assert raw_record_id(record.as_marc()) == record['001'].data
+    assert raw_record_id(b"00026nam a22000000  4500\x1e\x1d") is None
+    assert raw_record_id(b"kein Record") is None
+
+
+def test_ids_mit_praefix_und_cache(tmp_path, monkeypatch):
+    id_list = write_id_list(tmp_path / "suppressed.csv", ["123", "456"])
+    id_filter = IdFilter([id_list])
+
+    assert "123" in id_filter and "456" in id_filter
+    assert "0-123" not in id_filter and "789" not in id_filter
+    assert id_filter.cache_file.exists()
+
+    # Zweiter Lauf: die Liste wird nicht mehr gelesen
+    def fail(path, prefix):
+        raise AssertionError("Liste trotz Cache gelesen")
+    monkeypatch.setattr(help.id_filter, "_read_ids", fail)
+    assert "456" in IdFilter([id_list])
+
+    # Geänderte Liste: neuer Cache
+    monkeypatch.undo()
+    write_id_list(id_list, ["789", "123", "abc"])
+    changed = IdFilter([id_list])
+    assert changed.cache_file != id_filter.cache_file
+    assert len(changed) == 3 and "789" in changed and "456" not in changed
+
+
+def test_ohne_liste():
+    with pytest.raises(ValueError, match="mindestens eine ID-Liste"):
+        IdFilter([])
+
+
+def test_verworfene_records_werden_nicht_geparst(tmp_path, sample_bytes, sample_records, monkeypatch):
+    suppressed = [sample_records[1]['001'].data, sample_records[4]['001'].data]
+    id_filter = IdFilter([write_id_list(tmp_path / "suppressed.csv", suppressed)], use_cache=False)
+    parsed = []
+    original_init = LazyRecord.__init__
+
+    def counting_init(self, chunk, *args, **kwargs):
+        parsed.append(raw_record_id(chunk))
+        original_init(self, chunk, *args, **kwargs)
+    monkeypatch.setattr(LazyRecord, "__init__", counting_init)
+
+    reader = LazyMARCReader(io.BytesIO(sample_bytes), skip=id_filter.drops_chunk)
+    records = list(reader)
+
+    assert len(records) == len(sample_records) - 2
+    assert not set(parsed) & set(suppressed)
+    assert reader.dropped == id_filter.dropped == 2
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_process_marc_files(tmp_path, sample_records, lazy):
+    suppressed = [sample_records[0]['001'].data, sample_records[5]['001'].data]
+    id_filter = IdFilter([write_id_list(tmp_path / "suppressed.csv", suppressed)], use_cache=False)
+
+    pydantics, _ = process_marc_files("samples/output.mrc", str(tmp_path / "result"), id_filter=id_filter,
+                                      lazy_decoding=lazy)
+
+    expected = [record['001'].data for record in sample_records if record['001'].data not in suppressed]
+    assert [model.record_id for model in pydantics] == expected
+    assert id_filter.dropped == 2
+
+
+def test_dead_letter_position_zaehlt_verworfene_mit(tmp_path, sample_records):
+    source = tmp_path / "quelle.mrc"
+    records = write_faulty_source(source, sample_records)
+    id_filter = IdFilter([write_id_list(tmp_path / "suppressed.csv", [records[0]['001'].data])], use_cache=False)
+
+    process_marc_files(str(source), str(tmp_path / "result"), id_filter=id_filter)
+
+    reasons = [json.loads(line) for line in open(tmp_path / "result.deadletter.jsonl", encoding='utf-8')]
+    assert [entry["position"] for entry in reasons] == [2, 3, len(records) + 1]
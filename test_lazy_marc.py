@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die lazy Dekodierung und den MARC-8-Dekoder.
+"""
+
+import io
+
+import pytest
+from pymarc import MARCReader
+from pymarc.marc8 import marc8_to_unicode
+
+from help.lazy_marc import LazyMARCReader, LazyRecord, Marc8Decoder
+from help.marc_utils import MarcUtils
+
+
+def test_lazy_record_entspricht_pymarc(sample_bytes):
+    data = sample_bytes
+    eager = list(MARCReader(io.BytesIO(data)))
+    lazy = list(LazyMARCReader(io.BytesIO(data)))
+
+    assert len(lazy) == len(eager)
+    for lazy_record, eager_record in zip(lazy, eager):
+        assert lazy_record['001'].data == eager_record['001'].data
+        assert (MarcUtils.extract_marc_subfields(lazy_record, "245ab", "650a", join=" ")
+                == MarcUtils.extract_marc_subfields(eager_record, "245ab", "650a", join=" "))
+        assert lazy_record.as_marc() == eager_record.as_marc()
+
+
+def test_nur_angefragte_felder_werden_dekodiert(sample_bytes):
+    record = next(iter(LazyMARCReader(io.BytesIO(sample_bytes))))
+
+    assert record.decoded_field_count == 0
+    assert '245' in record
+    assert record.decoded_field_count == 0
+    record.get_fields('245')
+    assert record.decoded_field_count == 1
+    record.get_fields('245')
+    assert record.decoded_field_count == 1
+
+
+@pytest.mark.parametrize("marc8", [
+    b"M\xe8uller",                  # kombinierendes Trema vor dem Basiszeichen
+    b"Stra\xe2e \xa5 \xb2ko",       # Akut, AE-Ligatur, o mit Strich
+    b"plain ascii",
+    b"\x1b(Ssome greek \x1b(B",     # Zeichensatzwechsel über Escape-Sequenz
+])
+def test_marc8_entspricht_pymarc(marc8):
+    assert Marc8Decoder().decode(marc8) == marc8_to_unicode(marc8, hide_utf8_warnings=True)
+
+
+def test_marc8_fehlerstrategie_und_cache():
+    invalid = b"A\xffB"
+    assert Marc8Decoder("replace").decode(invalid) == "A\ufffdB"
+    assert Marc8Decoder("ignore").decode(invalid) == "AB"
+    with pytest.raises(UnicodeDecodeError):
+        Marc8Decoder("strict").decode(invalid)
+
+    decoder = Marc8Decoder()
+    decoder.decode(b"M\xe8uller")
+    decoder.decode(b"M\xe8uller")
+    assert decoder.decode.cache_info().hits == 1
+
+
+def test_marc8_record_wird_ueber_leader_erkannt(sample_bytes):
+    record = next(MARCReader(io.BytesIO(sample_bytes)))
+    record['245']['a'] = "MXuller"
+    chunk = record.as_marc()
+    # Leader-Position 9 leer (MARC-8) und Platzhalter durch MARC-8-Bytes gleicher Länge ersetzen
+    chunk = chunk[:9] + b" " + chunk[10:]
+    chunk = chunk.replace(b"MXuller", b"M\xe8uller")
+
+    assert LazyRecord(chunk)['245']['a'] == "Müller"
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die verknüpften 880-Felder (LNK-Präfix) in MarcUtils, Konverter und MARCspec.
+"""
+
+import io
+
+import pytest
+import yaml
+from pymarc import Field, Indicators, Record, Subfield
+
+from help.lazy_marc import LazyMARCReader
+from help.linked_fields import link_index, parse_linkage
+from help.marc_utils import MarcUtils
+from marc2finc import map_record
+from marc_example import MARCSpecExecutor, MARCSpecParser
+from slubmodels.converter import convert
+from test_converter import SCHEMA, compile_converter
+
+
+def _field(tag, *subfields):
+    return Field(tag=tag, indicators=Indicators("1", "0"),
+                 subfields=[Subfield(code=code, value=value) for code, value in subfields])
+
+
+@pytest.fixture
+def linked_record():
+    """Record mit Titel und Gesamttitel in Originalschrift (880 über $6) und einem ungepaarten 880."""
+    record = Record(force_utf8=True)
+    record.leader = record.leader[:9] + "a" + record.leader[10:]
+    record.add_field(Field(tag="001", data="1234567890"))
+    record.add_field(_field("245", ("6", "880-01"), ("a", "Zhongguo li shi"), ("b", "xin bian")))
+    record.add_field(_field("800", ("6", "880-02"), ("a", "Wang, Li"), ("t", "Cong shu")))
+    record.add_field(_field("880", ("6", "245-01/$1"), ("a", "中国历史"), ("b", "新编")))
+    record.add_field(_field("880", ("6", "800-02/$1"), ("a", "王力"), ("c", "编")))
+    record.add_field(_field("880", ("6", "245-00/$1"), ("a", "ungepaart")))
+    record.add_field(_field("880", ("a", "ohne $6")))
+    return record
+
+
+def test_parse_linkage():
+    assert parse_linkage("245-01/$1/r") == ("245", "01")
+    assert parse_linkage("880-12") == ("880", "12")
+    assert parse_linkage("245") == ("245", "")
+
+
+def test_index(linked_record):
+    links = link_index(linked_record)
+
+    assert [field["a"] for field in links.fields("245")] == ["中国历史", "ungepaart"]
+    assert [field["a"] for field in links.fields("800")] == ["王力"]
+    assert links.fields("520") == [] and len(links) == 3
+    assert links.linked(linked_record["245"])["a"] == "中国历史"
+    assert links.linked(linked_record["001"]) is None
+    # Einmal pro Record aufgebaut, neu nur auf Anforderung
+    assert link_index(linked_record) is links
+    linked_record.remove_fields("880")
+    assert len(link_index(linked_record)) == 3 and len(link_index(linked_record, rebuild=True)) == 0
+
+
+def test_extract_marc_subfields(linked_record):
+    assert MarcUtils.extract_marc_subfields(linked_record, "LNK245ab", join=" : ") == ["中国历史 : 新编", "ungepaart"]
+    assert MarcUtils.extract_marc_subfields(linked_record, "245a", "LNK800ac") == ["Zhongguo li shi", "王力", "编"]
+    assert MarcUtils.extract_marc_subfields(linked_record, "LNK520a") == []
+
+
+def test_konverter_entspricht_map_record(linked_record):
+    values = convert(linked_record)
+
+    assert values == map_record(linked_record)
+    assert values["title_orig"] == "中国历史 : 新编"
+    assert values["series_orig"] == ["王力 编"]
+
+
+def test_lazy_record_dekodiert_nur_880(linked_record):
+    record = next(iter(LazyMARCReader(io.BytesIO(linked_record.as_marc()))))
+
+    assert [field["a"] for field in link_index(record).fields("245")] == ["中国历史", "ungepaart"]
+    assert record.decoded_field_count == 4
+
+
+def test_marcspec(linked_record):
+    assert MARCSpecParser().parse("LNK245$a").linked
+    executor = MARCSpecExecutor(linked_record)
+
+    assert executor.execute("LNK245$a$b") == ["中国历史", "新编", "ungepaart"]
+    assert executor.execute("LNK800$a") == ["王力"]
+    assert executor.execute("245$a") == ["Zhongguo li shi"]
+
+
+def test_ungueltige_lnk_spezifikation(tmp_path):
+    with open(SCHEMA, encoding="utf-8") as f:
+        schema = yaml.safe_load(f)
+    schema["classes"]["Finc"]["attributes"]["title_orig"]["annotations"]["source_marc"] = "LNKabc"
+
+    with pytest.raises(ValueError, match="Ungültige Feldspezifikation 'LNKabc'"):
+        compile_converter(schema, tmp_path)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die streamenden MARCXML- und MARC-in-JSON-Leser.
+"""
+
+import io
+import tracemalloc
+
+from pymarc.marcxml import record_to_xml
+
+from help.marc_readers import (
+    MarcJsonLinesReader,
+    MarcXmlStreamReader,
+    create_marc_reader,
+    detect_input_format,
+)
+from help.marc_utils import MarcUtils
+
+
+def as_marcxml_collection(records, repeat=1) -> bytes:
+    parts = [b'<?xml version="1.0" encoding="UTF-8"?>',
+             b'<collection xmlns="http://www.loc.gov/MARC21/slim">']
+    for _ in range(repeat):
+        parts.extend(record_to_xml(record, namespace=False) for record in records)
+    parts.append(b'</collection>')
+    return b"\n".join(parts)
+
+
+def as_json_lines(records) -> bytes:
+    return "\n".join(record.as_json() for record in records).encode("utf-8")
+
+
+def extract(record):
+    return (
+        record['001'].data,
+        MarcUtils.extract_marc_subfields(record, "245ab", join=": "),
+        MarcUtils.extract_marc_subfields(record, "650a", "020a"),
+    )
+
+
+def test_marcxml_liefert_gleiche_extraktion_wie_iso2709(sample_records):
+    records = sample_records
+    reader = MarcXmlStreamReader(io.BytesIO(as_marcxml_collection(records)))
+    streamed = list(reader)
+
+    assert len(streamed) == len(records)
+    assert [extract(r) for r in streamed] == [extract(r) for r in records]
+    assert str(streamed[0].leader) == str(records[0].leader)
+
+
+def test_marc_json_lines_liefert_gleiche_extraktion_wie_iso2709(sample_records):
+    records = sample_records
+    streamed = list(MarcJsonLinesReader(io.BytesIO(as_json_lines(records))))
+
+    assert [extract(r) for r in streamed] == [extract(r) for r in records]
+
+
+def test_defekte_json_zeile_liefert_none_mit_ursache():
+    reader = MarcJsonLinesReader(io.BytesIO(b'{"leader": \n\n'))
+    results = list(reader)
+
+    assert results == [None]
+    assert reader.current_exception is not None
+    assert reader.current_chunk == b'{"leader": \n'
+
+
+def test_defektes_marcxml_liefert_none_und_endet(sample_records):
+    data = as_marcxml_collection(sample_records[:2])
+    # Abgeschnitten mitten im dritten Record
+    data = data.replace(b'</collection>', b'<record><leader>00000nam')
+    reader = MarcXmlStreamReader(io.BytesIO(data))
+    results = list(reader)
+
+    assert [record['001'].data for record in results[:2]] == [r['001'].data for r in sample_records[:2]]
+    assert results[2:] == [None]
+    assert reader.current_chunk is None
+    assert "no element found" in str(reader.current_exception)
+
+
+def test_marcxml_speicherbedarf_bleibt_konstant(sample_records):
+    records = sample_records
+    source = as_marcxml_collection(records, repeat=100)
+
+    tracemalloc.start()
+    count = sum(1 for _ in MarcXmlStreamReader(io.BytesIO(source)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert count == len(records) * 100
+    # Die Quelle ist mehrere MB groß, der Leser hält nur den aktuellen Record
+    assert peak < len(source) / 10
+
+
+def test_formaterkennung_und_fabrik():
+    assert detect_input_format("daten/titel.xml") == "xml"
+    assert detect_input_format("daten/titel.JSONL") == "json"
+    assert detect_input_format("daten/titel.mrc") == "marc"
+    assert isinstance(create_marc_reader(io.BytesIO(b""), "xml"), MarcXmlStreamReader)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für Speicherbeobachtung und Speicherbudget (help/memory.py).
+"""
+
+import time
+
+import pytest
+
+from help.memory import (PRESSURE_HARD, PRESSURE_OK, PRESSURE_SOFT, MemoryBudget, MemoryProfiler, current_rss,
+                         parse_size)
+from marc2finc import process_marc_files
+from slubmodels.converter import convert
+from slubmodels.dataclass_model import Finc as DataclassFinc
+from slubmodels.pydantic_model import Finc as PydanticFinc
+
+MODELS = {"PydanticFinc": PydanticFinc, "DataclassFinc": DataclassFinc, "converter": convert}
+MIB = 1024 ** 2
+
+
+class FakeRss:
+    """Liefert vorgegebene RSS-Werte, danach immer den letzten."""
+
+    def __init__(self, *values):
+        self.values = list(values)
+
+    def __call__(self):
+        return self.values.pop(0) if len(self.values) > 1 else self.values[0]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1000", 1000),
+    ("512M", 512 * MIB),
+    ("2G", 2 * 1024 * MIB),
+    ("1.5g", int(1.5 * 1024 * MIB)),
+    ("64MiB", 64 * MIB),
+    ("100 kb", 100 * 1024),
+])
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+def test_parse_size_ungueltig():
+    with pytest.raises(ValueError, match="Ungültige Speichergröße"):
+        parse_size("viel")
+
+
+def test_druckstufen_und_abschnittsgroesse():
+    budget = MemoryBudget(100 * MIB, interval=8, min_interval=2, rss_reader=FakeRss(50 * MIB, 85 * MIB, 120 * MIB,
+                                                                                    120 * MIB, 10 * MIB))
+    assert budget.check() == PRESSURE_OK and budget.interval == 8
+    assert budget.check() == PRESSURE_SOFT and budget.interval == 4
+    assert budget.check() == PRESSURE_HARD and budget.interval == 2
+    assert budget.check() == PRESSURE_HARD and budget.interval == 2
+    assert budget.check() == PRESSURE_OK and budget.interval == 4
+    assert budget.peak_rss == 120 * MIB
+    # Zwei aufeinanderfolgende Prüfungen über der Grenze sind ein Ereignis
+    assert budget.hard_events == 1
+
+    assert [budget.due() for _ in range(4)] == [False, False, False, True]
+
+
+def test_ueberschreitung_warnt_einmal_ohne_anzuhalten(caplog):
+    budget = MemoryBudget(MIB, rss_reader=FakeRss(2 * MIB, 2 * MIB, MIB // 2, 2 * MIB))
+    for _ in range(2):
+        assert budget.check() == PRESSURE_HARD
+        budget.overrun()
+    assert budget.check() == PRESSURE_OK
+    assert budget.check() == PRESSURE_HARD
+    budget.overrun()
+
+    warnings = [record for record in caplog.records if "überschritten" in record.getMessage()]
+    assert budget.overruns == 3
+    assert len(warnings) == 2
+
+
+def test_ohne_ausgabedatei_kein_stillstand():
+    start = time.perf_counter()
+    budget = MemoryBudget(MIB, interval=1, min_interval=1, rss_reader=FakeRss(2 * MIB))
+    process_marc_files("samples/output.mrc", None, MODELS, memory_budget=budget)
+    assert time.perf_counter() - start < 10
+    assert budget.flushes == 0
+    assert budget.overruns == 13
+
+
+def test_vorzeitiges_schreiben_ergibt_dieselbe_ausgabe(tmp_path):
+    expected_pydantics, expected_dataclasses = process_marc_files("samples/output.mrc", str(tmp_path / "normal"), MODELS)
+
+    budget = MemoryBudget(MIB, interval=4, min_interval=4, rss_reader=FakeRss(2 * MIB))
+    pydantics, dataclasses = process_marc_files("samples/output.mrc", str(tmp_path / "budget"), MODELS,
+                                                memory_budget=budget)
+
+    for suffix in ("pydantic.jsonl", "dataclass.jsonl"):
+        assert (tmp_path / f"budget.{suffix}").read_bytes() == (tmp_path / f"normal.{suffix}").read_bytes()
+    # Geprüft wird vor den Records 4, 8 und 12; danach bleiben nur die beiden letzten Modelle im Speicher
+    assert budget.flushes == 3
+    assert len(pydantics) == len(dataclasses) == len(expected_pydantics) - 11
+    assert pydantics == expected_pydantics[11:]
+
+
+def test_profiler_schritte():
+    profiler = MemoryProfiler("tracemalloc", sample_interval=2)
+    try:
+        profiler.start_stage("eins")
+        data = [bytes(1024) for _ in range(1024)]
+        for _ in range(4):
+            profiler.sample()
+        profiler.start_stage("zwei")
+        del data
+        profiler.log_summary()
+    finally:
+        profiler.close()
+
+    summary = profiler.summary()
+    assert [entry["stage"] for entry in summary] == ["eins", "zwei"]
+    assert summary[0]["samples"] == 3
+    assert summary[0]["traced_peak"] >= MIB
+    if current_rss() is not None:
+        assert summary[0]["rss_peak"] >= summary[0]["rss_start"]
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die Normalisierungskette (help/normalize.py).
+"""
+
+import re
+import unicodedata
+
+import pytest
+
+from help.marc_utils import MarcUtils
+from help.normalize import TextNormalizer, get_normalizer, is_single_char_pattern, solrmarc_clean
+
+TOPIC_SPECS = ("600abcdefghjklmnopqrstuvxyz", "650abcdevxyz", "689agxz", "653a")
+
+
+def sequential(value, patterns):
+    """Referenz: strip und jedes Muster einzeln wie MarcUtils.clean_field_content()."""
+    return MarcUtils.clean_field_content(value, True, MarcUtils.compile_regex_patterns(patterns))
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    (r"\d", True),
+    (r"[()]", True),
+    (r"a|\W", True),
+    (r"ab", False),
+    (r"\d+", False),
+    (r"^\d", False),
+    (r"(?<=a)b", False),
+    (r"\b.", False),
+    (r"(?i)a", False),
+])
+def test_ein_zeichen_muster(pattern, expected):
+    assert is_single_char_pattern(re.compile(pattern)) is expected
+
+
+@pytest.mark.parametrize("patterns", [
+    [r"\d", r"\W"],
+    [r"\d", r"[()]", r"\W"],
+    [r"b", r"ab"],
+    [r"x", r"ab", r"\d"],
+    [r"\[.*?\]", r"\d", r"\s+$"],
+])
+def test_zusammenfassung_entspricht_einzelschritten(patterns):
+    normalize = TextNormalizer(remove_patterns=patterns)
+    for value in (" abc ", "axb1", "Botanik (1860) [Elektronische Ressource] ", "a1b", "xab9", "  "):
+        assert normalize(value) == sequential(value, patterns)
+
+
+def test_zusammenfassung_nur_aufeinanderfolgender_muster():
+    normalize = TextNormalizer(remove_patterns=[r"\d", r"[()]", "ab", r"x", r"\W"])
+    assert [step.pattern for step in normalize.steps] == [r"(?:\d)|(?:[()])", "ab", r"(?:x)|(?:\W)"]
+
+
+def test_ungueltiges_muster_wird_uebersprungen():
+    normalize = TextNormalizer(remove_patterns=[r"(", r"\d"])
+    assert [step.pattern for step in normalize.steps] == [r"\d"]
+    assert normalize("Band 3") == "Band "
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Botanik /", "Botanik"),
+    ("Schmeil, Otto,", "Schmeil, Otto"),
+    ("Flora von Deutschland ;", "Flora von Deutschland"),
+    ("[Elektronische Ressource].", "Elektronische Ressource"),
+    ("Goethe, J. W.", "Goethe, J. W."),
+    ("Leipzig : Quelle & Meyer.", "Leipzig : Quelle & Meyer"),
+    ("[a] und [b]", "[a] und [b]"),
+    ("Titel... :", "Titel"),
+])
+def test_solrmarc_clean(value, expected):
+    assert solrmarc_clean(value) == expected
+
+
+def test_nfc_und_cache():
+    normalize = TextNormalizer(nfc=True, clean_punctuation=True, cache_size=2)
+    decomposed = unicodedata.normalize("NFD", "Pflanzenführer /")
+    assert normalize(decomposed) == "Pflanzenführer"
+    assert normalize(decomposed) == "Pflanzenführer"
+    normalize("a")
+    normalize("b")
+    assert normalize.stats() == {"hits": 1, "misses": 3, "hit_rate": 0.25, "size": 2, "maxsize": 2}
+
+
+def test_extract_marc_subfields_nutzt_gemeinsamen_normalisierer(sample_records):
+    normalizer = get_normalizer(True, (r"\d", r"\W"))
+    normalizer.clear_cache()
+
+    for record in sample_records:
+        expected = []
+        for spec in TOPIC_SPECS:
+            for field in record.get_fields(spec[:3]):
+                for code in spec[3:]:
+                    for content in field.get_subfields(code):
+                        value = sequential(content, [r"\d", r"\W"]) if content else ""
+                        if value:
+                            expected.append(value)
+        assert MarcUtils.extract_marc_subfields(record, *TOPIC_SPECS, remove_patterns=[r"\d", r"\W"]) == expected
+
+    assert get_normalizer(True, (r"\d", r"\W")) is normalizer
+    assert normalizer.hits > 0 and 0 < normalizer.hit_rate < 1
+
+
+def test_ohne_regex_parser_keine_zusammenfassung(monkeypatch):
+    import help.normalize as normalize_module
+    monkeypatch.setattr(normalize_module, "sre_parse", None)
+
+    normalizer = TextNormalizer(remove_patterns=[r"\d", r"\W"], cache_size=0)
+    assert [step.pattern for step in normalizer.steps] == [r"\d", r"\W"]
+    assert normalizer("Botanik 1860 /") == "Botanik"
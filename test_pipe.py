@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für den Pipe-Modus (-s - -t -).
+"""
+
+import io
+import json
+import select
+import subprocess
+import sys
+import time
+
+import pytest
+
+from help.dedup import RecordDeduplicator
+from help.pipe import JsonLinesWriter, is_stdio, open_source
+from marc2finc import process_marc_files
+
+
+class CountingBuffer(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.flush_count = 0
+
+    def flush(self):
+        self.flush_count += 1
+        super().flush()
+
+
+def _stdin(monkeypatch, data):
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(data)))
+
+
+def test_is_stdio():
+    assert is_stdio("-") and not is_stdio("samples/output.mrc") and not is_stdio(None)
+
+
+@pytest.mark.parametrize("flush_every, lines, expected", [(1, 3, 3), (2, 5, 3), (0, 5, 1)])
+def test_flush_nach_anzahl(flush_every, lines, expected):
+    buffer = CountingBuffer()
+    with JsonLinesWriter(buffer, flush_every=flush_every) as writer:
+        for number in range(lines):
+            writer.write(f'{{"n": {number}}}\n')
+
+    assert buffer.flush_count == expected == writer.flushes
+    assert buffer.getvalue().decode("utf-8").splitlines() == [f'{{"n": {number}}}' for number in range(lines)]
+
+
+def test_flush_nach_zeit():
+    buffer = CountingBuffer()
+    writer = JsonLinesWriter(buffer, flush_every=0, flush_seconds=0.02)
+    writer.write('{"n": 1}\n')
+    deadline = time.monotonic() + 5
+    while buffer.flush_count == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Geleert, ohne dass eine weitere Zeile geschrieben wurde
+    assert buffer.flush_count == 1
+    writer.close()
+    assert buffer.flush_count == 1
+
+
+def test_open_source_stdin(monkeypatch, sample_bytes):
+    _stdin(monkeypatch, sample_bytes)
+    with open_source("-") as f:
+        assert f.read() == sample_bytes
+    # stdin bleibt offen
+    assert not sys.stdin.buffer.closed
+
+
+def test_stdin_nach_stream_wie_datei(monkeypatch, tmp_path, sample_bytes):
+    process_marc_files("samples/output.mrc", str(tmp_path / "datei"))
+    _stdin(monkeypatch, sample_bytes)
+    buffer = io.BytesIO()
+
+    pydantics, dataclasses = process_marc_files("-", None, output_stream=JsonLinesWriter(buffer))
+
+    assert pydantics == [] and dataclasses == []
+    assert buffer.getvalue() == (tmp_path / "datei.pydantic.jsonl").read_bytes()
+
+
+def test_vorlauf_mit_stdin(monkeypatch, sample_bytes):
+    _stdin(monkeypatch, sample_bytes)
+    deduplicator = RecordDeduplicator(["id"], policy="last")
+    try:
+        with pytest.raises(ValueError, match="nicht mit stdin"):
+            process_marc_files("-", None, output_stream=JsonLinesWriter(io.BytesIO()), deduplicator=deduplicator)
+    finally:
+        deduplicator.close()
+
+
+def _readline(stream, timeout):
+    ready, _, _ = select.select([stream], [], [], timeout)
+    return stream.readline() if ready else b""
+
+
+def test_pipeline_liefert_jeden_record_sofort(sample_records):
+    process = subprocess.Popen([sys.executable, "marc2finc.py", "-s", "-", "-t", "-"], stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for record in sample_records[:3]:
+            process.stdin.write(record.as_marc())
+            process.stdin.flush()
+            # Die Zeile kommt, solange stdin noch offen ist
+            line = _readline(process.stdout, 60)
+            assert json.loads(line)["record_id"] == record["001"].data
+        process.stdin.close()
+        assert process.stdout.read() == b""
+        assert process.wait(timeout=60) == 0
+        # Logs stehen auf stderr, nicht zwischen den JSON-Zeilen
+        assert b"3 JSON-Zeilen nach stdout geschrieben" in process.stderr.read()
+    finally:
+        process.kill()
+        process.stdout.close()
+        process.stderr.close()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für den Offsetindex und den Konvertierungscache (help/record_index.py).
+"""
+
+import os
+import shutil
+
+import pytest
+
+from help.record_index import ConversionCache, RecordIndex
+from slubmodels.converter import convert
+from slubmodels.pydantic_model import Finc
+
+
+@pytest.fixture
+def marc_file(tmp_path):
+    target = tmp_path / "output.mrc"
+    shutil.copy("samples/output.mrc", target)
+    return target
+
+
+@pytest.fixture
+def records(sample_records):
+    return sample_records
+
+
+def title(record):
+    return " ".join(value.strip() for value in record["245"].get_subfields("a", "b") if value.strip())
+
+
+def test_seiten_entsprechen_der_datei(marc_file, records):
+    with RecordIndex(marc_file) as index:
+        assert len(index) == len(records) == 13
+        assert index.page_count(5) == 3
+        pages = [index.page(number, 5) for number in range(3)]
+        assert [len(page) for page in pages] == [5, 5, 3]
+        assert index.page(3, 5) == []
+
+        entries = [entry for page in pages for entry in page]
+        assert [entry.n for entry in entries] == list(range(13))
+        assert [entry.id for entry in entries] == [record["001"].data for record in records]
+        assert [entry.title for entry in entries] == [title(record) for record in records]
+
+        # Über Offset und Länge gelesen ist der Record identisch mit dem aus der Datei
+        for entry, record in zip(entries, records):
+            assert index.read_chunk(entry) == record.as_marc()
+            assert index.record(entry)["245"].value() == record["245"].value()
+
+
+def test_suche_nach_titel_und_id(marc_file, records):
+    with RecordIndex(marc_file) as index:
+        record = records[4]
+        word = title(record).split()[0]
+        expected = [n for n, other in enumerate(records) if word.lower()[:4] in title(other).lower()]
+
+        hits = index.page(0, 50, word[:4])
+        assert record["001"].data in [entry.id for entry in hits]
+        assert index.count(word[:4]) == len(hits)
+        assert set(expected) <= {entry.n for entry in hits}
+
+        assert [entry.n for entry in index.page(0, 50, record["001"].data)] == [4]
+        assert index.find(record["001"].data).n == 4
+        assert index.count("gibtesnicht") == 0
+
+
+def test_suche_ohne_fts5(marc_file, records):
+    with RecordIndex(marc_file) as index:
+        index.fts = False
+        word = title(records[0]).split()[1]
+        assert 0 in [entry.n for entry in index.page(0, 50, word)]
+
+
+def test_index_wird_nur_bei_aenderung_neu_aufgebaut(marc_file, monkeypatch):
+    with RecordIndex(marc_file) as index:
+        assert index.is_current()
+
+    builds = []
+    original_build = RecordIndex.build
+    monkeypatch.setattr(RecordIndex, "build", lambda self: builds.append(1) or original_build(self))
+    RecordIndex(marc_file).close()
+    assert builds == []
+
+    with open(marc_file, "ab") as marc:
+        marc.write(open("samples/output.mrc", "rb").read())
+    stat = os.stat(marc_file)
+    os.utime(marc_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    with RecordIndex(marc_file) as index:
+        assert builds == [1]
+        assert len(index) == 26
+
+
+def test_konvertierung_wird_pro_id_gespeichert(marc_file):
+    cache = ConversionCache(convert, Finc, maxsize=2)
+    with RecordIndex(marc_file) as index:
+        first, second, third = index.page(0, 3)
+        result = cache.get(index, first)
+        assert result["record_id"] == first.id
+        assert cache.get(index, first) is result
+        cache.get(index, second)
+        cache.get(index, third)
+
+    assert (cache.hits, cache.misses, len(cache)) == (1, 3, 2)
+
+
+def test_konvertierungsfehler_im_ergebnis(marc_file):
+    def failing(record):
+        raise ValueError("kaputt")
+
+    with RecordIndex(marc_file) as index:
+        result = ConversionCache(failing).get(index, index.page(0, 1)[0])
+    assert result == {"error": "ValueError: kaputt"}
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für den HTTP-Dienst (marc2finc.py --serve).
+"""
+
+import http.client
+import json
+import threading
+
+import pytest
+from pymarc import record_to_xml
+
+from help.serve import (ConversionServer, ConversionService, Histogram, RecordConverter,
+                        detect_body_format)
+from marc2finc import _pydantic_json, process_marc_files
+from slubmodels.converter import convert
+from slubmodels.pydantic_model import Finc as PydanticFinc
+from test_error_report import write_faulty_source
+
+
+def _converter():
+    return RecordConverter({"PydanticFinc": PydanticFinc}, _pydantic_json, convert)
+
+
+@pytest.fixture(params=[0, 2], ids=["sammelthread", "prozesse"])
+def server(request):
+    service = ConversionService(_converter(), workers=request.param, batch_size=8, batch_wait=0.005).start()
+    http_server = ConversionServer(("127.0.0.1", 0), service, max_body=1024 * 1024)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield http_server
+    http_server.shutdown()
+    http_server.server_close()
+    service.stop()
+
+
+def _request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=30)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.read().decode("utf-8")
+    finally:
+        connection.close()
+
+
+def test_histogram():
+    histogram = Histogram((0.001, 0.01, 0.1))
+    for value in (0.0005, 0.002, 0.003, 0.05, 3.0):
+        histogram.observe(value)
+
+    assert histogram.count == 5 and histogram.sum == pytest.approx(3.0555)
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(1.0) == float("inf")
+    assert Histogram((1,)).quantile(0.5) is None
+    lines = histogram.prometheus("latenz", "Test")
+    assert 'latenz_bucket{le="0.01"} 3' in lines and 'latenz_bucket{le="+Inf"} 5' in lines
+    assert "latenz_count 5" in lines
+
+
+@pytest.mark.parametrize("data, content_type, requested, expected", [
+    (b"00714cam", None, None, "marc"),
+    (b"  <?xml version='1.0'?>", None, None, "xml"),
+    (b'{"leader": ""}', None, None, "json"),
+    (b"00714cam", "application/marcxml+xml", None, "xml"),
+    (b"<collection/>", "application/marc", None, "marc"),
+    (b"00714cam", "application/x-ndjson; charset=utf-8", None, "json"),
+    (b"00714cam", "application/xml", "marc", "marc"),
+])
+def test_detect_body_format(data, content_type, requested, expected):
+    assert detect_body_format(data, content_type, requested) == expected
+
+
+def test_detect_body_format_unbekannt():
+    with pytest.raises(ValueError, match="Unbekanntes Format: pdf"):
+        detect_body_format(b"", None, "pdf")
+
+
+def test_gleiche_dokumente_wie_dateiausgabe(server, tmp_path, sample_bytes):
+    process_marc_files("samples/output.mrc", str(tmp_path / "datei"))
+    expected = [json.loads(line) for line in open(tmp_path / "datei.pydantic.jsonl", encoding="utf-8")]
+
+    status, body = _request(server, "POST", "/convert", sample_bytes)
+
+    assert status == 200
+    assert json.loads(body) == {"records": expected, "errors": []}
+
+
+def test_marcxml(server, sample_records):
+    xml = (b'<collection xmlns="http://www.loc.gov/MARC21/slim">'
+           + b"".join(record_to_xml(record, namespace=False) for record in sample_records[:2]) + b"</collection>")
+
+    status, body = _request(server, "POST", "/convert", xml, {"Content-Type": "application/marcxml+xml"})
+
+    assert status == 200
+    assert [document["record_id"] for document in json.loads(body)["records"]] == \
+        [record["001"].data for record in sample_records[:2]]
+
+
+def test_fehler_pro_record(server, tmp_path, sample_records):
+    records = write_faulty_source(tmp_path / "quelle.mrc", sample_records)
+
+    status, body = _request(server, "POST", "/convert", (tmp_path / "quelle.mrc").read_bytes())
+
+    result = json.loads(body)
+    assert status == 200
+    assert len(result["records"]) == len(records) - 2
+    assert [error["position"] for error in result["errors"]] == [2, 3, len(records) + 1]
+    assert result["errors"][0]["reasons"][0]["stage"] == "mapping"
+    assert result["errors"][1]["reasons"][0]["field"] == "isbn"
+
+
+def test_parallele_anfragen_und_metriken(server, sample_records):
+    results = [None] * 12
+
+    def post(index):
+        results[index] = _request(server, "POST", "/convert", sample_records[index % len(sample_records)].as_marc())
+
+    threads = [threading.Thread(target=post, args=(index,)) for index in range(len(results))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for index, (status, body) in enumerate(results):
+        assert status == 200
+        assert json.loads(body)["records"][0]["record_id"] == sample_records[index % len(sample_records)]["001"].data
+
+    status, metrics = _request(server, "GET", "/metrics")
+    assert status == 200
+    lines = metrics.splitlines()
+    assert "marc2finc_requests_total 12" in lines and "marc2finc_records_total 12" in lines
+    assert "marc2finc_request_seconds_count 12" in lines
+    # Gleichzeitige Anfragen werden zu Stapeln zusammengefasst
+    batches = int(next(line.split()[1] for line in lines if line.startswith("marc2finc_batch_requests_count")))
+    assert 1 <= batches <= 12
+
+
+def test_abgelehnte_anfragen(server):
+    assert _request(server, "GET", "/health") == (200, "ok\n")
+    assert _request(server, "GET", "/unbekannt")[0] == 404
+    assert _request(server, "POST", "/convert?format=pdf", b"x")[0] == 400
+    # Zu große Bodys werden schon anhand von Content-Length abgelehnt, ohne sie zu lesen
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=30)
+    connection.putrequest("POST", "/convert")
+    connection.putheader("Content-Length", str(1024 * 1024 + 1))
+    connection.endheaders()
+    assert connection.getresponse().status == 413
+    connection.close()
+    status, metrics = _request(server, "GET", "/metrics")
+    assert "marc2finc_rejected_requests_total 3" in metrics.splitlines()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die Aufteilung der Ausgabe auf Shards und die Rotation der Dateien.
+"""
+
+import io
+import json
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from help.pipe import JsonLinesWriter
+from help.shards import (OutputLayout, _murmurhash3_32_python, composite_id_hash, murmurhash3_32,
+                         solr_ranges)
+from marc2finc import process_marc_files
+
+
+@pytest.mark.parametrize("data, seed, expected", [
+    (b"", 0, 0),
+    (b"", 1, 0x514E28B7),
+    (b"abc", 0, 0xB3DD93FA),
+    (b"aaaa", 0x9747B28C, 0x5A97808A),
+    (b"Hello, world!", 0, 0xC0363E43),
+    (b"The quick brown fox jumps over the lazy dog", 0, 0x2E4FF723),
+])
+def test_murmurhash3(data, seed, expected):
+    assert _murmurhash3_32_python(data, seed) == murmurhash3_32(data, seed) == expected
+
+
+def test_solr_ranges():
+    # Wie die Bereiche von shard1..shard4 einer Collection mit numShards=4
+    assert [(start & 0xFFFFFFFF, end & 0xFFFFFFFF) for start, end in solr_ranges(4)] == [
+        (0x80000000, 0xBFFFFFFF), (0xC0000000, 0xFFFFFFFF), (0x00000000, 0x3FFFFFFF), (0x40000000, 0x7FFFFFFF)]
+    assert solr_ranges(1) == [(-(1 << 31), (1 << 31) - 1)]
+
+
+def test_composite_id_hash():
+    prefix, doc = murmurhash3_32(b"0"), murmurhash3_32(b"1883795745")
+    assert composite_id_hash("0!1883795745") & 0xFFFFFFFF == (prefix & 0xFFFF0000) | (doc & 0x0000FFFF)
+    assert composite_id_hash("0/4!1883795745") & 0xFFFFFFFF == (prefix & 0xF0000000) | (doc & 0x0FFFFFFF)
+    assert composite_id_hash("0-1883795745") & 0xFFFFFFFF == murmurhash3_32(b"0-1883795745")
+    # Alle Dokumente mit demselben Präfix landen bei Solr im selben Shard
+    layout = OutputLayout(shards=8, router="solr")
+    assert len({layout.shard_for(f"kxp!{number}") for number in range(100)}) == 1
+
+
+@pytest.mark.parametrize("router", ["hash", "solr"])
+def test_shards_gleichmaessig(router):
+    layout = OutputLayout(shards=4, router=router)
+    counts = Counter(layout.shard_for(f"0-{number}") for number in range(4000))
+    assert sorted(counts) == [0, 1, 2, 3]
+    assert all(800 < count < 1200 for count in counts.values())
+    # Stabil: gleiche id, gleicher Shard
+    assert layout.shard_for("0-1883795745") == OutputLayout(shards=4, router=router).shard_for("0-1883795745")
+
+
+def test_ungueltiges_layout():
+    with pytest.raises(ValueError, match="Unbekannter Shard-Router"):
+        OutputLayout(router="random")
+    with pytest.raises(ValueError, match="mindestens 1"):
+        OutputLayout(shards=0)
+
+
+def test_dateinamen():
+    assert OutputLayout().path(Path("out"), "r", "pydantic") == Path("out/r.pydantic.jsonl")
+    assert OutputLayout(shards=16).path(Path("out"), "r", "pydantic", 3) == Path("out/r.pydantic.shard03.jsonl")
+    assert OutputLayout(shards=200, max_records=5).path(Path("out"), "r", "dataclass", 7, 2) == \
+        Path("out/r.dataclass.shard007.part0002.jsonl")
+
+
+@pytest.mark.parametrize("limits, expected", [
+    ({"max_records": 2}, [2, 2, 1]),
+    # Die Datei wird gewechselt, bevor sie größer würde; eine zu lange Zeile steht allein
+    ({"max_bytes": 25}, [2, 1, 2]),
+])
+def test_rotation(tmp_path, limits, expected):
+    lines = ['{"n": 1}\n', '{"n": 2}\n', '{"long": "xxxxxxxxxxxxxxxxxxxxxxxx"}\n', '{"n": 4}\n', '{"n": 5}\n']
+    with OutputLayout(**limits).open(tmp_path, "r", "pydantic") as writer:
+        for line in lines:
+            writer.write(None, line)
+
+    files = writer.files()
+    assert [entry["records"] for entry in files] == expected
+    assert "".join((tmp_path / entry["path"]).read_text(encoding="utf-8") for entry in files) == "".join(lines)
+    assert [entry["bytes"] for entry in files] == [(tmp_path / entry["path"]).stat().st_size for entry in files]
+
+
+@pytest.mark.parametrize("router", ["hash", "solr"])
+def test_process_marc_files_mit_shards(tmp_path, router):
+    process_marc_files("samples/output.mrc", str(tmp_path / "eine" / "r"))
+    layout = OutputLayout(shards=3, router=router, max_records=3)
+
+    process_marc_files("samples/output.mrc", str(tmp_path / "shards" / "r"), layout=layout)
+
+    manifest = json.loads((tmp_path / "shards" / "r.shards.json").read_text(encoding="utf-8"))
+    assert manifest["shards"] == 3 and manifest["router"] == router
+    for kind in ("pydantic", "dataclass"):
+        expected = (tmp_path / "eine" / f"r.{kind}.jsonl").read_text(encoding="utf-8").splitlines()
+        lines = []
+        for entry in manifest["outputs"][kind]:
+            shard_lines = (tmp_path / "shards" / entry["path"]).read_text(encoding="utf-8").splitlines()
+            assert len(shard_lines) == entry["records"] <= 3
+            assert all(layout.shard_for(json.loads(line)["id"]) == entry["shard"] for line in shard_lines)
+            lines.extend(shard_lines)
+        assert sorted(lines) == sorted(expected)
+    assert not (tmp_path / "shards" / "r.pydantic.jsonl").exists()
+
+
+def test_shards_nicht_mit_stdout(tmp_path):
+    with pytest.raises(ValueError, match="nicht stdout"):
+        process_marc_files("samples/output.mrc", None, output_stream=JsonLinesWriter(io.BytesIO()),
+                           layout=OutputLayout(shards=2))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die generierte schlanke Finc-Klasse mit __slots__.
+"""
+
+import pytest
+from linkml_runtime.utils.schemaview import SchemaView
+
+from help.linkml_generator import generate_slotted_model
+from slubmodels.dataclass_model import Finc as DataclassFinc
+from slubmodels.slotted_model import Finc as SlottedFinc
+
+REQUIRED = ("id", "record_id", "title", "recordtype")
+
+
+def dataclass_json_dict(model):
+    """Serialisierung der Dataclass wie in process_marc_files()."""
+    return {k: v for k, v in model.__dict__.items() if v is not None and not (isinstance(v, list) and len(v) == 0)}
+
+
+def test_generierter_code_ist_aktuell():
+    source = generate_slotted_model(SchemaView("schema/finc.yaml"), "Finc", "finc.yaml")
+    with open("slubmodels/slotted_model.py", encoding="utf-8") as f:
+        assert f.read() == source
+
+
+def test_ausgabe_entspricht_dataclass(sample_values):
+    for values in sample_values:
+        slotted = SlottedFinc(**values).to_json_dict()
+        expected = dataclass_json_dict(DataclassFinc(**values))
+        assert list(slotted.items()) == list(expected.items())
+
+
+@pytest.mark.parametrize("field", REQUIRED)
+@pytest.mark.parametrize("empty", [None, []])
+def test_pflichtfelder_wie_dataclass(field, empty, sample_values):
+    values = dict(sample_values[0], **{field: empty})
+
+    with pytest.raises(ValueError) as dataclass_error:
+        DataclassFinc(**values)
+    with pytest.raises(ValueError) as slotted_error:
+        SlottedFinc(**values)
+    assert str(slotted_error.value) == str(dataclass_error.value) == f"{field} must be supplied"
+
+
+def test_umwandlung_und_unbekannte_felder(sample_values):
+    values = dict(sample_values[0], title="", topic="Botanik", author=[1, "b"], isbn=None)
+    slotted = SlottedFinc(**values)
+    dataclass = DataclassFinc(**values)
+
+    assert slotted.title == dataclass.title == ""
+    assert slotted.topic == dataclass.topic == ["Botanik"]
+    assert slotted.author == dataclass.author == ["1", "b"]
+    assert not hasattr(slotted, "__dict__")
+
+    with pytest.raises(ValueError, match="Unknown argument: unbekannt"):
+        SlottedFinc(**values, unbekannt=1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die einmalige, nicht blockierende Logging-Konfiguration (help/slublogging.py).
+"""
+
+import logging
+import logging.handlers
+import multiprocessing
+
+
+from help import slublogging
+from help.marc_utils import MarcUtils
+from help.slublogging import (configure_worker_logging, create_worker_log_queue, getSlubLogger,
+                              stop_worker_log_queue)
+from marc2finc import ISBN_SPECS, TOPIC_SPECS, map_record
+from slubmodels.converter import convert
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _log_in_worker(number):
+    log = logging.getLogger('test.worker')
+    log.info("Worker %d bearbeitet", number)
+    log.debug("Worker %d Details", number)
+    return number
+
+
+def test_konfiguration_nur_einmal(monkeypatch):
+    calls = []
+    monkeypatch.setattr(logging.config, "dictConfig", lambda config: calls.append(config))
+
+    for name in ("help.a", "help.b", "process_marc_files"):
+        getSlubLogger(name)
+    assert calls == []
+
+    root = logging.getLogger()
+    # Neben den Handlern von pytest hängt nur ein QueueHandler am Root-Logger, die Ausgabe läuft im Listener
+    assert sum(isinstance(handler, logging.handlers.QueueHandler) for handler in root.handlers) == 1
+    assert not any(type(handler) is logging.StreamHandler for handler in root.handlers)
+    assert slublogging._listener is not None
+    assert root.level == logging.INFO
+
+
+def test_keine_formatierung_bei_deaktiviertem_level(monkeypatch, sample_records):
+    records = sample_records
+    record_ids = [record['001'].data for record in records]
+
+    created = []
+    messages = []
+    original_debug = logging.Logger.debug
+    monkeypatch.setattr(logging.Logger, "makeRecord", lambda *args, **kwargs: created.append(args))
+
+    def spy_debug(self, msg, *args, **kwargs):
+        messages.append(msg)
+        return original_debug(self, msg, *args, **kwargs)
+    monkeypatch.setattr(logging.Logger, "debug", spy_debug)
+
+    for record in records:
+        map_record(record)
+        convert(record)
+        MarcUtils.extract_marc_subfields(record, *TOPIC_SPECS, *ISBN_SPECS, "999a")
+
+    # Kein LogRecord erzeugt, und keine Nachricht wurde vorab mit Werten aus dem Record formatiert
+    assert created == []
+    assert messages
+    assert not any(record_id in message for message in messages for record_id in record_ids)
+
+
+def test_worker_logs_im_elternprozess():
+    handler = ListHandler()
+    logger = logging.getLogger('test.worker')
+    logger.addHandler(handler)
+    context = multiprocessing.get_context("spawn")
+    log_queue = create_worker_log_queue(context)
+    try:
+        with context.Pool(2, initializer=configure_worker_logging, initargs=(log_queue,)) as pool:
+            assert sorted(pool.map(_log_in_worker, range(4))) == [0, 1, 2, 3]
+    finally:
+        stop_worker_log_queue(log_queue)
+        logger.removeHandler(handler)
+
+    assert sorted(record.getMessage() for record in handler.records) == [
+        f"Worker {number} bearbeitet" for number in range(4)]
+
+
+def test_neue_konfiguration_und_flush(tmp_path):
+    config_file = tmp_path / "logging.toml"
+    config_file.write_text(slublogging.DEFAULT_LOGGING_CONFIG.replace('level = "INFO"', 'level = "WARNING"', 1),
+                           encoding="utf-8")
+    try:
+        assert slublogging.configure_logging(config_file) is True
+        assert slublogging.configure_logging(config_file) is False
+        assert logging.getLogger().level == logging.WARNING
+        slublogging.flush_logging()
+    finally:
+        slublogging.configure_logging(force=True)
+    assert logging.getLogger().level == logging.INFO
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für die Sortierschlüssel (title_sort, author_sort).
+"""
+
+import io
+
+import pytest
+from pymarc import Field, Record, Subfield
+
+from help.lazy_marc import LazyMARCReader
+from help.sort_keys import ARTICLE_PATTERNS, ARTICLES, SortKeyBuilder, fold, get_sort_keys
+
+
+def _record(title, language="ger", indicator="0"):
+    record = Record()
+    record.add_field(Field(tag="001", data="1"),
+                     Field(tag="008", data="240611s2024    gw            000 0 " + language + " d"),
+                     Field(tag="245", indicators=["1", indicator], subfields=[Subfield("a", title)]))
+    return record
+
+
+@pytest.mark.parametrize("title, language, expected", [
+    ("Die Flora Deutschlands", "ger", "flora deutschlands"),
+    ("Der, die, das", "ger", "die das"),
+    ("The Night Tripper", "eng", "night tripper"),
+    ("A", "eng", "a"),
+    ("Anatomy of a Murder", "eng", "anatomy of a murder"),
+    ("L'Étranger", "fre", "etranger"),
+    ("Les Misérables", "fre", "miserables"),
+    ("Il nome della rosa", "ita", "nome della rosa"),
+    ("Het Achterhuis", "dut", "achterhuis"),
+    ("Die Hard", "eng", "die hard"),
+    ("Die Hard", None, "hard"),
+    ("De bello Gallico", "lat", "de bello gallico"),
+])
+def test_artikel_pro_sprache(title, language, expected):
+    assert SortKeyBuilder().title_key(title, language) == expected
+
+
+def test_artikeltabellen_vorkompiliert():
+    assert set(ARTICLE_PATTERNS) == set(ARTICLES)
+    assert ARTICLE_PATTERNS["lat"] is None
+    assert ARTICLE_PATTERNS["ger"].match("das buch")
+    assert not ARTICLE_PATTERNS["ger"].match("dasein")
+
+
+def test_indikator_hat_vorrang():
+    keys = SortKeyBuilder()
+    # Indikator 4 überspringt "Die ", der Artikel aus der Tabelle wird nicht zusätzlich entfernt
+    assert keys.title_key("Die Die-Hard-Filme", "ger", 4) == "die hard filme"
+    assert keys.title_key("[Die] Sprache", "ger", 0) == "sprache"
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Æsop ß Łódź", "aesop ss lodz"),
+    ("Friedrich II. Preußen, König 1712-1786", "friedrich ii preussen konig 1712 1786"),
+    ("Œuvres complètes", "oeuvres completes"),
+    ("  Mehrfach   Leerraum\t", "mehrfach leerraum"),
+    ("Dvořák, Antonín", "dvorak antonin"),
+])
+def test_faltung(value, expected):
+    assert SortKeyBuilder().key(value) == expected
+
+
+def test_fold_laesst_nicht_lateinische_schrift():
+    assert fold("Война и мир") == "война и мир"
+
+
+def test_lru_cache():
+    keys = SortKeyBuilder(cache_size=2)
+    for _ in range(3):
+        keys.key("Schmeil, Otto")
+        keys.title_key("Die Flora", "ger", 4)
+
+    stats = keys.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (4, 2, 2)
+    assert stats["hit_rate"] == pytest.approx(4 / 6)
+
+    keys.clear_cache()
+    assert keys.stats()["size"] == 0
+
+
+def test_title_aus_record():
+    keys = SortKeyBuilder()
+    assert keys.title("Die Flora", _record("Die Flora", indicator="4")) == "flora"
+    assert keys.title("The Night", _record("The Night", language="eng")) == "night"
+    assert keys.title("", _record("")) is None
+    assert keys.title("...", _record("...")) is None
+    # Ohne 008 gelten die Artikel aller Sprachen
+    record = _record("La reliure")
+    record.remove_fields("008")
+    assert keys.title("La reliure", record) == "reliure"
+
+
+def test_beispielrecords(sample_bytes, sample_records, sample_values):
+    keys = get_sort_keys()
+    lazy_records = list(LazyMARCReader(io.BytesIO(sample_bytes)))
+    titles = {values["record_id"]: values["title_sort"] for values in sample_values}
+
+    assert titles["1883795745"].startswith("flora deutschlands")
+    assert titles["1142777251"].startswith("reliure francaise")
+    for record, lazy in zip(sample_records, lazy_records):
+        value = record["245"]["a"]
+        assert keys.title(value, record) == keys.title(value, lazy)
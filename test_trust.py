@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests für den Vertrauensmodus (--trust) mit Stichproben-Validierung.
+"""
+
+import logging
+
+import pytest
+
+from help.trust import SAMPLED, SUSPICIOUS, TrustedDocument, TrustPolicy
+from marc2finc import _dataclass_json, _pydantic_json, process_marc_files
+from slubmodels.dataclass_model import Finc as DataclassFinc
+from slubmodels.pydantic_model import Finc as PydanticFinc
+from slubmodels.slotted_model import Finc as SlottedFinc
+
+
+@pytest.mark.parametrize("dataclass_class", [DataclassFinc, SlottedFinc], ids=["dataclass", "slotted"])
+def test_gleiches_json_wie_die_modelle(sample_values, dataclass_class):
+    trust = TrustPolicy(PydanticFinc, dataclass_class)
+    for values in sample_values:
+        document = trust.document(values)
+        assert _pydantic_json(document) == _pydantic_json(PydanticFinc(**values))
+        assert _dataclass_json(document) == _dataclass_json(dataclass_class(**values))
+        assert document.id == values["id"]
+
+
+def test_verdaechtige_records(sample_values):
+    trust = TrustPolicy(PydanticFinc, DataclassFinc, sample_rate=0)
+    values = sample_values[0]
+
+    assert trust.validation_reason(values) is None
+    assert trust.validation_reason({**values, "title": ""}) == SUSPICIOUS
+    assert trust.validation_reason({key: value for key, value in values.items() if key != "id"}) == SUSPICIOUS
+    assert trust.validation_reason({**values, "unbekannt": "x"}) == SUSPICIOUS
+    assert trust.trusted == 1
+
+
+def test_stichprobe():
+    values = {"id": "0-1", "record_id": "1", "title": "T", "recordtype": "marc"}
+    assert all(TrustPolicy(PydanticFinc, DataclassFinc, sample_rate=1).validation_reason(values) == SAMPLED
+               for _ in range(10))
+    trust = TrustPolicy(PydanticFinc, DataclassFinc, sample_rate=10, seed=1)
+    sampled = sum(trust.validation_reason(values) == SAMPLED for _ in range(10000))
+    assert 800 < sampled < 1200 and trust.trusted == 10000 - sampled
+    with pytest.raises(ValueError, match="nicht negativ"):
+        TrustPolicy(PydanticFinc, DataclassFinc, sample_rate=-1)
+
+
+def test_process_marc_files_wie_ohne_trust(tmp_path):
+    process_marc_files("samples/output.mrc", str(tmp_path / "voll"))
+    trust = TrustPolicy(PydanticFinc, DataclassFinc, sample_rate=0)
+
+    pydantics, dataclasses = process_marc_files("samples/output.mrc", str(tmp_path / "trust"), trust=trust)
+
+    assert all(isinstance(document, TrustedDocument) for document in pydantics + dataclasses)
+    for kind in ("pydantic", "dataclass"):
+        assert (tmp_path / f"trust.{kind}.jsonl").read_bytes() == (tmp_path / f"voll.{kind}.jsonl").read_bytes()
+
+
+def test_fehler_in_der_stichprobe(sample_values, caplog):
+    trust = TrustPolicy(PydanticFinc, DataclassFinc, sample_rate=1)
+    for values in sample_values[:4]:
+        reason = trust.validation_reason(values)
+        trust.observe(reason, values, PydanticFinc(**values), _pydantic_json)
+    # Validierung fehlgeschlagen bzw. validiertes JSON weicht von der direkten Ausgabe ab
+    trust.observe(SAMPLED, sample_values[4])
+    trust.observe(SAMPLED, sample_values[5], PydanticFinc(**sample_values[5]), lambda model: "{}\n")
+    trust.observe(SUSPICIOUS, sample_values[6])
+
+    assert trust.validated == {SAMPLED: 6, SUSPICIOUS: 1}
+    assert trust.failed == {SAMPLED: 2, SUSPICIOUS: 1} and trust.mismatched == 1
+    with caplog.at_level(logging.INFO, logger="help.trust"):
+        trust.log_summary()
+    assert "2 von 6 Records der Stichprobe fehlerhaft (1 mit abweichendem JSON)" in caplog.text
+    assert "1 von 1 verdächtigen Records fehlerhaft" in caplog.text